@@ -0,0 +1,201 @@
+# action_scheduler.py
+import asyncio
+import time
+from collections import deque
+
+# Prioridades das ações de saída (menor = mais importante)
+PRIORITY_HIGH = 0  # Respostas de callback e apagar mensagens
+PRIORITY_NORMAL = 1  # Banir, restringir e boas-vindas (o botão "Já segui" libera o usuário restrito)
+PRIORITY_LOW = 2  # Edições de mensagem
+
+PRIORITY_NAMES = {
+    PRIORITY_HIGH: "alta",
+    PRIORITY_NORMAL: "normal",
+    PRIORITY_LOW: "baixa",
+}
+
+
+class ActionDroppedError(Exception):
+    """Ação descartada da fila porque o bot está parando (prazo de drenagem esgotado)."""
+
+
+class ActionScheduler:
+    """Agendador das chamadas de saída para a API do Telegram.
+
+    Cada classe de prioridade tem sua fila; o despachante sempre atende a fila
+    mais importante, dentro de um orçamento de taxa (token bucket) e de um limite
+    de chamadas simultâneas. Proteção contra inanição: um item de classe inferior
+    que esperou mais que `max_wait_sec[classe]` passa na frente.
+    """
+
+    def __init__(self, rate_per_sec=30.0, burst=30, max_concurrent=16, max_wait_sec=None):
+        self.rate_per_sec = float(rate_per_sec)
+        self.burst = max(1, burst)
+        self.max_concurrent = max_concurrent
+        self.max_wait_sec = {PRIORITY_NORMAL: 2.0, PRIORITY_LOW: 5.0}
+        self.max_wait_sec.update(max_wait_sec or {})
+        self._queues = {priority: deque() for priority in PRIORITY_NAMES}
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._wakeup = None
+        self._semaphore = None
+        self._task = None
+        self._stopped = False  # Parado por stop(): novas ações são recusadas até o próximo start()
+        self._in_flight = set()
+        # Métricas por classe
+        self.dispatched = {priority: 0 for priority in PRIORITY_NAMES}
+        self.promoted = {priority: 0 for priority in PRIORITY_NAMES}  # Atendidos pela proteção contra inanição
+        self.max_wait_observed = {priority: 0.0 for priority in PRIORITY_NAMES}
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Inicia o despachante no event loop atual."""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._last_refill = time.monotonic()
+        self._stopped = False
+        self._task = asyncio.get_running_loop().create_task(self._dispatch_loop())
+
+    async def submit(self, priority, func, *args, **kwargs):
+        """Enfileira `func(*args, **kwargs)` na classe `priority` e aguarda o resultado.
+
+        Antes do primeiro start(), executa direto. Depois de stop(), levanta
+        ActionDroppedError: executar direto furaria o limite de taxa.
+        """
+        if self._stopped:
+            raise ActionDroppedError("Ação recusada: o agendador está parado")
+        if not self.running:
+            return await func(*args, **kwargs)
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append((time.monotonic(), future, func, args, kwargs))
+        self._wakeup.set()
+        return await future
+
+    def queue_depths(self):
+        """Profundidade atual de cada fila, por nome da classe."""
+        return {PRIORITY_NAMES[priority]: len(queue) for priority, queue in self._queues.items()}
+
+    def pending(self):
+        """Total de ações enfileiradas ou em execução."""
+        return sum(len(queue) for queue in self._queues.values()) + len(self._in_flight)
+
+    def stats(self):
+        return {
+            PRIORITY_NAMES[priority]: {
+                "depth": len(self._queues[priority]),
+                "dispatched": self.dispatched[priority],
+                "promoted": self.promoted[priority],
+                "max_wait_sec": round(self.max_wait_observed[priority], 3),
+            }
+            for priority in PRIORITY_NAMES
+        }
+
+    async def drain(self, timeout):
+        """Aguarda até `timeout` segundos as filas esvaziarem. Retorna True se esvaziaram."""
+        deadline = time.monotonic() + timeout
+        while self.pending() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        return not self.pending()
+
+    async def stop(self, drain_timeout=0):
+        """Para o despachante, opcionalmente drenando as filas antes. Retorna quantas ações foram descartadas.
+
+        Quem aguardava uma ação descartada recebe ActionDroppedError (e não CancelledError),
+        então os handlers terminam normalmente pelo seu tratamento de erro.
+        """
+        if drain_timeout and self.running:
+            await self.drain(drain_timeout)
+        self._stopped = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        dropped = 0
+        for queue in self._queues.values():
+            while queue:
+                _, future, _, _, _ = queue.popleft()
+                if not future.done():
+                    future.set_exception(ActionDroppedError("Ação descartada na parada do bot"))
+                    dropped += 1
+        return dropped
+
+    def _next_item(self, now):
+        """Escolhe o próximo item: o mais atrasado além do limite de espera, senão o de maior prioridade."""
+        overdue_priority = None
+        overdue_by = 0.0
+        for priority, max_wait in self.max_wait_sec.items():
+            queue = self._queues[priority]
+            if queue:
+                late = now - queue[0][0] - max_wait
+                if late >= 0 and (overdue_priority is None or late > overdue_by):
+                    overdue_priority, overdue_by = priority, late
+        if overdue_priority is not None:
+            self.promoted[overdue_priority] += 1
+            return overdue_priority, self._queues[overdue_priority].popleft()
+        for priority in sorted(self._queues):
+            if self._queues[priority]:
+                return priority, self._queues[priority].popleft()
+        return None, None
+
+    def _discard_abandoned(self):
+        """Tira do início das filas os itens de quem desistiu (tarefa cancelada). Retorna True se sobrou algum."""
+        for queue in self._queues.values():
+            while queue and queue[0][1].done():
+                queue.popleft()
+        return any(self._queues.values())
+
+    async def _acquire_token(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_per_sec)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate_per_sec)
+
+    async def _dispatch_loop(self):
+        while True:
+            if not self._discard_abandoned():
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            await self._acquire_token()
+            await self._semaphore.acquire()
+            # Itens podem ter sido cancelados durante a espera: só o que de fato sai consome a ficha
+            if not self._discard_abandoned():
+                self._tokens = min(self.burst, self._tokens + 1)
+                self._semaphore.release()
+                continue
+            now = time.monotonic()
+            priority, item = self._next_item(now)
+            queued_at, future, func, args, kwargs = item
+            self.dispatched[priority] += 1
+            self.max_wait_observed[priority] = max(self.max_wait_observed[priority], now - queued_at)
+            task = asyncio.get_running_loop().create_task(self._run(future, func, args, kwargs))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _run(self, future, func, args, kwargs):
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            if not future.done():
+                future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            self._semaphore.release()
@@ -0,0 +1,165 @@
+# api_retry.py
+import asyncio
+import random
+import time
+from collections import defaultdict
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+
+from action_scheduler import PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+
+# Métodos que podem ser repetidos após um erro de rede ou timeout. A requisição pode ter chegado
+# ao Telegram antes da falha; repetir estes não duplica nada. Os demais (ex.: send_message) não
+# são repetidos nesse caso, para não enviar a mesma mensagem duas vezes.
+IDEMPOTENT_METHODS = frozenset({
+    "delete_message", "delete_messages", "ban_chat_member", "unban_chat_member",
+    "restrict_chat_member", "set_chat_permissions", "edit_message_text", "answer_callback_query",
+    "get_chat", "get_chat_member", "get_me",
+})
+
+
+class CallShedError(TelegramError):
+    """Chamada descartada porque o Telegram está limitando o bot (circuit breaker aberto)."""
+
+    def __init__(self, method):
+        super().__init__(f"Chamada {method} descartada: Telegram limitando requisições")
+        self.method = method
+
+
+def _retry_after_seconds(error):
+    """retry_after pode ser int ou timedelta dependendo da versão do python-telegram-bot."""
+    delay = error.retry_after
+    if hasattr(delay, "total_seconds"):
+        delay = delay.total_seconds()
+    return float(delay)
+
+
+class CircuitBreaker:
+    """Circuit breaker de um método da API.
+
+    Abre após `failure_threshold` falhas seguidas (ou imediatamente em um
+    RetryAfter) e fica aberto por `reset_sec` (ou pelo retry_after informado).
+    Aberto, descarta chamadas de baixa prioridade; com o dobro de falhas
+    seguidas, descarta também as de prioridade normal.
+    """
+
+    def __init__(self, failure_threshold=5, reset_sec=30):
+        self.failure_threshold = failure_threshold
+        self.reset_sec = reset_sec
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def is_open(self, now=None):
+        now = time.monotonic() if now is None else now
+        return now < self.open_until
+
+    def allow(self, priority, now=None):
+        if not self.is_open(now) or priority == PRIORITY_HIGH:
+            return True
+        if priority == PRIORITY_NORMAL:
+            return self.consecutive_failures < 2 * self.failure_threshold
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, open_for=None):
+        self.consecutive_failures += 1
+        now = time.monotonic()
+        if open_for is not None:
+            self.open_until = max(self.open_until, now + open_for)
+        elif self.consecutive_failures >= self.failure_threshold:
+            self.open_until = max(self.open_until, now + self.reset_sec)
+
+
+class ApiCaller:
+    """Executa chamadas da API com retry: respeita RetryAfter (429) e usa backoff
+    exponencial com jitter para erros de rede transitórios (só nos IDEMPOTENT_METHODS).
+
+    Erros definitivos (BadRequest, Forbidden...) são repassados na primeira tentativa,
+    para que o tratamento existente de cada chamada continue funcionando.
+    """
+
+    def __init__(self, config=None, log=None, scheduler=None):
+        settings = (config or {}).get("api_retry", {})
+        self.max_attempts = max(1, settings.get("max_attempts", 4))
+        self.backoff_base_sec = settings.get("backoff_base_sec", 0.5)
+        self.backoff_max_sec = settings.get("backoff_max_sec", 10)
+        self.max_retry_after_sec = settings.get("max_retry_after_sec", 60)
+        self._breaker_threshold = settings.get("breaker_failure_threshold", 5)
+        self._breaker_reset_sec = settings.get("breaker_reset_sec", 30)
+        self._breakers = {}
+        self._log = log
+        self.scheduler = scheduler  # ActionScheduler: cada tentativa passa pela fila de prioridade
+        self.throttled_until = 0.0  # RetryAfter recebido em qualquer método
+        self.counters = defaultdict(lambda: {"calls": 0, "retries": 0, "failures": 0, "shed": 0})
+
+    def breaker(self, method):
+        breaker = self._breakers.get(method)
+        if breaker is None:
+            breaker = self._breakers[method] = CircuitBreaker(self._breaker_threshold, self._breaker_reset_sec)
+        return breaker
+
+    def is_throttled(self):
+        return time.monotonic() < self.throttled_until
+
+    def _backoff(self, attempt):
+        """Backoff exponencial com jitter completo."""
+        return random.uniform(0, min(self.backoff_max_sec, self.backoff_base_sec * (2 ** attempt)))
+
+    async def call(self, method, func, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """Chama `func(*args, **kwargs)` aplicando retry, backoff e o circuit breaker de `method`."""
+        breaker = self.breaker(method)
+        counters = self.counters[method]
+        counters["calls"] += 1
+
+        for attempt in range(self.max_attempts):
+            if not breaker.allow(priority) or (priority == PRIORITY_LOW and self.is_throttled()):
+                counters["shed"] += 1
+                raise CallShedError(method)
+
+            try:
+                if self.scheduler is not None:
+                    result = await self.scheduler.submit(priority, func, *args, **kwargs)
+                else:
+                    result = await func(*args, **kwargs)
+            except RetryAfter as e:
+                delay = _retry_after_seconds(e)
+                breaker.record_failure(open_for=delay)
+                self.throttled_until = max(self.throttled_until, time.monotonic() + delay)
+                last_attempt = attempt == self.max_attempts - 1
+                if priority == PRIORITY_LOW or last_attempt or delay > self.max_retry_after_sec:
+                    counters["failures"] += 1
+                    raise
+                counters["retries"] += 1
+                self._notify(f"{method}: limite do Telegram, nova tentativa em {delay:.0f}s.")
+                await asyncio.sleep(delay)
+            except BadRequest:
+                # Subclasse de NetworkError, mas não é transitório
+                counters["failures"] += 1
+                raise
+            except NetworkError as e:
+                # Inclui TimedOut. Diferente do 429, a requisição pode ter sido executada: só repete os idempotentes
+                breaker.record_failure()
+                if attempt == self.max_attempts - 1 or method not in IDEMPOTENT_METHODS:
+                    counters["failures"] += 1
+                    raise
+                counters["retries"] += 1
+                delay = self._backoff(attempt)
+                self._notify(f"{method}: erro de rede ({e}), nova tentativa em {delay:.1f}s.")
+                await asyncio.sleep(delay)
+            else:
+                breaker.record_success()
+                return result
+
+    def stats(self):
+        """Contadores por método e estado dos circuit breakers."""
+        return {
+            method: dict(counters, breaker_open=self.breaker(method).is_open())
+            for method, counters in self.counters.items()
+        }
+
+    def _notify(self, message):
+        if self._log:
+            self._log(message)
@@ -0,0 +1,215 @@
+# audit_log.py
+import queue
+import sqlite3
+import threading
+import time
+
+AUDIT_FILE = "moderation_audit.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audit (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    action TEXT NOT NULL,
+    rule TEXT,
+    user_id INTEGER,
+    chat_id INTEGER,
+    message_id INTEGER,
+    latency_ms REAL,
+    outcome TEXT NOT NULL,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_audit_user_ts ON audit(user_id, ts);
+CREATE INDEX IF NOT EXISTS idx_audit_chat_ts ON audit(chat_id, ts);
+CREATE INDEX IF NOT EXISTS idx_audit_rule_ts ON audit(rule, ts);
+CREATE INDEX IF NOT EXISTS idx_audit_ts ON audit(ts);
+"""
+
+_COLUMNS = ("id", "ts", "action", "rule", "user_id", "chat_id", "message_id", "latency_ms", "outcome", "detail")
+
+
+class AuditLog:
+    """Log de auditoria das ações de moderação (SQLite em modo WAL, somente inserções).
+
+    `record()` apenas enfileira o registro; uma thread própria grava em lotes,
+    então o event loop do bot nunca espera pelo disco. As consultas usam uma
+    conexão separada e os índices por usuário, chat, regra e data.
+    """
+
+    def __init__(self, path=AUDIT_FILE, batch_size=500, flush_interval_sec=1.0, log=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self._log = log  # Chamado da thread de escrita, uma vez por sequência de falhas
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.write_errors = 0
+        self._failing_since = None  # Registros perdidos na sequência de falhas atual
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- Escrita ---
+
+    def record(self, action, rule=None, user_id=None, chat_id=None, message_id=None,
+               latency_ms=None, outcome="ok", detail=None, ts=None):
+        """Enfileira um registro de auditoria (não bloqueia)."""
+        self._ensure_writer()
+        self._queue.put((ts or time.time(), action, rule, user_id, chat_id, message_id, latency_ms, outcome, detail))
+
+    def flush(self, timeout=5.0):
+        """Aguarda a gravação de tudo que já foi enfileirado."""
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Grava o que estiver pendente e encerra a thread de escrita."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(timeout)
+
+    def pending(self):
+        """Registros aguardando gravação."""
+        return self._queue.qsize()
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="AuditLogWriter", daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self):
+        conn = self._connect()
+        try:
+            stop = False
+            while not stop:
+                batch, waiters = [], []
+                try:
+                    item = self._queue.get(timeout=self.flush_interval_sec)
+                except queue.Empty:
+                    continue
+                deadline = time.monotonic() + self.flush_interval_sec
+                while True:
+                    if item is None:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        batch.append(item)
+                    if stop or waiters or len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                if batch:
+                    self._write_batch(conn, batch)
+                for waiter in waiters:
+                    waiter.set()
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO audit (ts, action, rule, user_id, chat_id, message_id, latency_ms, outcome, detail) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+            self.written += len(batch)
+        except sqlite3.Error as e:
+            self.write_errors += len(batch)
+            if self._failing_since is None:
+                self._failing_since = self.write_errors - len(batch)
+                self._notify(f"Falha ao gravar o log de auditoria em {self.path}: {e}. "
+                             f"{len(batch)} registro(s) perdido(s); novos erros serão omitidos até a recuperação.")
+        else:
+            if self._failing_since is not None:
+                lost = self.write_errors - self._failing_since
+                self._failing_since = None
+                self._notify(f"Gravação do log de auditoria restabelecida ({lost} registro(s) perdido(s)).")
+
+    def _notify(self, message):
+        if self._log:
+            self._log(message)
+
+    # --- Consulta ---
+
+    @staticmethod
+    def _where(user_id=None, chat_id=None, rule=None, action=None, since=None, until=None, before=None):
+        clauses, params = [], []
+        for column, value in (("user_id", user_id), ("chat_id", chat_id), ("rule", rule), ("action", action)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        if before is not None:
+            # Paginação por chave: registros depois de (ts, id) na ordem mais recentes primeiro
+            ts, row_id = before
+            clauses.append("(ts < ? OR (ts = ? AND id < ?))")
+            params.extend((ts, ts, row_id))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, user_id=None, chat_id=None, rule=None, action=None, since=None, until=None, limit=200, before=None):
+        """Registros mais recentes primeiro, como lista de dicts.
+
+        Ex.: tudo que foi feito com o usuário X -> query(user_id=X).
+        A página seguinte é query(..., before=(ts, id) do último registro recebido);
+        o índice leva direto ao ponto, sem percorrer as páginas anteriores como o OFFSET.
+        """
+        where, params = self._where(user_id, chat_id, rule, action, since, until, before)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM audit{where} ORDER BY ts DESC, id DESC LIMIT ?"
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params + [limit]).fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def seek(self, skip, user_id=None, chat_id=None, rule=None, action=None, since=None, until=None, before=None):
+        """Chave (ts, id) do `skip`-ésimo registro a partir de `before`, ou None se não houver.
+
+        Usado para saltos (barra de rolagem): lê só (ts, id) dos índices, sem carregar os registros.
+        """
+        if skip <= 0:
+            return before
+        where, params = self._where(user_id, chat_id, rule, action, since, until, before)
+        sql = f"SELECT ts, id FROM audit{where} ORDER BY ts DESC, id DESC LIMIT 1 OFFSET ?"
+        conn = self._connect()
+        try:
+            row = conn.execute(sql, params + [skip - 1]).fetchone()
+        finally:
+            conn.close()
+        return tuple(row) if row else None
+
+    def count(self, user_id=None, chat_id=None, rule=None, action=None, since=None, until=None):
+        """Quantidade de registros que atendem aos filtros."""
+        where, params = self._where(user_id, chat_id, rule, action, since, until)
+        conn = self._connect()
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM audit{where}", params).fetchone()[0]
+        finally:
+            conn.close()
@@ -0,0 +1,211 @@
+# ban_registry.py
+import argparse
+import os
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+
+BAN_REGISTRY_FILE = "ban_registry.bin"
+
+_MAGIC = b"BANREG1\0"
+_registries = {}  # path: BanRegistry compartilhado pelos bots do processo
+_registries_lock = threading.Lock()
+
+
+def _read_ids(path):
+    """IDs de um arquivo do registro (binário, já ordenado) ou de texto (um ID por linha, '#' para comentários).
+
+    Retorna (ids, ordenados).
+    """
+    with open(path, "rb") as f:
+        header = f.read(len(_MAGIC))
+        if header == _MAGIC:
+            ids = array("q")
+            ids.frombytes(f.read())
+            if sys.byteorder == "big":
+                ids.byteswap()  # Gravado sempre em little-endian
+            return ids, True
+        data = header + f.read()
+    ids = array("q")
+    for line in data.decode("utf-8").splitlines():
+        line = line.split("#", 1)[0].strip()
+        if line:
+            ids.append(int(line))
+    return ids, False
+
+
+class BanRegistry:
+    """Registro global de usuários banidos, compartilhado entre grupos e bots.
+
+    Array ordenado de int64 (8 bytes por usuário, ~8 MB para 1M): consulta por
+    busca binária, sem nenhuma chamada à API. Gravado em arquivo binário via
+    arquivo temporário + os.replace. Se o arquivo for alterado por outro
+    processo (ex.: importação pela linha de comando), `refresh()` o recarrega
+    e `save()` relê o disco antes de gravar; nos dois casos as adições e
+    remoções ainda não gravadas são reaplicadas sobre o conteúdo lido, então
+    nem um desbanimento local nem uma remoção feita pelo outro processo se perdem.
+    """
+
+    def __init__(self, path=BAN_REGISTRY_FILE):
+        self.path = path
+        self._ids = array("q")
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._added = set()  # Alterações desde a última gravação
+        self._removed = set()
+        self._load()
+
+    @property
+    def dirty(self):
+        return bool(self._added or self._removed)
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        mtime = self._file_mtime()
+        ids, ordered = array("q"), True
+        if mtime is not None:
+            try:
+                ids, ordered = _read_ids(self.path)
+            except (OSError, ValueError):
+                ids, ordered = array("q"), True
+        self._ids = ids if ordered else array("q", sorted(set(ids)))
+        self._mtime = mtime
+
+    def refresh(self):
+        """Recarrega se o arquivo mudou fora deste processo (só um stat quando nada mudou)."""
+        with self._lock:
+            if self._file_mtime() == self._mtime:
+                return False
+            self._load()
+            self._apply_pending()
+            return True
+
+    def _apply_pending(self):
+        """Reaplica as adições e remoções ainda não gravadas sobre o conteúdo lido do disco."""
+        if self.dirty:
+            self._ids = array("q", sorted(set(self._ids).union(self._added).difference(self._removed)))
+
+    def __contains__(self, user_id):
+        ids = self._ids
+        index = bisect_left(ids, user_id)
+        return index < len(ids) and ids[index] == user_id
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, user_id):
+        """Registra um banimento. Retorna True se o usuário era novo."""
+        with self._lock:
+            index = bisect_left(self._ids, user_id)
+            if index < len(self._ids) and self._ids[index] == user_id:
+                return False
+            self._ids.insert(index, user_id)
+            self._added.add(user_id)
+            self._removed.discard(user_id)
+            return True
+
+    def remove(self, user_id):
+        """Remove um usuário (desbanido por um admin). Retorna True se estava no registro."""
+        with self._lock:
+            index = bisect_left(self._ids, user_id)
+            if index == len(self._ids) or self._ids[index] != user_id:
+                return False
+            del self._ids[index]
+            self._removed.add(user_id)
+            self._added.discard(user_id)
+            return True
+
+    def save(self):
+        """Grava o registro se houve alterações. Faz I/O: chamar fora do event loop. Retorna True se gravou."""
+        with self._lock:
+            if not self.dirty:
+                return False
+            if self._mtime != self._file_mtime():
+                # Alterado por outro processo: não descartar o que ele gravou
+                try:
+                    ids, ordered = _read_ids(self.path)
+                except (OSError, ValueError):
+                    pass  # Ilegível: grava o que está em memória
+                else:
+                    self._ids = ids if ordered else array("q", sorted(set(ids)))
+                    self._apply_pending()
+            ids = array("q", self._ids)
+            if sys.byteorder == "big":
+                ids.byteswap()
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(_MAGIC)
+                ids.tofile(f)
+            os.replace(temp_path, self.path)
+            self._mtime = self._file_mtime()
+            self._added.clear()
+            self._removed.clear()
+            return True
+
+    def import_file(self, path):
+        """Importa IDs de outro registro (binário ou texto). Retorna quantos eram novos."""
+        new_ids = set(_read_ids(path)[0])
+        with self._lock:
+            new_ids.difference_update(self._ids)
+            if new_ids:
+                self._ids = array("q", sorted(new_ids.union(self._ids)))
+                self._added.update(new_ids)
+                self._removed.difference_update(new_ids)
+            return len(new_ids)
+
+    def export_file(self, path):
+        """Exporta em texto, um ID por linha (formato para compartilhar entre instalações)."""
+        with self._lock:
+            ids = array("q", self._ids)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# Usuários banidos ({len(ids)})\n")
+            f.writelines(f"{user_id}\n" for user_id in ids)
+        return len(ids)
+
+
+def open_ban_registry(path=BAN_REGISTRY_FILE):
+    """Registro do arquivo `path`, uma única instância por processo (compartilhada pelos bots)."""
+    path = os.path.abspath(path)
+    with _registries_lock:
+        registry = _registries.get(path)
+        if registry is None:
+            registry = _registries[path] = BanRegistry(path)
+        return registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa/exporta o registro global de usuários banidos.")
+    parser.add_argument("--path", default=BAN_REGISTRY_FILE, help="Arquivo do registro")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("count", help="Mostra quantos usuários estão no registro")
+    export_parser = commands.add_parser("export", help="Exporta em texto (um ID por linha)")
+    export_parser.add_argument("file")
+    import_parser = commands.add_parser("import", help="Importa de um arquivo exportado ou de outro registro")
+    import_parser.add_argument("file")
+    for name in ("add", "remove"):
+        command_parser = commands.add_parser(name, help=f"{'Adiciona' if name == 'add' else 'Remove'} IDs")
+        command_parser.add_argument("user_ids", nargs="+", type=int)
+    args = parser.parse_args()
+
+    registry = BanRegistry(args.path)
+    if args.command == "count":
+        print(f"{len(registry)} usuário(s) no registro.")
+    elif args.command == "export":
+        print(f"{registry.export_file(args.file)} usuário(s) exportado(s) para {args.file}.")
+    elif args.command == "import":
+        print(f"{registry.import_file(args.file)} usuário(s) novo(s) importado(s).")
+    elif args.command == "add":
+        print(f"{sum(registry.add(user_id) for user_id in args.user_ids)} usuário(s) adicionado(s).")
+    else:
+        print(f"{sum(registry.remove(user_id) for user_id in args.user_ids)} usuário(s) removido(s).")
+    registry.save()
+
+
+if __name__ == "__main__":
+    main()
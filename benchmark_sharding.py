@@ -0,0 +1,86 @@
+# benchmark_sharding.py
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+from config_manager import DEFAULT_CONFIG
+from rules_engine import RuleEngine, MessageInfo
+from sharding import ShardedRuleEvaluator
+
+WORDS = ["papelaria", "caneta", "adesivo", "planner", "bom", "dia", "olá", "promoção", "link", "grupo",
+         "hoje", "arte", "digital", "personalizados", "comprar", "vender", "preço", "entrega", "frete", "foto"]
+
+
+def build_rules(profanity_words, keywords):
+    """Regras padrão com listas grandes (custo de CPU semelhante a um grupo com muitas palavras bloqueadas)."""
+    rules = dict(DEFAULT_CONFIG["rules"])
+    rules["profanity_list"] = [f"proibida{i:05d}" for i in range(profanity_words)]
+    rules["allowed_topics_keywords"] = list(rules["allowed_topics_keywords"]) + [f"tema{i:05d}" for i in range(keywords)]
+    return rules
+
+
+def build_messages(count, chats, users_per_chat, seed=42):
+    """Mensagens de `chats` grupos; o padrão (1) é o caso real, um bot moderando um só grupo."""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        chat_id = -1000000000000 - rng.randrange(chats)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 25)))
+        if rng.random() < 0.05:
+            text += " https://exemplo.com"
+        messages.append(MessageInfo(chat_id=chat_id, user_id=rng.randrange(users_per_chat) + 1, message_id=i,
+                                    user_name="bench", text=text, ts=time.time()))
+    return messages
+
+
+def run_inline(messages, rules):
+    engine = RuleEngine()
+    started = time.perf_counter()
+    for info in messages:
+        engine.evaluate(info, rules)
+    return time.perf_counter() - started
+
+
+async def run_sharded(messages, rules, workers, concurrency):
+    evaluator = ShardedRuleEvaluator(workers, rules, timeout_sec=60)
+    evaluator.start()
+    try:
+        # Aquecimento: processos iniciados e regras carregadas
+        await asyncio.gather(*(evaluator.evaluate(info) for info in messages[:workers * 10]))
+        started = time.perf_counter()
+        for offset in range(0, len(messages), concurrency):
+            await asyncio.gather(*(evaluator.evaluate(info) for info in messages[offset:offset + concurrency]))
+        return time.perf_counter() - started
+    finally:
+        evaluator.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vazão da avaliação de regras por número de workers (modo supervisor).")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--chats", type=int, default=1, help="Grupos (cada bot modera um)")
+    parser.add_argument("--users", type=int, default=5000, help="Usuários ativos por grupo")
+    parser.add_argument("--max-workers", type=int, default=min(8, multiprocessing.cpu_count()))
+    parser.add_argument("--profanity-words", type=int, default=2000)
+    parser.add_argument("--keywords", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=1000, help="Mensagens em andamento ao mesmo tempo")
+    args = parser.parse_args()
+
+    rules = build_rules(args.profanity_words, args.keywords)
+    messages = build_messages(args.messages, args.chats, args.users)
+    print(f"{args.messages} mensagens, {args.chats} chat(s), {args.users} usuários por chat, "
+          f"{len(rules['profanity_list'])} palavras bloqueadas, "
+          f"{multiprocessing.cpu_count()} CPUs")
+
+    baseline = run_inline(messages, rules)
+    print(f"{'workers':>8} {'msg/s':>10} {'speedup':>8}")
+    print(f"{'local':>8} {args.messages / baseline:>10.0f} {1.0:>8.2f}")
+    for workers in range(1, args.max_workers + 1):
+        elapsed = asyncio.run(run_sharded(messages, rules, workers, args.concurrency))
+        print(f"{workers:>8} {args.messages / elapsed:>10.0f} {baseline / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -1,86 +1,56 @@
 # bot_controller.py
-import asyncio
 import logging
-from typing import Optional
-from telegram_bot import TelegramBot
+from bot_lifecycle import STOPPED, ERROR
 
 class BotController:
+    """Controla parada e reinício do bot a partir de outras threads (GUI).
+
+    Nada aqui espera com sleeps fixos: o pedido é entregue ao event loop do bot
+    com call_soon_threadsafe e quem precisa do resultado aguarda a transição de
+    estado no ciclo de vida.
+    """
+
     def __init__(self, bot_instance):
         self.bot = bot_instance  # Recebe a instância do TelegramBot
-        self._stop_event = asyncio.Event()
 
-    async def stop_bot_async(self):
-        """Versão assíncrona para parada segura do bot"""
+    def request_stop(self):
+        """Pede a parada sem bloquear. Retorna False se o bot não estava em execução."""
+        if not self._signal("stop", restart=False):
+            self.bot._log("Bot já está parado.")
+            return False
+        return True
+
+    def request_restart(self):
+        """Pede o reinício sem bloquear (mesmo Application e estado em memória)."""
+        if not self._signal("restart", restart=True):
+            self.bot._log("Bot não está em execução; nada a reiniciar.")
+            return False
+        return True
+
+    def stop_bot(self, timeout=None):
+        """Interface síncrona: pede a parada e aguarda o estado Stopped (ou Error)."""
+        if not self.request_stop():
+            return True
+        if timeout is None:
+            timeout = self.stop_timeout()
+        if not self.bot.lifecycle.wait_for((STOPPED, ERROR), timeout):
+            self.bot._report_error(f"Timeout ao parar o bot ({timeout:.0f}s)")
+            return False
+        return True
+
+    def stop_timeout(self):
+        """Espera máxima por uma parada completa (drenagem + encerramento)."""
+        return self.bot.config.get("lifecycle", {}).get("stop_timeout_sec", 15)
+
+    def _signal(self, operation, restart):
+        loop = self.bot.loop
+        if loop is None or loop.is_closed():
+            return False
+        self.bot.lifecycle.request(operation)
         try:
-            if not self.bot.application or not self.bot.running:
-                self.bot._log("Bot já está parado (async).")
-                return
-
-            self.bot._update_status("Stopping")
-            self.bot._log("Iniciando processo de parada assíncrona...")
-
-            # Sinaliza para o polling parar
-            if self.bot.application.running:
-                await self.bot.application.stop()
-                await asyncio.sleep(0.5)  # Pausa para finalização
-
-            # Shutdown limpo
-            if not self.bot.application.is_running:
-                await self.bot.application.shutdown()
-
+            loop.call_soon_threadsafe(self.bot._request_stop, restart)
         except RuntimeError as e:
-            if "Event loop is closed" not in str(e):
-                self.bot._report_error(f"Erro de runtime: {str(e)}")
-        except Exception as e:
-            self.bot._report_error(f"Erro na parada assíncrona: {str(e)}")
-        finally:
-            self._cleanup_resources()
-
-    def stop_bot(self):
-        """Interface síncrona para parada do bot"""
-        try:
-            if not self._is_bot_running():
-                self.bot._update_status("Stopped")
-                return
-
-            if not self.bot.loop or not self.bot.loop.is_running():
-                self.bot._report_error("Loop de eventos não disponível")
-                return
-
-            # Executa a parada assíncrona
-            future = asyncio.run_coroutine_threadsafe(
-                self.stop_bot_async(),
-                self.bot.loop
-            )
-            future.result(timeout=15)  # Timeout aumentado para 15s
-
-        except asyncio.TimeoutError:
-            self.bot._report_error("Timeout ao parar o bot")
-        except Exception as e:
-            self.bot._report_error(f"Erro na parada: {str(e)}")
-        finally:
-            self._final_cleanup()
-
-    def _is_bot_running(self) -> bool:
-        """Verifica se o bot está em execução de forma segura"""
-        return hasattr(self.bot, 'running') and self.bot.running
-
-    def _cleanup_resources(self):
-        """Limpeza de recursos assíncronos"""
-        try:
-            self.bot.running = False
-            if hasattr(self.bot, 'application'):
-                self.bot.application = None
-        except Exception as e:
-            logging.error(f"Erro na limpeza assíncrona: {str(e)}")
-
-    def _final_cleanup(self):
-        """Limpeza final síncrona"""
-        try:
-            if hasattr(self.bot, 'bot_thread'):
-                self.bot.bot_thread = None
-            if hasattr(self.bot, 'loop'):
-                self.bot.loop = None
-            self.bot._update_status("Stopped")
-        except Exception as e:
-            logging.error(f"Erro na limpeza final: {str(e)}")
\ No newline at end of file
+            # Loop fechado entre a verificação e a chamada: o bot já terminou
+            logging.debug(f"Pedido de {operation} ignorado: {e}")
+            return False
+        return True
@@ -0,0 +1,57 @@
+# bot_host.py
+import asyncio
+import threading
+
+
+class BotHost:
+    """Event loop compartilhado por vários bots, em uma única thread.
+
+    Cada TelegramBot continua com seu próprio estado (caches, filas, métricas);
+    o host só fornece o loop. Um bot parado não afeta os demais, e o loop
+    continua rodando até `stop()`.
+    """
+
+    def __init__(self, name="BotHost"):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Inicia a thread do loop (idempotente). Retorna o loop."""
+        with self._lock:
+            if self.running:
+                return self.loop
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(ready,), name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            return self.loop
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def submit(self, coro):
+        """Agenda uma corrotina no loop compartilhado (qualquer thread). Retorna um concurrent.futures.Future."""
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def stop(self, timeout=5.0):
+        """Para o loop. Os bots devem ter sido parados antes."""
+        with self._lock:
+            thread, loop = self._thread, self.loop
+            self._thread = None
+        if thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
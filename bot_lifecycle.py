@@ -0,0 +1,96 @@
+# bot_lifecycle.py
+import threading
+import time
+
+# Estados do ciclo de vida (os mesmos nomes publicados como status para a GUI)
+STOPPED = "Stopped"
+STARTING = "Starting"
+RUNNING = "Running"
+DRAINING = "Draining"
+ERROR = "Error"
+
+# Transições permitidas (estado atual: próximos estados)
+_TRANSITIONS = {
+    STOPPED: {STARTING, ERROR},
+    STARTING: {RUNNING, ERROR},
+    RUNNING: {DRAINING, ERROR},
+    DRAINING: {STOPPED, STARTING, ERROR},  # STARTING: reinício sem passar por Stopped
+    ERROR: {STARTING, STOPPED},
+}
+
+# Estado que encerra cada operação (para medir a latência)
+_COMPLETES = {
+    "start": RUNNING,
+    "restart": RUNNING,
+    "stop": STOPPED,
+}
+
+OPERATION_NAMES = {
+    "start": "início",
+    "restart": "reinício",
+    "stop": "parada",
+}
+
+
+class LifecycleError(RuntimeError):
+    """Transição de estado não permitida."""
+
+
+class BotLifecycle:
+    """Máquina de estados do bot: Stopped -> Starting -> Running -> Draining -> Stopped.
+
+    As transições são feitas pelo event loop do bot e notificadas a `on_change`.
+    Outras threads esperam um estado com `wait_for` (Condition, sem polling).
+    `request()` marca o início de uma operação (início, parada ou reinício);
+    a transição que a conclui devolve a latência medida.
+    """
+
+    def __init__(self, on_change=None):
+        self.state = STOPPED
+        self.on_change = on_change
+        self.latencies = {}  # operação: segundos da última execução
+        self._cond = threading.Condition()
+        self._pending = None  # (operação, instante da solicitação)
+
+    @property
+    def active(self):
+        """True enquanto o bot está iniciando, rodando ou drenando."""
+        return self.state in (STARTING, RUNNING, DRAINING)
+
+    def request(self, operation):
+        """Registra a solicitação de uma operação ('start', 'stop' ou 'restart')."""
+        with self._cond:
+            self._pending = (operation, time.perf_counter())
+
+    def transition(self, new_state):
+        """Muda de estado. Retorna (operação, segundos) se a transição concluiu uma operação solicitada."""
+        with self._cond:
+            if new_state == self.state:
+                return None
+            if new_state not in _TRANSITIONS[self.state]:
+                raise LifecycleError(f"Transição inválida: {self.state} -> {new_state}")
+            self.state = new_state
+            measured = self._measure(new_state)
+            self._cond.notify_all()
+        if self.on_change:
+            self.on_change(new_state)
+        return measured
+
+    def _measure(self, new_state):
+        if self._pending is None:
+            return None
+        operation, requested_at = self._pending
+        if new_state == ERROR:
+            self._pending = None  # Operação falhou: nada a medir
+            return None
+        if _COMPLETES[operation] != new_state:
+            return None
+        self._pending = None
+        elapsed = time.perf_counter() - requested_at
+        self.latencies[operation] = elapsed
+        return operation, elapsed
+
+    def wait_for(self, states, timeout=None):
+        """Bloqueia (fora do event loop) até o estado estar em `states`. Retorna False no timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.state in states, timeout)
@@ -3,7 +3,27 @@ import asyncio
 import threading
 import time
 from bot_controller import BotController
-from telegram import Update, Bot, InlineKeyboardButton, InlineKeyboardMarkup, ChatPermissions
+from bot_lifecycle import BotLifecycle, OPERATION_NAMES, STOPPED, STARTING, RUNNING, DRAINING, ERROR
+from member_cache import MemberStatusCache
+from follow_verifier import create_follow_verifier
+from message_index import RecentMessageIndex, chunked
+from chat_flood import ChatRateMonitor
+from http_pool import build_requests
+from api_retry import ApiCaller
+from action_scheduler import ActionScheduler, ActionDroppedError, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from audit_log import AuditLog, AUDIT_FILE
+from metrics import BotMetrics
+from rules_engine import RuleEngine, MessageInfo
+from word_lists import create_word_lists
+from sharding import create_rule_evaluator
+from update_watermark import UpdateWatermark, WATERMARK_FILE
+from media_blocklist import create_media_blocklist, message_media_keys
+from ban_registry import open_ban_registry, BAN_REGISTRY_FILE
+from loop_profiler import SamplingProfiler, SlowCallbackMonitor, PROFILE_FILE
+from memory_report import structure_row, pop_oldest, process_memory, format_bytes, EVICT_TO
+from maintenance import MaintenanceScheduler, sweep_mapping, compact_sqlite
+from gui_events import BusLogHandler, StatusEvent, ErrorEvent, MetricEvent
+from telegram import Update, Bot, InlineKeyboardButton, InlineKeyboardMarkup, ChatPermissions, ChatMember
 from telegram.ext import (
     Application, 
     CommandHandler, 
@@ -11,12 +31,16 @@ from telegram.ext import (
     filters, 
     ContextTypes, 
     CallbackQueryHandler, 
-    ChatMemberHandler
+    ChatMemberHandler,
+    TypeHandler,
+    ApplicationHandlerStop,
+    CallbackContext
 )
 from telegram.constants import ParseMode
 from telegram.error import TelegramError, Forbidden, BadRequest
 import logging
-from collections import defaultdict
+import sqlite3
+from collections import defaultdict, OrderedDict, deque
 import queue
 
 # Configura logging básico (para console/arquivo, se desejado)
@@ -39,24 +63,30 @@ class GuiHandler(logging.Handler):
         log_entry = self.format(record)
         self.log_queue.put(log_entry)
 
-# --- Variáveis Globais (Simulação) ---
-pending_verification = {} # user_id: timestamp
-user_message_counts = defaultdict(lambda: defaultdict(list)) # user_id: {chat_id: [timestamp1, timestamp2,...]}
-
 class TelegramBot:
     """Classe para gerenciar a lógica do bot do Telegram."""
 
-    def __init__(self, config, status_callback=None, error_callback=None, log_queue=None):
+    DELETE_MESSAGES_BATCH_SIZE = 100 # Limite de IDs por chamada deleteMessages
+    VERIFY_NOTICE_SEPARATOR = "\n\n⚠️ " # Separa a mensagem de boas-vindas do aviso de verificação
+
+    def __init__(self, config, status_callback=None, error_callback=None, log_queue=None, event_bus=None,
+                 host=None, name=None):
         """Inicializa o bot."""
         self.config = config
+        self.name = name or config.get("bot_name", "principal")  # Identifica o bot na GUI e nos logs
+        self.host = host  # BotHost com o loop compartilhado (None: thread e loop próprios)
         self.application = None
         self.bot_thread = None
         self.stop_event = threading.Event()  # Não usado ativamente para parar asyncio, mas pode ser útil
         self.status_callback = status_callback  # Função para atualizar status na GUI
         self.error_callback = error_callback  # Função para reportar erros na GUI
         self.log_queue = log_queue  # Fila para enviar logs para a GUI
+        self.event_bus = event_bus  # Barramento de eventos para a GUI (ver gui_events.py)
+        self.status = "Stopped"  # Último status publicado (lido pelo próprio bot, nunca pela GUI)
         self.running = False
-        self.loop = None  # Event loop para asyncio
+        self.loop = None  # Event loop para asyncio (o do host, se compartilhado)
+        self.api_request = None  # Pool HTTP das chamadas da API (ver http_pool.py)
+        self.updates_request = None  # Pool HTTP exclusivo do getUpdates
 
         # Configura o logger específico desta instância do bot
         self.logger = logging.getLogger(f"BotManager_{id(self)}")
@@ -68,8 +98,14 @@ class TelegramBot:
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
 
-        # Adiciona o handler da GUI se a fila foi fornecida
-        if self.log_queue:
+        # Adiciona o handler da GUI: barramento de eventos ou, no modo antigo, a fila de logs
+        if self.event_bus is not None:
+            # Vários bots escrevem no mesmo console: o nome identifica cada linha
+            formatter = logging.Formatter(f'%(asctime)s - [{self.name}] %(levelname)s - %(message)s', datefmt='%H:%M:%S')
+            bus_handler = BusLogHandler(self.event_bus)
+            bus_handler.setFormatter(formatter)
+            self.logger.addHandler(bus_handler)
+        elif self.log_queue:
             formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%H:%M:%S')
             gui_handler = GuiHandler(self.log_queue)
             gui_handler.setFormatter(formatter)
@@ -81,8 +117,114 @@ class TelegramBot:
             console_handler.setFormatter(formatter)
             self.logger.addHandler(console_handler)
 
+        # Estado de moderação desta instância (isolado dos outros bots do processo)
+        self.pending_verification = {} # user_id: timestamp
+        self._verification_expiries = set() # Tarefas de _expire_verifications em andamento
+        self.word_lists = create_word_lists(self.config, preload=False) # Listas de palavras grandes (carregadas no executor ao iniciar)
+        self.rule_engine = RuleEngine(self.word_lists) # Regras de mensagens (guarda o histórico de flood por usuário/chat)
+        # Modo supervisor: regras avaliadas em processos separados, por shard de user_id (ver sharding.py)
+        self.rule_workers = create_rule_evaluator(self.config)
+
+        # Ciclo de vida (Stopped -> Starting -> Running -> Draining -> Stopped); cada transição publica o status
+        self.lifecycle = BotLifecycle(on_change=self._update_status)
+        self._stop_requested = None  # asyncio.Event criado junto com o loop em start_bot
+        self._restart_requested = False
+
         # Inicializa o controlador de parada
         self.controller = BotController(self)
+
+        # Cache de status de membros (evita um get_chat_member por verificação)
+        perf = self.config.get("performance", {})
+        self.member_cache = MemberStatusCache(ttl_sec=perf.get("member_cache_ttl_sec", 60))
+
+        # Métricas em memória (painel da GUI)
+        self.metrics = BotMetrics(capacity=perf.get("metrics_history_samples", 300))
+        self._metrics_task = None
+        self._rss_warned = False  # Aviso de memória do processo já emitido (ver _enforce_memory_limits)
+
+        # Log de auditoria das ações de moderação
+        audit_settings = self.config.get("audit_log", {})
+        self.audit = None
+        if audit_settings.get("enabled", True):
+            self.audit = AuditLog(
+                audit_settings.get("path", AUDIT_FILE),
+                batch_size=audit_settings.get("batch_size", 500),
+                flush_interval_sec=audit_settings.get("flush_interval_sec", 1.0),
+                log=lambda message: self._log(message, level=logging.ERROR)
+            )
+
+        # Marca d'água dos updates processados (evita reprocessar updates reenviados após uma queda)
+        watermark_settings = self.config.get("update_watermark", {})
+        self.watermark = None
+        self._watermark_task = None
+        if watermark_settings.get("enabled", True):
+            bot_id = str(self.config.get("bot_token", "")).split(":")[0]
+            self.watermark = UpdateWatermark(
+                watermark_settings.get("path", WATERMARK_FILE).format(bot=self.name),
+                bot_id,
+                window=watermark_settings.get("dedup_window", 10000)
+            )
+
+        # Fila de saída com prioridades: apagar/callbacks, depois banir/restringir/boas-vindas, depois edições
+        sched = self.config.get("scheduler", {})
+        self.scheduler = ActionScheduler(
+            rate_per_sec=sched.get("rate_per_sec", 30),
+            burst=sched.get("burst", 30),
+            max_concurrent=sched.get("max_concurrent", 16),
+            max_wait_sec={
+                PRIORITY_NORMAL: sched.get("normal_max_wait_sec", 2),
+                PRIORITY_LOW: sched.get("low_max_wait_sec", 5),
+            }
+        )
+
+        # Chamadas à API com retry/backoff e circuit breaker por método
+        self.api = ApiCaller(self.config, log=lambda msg: self._log(msg, level=logging.WARNING), scheduler=self.scheduler)
+
+        # Verificador de seguidores ("Já segui"), plugável via config
+        self.follow_verifier = create_follow_verifier(self.config)
+
+        # Índice das mensagens recentes por usuário (para apagar o histórico de quem for banido)
+        self.message_index = RecentMessageIndex(
+            per_user=self.config.get("rules", {}).get("purge_message_count", 50),
+            max_users_per_chat=perf.get("message_index_max_users_per_chat", 5000)
+        )
+
+        # Proteção contra flood no chat inteiro (soma de todos os usuários)
+        rules = self.config.get("rules", {})
+        self.chat_rate_monitor = ChatRateMonitor(
+            window_sec=rules.get("chat_flood_window_sec", 10),
+            threshold_per_sec=rules.get("chat_flood_threshold_per_sec", 20),
+            restore_after_sec=rules.get("chat_flood_restore_after_sec", 30)
+        )
+        self._flood_protections = {}  # chat_id: (asyncio.Task, ação, contexto) da proteção ativa
+        self._saved_chat_permissions = {}  # chat_id: ChatPermissions antes do bloqueio
+        self._flood_restricted = defaultdict(set)  # chat_id: {user_id} restritos durante o flood
+        self._recent_joins = defaultdict(OrderedDict)  # chat_id: {user_id: timestamp de entrada}
+
+        # Mídias proibidas (carregadas em segundo plano no início do bot: a lista pode ser grande)
+        self.media_blocklist = None
+        self._recent_media = OrderedDict()  # (chat_id, user_id): deque[(timestamp, chaves)] para o banimento manual
+        self._recent_media_max_users = perf.get("message_index_max_users_per_chat", 5000)
+
+        # Registro global de banidos (um por processo, compartilhado entre grupos e bots)
+        registry_settings = self.config.get("ban_registry", {})
+        self.ban_registry = None
+        self._ban_registry_task = None
+        if registry_settings.get("enabled", True):
+            self.ban_registry = open_ban_registry(registry_settings.get("path", BAN_REGISTRY_FILE))
+
+        # Controle de cliques em botões inline (deduplicação e throttling por usuário)
+        self._callbacks_in_flight = set()  # user_ids com um clique em processamento
+        self._last_callback_click = {}  # user_id: time.monotonic() do último clique aceito
+
+        # Manutenção periódica: expira estado antigo e compacta os bancos sem pesar nos handlers
+        self._setup_maintenance()
+
+        # Diagnóstico do event loop (ligado sob demanda pela GUI/CLI). Com o loop compartilhado,
+        # cobre todos os bots do host.
+        self._loop_thread_id = None  # Thread que executa o loop deste bot
+        self.profiler = None  # SamplingProfiler em andamento
+        self.slow_callback_monitor = None  # SlowCallbackMonitor ativo
         
         # Adiciona esta verificação para garantir que o loop não seja reutilizado
         self._loop_lock = threading.Lock()
@@ -93,34 +235,306 @@ class TelegramBot:
         self.logger.log(level, message)
 
     def _update_status(self, status):
-        """Chama o callback de status se disponível e loga."""
+        """Publica o novo status (barramento de eventos ou callback) e loga."""
         self._log(f"Atualizando status para: {status}", level=logging.DEBUG)
-        if self.status_callback:
-            self.status_callback(status)
+        self.status = status
         self.running = (status == "Running")
+        if self.event_bus is not None:
+            self.event_bus.publish(StatusEvent(status, bot=self.name))
+        elif self.status_callback:
+            self.status_callback(status)
         # Atualiza config apenas se necessário (pode causar I/O excessivo)
         # self.config["bot_status"] = status
 
+    def _audit(self, action, rule, user_id, chat_id, message_id=None, started=None, ok=True, detail=None):
+        """Registra uma ação de moderação no log de auditoria (gravação em lote, não bloqueia)."""
+        if self.audit is None:
+            return
+        latency_ms = (time.monotonic() - started) * 1000 if started is not None else None
+        self.audit.record(action, rule, user_id, chat_id, message_id, latency_ms, "ok" if ok else "falha", detail)
+
+    def _timed(self, handler):
+        """Envolve um handler registrando sua latência nas métricas."""
+        async def timed_handler(update, context):
+            started = time.perf_counter()
+            try:
+                return await handler(update, context)
+            finally:
+                self.metrics.record_latency((time.perf_counter() - started) * 1000)
+        return timed_handler
+
+    async def _count_update(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Conta todos os updates recebidos (updates/s no painel)."""
+        self.metrics.record_update()
+
+    async def _skip_duplicate_update(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Descarta updates já processados (reenviados pelo Telegram após reinício ou queda)."""
+        if self.watermark.is_duplicate(update.update_id):
+            self._log(f"Update {update.update_id} já processado; ignorando.", level=logging.DEBUG)
+            raise ApplicationHandlerStop
+
+    async def _mark_update_done(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Avança a marca d'água depois que todos os handlers do update rodaram."""
+        self.watermark.mark_done(update.update_id)
+
+    async def _watermark_writer(self):
+        """Grava a marca d'água periodicamente, apenas quando ela avançou (write-behind)."""
+        interval = self.config.get("update_watermark", {}).get("flush_interval_sec", 1.0)
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            if self.watermark.dirty:
+                await self._flush_watermark(loop)
+
+    async def _flush_watermark(self, loop=None):
+        loop = loop or asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.watermark.flush)
+        except OSError as e:
+            self._log(f"Falha ao gravar a marca d'água dos updates: {e}", level=logging.WARNING)
+
+    async def _ban_registry_writer(self):
+        """Sincroniza o registro de banidos com o disco periodicamente (write-behind): grava as
+        alterações acumuladas ou, sem alterações, incorpora as feitas por outro processo."""
+        interval = self.config.get("ban_registry", {}).get("flush_interval_sec", 5.0)
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            await self._sync_ban_registry(loop)
+
+    async def _sync_ban_registry(self, loop=None):
+        loop = loop or asyncio.get_running_loop()
+        registry = self.ban_registry
+        try:
+            await loop.run_in_executor(None, registry.save if registry.dirty else registry.refresh)
+        except OSError as e:
+            self._report_error(f"Falha ao gravar o registro de banidos: {e}")
+
+    async def _metrics_sampler(self):
+        """Grava uma amostra das métricas por intervalo (séries limitadas, lidas pela GUI)."""
+        interval = self.config.get("performance", {}).get("metrics_interval_sec", 1.0)
+        while True:
+            await asyncio.sleep(interval)
+            counters = self.api.counters.values()
+            gauges = {f"queue_{name}": depth for name, depth in self.scheduler.queue_depths().items()}
+            gauges["pending_verification"] = len(self.pending_verification)
+            self.metrics.sample(
+                api_calls=sum(c["calls"] for c in counters),
+                api_failures=sum(c["failures"] + c["shed"] for c in counters),
+                gauges=gauges
+            )
+            self._publish_chat_rate()
+
+    # --- Manutenção periódica (ver maintenance.py) ---
+
+    def _setup_maintenance(self):
+        """Registra as tarefas de manutenção; cada uma roda no event loop, em fatias curtas."""
+        settings = self.config.get("maintenance", {})
+        self.maintenance = MaintenanceScheduler(
+            log=lambda msg: self._log(msg, level=logging.WARNING),
+            slice_ms=settings.get("slice_ms", 5)
+        )
+        self.maintenance.add("state", settings.get("state_sweep_interval_sec", 60), self._sweep_state)
+        self.maintenance.add("caches", settings.get("cache_sweep_interval_sec", 120), self._sweep_caches)
+        self.maintenance.add("memory_limits", self.config.get("memory", {}).get("check_interval_sec", 60),
+                             self._enforce_memory_limits)
+        self.maintenance.add("storage", settings.get("storage_compact_interval_sec", 3600), self._compact_storage)
+        self.maintenance.add("media_blocklist", self.config.get("media_blocklist", {}).get("refresh_interval_sec", 5),
+                             self._refresh_media_blocklist)
+        self.maintenance.add("word_lists", self.config.get("word_lists", {}).get("refresh_interval_sec", 5),
+                             self._refresh_word_lists)
+
+    def _sweep_state(self):
+        """Verificações pendentes expiradas, históricos de flood ociosos e chats sem atividade."""
+        cutoff = time.time() - self.config.get("maintenance", {}).get("pending_verification_ttl_sec", 86400)
+        expired = []
+        removed = yield from sweep_mapping(self.pending_verification, lambda user_id, since: since < cutoff,
+                                           on_remove=lambda user_id, since: expired.append(user_id))
+        self._schedule_verification_expiry(expired, "prazo esgotado")
+        removed += yield from self.rule_engine.sweep_idle(max(self.config.get("rules", {}).get("spam_time_limit_sec", 10), 60))
+        removed += self.chat_rate_monitor.purge_idle()  # Poucos chats: de uma vez
+        return removed
+
+    def _sweep_caches(self):
+        """Entradas expiradas dos caches (membros, seguidores, cliques, entradas e mídias recentes)."""
+        now, monotonic_now = time.time(), time.monotonic()
+        removed = yield from self.member_cache.sweep_expired()
+        removed += yield from self.follow_verifier.sweep_expired()
+        throttle = self.config.get("performance", {}).get("callback_throttle_sec", 1.0)
+        removed += yield from sweep_mapping(self._last_callback_click, lambda user_id, clicked: monotonic_now - clicked >= throttle)
+        join_window = self.config.get("rules", {}).get("chat_flood_new_member_window_sec", 600)
+        for chat_id in list(self._recent_joins):
+            joins = self._recent_joins.get(chat_id)
+            if joins is None:
+                continue
+            removed += yield from sweep_mapping(joins, lambda user_id, joined: now - joined > join_window)
+            if not joins:
+                self._recent_joins.pop(chat_id, None)
+        media_window = self.config.get("media_blocklist", {}).get("auto_add_window_sec", 600)
+        removed += yield from sweep_mapping(self._recent_media, lambda key, recent: not recent or now - recent[-1][0] > media_window)
+        return removed
+
+    async def _refresh_media_blocklist(self):
+        """Aplica as mídias adicionadas/removidas por outras conexões (GUI), fora do event loop."""
+        if self.media_blocklist is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.media_blocklist.refresh, True)
+        return 0
+
+    async def _refresh_word_lists(self):
+        """Aplica as palavras adicionadas/removidas na GUI, fora do event loop (os matchers são trocados de uma vez)."""
+        await asyncio.get_running_loop().run_in_executor(None, self.word_lists.refresh, True)
+        return 0
+
+    async def _compact_storage(self):
+        """Checkpoint do WAL e PRAGMA optimize dos bancos SQLite usados pelo bot (fora do event loop)."""
+        paths = [self.word_lists.store.path]
+        if self.audit is not None:
+            paths.append(self.audit.path)
+        if self.media_blocklist is not None:
+            paths.append(self.media_blocklist.path)
+        loop = asyncio.get_running_loop()
+        for path in paths:
+            try:
+                await loop.run_in_executor(None, compact_sqlite, path)
+            except sqlite3.Error as e:
+                self._log(f"Falha ao compactar {path}: {e}", level=logging.WARNING)
+        return 0
+
+    def _enforce_memory_limits(self):
+        """Descarta as entradas mais antigas das estruturas acima do limite e avisa no log."""
+        limits = self.config.get("memory", {})
+        evicted = self._evict("pending_verification", self.pending_verification, limits.get("pending_verification_max", 50000))
+        self._schedule_verification_expiry([user_id for user_id, since in evicted], "limite de memória")
+        history_limit = limits.get("flood_history_max_users", 100000)
+        history = self.rule_engine.user_message_counts
+        if history_limit and len(history) > history_limit:
+            # Primeiro o que já não conta para o flood; só então os usuários mais antigos
+            self.rule_engine.purge_idle(max(self.config.get("rules", {}).get("spam_time_limit_sec", 10), 60))
+            self._evict("user_message_counts", history, history_limit)
+        follow_limit = limits.get("follow_cache_max", 100000)
+        if follow_limit and len(self.follow_verifier) > follow_limit:
+            entries = len(self.follow_verifier)
+            removed = self.follow_verifier.trim(int(follow_limit * EVICT_TO))
+            self._log(f"Limite de memória: follow_cache tinha {entries} entradas (limite {follow_limit}); "
+                      f"{removed} descartada(s).", level=logging.WARNING)
+        rss_warn_mb = limits.get("rss_warn_mb", 1024)
+        rss = process_memory() if rss_warn_mb else None
+        if rss is not None:
+            if rss > rss_warn_mb * 1024 * 1024 and not self._rss_warned:
+                self._rss_warned = True  # Um aviso por vez que o limite é ultrapassado
+                self._log(f"Memória do processo em {format_bytes(rss)} (aviso a partir de {rss_warn_mb} MB). "
+                          "Veja o relatório de memória.", level=logging.WARNING)
+            elif rss < rss_warn_mb * 1024 * 1024 * EVICT_TO:
+                self._rss_warned = False
+
+    def _evict(self, name, mapping, limit):
+        """Descarta as entradas mais antigas de `mapping` acima do limite. Retorna os pares (chave, valor) descartados."""
+        if not limit or len(mapping) <= limit:
+            return []
+        entries = len(mapping)
+        removed = pop_oldest(mapping, int(limit * EVICT_TO))
+        self._log(f"Limite de memória: {name} tinha {entries} entradas (limite {limit}); "
+                  f"{len(removed)} mais antiga(s) descartada(s).", level=logging.WARNING)
+        return removed
+
+    def _schedule_verification_expiry(self, user_ids, reason):
+        """Agenda a saída do silêncio de quem teve a verificação pendente descartada.
+
+        Sem isso o usuário continuaria restrito (a restrição da entrada não
+        expira) e sem mensagem de boas-vindas válida para se liberar.
+        """
+        if not user_ids or self.application is None:
+            return
+        context = CallbackContext(self.application)
+        task = asyncio.get_running_loop().create_task(self._expire_verifications(user_ids, reason, context))
+        self._verification_expiries.add(task)
+        task.add_done_callback(self._verification_expiries.discard)
+
+    async def _expire_verifications(self, user_ids, reason, context: ContextTypes.DEFAULT_TYPE):
+        """Remove do grupo ou libera (maintenance.pending_verification_expire_action) os usuários, pela fila de ações."""
+        action = self.config.get("maintenance", {}).get("pending_verification_expire_action", "kick")
+        try:
+            chat_id = int(self.config.get("group_id"))
+        except (TypeError, ValueError):
+            self._log(f"{len(user_ids)} verificação(ões) descartada(s) sem group_id configurado; usuários continuam restritos.", level=logging.WARNING)
+            return
+        expired = 0
+        for user_id in user_ids:
+            if user_id in self.pending_verification:
+                continue # Clicou no botão depois do descarte e a verificação foi retomada
+            started = time.monotonic()
+            if action == "unrestrict":
+                ok = await self._unrestrict_user(user_id, chat_id, context)
+            else:
+                ok = await self._kick_user(user_id, chat_id, context)
+            self._audit(action, "pending_verification_expired", user_id, chat_id, started=started, ok=ok)
+            expired += ok
+        self._log(f"Verificações descartadas ({reason}): {expired} de {len(user_ids)} usuário(s) "
+                  f"{'liberado(s)' if action == 'unrestrict' else 'removido(s) do grupo'}.")
+
+    def _publish_chat_rate(self):
+        """Publica a taxa de mensagens do grupo configurado (rótulo da barra de status)."""
+        if self.event_bus is None:
+            return
+        group_id = self.config.get("group_id")
+        if not group_id:
+            return
+        try:
+            chat_id = int(group_id)
+        except ValueError:
+            return
+        self.event_bus.publish(MetricEvent("chat_rate", bot=self.name, value=(
+            self.chat_rate_monitor.rate(chat_id),
+            self.chat_rate_monitor.is_surging(chat_id)
+        )))
+
+    def http_pool_stats(self):
+        """Ocupação dos pools HTTP (chamadas da API e getUpdates)."""
+        return [request.stats() for request in (self.api_request, self.updates_request) if request is not None]
+
+    def _log_http_pool_stats(self):
+        for stats in self.http_pool_stats():
+            level = logging.WARNING if stats["pool_timeouts"] else logging.INFO
+            self._log(
+                f"Pool HTTP '{stats['name']}': {stats['total_requests']} requisições, "
+                f"pico {stats['peak_in_flight']}/{stats['pool_size']} conexões, "
+                f"{stats['saturated_sec']}s saturado, {stats['pool_timeouts']} timeouts de pool.",
+                level=level
+            )
+
     def _report_error(self, message):
-        """Chama o callback de erro se disponível e loga como erro."""
+        """Publica o erro para a GUI (barramento de eventos ou callback) e loga como erro."""
         self._log(message, level=logging.ERROR)
-        if self.error_callback:
+        if self.event_bus is not None:
+            self.event_bus.publish(ErrorEvent(message, bot=self.name))
+        elif self.error_callback:
             self.error_callback(message)
 
     async def _restricted_until(self, user_id: int, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
-        """Verifica se o usuário está restrito no grupo."""
+        """Verifica se o usuário está restrito no grupo (sem poder enviar mensagens).
+
+        Usa o cache de membros: cliques repetidos no botão não geram um get_chat_member cada.
+        """
         try:
-            member = await context.bot.get_chat_member(chat_id, user_id)
-            return member.status == 'restricted' and member.until_date is not None
+            member = await self.member_cache.get(
+                chat_id, user_id,
+                lambda: context.bot.get_chat_member(chat_id, user_id)
+            )
+            return member.status == ChatMember.RESTRICTED and not member.can_send_messages
         except TelegramError as e:
             self._log(f"Erro ao verificar status do membro {user_id} no chat {chat_id}: {e}", level=logging.ERROR)
             return False # Assume não restrito se houver erro
 
-    async def _restrict_user(self, user_id: int, chat_id: int, context: ContextTypes.DEFAULT_TYPE, can_send_messages=False):
+    async def _restrict_user(self, user_id: int, chat_id: int, context: ContextTypes.DEFAULT_TYPE, can_send_messages=False, until_date=0):
         """Restringe um usuário no grupo (não pode enviar mensagens, mídia, etc.)."""
         permissions = ChatPermissions(
             can_send_messages=can_send_messages, # Permite msg se True (após seguir)
-            can_send_media_messages=False,
+            can_send_audios=False,
+            can_send_documents=False,
+            can_send_photos=False,
+            can_send_videos=False,
+            can_send_video_notes=False,
+            can_send_voice_notes=False,
             can_send_polls=False,
             can_send_other_messages=False,
             can_add_web_page_previews=False,
@@ -129,25 +543,35 @@ class TelegramBot:
             can_pin_messages=False,
         )
         try:
-            await context.bot.restrict_chat_member(
+            await self.api.call(
+                "restrict_chat_member", context.bot.restrict_chat_member,
                 chat_id=chat_id,
                 user_id=user_id,
                 permissions=permissions,
-                until_date=0 # Restrição permanente até ser removida manualmente ou pelo bot
+                until_date=until_date, # 0 = permanente até ser removida manualmente ou pelo bot
+                priority=PRIORITY_NORMAL
             )
+            self.member_cache.invalidate(chat_id, user_id)
             self._log(f"Usuário {user_id} restringido no chat {chat_id}.")
+            return True
         except Forbidden:
              self._report_error(f"Erro: Permissão negada para restringir usuário {user_id} no chat {chat_id}. O bot tem direitos de administrador?")
         except BadRequest as e:
              self._report_error(f"Erro ao restringir usuário {user_id}: {e}")
         except Exception as e:
             self._report_error(f"Erro inesperado ao restringir usuário {user_id}: {e}")
+        return False
 
     async def _unrestrict_user(self, user_id: int, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
         """Remove restrições de um usuário."""
         permissions = ChatPermissions(
             can_send_messages=True,
-            can_send_media_messages=True, # Ou ajuste conforme necessário
+            can_send_audios=True, # Mídias: ajuste conforme necessário
+            can_send_documents=True,
+            can_send_photos=True,
+            can_send_videos=True,
+            can_send_video_notes=True,
+            can_send_voice_notes=True,
             can_send_polls=True,
             can_send_other_messages=True,
             can_add_web_page_previews=True,
@@ -156,13 +580,17 @@ class TelegramBot:
             can_pin_messages=False, # Geralmente restrito a admins
         )
         try:
-            await context.bot.restrict_chat_member(
+            await self.api.call(
+                "restrict_chat_member", context.bot.restrict_chat_member,
                 chat_id=chat_id,
                 user_id=user_id,
                 permissions=permissions,
-                use_independent_chat_permissions=True # Necessário para remover restrições específicas
+                use_independent_chat_permissions=True, # Necessário para remover restrições específicas
+                priority=PRIORITY_NORMAL
             )
+            self.member_cache.invalidate(chat_id, user_id)
             self._log(f"Restrições removidas para usuário {user_id} no chat {chat_id}.")
+            return True
         except Forbidden:
              self._report_error(f"Erro: Permissão negada para remover restrições do usuário {user_id}. O bot tem direitos de administrador?")
         except BadRequest as e:
@@ -170,12 +598,38 @@ class TelegramBot:
             self._log(f"Info ao remover restrições do usuário {user_id}: {e}", level=logging.WARNING)
         except Exception as e:
             self._report_error(f"Erro inesperado ao remover restrições do usuário {user_id}: {e}")
+        return False
+
+    async def _kick_user(self, user_id: int, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
+        """Remove o usuário do grupo sem bani-lo (pode entrar de novo e refazer a verificação)."""
+        try:
+            # Sem only_if_banned, o unbanChatMember remove do grupo quem ainda é membro
+            await self.api.call(
+                "unban_chat_member", context.bot.unban_chat_member,
+                chat_id=chat_id,
+                user_id=user_id,
+                priority=PRIORITY_NORMAL
+            )
+            self.member_cache.invalidate(chat_id, user_id)
+            self._log(f"Usuário {user_id} removido do chat {chat_id}.")
+            return True
+        except Forbidden:
+             self._report_error(f"Erro: Permissão negada para remover usuário {user_id} do chat {chat_id}. O bot tem direitos de administrador?")
+        except BadRequest as e:
+            # Pode acontecer se o usuário já saiu do grupo
+            self._log(f"Info ao remover usuário {user_id}: {e}", level=logging.WARNING)
+        except Exception as e:
+            self._report_error(f"Erro inesperado ao remover usuário {user_id}: {e}")
+        return False
 
     async def _ban_user(self, user_id: int, chat_id: int, context: ContextTypes.DEFAULT_TYPE, reason: str = "Violação das regras"):
         """Bane um usuário do grupo."""
         try:
-            await context.bot.ban_chat_member(chat_id=chat_id, user_id=user_id)
+            await self.api.call("ban_chat_member", context.bot.ban_chat_member, chat_id=chat_id, user_id=user_id, priority=PRIORITY_NORMAL)
+            self.member_cache.invalidate(chat_id, user_id)
+            self._register_ban(user_id)
             self._log(f"Usuário {user_id} banido do chat {chat_id} por: {reason}")
+            return True
             # Opcional: Enviar mensagem ao grupo informando o banimento (cuidado para não poluir)
             # await context.bot.send_message(chat_id=chat_id, text=f"Usuário banido por: {reason}")
         except Forbidden:
@@ -184,12 +638,19 @@ class TelegramBot:
             self._report_error(f"Erro ao banir usuário {user_id}: {e}")
         except Exception as e:
             self._report_error(f"Erro inesperado ao banir usuário {user_id}: {e}")
+        return False
+
+    def _register_ban(self, user_id):
+        """Adiciona ao registro global de banidos (gravado depois por _ban_registry_writer)."""
+        if self.ban_registry is not None:
+            self.ban_registry.add(user_id)
 
     async def _delete_message(self, chat_id: int, message_id: int, context: ContextTypes.DEFAULT_TYPE):
         """Apaga uma mensagem."""
         try:
-            await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
+            await self.api.call("delete_message", context.bot.delete_message, chat_id=chat_id, message_id=message_id, priority=PRIORITY_HIGH)
             self._log(f"Mensagem {message_id} apagada no chat {chat_id}.", level=logging.DEBUG)
+            return True
         except Forbidden:
             # Comum se a mensagem for antiga ou o bot não for admin
             self._log(f"Permissão negada para apagar mensagem {message_id} no chat {chat_id}.", level=logging.WARNING)
@@ -198,10 +659,192 @@ class TelegramBot:
             self._log(f"Não foi possível apagar mensagem {message_id}: {e}", level=logging.WARNING)
         except Exception as e:
             self._report_error(f"Erro inesperado ao apagar mensagem {message_id}: {e}")
+        return False
+
+
+    async def _purge_user_messages(self, user_id: int, chat_id: int, context: ContextTypes.DEFAULT_TYPE, skip_message_id: int = None):
+        """Apaga as mensagens recentes do usuário em lote (deleteMessages, até 100 IDs por chamada).
+
+        Retorna quantas mensagens foram apagadas.
+        """
+        message_ids = [mid for mid in self.message_index.pop_user(chat_id, user_id) if mid != skip_message_id]
+        if not message_ids:
+            return 0
+
+        deleted = 0
+        for chunk in chunked(message_ids, self.DELETE_MESSAGES_BATCH_SIZE):
+            try:
+                # Mensagens já apagadas ou inexistentes são ignoradas pelo Telegram
+                await self.api.call("delete_messages", context.bot.delete_messages, chat_id=chat_id, message_ids=chunk, priority=PRIORITY_HIGH)
+                deleted += len(chunk)
+            except Forbidden:
+                self._log(f"Permissão negada para apagar mensagens do usuário {user_id} no chat {chat_id}.", level=logging.WARNING)
+                break
+            except BadRequest as e:
+                self._log(f"Não foi possível apagar mensagens do usuário {user_id}: {e}", level=logging.WARNING)
+            except Exception as e:
+                self._report_error(f"Erro inesperado ao apagar mensagens do usuário {user_id}: {e}")
+                break
+        self._log(f"{deleted} mensagem(ns) recente(s) do usuário {user_id} apagada(s) no chat {chat_id}.")
+        return deleted
+
+    async def _check_chat_flood(self, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
+        """Conta a mensagem na taxa do chat e ativa a proteção se o limite for ultrapassado."""
+        rate = self.chat_rate_monitor.hit(chat_id)
+        if self.chat_rate_monitor.should_activate(chat_id, rate):
+            self.chat_rate_monitor.mark_surge(chat_id)
+            self._log(f"Flood no chat {chat_id}: {rate:.1f} msg/s (limite {self.chat_rate_monitor.threshold_per_sec}). Ativando proteção.", level=logging.WARNING)
+            action = self.config.get("rules", {}).get("chat_flood_action", "lockdown")
+            # Tarefa do próprio bot, não do Application: Application.stop() aguardaria o chat acalmar
+            task = asyncio.get_running_loop().create_task(self._run_chat_flood_protection(chat_id, action, context))
+            self._flood_protections[chat_id] = (task, action, context)
+
+    async def _run_chat_flood_protection(self, chat_id: int, action: str, context: ContextTypes.DEFAULT_TYPE):
+        """Mantém a proteção ativa até a taxa do chat normalizar e então restaura as configurações.
+
+        Cancelada na parada do bot; nesse caso quem restaura o chat é _stop_chat_flood_protections.
+        """
+        if action == "restrict_new_members":
+            await self._restrict_recent_members(chat_id, context)
+        else:
+            await self._lock_chat(chat_id, context)
+        while not self.chat_rate_monitor.should_restore(chat_id):
+            await asyncio.sleep(1)
+        self._flood_protections.pop(chat_id, None)
+        await self._restore_chat(chat_id, action, context)
+        self._log(f"Taxa do chat {chat_id} normalizada. Configurações restauradas.")
+
+    async def _restore_chat(self, chat_id: int, action: str, context: ContextTypes.DEFAULT_TYPE):
+        """Desfaz a proteção contra flood (permissões do grupo ou membros recentes silenciados)."""
+        if action == "restrict_new_members":
+            await self._release_recent_members(chat_id, context)
+        else:
+            await self._unlock_chat(chat_id, context)
+        self.chat_rate_monitor.clear_surge(chat_id)
+
+    async def _stop_chat_flood_protections(self, timeout):
+        """Parada do bot: cancela as proteções ativas e restaura cada chat (antes de a fila de saída parar)."""
+        protections, self._flood_protections = self._flood_protections, {}
+        for task, _, _ in protections.values():
+            task.cancel()
+        await asyncio.gather(*(task for task, _, _ in protections.values()), return_exceptions=True)
+        for chat_id, (_, action, context) in protections.items():
+            try:
+                await asyncio.wait_for(self._restore_chat(chat_id, action, context), timeout)
+                self._log(f"Proteção contra flood do chat {chat_id} encerrada na parada; configurações restauradas.", level=logging.WARNING)
+            except asyncio.TimeoutError:
+                self._report_error(f"Não foi possível restaurar o chat {chat_id} em {timeout}s na parada. Verifique as permissões do grupo.")
 
+    async def _lock_chat(self, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
+        """Deixa o chat somente leitura para membros comuns, guardando as permissões atuais.
+
+        A Bot API não oferece o modo lento (slow mode) para bots, então o bloqueio
+        temporário das permissões do grupo é o equivalente disponível.
+        """
+        try:
+            chat = await self.api.call("get_chat", context.bot.get_chat, chat_id, priority=PRIORITY_NORMAL)
+            self._saved_chat_permissions[chat_id] = chat.permissions
+            await self.api.call(
+                "set_chat_permissions", context.bot.set_chat_permissions,
+                chat_id=chat_id, permissions=ChatPermissions.no_permissions(), priority=PRIORITY_NORMAL
+            )
+            self._log(f"Chat {chat_id} bloqueado temporariamente por flood.", level=logging.WARNING)
+        except TelegramError as e:
+            self._report_error(f"Erro ao bloquear o chat {chat_id} durante flood: {e}")
+
+    async def _unlock_chat(self, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
+        """Restaura as permissões guardadas por _lock_chat."""
+        permissions = self._saved_chat_permissions.pop(chat_id, None)
+        if permissions is None:
+            return
+        try:
+            await self.api.call(
+                "set_chat_permissions", context.bot.set_chat_permissions,
+                chat_id=chat_id, permissions=permissions, priority=PRIORITY_NORMAL
+            )
+        except TelegramError as e:
+            self._report_error(f"Erro ao restaurar as permissões do chat {chat_id}: {e}")
+
+    async def _restrict_recent_members(self, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
+        """Silencia temporariamente quem entrou recentemente (e ainda não está pendente de verificação)."""
+        rules = self.config.get("rules", {})
+        window = rules.get("chat_flood_new_member_window_sec", 600)
+        now = time.time()
+        # A restrição expira sozinha no Telegram caso o bot pare antes de liberar
+        until_date = int(now + max(window, 60))
+        for user_id, joined_at in list(self._recent_joins[chat_id].items()):
+            if now - joined_at > window or user_id in self.pending_verification:
+                continue
+            await self._restrict_user(user_id, chat_id, context, until_date=until_date)
+            self._flood_restricted[chat_id].add(user_id)
+        self._log(f"{len(self._flood_restricted[chat_id])} membro(s) recente(s) silenciado(s) no chat {chat_id} durante o flood.", level=logging.WARNING)
+
+    async def _release_recent_members(self, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
+        """Libera os membros silenciados por _restrict_recent_members."""
+        for user_id in self._flood_restricted.pop(chat_id, set()):
+            if user_id not in self.pending_verification:
+                await self._unrestrict_user(user_id, chat_id, context)
+
+    def _remember_join(self, chat_id: int, user_id: int):
+        """Registra a entrada de um membro (limitado às entradas mais recentes)."""
+        joins = self._recent_joins[chat_id]
+        joins.pop(user_id, None)
+        joins[user_id] = time.time()
+        while len(joins) > 1000:
+            joins.popitem(last=False)
 
     # --- Handlers ---
 
+    async def _track_chat_member(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Atualiza o cache de membros e reage a banimentos/desbanimentos manuais dos admins."""
+        change = update.chat_member or update.my_chat_member
+        if not change:
+            return
+        new_member = change.new_chat_member
+        self.member_cache.set(change.chat.id, new_member.user.id, new_member)
+        if not update.chat_member or change.from_user is None or change.from_user.id == context.bot.id:
+            return  # Só interessam as ações manuais dos admins (as do bot já foram tratadas)
+        was_banned = change.old_chat_member.status == ChatMember.BANNED
+        if new_member.status == ChatMember.BANNED and not was_banned:
+            self._register_ban(new_member.user.id)
+            await self._block_media_of_banned(change, context)
+        elif was_banned and new_member.status != ChatMember.BANNED and self.ban_registry is not None:
+            if self.ban_registry.remove(new_member.user.id):
+                self._log(f"Usuário {new_member.user.id} desbanido por {change.from_user.first_name}; removido do registro de banidos.")
+
+    def _remember_media(self, chat_id, user_id, keys):
+        """Guarda as mídias recentes do usuário (usadas se um admin o banir manualmente)."""
+        entry = self._recent_media.get((chat_id, user_id))
+        if entry is None:
+            entry = self._recent_media[(chat_id, user_id)] = deque(maxlen=5)
+            if len(self._recent_media) > self._recent_media_max_users:
+                self._recent_media.popitem(last=False)
+        else:
+            self._recent_media.move_to_end((chat_id, user_id))
+        entry.append((time.time(), keys))
+
+    async def _block_media_of_banned(self, change, context: ContextTypes.DEFAULT_TYPE):
+        """Banimento feito por um admin: as mídias recentes do banido entram na lista de mídias proibidas."""
+        settings = self.config.get("media_blocklist", {})
+        admin = change.from_user
+        if self.media_blocklist is None or not settings.get("auto_add_on_admin_ban", True):
+            return
+        chat_id, user_id = change.chat.id, change.new_chat_member.user.id
+        recent = self._recent_media.pop((chat_id, user_id), ())
+        cutoff = time.time() - settings.get("auto_add_window_sec", 600)
+        keys = {key for ts, media_keys in recent if ts >= cutoff for key in media_keys}
+        if not keys:
+            return
+        loop = asyncio.get_running_loop()
+        added = 0
+        for key in sorted(keys):
+            if await loop.run_in_executor(None, self.media_blocklist.add, key, f"admin {admin.id}", f"banimento de {user_id}"):
+                added += 1
+        if added:
+            self._log(f"{added} mídia(s) de {user_id} adicionada(s) à lista de mídias proibidas (banido por {admin.first_name}).")
+            self._audit("media_blocklist_add", "media_blocklist", user_id, chat_id, None, None, True,
+                        detail=", ".join(sorted(keys)))
+
     async def _handle_new_member(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Lida com novos membros entrando no grupo."""
         if not update.message or not update.message.new_chat_members:
@@ -223,9 +866,20 @@ class TelegramBot:
             user_name = member.first_name
 
             self._log(f"Novo membro {user_name} ({user_id}) entrou no chat {chat_id}.")
+            started = time.monotonic()
+
+            # 0. Já banido em outro grupo: bane de imediato, sem boas-vindas (nenhuma consulta à API)
+            if self.ban_registry is not None and user_id in self.ban_registry:
+                self.metrics.record_rule_hit("ban_registry")
+                ok = await self._ban_user(user_id, chat_id, context, reason="Banido anteriormente (registro global)")
+                self._audit("ban", "ban_registry", user_id, chat_id, started=started, ok=ok)
+                continue
+
+            self._remember_join(chat_id, user_id)
 
             # 1. Restringe o usuário imediatamente
-            await self._restrict_user(user_id, chat_id, context)
+            ok = await self._restrict_user(user_id, chat_id, context)
+            self._audit("restrict", "new_member", user_id, chat_id, started=started, ok=ok)
 
             # 2. Envia mensagem de boas-vindas com botão de verificação
             welcome_text = self.config.get("welcome_message", "").format(
@@ -236,200 +890,301 @@ class TelegramBot:
             keyboard = [[InlineKeyboardButton("✅ Já segui", callback_data=f"verify_{user_id}")]]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
+            # Pendente antes do envio: se nada mais der certo, a expiração das pendências ainda o alcança
+            self.pending_verification[user_id] = time.time() # Marca para verificação
             try:
-                await context.bot.send_message(
+                # Prioridade normal (com retry no 429): sem o botão, o usuário ficaria restrito sem saída
+                await self.api.call(
+                    "send_message", context.bot.send_message,
                     chat_id=chat_id,
                     text=welcome_text,
                     reply_markup=reply_markup,
-                    parse_mode=ParseMode.HTML # Ou MARKDOWN se preferir
+                    parse_mode=ParseMode.HTML, # Ou MARKDOWN se preferir
+                    priority=PRIORITY_NORMAL
                 )
-                pending_verification[user_id] = time.time() # Marca para verificação
                 self._log(f"Mensagem de boas-vindas enviada para {user_name} ({user_id}). Aguardando verificação.")
             except TelegramError as e:
                 self._report_error(f"Falha ao enviar mensagem de boas-vindas para {user_id}: {e}")
+                # Sem o botão não há como concluir a verificação: libera o usuário
+                if ok and await self._unrestrict_user(user_id, chat_id, context):
+                    self.pending_verification.pop(user_id, None)
+
+    async def _answer_callback(self, query, text=None, show_alert=False):
+        """Responde o callback (uma única vez por query), ignorando queries expiradas."""
+        try:
+            await self.api.call("answer_callback_query", query.answer, text, show_alert=show_alert, priority=PRIORITY_HIGH)
+        except TelegramError as e:
+            self._log(f"Não foi possível responder o callback {query.id}: {e}", level=logging.DEBUG)
 
     async def _handle_callback_query(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Lida com cliques em botões inline."""
         query = update.callback_query
-        await query.answer() # Responde ao Telegram que o clique foi recebido
-
         user_id = query.from_user.id
         user_name = query.from_user.first_name
+
+        # Cliques repetidos: um clique por vez por usuário e intervalo mínimo entre cliques
+        if user_id in self._callbacks_in_flight:
+            await self._answer_callback(query, "Sua solicitação já está sendo processada. Aguarde.")
+            return
+        now = time.monotonic()
+        throttle = self.config.get("performance", {}).get("callback_throttle_sec", 1.0)
+        last_click = self._last_callback_click.get(user_id)
+        if last_click is not None and now - last_click < throttle:
+            await self._answer_callback(query, "Muitos cliques. Aguarde um instante.")
+            return
+        self._last_callback_click[user_id] = now
+        if len(self._last_callback_click) > 10000:
+            # Descarta registros antigos para a tabela não crescer sem limite
+            self._last_callback_click = {uid: t for uid, t in self._last_callback_click.items() if now - t < throttle}
+
+        self._callbacks_in_flight.add(user_id)
+        release_in_flight = True
+        try:
+            release_in_flight = await self._process_callback_query(query, user_id, user_name, update, context)
+        finally:
+            if release_in_flight:
+                self._callbacks_in_flight.discard(user_id)
+
+    async def _process_callback_query(self, query, user_id: int, user_name: str, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Processa o clique e responde o callback exatamente uma vez.
+
+        Retorna False se a verificação continuou em segundo plano (que então libera o usuário).
+        """
         # O chat_id pode não estar presente em todas as queries, mas geralmente está na mensagem associada
         chat_id = query.message.chat_id if query.message else None
-        data = query.data
+        data = query.data or ""
 
         self._log(f"Callback query recebido de {user_name} ({user_id}): {data}", level=logging.DEBUG)
 
-        if data.startswith("verify_"):
-            target_user_id = int(data.split("_")[1])
-
-            # Apenas o próprio usuário pode clicar no seu botão de verificação
-            if user_id != target_user_id:
-                await query.answer("Este botão não é para você.", show_alert=True)
-                self._log(f"Usuário {user_name} ({user_id}) clicou no botão de verificação de outro usuário ({target_user_id}).", level=logging.WARNING)
-                return
-
-            if not chat_id:
-                 self._log(f"Não foi possível obter chat_id para a query de verificação do usuário {user_id}.", level=logging.ERROR)
-                 await query.answer("Erro interno ao processar a verificação.", show_alert=True)
-                 return
-
-            if user_id in pending_verification:
-                self._log(f"Usuário {user_name} ({user_id}) clicou em 'Já segui'. Simulando verificação.")
-                # --- SIMULAÇÃO DE VERIFICAÇÃO ---
-                # Aqui você integraria com as APIs do Instagram/TikTok se disponíveis.
-                # Por agora, vamos assumir que ele seguiu.
-                followed = True # Simulação
-
-                if followed:
-                    await self._unrestrict_user(user_id, chat_id, context)
-                    if user_id in pending_verification: # Verifica novamente antes de deletar
-                        del pending_verification[user_id] # Remove da lista de pendentes
-                    try:
-                        await query.edit_message_text(text=f"Obrigado por seguir, {user_name}! Acesso liberado.")
-                        self._log(f"Acesso liberado para {user_name} ({user_id}) no chat {chat_id}.")
-                    except TelegramError as e:
-                         self._log(f"Erro ao editar mensagem de confirmação para {user_id}: {e}", level=logging.WARNING)
-
-                else:
-                    # Se a verificação real falhar:
-                    await query.answer("Parece que você ainda não seguiu os perfis. Tente novamente após seguir.", show_alert=True)
-                    self._log(f"Verificação simulada falhou para {user_name} ({user_id}).", level=logging.INFO)
-                    # Poderia adicionar um limite de tempo ou tentativas aqui
+        if not data.startswith("verify_"):
+            await self._answer_callback(query)
+            return True
+
+        target_user_id = int(data.split("_")[1])
+
+        # Apenas o próprio usuário pode clicar no seu botão de verificação
+        if user_id != target_user_id:
+            await self._answer_callback(query, "Este botão não é para você.", show_alert=True)
+            self._log(f"Usuário {user_name} ({user_id}) clicou no botão de verificação de outro usuário ({target_user_id}).", level=logging.WARNING)
+            return True
+
+        if not chat_id:
+            self._log(f"Não foi possível obter chat_id para a query de verificação do usuário {user_id}.", level=logging.ERROR)
+            await self._answer_callback(query, "Erro interno ao processar a verificação.", show_alert=True)
+            return True
+
+        if user_id not in self.pending_verification:
+            # A pendência pode ter se perdido (bot reiniciado, entrada expirada ou descartada por
+            # limite de memória): o status real no grupo decide se ainda há o que verificar
+            flood_restricted = user_id in self._flood_restricted.get(chat_id, ())
+            if flood_restricted or not await self._restricted_until(user_id, chat_id, context):
+                await self._answer_callback(query, "Verificação não necessária ou já concluída.", show_alert=True)
+                self._log(f"Usuário {user_name} ({user_id}) clicou em 'Já segui', mas não estava pendente.", level=logging.WARNING)
+                return True
+            self._log(f"Usuário {user_name} ({user_id}) não estava pendente, mas continua restrito no chat {chat_id}; retomando a verificação.")
+            self.pending_verification[user_id] = time.time()
+
+        followed = self.follow_verifier.cached_result(user_id)
+        if followed is not None:
+            self._log(f"Usuário {user_name} ({user_id}) clicou em 'Já segui'. Usando resultado em cache.")
+            if followed:
+                await self._answer_callback(query)
+                await self._finish_verification(query, user_id, user_name, chat_id, context, followed)
             else:
-                # Usuário clicou mas não estava pendente (talvez já verificado ou erro)
-                 await query.answer("Verificação não necessária ou já concluída.", show_alert=True)
-                 self._log(f"Usuário {user_name} ({user_id}) clicou em 'Já segui', mas não estava pendente.", level=logging.WARNING)
+                # Resultado negativo em cache: o aviso vai na própria resposta do callback
+                notice = await self._finish_verification(query, user_id, user_name, chat_id, context, followed)
+                await self._answer_callback(query, notice, show_alert=bool(notice))
+            return True
+
+        self._log(f"Usuário {user_name} ({user_id}) clicou em 'Já segui'. Verificação iniciada em segundo plano.")
+        await self._answer_callback(query, "Verificando... aguarde alguns segundos.")
+        # A consulta externa pode ser lenta: não bloqueia o handler
+        context.application.create_task(
+            self._verify_follow_in_background(query, user_id, user_name, chat_id, context),
+            update=update
+        )
+        return False
 
+    async def _verify_follow_in_background(self, query, user_id: int, user_name: str, chat_id: int, context: ContextTypes.DEFAULT_TYPE):
+        """Consulta o verificador de seguidores e conclui a verificação."""
+        try:
+            followed = await self.follow_verifier.check(user_id, user_name)
+            notice = await self._finish_verification(query, user_id, user_name, chat_id, context, followed)
+            if notice:
+                await self._show_verification_notice(query, user_id, notice)
+        finally:
+            self._callbacks_in_flight.discard(user_id)
+
+    async def _finish_verification(self, query, user_id: int, user_name: str, chat_id: int, context: ContextTypes.DEFAULT_TYPE, followed):
+        """Libera o usuário se followed=True. Caso contrário retorna o aviso a ser exibido."""
+        if user_id not in self.pending_verification:
+            return None # Já concluída por outro clique
+
+        if followed:
+            started = time.monotonic()
+            ok = await self._unrestrict_user(user_id, chat_id, context)
+            self._audit("unrestrict", "verification", user_id, chat_id, started=started, ok=ok)
+            self.pending_verification.pop(user_id, None) # Remove da lista de pendentes
+            try:
+                await self.api.call(
+                    "edit_message_text", query.edit_message_text,
+                    text=f"Obrigado por seguir, {user_name}! Acesso liberado.", priority=PRIORITY_LOW
+                )
+                self._log(f"Acesso liberado para {user_name} ({user_id}) no chat {chat_id}.")
+            except TelegramError as e:
+                self._log(f"Erro ao editar mensagem de confirmação para {user_id}: {e}", level=logging.WARNING)
+            return None
+
+        if followed is None:
+            self._log(f"Verificação de {user_name} ({user_id}) indisponível (timeout ou erro do backend).", level=logging.WARNING)
+            return "Não foi possível verificar agora. Tente novamente em instantes."
+        self._log(f"Verificação falhou para {user_name} ({user_id}).", level=logging.INFO)
+        return "Parece que você ainda não seguiu os perfis. Tente novamente após seguir."
+
+    async def _show_verification_notice(self, query, user_id: int, notice: str):
+        """Mostra o aviso na mensagem de boas-vindas (o callback já foi respondido), mantendo o botão."""
+        if not query.message:
+            return
+        original_text = query.message.text_html.split(self.VERIFY_NOTICE_SEPARATOR)[0]
+        try:
+            await self.api.call(
+                "edit_message_text", query.edit_message_text,
+                text=f"{original_text}{self.VERIFY_NOTICE_SEPARATOR}{notice}",
+                reply_markup=query.message.reply_markup,
+                parse_mode=ParseMode.HTML,
+                priority=PRIORITY_LOW
+            )
+        except TelegramError as e:
+            self._log(f"Erro ao avisar {user_id} sobre a verificação: {e}", level=logging.WARNING)
 
     async def _handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Processa todas as mensagens recebidas."""
         if not update.message or not update.message.from_user:
              return # Ignora atualizações sem mensagem ou usuário
+        started = time.monotonic() # Latência registrada no log de auditoria
 
         message = update.message
         user = message.from_user
         chat_id = message.chat_id
         user_id = user.id
         user_name = user.first_name
-        text = message.text or message.caption or "" # Pega texto da msg ou legenda de midia
         message_id = message.message_id
 
         # Ignora mensagens do próprio bot ou de chats não configurados
-        bot_info = await context.bot.get_me()
-        if user.id == bot_info.id:
+        if user.id == context.bot.id: # Preenchido pelo getMe da inicialização (sem chamada por mensagem)
             return
         if str(chat_id) != str(self.config.get("group_id")):
             return
 
         # Log da mensagem recebida (cuidado com privacidade em produção)
-        # self._log(f"Msg de {user_name}({user_id}) no chat {chat_id}: {text[:50]}...", level=logging.DEBUG)
+        # self._log(f"Msg de {user_name}({user_id}) no chat {chat_id}: {(message.text or '')[:50]}...", level=logging.DEBUG)
+
 
+        # --- Flood no chat inteiro ---
+        if self.config.get("rules", {}).get("block_chat_flood"):
+            await self._check_chat_flood(chat_id, context)
 
         # --- Verificação de Restrição ---
-        if user_id in pending_verification:
+        if user_id in self.pending_verification:
              self._log(f"Mensagem de usuário não verificado {user_name}({user_id}) detectada. Apagando.")
-             await self._delete_message(chat_id, message_id, context)
+             self.metrics.record_rule_hit("pending_verification")
+             ok = await self._delete_message(chat_id, message_id, context)
+             self._audit("delete", "pending_verification", user_id, chat_id, message_id, started, ok)
              # Opcional: Reenviar instrução ou avisar no privado
              # await context.bot.send_message(user_id, "Você precisa clicar em 'Já segui' no grupo após seguir os perfis.")
              return # Interrompe processamento adicional para este usuário
 
+        # Indexa a mensagem para poder apagar o histórico do usuário se ele for banido
+        self.message_index.add(chat_id, user_id, message_id)
+
+        # --- Mídias Proibidas ---
+        media_keys = message_media_keys(message) if self.media_blocklist is not None else ()
+        if media_keys:
+            self._remember_media(chat_id, user_id, media_keys)
+            blocked_key = None
+            if self.media_blocklist.might_match(media_keys):
+                # Com o filtro de Bloom, "talvez" é confirmado no SQLite: fora do event loop
+                blocked_key = await asyncio.get_running_loop().run_in_executor(None, self.media_blocklist.match, media_keys)
+            if blocked_key:
+                self._log(f"Mídia proibida ({blocked_key}) de {user_name}({user_id}).")
+                self.metrics.record_rule_hit("media_blocklist")
+                ok = await self._delete_message(chat_id, message_id, context)
+                self._audit("delete", "media_blocklist", user_id, chat_id, message_id, started, ok, detail=blocked_key)
+                if self.config.get("media_blocklist", {}).get("action", "ban") == "ban":
+                    ok = await self._ban_user(user_id, chat_id, context, reason="Mídia proibida")
+                    self._audit("ban", "media_blocklist", user_id, chat_id, message_id, started, ok, detail=blocked_key)
+                    if self.config.get("rules", {}).get("purge_on_ban", True):
+                        purged = await self._purge_user_messages(user_id, chat_id, context, skip_message_id=message_id)
+                        if purged:
+                            self._audit("purge", "media_blocklist", user_id, chat_id, message_id, started, True, detail=f"{purged} mensagens")
+                return
 
         # --- Aplicação das Regras ---
         rules = self.config.get("rules", {})
-        delete_msg = False
-        ban_user = False
-        ban_reason = ""
-
-        # 1. Palavrões/Ofensas
-        if rules.get("block_profanity"):
-            profanity_list = rules.get("profanity_list", [])
-            if any(word.lower() in text.lower() for word in profanity_list):
-                self._log(f"Palavrão detectado de {user_name}({user_id}): {text}")
-                delete_msg = True
-                ban_user = True
-                ban_reason = "Conteúdo ofensivo"
-
-        # 2. Fora de Tópico (se não for banido por profanidade)
-        if not ban_user and rules.get("block_off_topic") and text: # Verifica se há texto
-            keywords = rules.get("allowed_topics_keywords", [])
-            is_greeting = any(greet in text.lower() for greet in ["oi", "ola", "olá", "bom dia", "boa tarde", "boa noite", "tudo bem"])
-            # Considera fora de tópico se não for saudação E não contiver nenhuma keyword
-            if not is_greeting and not any(keyword.lower() in text.lower() for keyword in keywords):
-                self._log(f"Mensagem fora de tópico detectada de {user_name}({user_id}): {text}")
-                delete_msg = True
-                # ban_user = False # Normalmente não bane
-
-        # 3. Links (se não for banido antes)
-        if not ban_user and rules.get("block_links"):
-             has_link = any(entity.type in ['url', 'text_link'] for entity in message.entities or [])
-             has_explicit_link = 'http://' in text or 'https://' in text or 'www.' in text or '.com' in text or '.net' in text or '.org' in text
-             if has_link or has_explicit_link:
-                 self._log(f"Link detectado de {user_name}({user_id}): {text}")
-                 delete_msg = True
-                 # ban_user = False
-
-        # 4. Tipo de Arquivo (apenas PDF)
-        if not ban_user and rules.get("allow_only_pdf"):
-            if message.document and message.document.mime_type != 'application/pdf':
-                self._log(f"Tipo de arquivo não permitido ({message.document.mime_type}) de {user_name}({user_id})")
-                delete_msg = True
-                # ban_user = False
-            elif message.photo or message.video or message.audio or message.voice or message.sticker:
-                 self._log(f"Tipo de mídia não permitida (não PDF) de {user_name}({user_id})")
-                 delete_msg = True
-                 # ban_user = False
-
-
-        # 5. Spam/Flood (verificação final)
-        if not ban_user and rules.get("block_spam_flood"):
-            now = time.time()
-            limit = rules.get("spam_message_limit", 5)
-            time_window = rules.get("spam_time_limit_sec", 10)
-
-            user_msgs = user_message_counts[user_id][chat_id]
-            # Limpa timestamps antigos
-            user_msgs = [t for t in user_msgs if now - t < time_window]
-            user_msgs.append(now)
-            user_message_counts[user_id][chat_id] = user_msgs
-
-            if len(user_msgs) > limit:
-                self._log(f"Spam/Flood detectado de {user_name}({user_id}) (mensagens: {len(user_msgs)} em {time_window}s)")
-                delete_msg = True # Apaga a mensagem atual que causou o spam
-                ban_user = True
-                ban_reason = "Spam/Flood"
-                # Limpa o histórico de mensagens para evitar banimentos múltiplos rápidos
-                user_message_counts[user_id][chat_id] = []
-
+        verdict = await self._evaluate_rules(MessageInfo.from_message(message), rules)
+        for hit in verdict.hits:
+            self._log(hit)
+        delete_msg = verdict.delete
+        ban_user = verdict.ban
+        ban_reason = verdict.ban_reason
+        rule = verdict.rule # Primeira regra que disparou (para o log de auditoria)
 
         # --- Ações ---
+        if rule:
+            self.metrics.record_rule_hit(rule)
         if delete_msg:
-            await self._delete_message(chat_id, message_id, context)
+            ok = await self._delete_message(chat_id, message_id, context)
+            self._audit("delete", rule, user_id, chat_id, message_id, started, ok)
         if ban_user:
-            await self._ban_user(user_id, chat_id, context, reason=ban_reason)
-            # Limpa contagem de spam se banido
-            if user_id in user_message_counts and chat_id in user_message_counts[user_id]:
-                 del user_message_counts[user_id][chat_id]
+            ok = await self._ban_user(user_id, chat_id, context, reason=ban_reason)
+            self._audit("ban", rule, user_id, chat_id, message_id, started, ok, detail=ban_reason)
+            if rules.get("purge_on_ban", True):
+                purged = await self._purge_user_messages(user_id, chat_id, context, skip_message_id=message_id if delete_msg else None)
+                if purged:
+                    self._audit("purge", rule, user_id, chat_id, message_id, started, True, detail=f"{purged} mensagens")
+
+    async def _evaluate_rules(self, info, rules):
+        """Avalia as regras no próprio loop ou, no modo supervisor, no worker dono do usuário."""
+        if self.rule_workers is not None and self.rule_workers.running:
+            try:
+                return await self.rule_workers.evaluate(info)
+            except asyncio.TimeoutError:
+                self._log(f"Worker de regras não respondeu (chat {info.chat_id}); avaliando localmente.", level=logging.WARNING)
+        return self.rule_engine.evaluate(info, rules)
 
 
     async def _post_init(self, application: Application):
-        """Tarefas a serem executadas após a inicialização do bot."""
+        """Tarefas a serem executadas após a inicialização do bot (a cada início ou reinício)."""
         try:
             bot_info = await application.bot.get_me()
-            self._log(f"Bot {bot_info.username} (ID: {bot_info.id}) iniciado com sucesso.")
-            self._update_status("Running")
-            # TODO: Implementar lógica de processamento de mensagens offline
-            self._log("Verificação de mensagens offline ainda não implementada.")
         except TelegramError as e:
             self._report_error(f"Falha ao iniciar o bot: {e}. Verifique o token e a conexão.")
-            self._update_status("Error")
-            # Tenta parar o loop asyncio se a inicialização falhar
-            await self.stop_bot_async()
+            raise
+        self._log(f"Bot {bot_info.username} (ID: {bot_info.id}) iniciado com sucesso.")
+        for error in self.rule_engine.regex_rules(self.config.get("rules", {})).errors:
+            self._log(f"Regra regex ignorada: {error}", level=logging.WARNING)
+        self.scheduler.start()
+        self._metrics_task = asyncio.get_running_loop().create_task(self._metrics_sampler())
+        if application.job_queue is None and self.maintenance.jobs:
+            self._log("JobQueue indisponível (pip install \"python-telegram-bot[job-queue]\"); "
+                      "manutenção periódica em tarefas asyncio.", level=logging.DEBUG)
+        self.maintenance.start(application.job_queue)
+        if self.watermark is not None:
+            if self.watermark.floor:
+                self._log(f"Updates até o ID {self.watermark.floor} já processados serão ignorados.")
+            self._watermark_task = asyncio.get_running_loop().create_task(self._watermark_writer())
+        if self.ban_registry is not None:
+            self._ban_registry_task = asyncio.get_running_loop().create_task(self._ban_registry_writer())
+        # TODO: Implementar lógica de processamento de mensagens offline
+        self._log("Verificação de mensagens offline ainda não implementada.")
 
     async def _error_handler(self, update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Loga os erros causados por Updates."""
         error = context.error
+        if isinstance(error, ActionDroppedError):
+            # Esperado na parada: a ação ficou na fila além do prazo de drenagem
+            self._log(f"Ação descartada na parada: {error}", level=logging.WARNING)
+            return
         error_message = f"Exceção ao processar uma atualização: {error}"
         # Tenta obter mais detalhes do update, se disponível
         update_details = ""
@@ -446,22 +1201,30 @@ class TelegramBot:
         # Adicione mais tratamentos de erro específicos conforme necessário
 
 
-    async def _run_bot_async(self):
-        """Configura e executa o bot no loop asyncio."""
-        token = self.config.get("bot_token")
-        if not token or token == "SEU_TOKEN_AQUI":
-            self._report_error("Configure o Token da API do Bot antes de iniciar.")
-            self._update_status("Error")
-            return
-
-        # Cria o Application
-        app_builder = Application.builder().token(token).post_init(self._post_init)
-        app_builder.connect_timeout(30).read_timeout(30).write_timeout(30)
-        self.application = app_builder.build()
+    def _build_application(self):
+        """Cria o Application com os pools HTTP e os handlers."""
+        app_builder = Application.builder().token(self.config.get("bot_token"))
+        # Pools separados: getUpdates não disputa conexões com apagar/banir/enviar
+        self.api_request, self.updates_request = build_requests(self.config, log=self._log)
+        app_builder.request(self.api_request).get_updates_request(self.updates_request)
+        base_url = self.config.get("http", {}).get("base_url")
+        if base_url: # Servidor da Bot API próprio ou falso (fake_telegram_server.py)
+            app_builder.base_url(base_url)
+        application = app_builder.build()
 
         # Configura handlers
-        self.application.add_handler(ChatMemberHandler(self._handle_new_member, ChatMemberHandler.CHAT_MEMBER))
-        self.application.add_handler(CallbackQueryHandler(self._handle_callback_query))
+        # Grupo -3: descarta updates já processados antes de qualquer outro handler
+        # Grupo -1: roda antes dos demais handlers, apenas para manter o cache de membros atualizado
+        # Grupo -2: conta todos os updates para o painel de desempenho
+        # Grupo 1: marca o update como concluído, depois dos handlers do grupo 0
+        if self.watermark is not None:
+            application.add_handler(TypeHandler(Update, self._skip_duplicate_update), group=-3)
+            application.add_handler(TypeHandler(Update, self._mark_update_done), group=1)
+        application.add_handler(TypeHandler(Update, self._count_update), group=-2)
+        application.add_handler(ChatMemberHandler(self._track_chat_member, ChatMemberHandler.ANY_CHAT_MEMBER), group=-1)
+        # Entradas chegam como mensagem de serviço (new_chat_members), não pelo filtro de mensagens abaixo
+        application.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, self._timed(self._handle_new_member)))
+        application.add_handler(CallbackQueryHandler(self._timed(self._handle_callback_query)))
         
         # Filtro de mensagens
         msg_filter = (
@@ -474,123 +1237,360 @@ class TelegramBot:
             )
         )
         
-        self.application.add_handler(MessageHandler(msg_filter, self._handle_message))
-        self.application.add_error_handler(self._error_handler)
+        application.add_handler(MessageHandler(msg_filter, self._timed(self._handle_message)))
+        application.add_error_handler(self._error_handler)
+        return application
 
-        # Inicia o bot
+    async def _run_bot_async(self):
+        """Configura e executa o bot no loop asyncio.
+
+        Cada início ou reinício é uma sessão; o reinício reaproveita o mesmo Application
+        (handlers, conexões HTTP) e todo o estado em memória (caches, índices, métricas).
+        """
+        token = self.config.get("bot_token")
+        if not token or token == "SEU_TOKEN_AQUI":
+            self._report_error("Configure o Token da API do Bot antes de iniciar.")
+            self.lifecycle.transition(ERROR)
+            return
+
+        self._loop_thread_id = threading.get_ident()
+        if self.config.get("profiling", {}).get("slow_callback_on_start"):
+            self.start_slow_callback_detection()
+        self.application = self._build_application()
+        if not self.word_lists.loaded:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.word_lists.load)
+            except sqlite3.Error as e:
+                self._report_error(f"Listas de palavras indisponíveis: {e}")
+        if self.media_blocklist is None and self.config.get("media_blocklist", {}).get("enabled", True):
+            # Pode levar alguns segundos com listas grandes: fora do event loop
+            try:
+                self.media_blocklist = await asyncio.get_running_loop().run_in_executor(None, create_media_blocklist, self.config)
+                self._log(f"Lista de mídias proibidas: {len(self.media_blocklist)} entrada(s).")
+            except (sqlite3.Error, OSError) as e:
+                self._report_error(f"Lista de mídias proibidas indisponível: {e}")
+        if self.rule_workers is not None:
+            # Os workers sobrevivem aos reinícios; só a parada definitiva os encerra
+            self.rule_workers.start()
+            self._log(f"Modo supervisor: regras avaliadas em {self.rule_workers.workers} processo(s).")
+        try:
+            while await self._run_session():
+                self._log("Reiniciando o bot...")
+        finally:
+            await self._shutdown()
+
+    async def _run_session(self):
+        """Starting -> Running -> (aguarda o pedido de parada) -> Draining. Retorna True se for um reinício."""
+        self.lifecycle.transition(STARTING)
         self._log("Iniciando polling do bot...")
-        self._update_status("Starting")
-        
         try:
-            await self.application.run_polling(
-                stop_signals=None,
-                allowed_updates=Update.ALL_TYPES
-            )
+            await self.application.initialize()  # No reinício já está inicializado (nada a fazer)
+            await self._post_init(self.application)
+            await self.application.start()
+            await self.application.updater.start_polling(allowed_updates=Update.ALL_TYPES)
         except Exception as e:
             self._report_error(f"Erro: {str(e)}")
-            self._update_status("Error")
-        finally:
-            self._log("Polling finalizado")
-            # O status final (Stopped/Error) deve ser definido por quem chamou stop ou pelo erro
+            self.lifecycle.transition(ERROR)
+            await self._drain_session()
+            return False
+
+        self._log_latency(self.lifecycle.transition(RUNNING))
+        await self._stop_requested.wait()
+        self._stop_requested.clear()
+        restart, self._restart_requested = self._restart_requested, False
+        self.lifecycle.transition(DRAINING)
+        await self._drain_session()
+        return restart
+
+    async def _drain_session(self):
+        """Para de buscar updates e conclui o que já foi recebido, dentro do prazo de drenagem.
+
+        Ações que ainda estiverem na fila de saída ao fim do prazo são descartadas.
+        """
+        started = time.perf_counter()
+        timeout = self.config.get("lifecycle", {}).get("drain_timeout_sec", 5.0)
+        application = self.application
+        if application.updater is not None and application.updater.running:
+            await application.updater.stop()
+        # Application.stop() processa os updates já recebidos e aguarda as tarefas em segundo plano
+        stopping = asyncio.ensure_future(application.stop()) if application.running else None
+        if stopping is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(stopping), timeout)
+            except asyncio.TimeoutError:
+                self._log(f"Prazo de drenagem ({timeout}s) esgotado; descartando ações pendentes.", level=logging.WARNING)
+        # Chats bloqueados por flood voltam ao normal enquanto a fila de saída ainda está ativa
+        await self._stop_chat_flood_protections(timeout)
+        if self._verification_expiries:
+            # Usuários com verificação descartada saem do silêncio antes de a fila de saída parar
+            done, unfinished = await asyncio.wait(set(self._verification_expiries), timeout=timeout)
+            for task in unfinished:
+                task.cancel()
+
+        if self._metrics_task is not None:
+            self._metrics_task.cancel()
+            self._metrics_task = None
+        self.maintenance.stop()
+        for name, stats in self.maintenance.stats().items():
+            if stats["runs"]:
+                self._log(f"Manutenção '{name}': {stats['runs']} execuções, {stats['removed']} entradas removidas, "
+                          f"{stats['busy_ms']:.0f} ms no loop (fatia máx. {stats['max_slice_ms']:.1f} ms, última execução "
+                          f"{stats['last_ms']:.0f} ms), {stats['skipped']} pulada(s), {stats['errors']} erro(s).")
+        for name, stats in self.scheduler.stats().items():
+            self._log(f"Fila '{name}': {stats['dispatched']} ações, {stats['promoted']} antecipadas, espera máx. {stats['max_wait_sec']}s.")
+        dropped = await self.scheduler.stop()
+        if dropped:
+            self._log(f"{dropped} ação(ões) pendente(s) descartada(s) na parada.", level=logging.WARNING)
+        if stopping is not None:
+            await stopping
+        if self._watermark_task is not None:
+            self._watermark_task.cancel()
+            self._watermark_task = None
+        if self._ban_registry_task is not None:
+            self._ban_registry_task.cancel()
+            self._ban_registry_task = None
+        if self.ban_registry is not None and self.ban_registry.dirty:
+            await self._sync_ban_registry()
+        if self.watermark is not None:
+            await self._flush_watermark()
+            if self.watermark.skipped:
+                self._log(f"{self.watermark.skipped} update(s) repetido(s) ignorado(s).")
+        if self.audit is not None:
+            # Garante no disco o que foi registrado até a parada
+            await asyncio.get_running_loop().run_in_executor(None, self.audit.flush)
+        self._log(f"Drenagem concluída em {(time.perf_counter() - started) * 1000:.0f} ms.")
+
+    async def _shutdown(self):
+        """Libera o Application e os recursos externos (parada definitiva, não no reinício)."""
+        try:
+            await self.application.shutdown()
+        except Exception as e:
+            self._report_error(f"Erro durante a parada: {str(e)}")
+        await self.follow_verifier.close()
+        await asyncio.get_running_loop().run_in_executor(None, self._close_storage)
+        if self.rule_workers is not None and self.rule_workers.running:
+            self._log(f"Workers de regras: {self.rule_workers.stats()}")
+            await asyncio.get_running_loop().run_in_executor(None, self.rule_workers.stop)
+        self._log_http_pool_stats()
+        if self.profiler is not None and self.profiler.running:
+            self.stop_profiling()
+        self.stop_slow_callback_detection()
+        self._log("Polling finalizado")
+        self.application = None
+        if self.lifecycle.state == DRAINING:
+            self._log_latency(self.lifecycle.transition(STOPPED))
+
+    def _close_storage(self):
+        """Encerra a thread do log de auditoria e fecha os bancos SQLite. Faz I/O: chamar fora do event loop.
+
+        Um novo início da mesma instância reabre tudo (a thread do log de auditoria
+        volta no primeiro registro, as listas de palavras são recarregadas e a lista
+        de mídias é recriada).
+        """
+        if self.audit is not None:
+            self.audit.close()
+        self.word_lists.close()
+        if self.media_blocklist is not None:
+            self.media_blocklist.close()
+            self.media_blocklist = None
+
+    def _log_latency(self, measured):
+        """Loga a latência de início/parada/reinício medida pelo ciclo de vida."""
+        if measured is None:
+            return
+        operation, elapsed = measured
+        self._log(f"Latência de {OPERATION_NAMES[operation]}: {elapsed * 1000:.0f} ms.")
 
+    def _request_stop(self, restart=False):
+        """Sinaliza o fim da sessão atual (executa no event loop do bot)."""
+        self._restart_requested = restart
+        self._stop_requested.set()
 
-async def stop_bot_async(self):
-    """Para o bot de forma assíncrona com tratamento seguro de event loop."""
-    try:
-        # Verificação do estado
-        status_text = self.status_callback.__self__.status_label.cget("text")
-        if not self.application and (self.running or status_text.endswith(("Starting", "Running"))):
+    async def stop_bot_async(self):
+        """Solicita a parada a partir do próprio event loop do bot (não aguarda a drenagem)."""
+        if not self.lifecycle.active:
             self._log("Bot não estava em execução.")
-            self._update_status("Stopped")
             return
+        self.lifecycle.request("stop")
+        self._request_stop()
 
-        self._update_status("Stopping")
-        
-        # Processo de parada em etapas
-        if hasattr(self.application, 'running') and self.application.running:
-            try:
-                await self.application.stop()
-                await asyncio.sleep(0.2)  # Pausa curta para finalização
-            except RuntimeError as e:
-                if "Event loop is closed" not in str(e):
-                    raise
-
-        # Shutdown seguro
-        if hasattr(self.application, 'is_shutting_down'):
-            if not self.application.is_shutting_down:
-                await self.application.shutdown()
-        
-        self._log("Bot parado com sucesso.")
-
-    except Exception as e:
-        self._report_error(f"Erro durante a parada: {str(e)}")
-    finally:
-        # Garante estado consistente
-        self.running = False
-        self._update_status("Stopped")
+    async def _run_guarded(self):
+        """Executa o bot até a parada definitiva; erros inesperados levam ao estado Error."""
         try:
-            if self.application:
-                self.application = None
-        except:
-            pass
-            
-            
-    def _run_wrapper(self):
-        """Wrapper para executar o loop asyncio em uma thread separada."""
-        try:
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
-            self.loop.run_until_complete(self._run_bot_async())
+            await self._run_bot_async()
         except Exception as e:
-            self._report_error(f"Erro fatal na thread do bot: {e}")
+            self._report_error(f"Erro fatal no bot: {e}")
+            self.lifecycle.transition(ERROR)
         finally:
-            if self.loop and self.loop.is_running():
-                self.loop.stop()
-            if self.loop and not self.loop.is_closed():
-                self.loop.close()
             self.loop = None
-            self._update_status("Stopped")
+
+    def _run_wrapper(self):
+        """Wrapper para executar o loop asyncio em uma thread separada (bot sem host)."""
+        loop = self.loop
+        try:
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self._run_guarded())
+        finally:
+            loop.close()
 
 
     def start_bot(self):
-        """Inicia o bot em uma nova thread."""
-        if self.running:
+        """Inicia o bot no loop do host ou, sem host, em uma nova thread. Não bloqueia."""
+        if self.loop is not None:
             self._log("Bot já está em execução.", level=logging.WARNING)
             return
 
         # Validações básicas da configuração
         if not self.config.get("bot_token") or self.config.get("bot_token") == "SEU_TOKEN_AQUI":
             self._report_error("Configure o Token da API do Bot antes de iniciar.")
-            self._update_status("Error")
+            self.lifecycle.transition(ERROR)
             return
         
         if not self.config.get("group_id") or self.config.get("group_id") == "SEU_GROUP_ID_AQUI":
             self._report_error("Configure o ID do Grupo antes de iniciar.")
-            self._update_status("Error")
+            self.lifecycle.transition(ERROR)
             return
 
         try:
-            self.stop_event.clear()
-            self.bot_thread = threading.Thread(target=self._run_wrapper, daemon=True)
-            self.bot_thread.start()
-            self._log("Thread do bot iniciada com sucesso.")
+            self.lifecycle.request("start")
+            self._stop_requested = asyncio.Event()
+            # O loop é definido aqui para que stop/restart possam sinalizá-lo desde já
+            if self.host is not None:
+                # Loop compartilhado com os outros bots (ver bot_host.py): nenhuma thread nova
+                self.loop = self.host.start()
+                self.host.submit(self._run_guarded())
+                self._log("Bot agendado no loop compartilhado.")
+            else:
+                self.loop = asyncio.new_event_loop()
+                self.bot_thread = threading.Thread(target=self._run_wrapper, name=f"TelegramBot-{self.name}", daemon=True)
+                self.bot_thread.start()
+                self._log("Thread do bot iniciada com sucesso.")
+            # O status será atualizado para Starting/Running/Error dentro da thread pelo ciclo de vida
         except Exception as e:
+            self.loop = None
             self._report_error(f"Falha ao iniciar thread: {str(e)}")
-            self._update_status("Error")
-            # Limpa eventos antigos e inicia a thread
-            self.stop_event.clear()
-            self.bot_thread = threading.Thread(target=self._run_wrapper, daemon=True)
-            self.bot_thread.start()
-            self._log("Thread do bot iniciada.")
-            # O status será atualizado para Starting/Running/Error dentro da thread via _post_init ou erros
-
+            self.lifecycle.transition(ERROR)
 
     def stop_bot(self):
-        """Delega a parada para o controlador"""
-        self.controller.stop_bot()
+        """Delega a parada para o controlador (aguarda o estado Stopped)"""
+        return self.controller.stop_bot()
+
+    def restart_bot(self, new_config=None):
+        """Reinicia o bot mantendo o estado em memória; se estiver parado, apenas inicia.
+
+        `new_config` (a configuração salva pela GUI) passa a valer na nova sessão. O reinício
+        reaproveita o Application: um novo token só vale depois de parar e iniciar o bot.
+        """
+        if new_config is not None:
+            self.update_config(new_config)
+        if self.loop is None:
+            self.start_bot()
+        else:
+            self.controller.request_restart()
+
     def update_config(self, new_config):
         """Atualiza a configuração do bot."""
         self.config = new_config
+        if self.rule_workers is not None and self.rule_workers.running and self.loop is not None:
+            self.loop.call_soon_threadsafe(self.rule_workers.update_rules, new_config.get("rules", {}))
         self._log("Configuração do bot atualizada pela GUI.")
         # Nota: Alterações críticas como token/group_id exigem reinício do bot.
         # A GUI deve informar isso ao usuário.
+
+    # --- Diagnóstico do event loop (chamado pela GUI/CLI, fora do loop) ---
+
+    def start_profiling(self):
+        """Inicia o profiler por amostragem na thread do event loop. Retorna False se não foi possível."""
+        if self.loop is None or self._loop_thread_id is None:
+            self._log("Profiler: o bot não está em execução.", level=logging.WARNING)
+            return False
+        if self.profiler is not None and self.profiler.running:
+            self._log("Profiler já está em execução.", level=logging.WARNING)
+            return False
+        settings = self.config.get("profiling", {})
+        self.profiler = SamplingProfiler(
+            self._loop_thread_id,
+            interval_sec=settings.get("sample_interval_ms", 10) / 1000,
+            max_depth=settings.get("max_stack_depth", 64)
+        )
+        self.profiler.start()
+        self._log(f"Profiler iniciado (uma amostra a cada {self.profiler.interval_sec * 1000:.0f} ms).")
+        return True
+
+    def stop_profiling(self, path=None):
+        """Para o profiler e grava as pilhas (formato collapsed, para flame graph). Retorna o caminho ou None."""
+        profiler = self.profiler
+        if profiler is None or not profiler.running:
+            self._log("Profiler não está em execução.", level=logging.WARNING)
+            return None
+        profiler.stop()
+        if path is None:
+            path = self.config.get("profiling", {}).get("output_path", PROFILE_FILE).format(
+                bot=self.name, time=time.strftime("%Y%m%d_%H%M%S"))
+        try:
+            stacks = profiler.dump(path)
+        except OSError as e:
+            self._report_error(f"Falha ao gravar o perfil em {path}: {e}")
+            return None
+        self._log(f"Perfil gravado em {path}: {profiler.samples} amostras em {profiler.elapsed_sec:.1f}s, {stacks} pilhas distintas.")
+        for label, share in profiler.top_functions(5):
+            self._log(f"  {share:6.1%}  {label}")
+        return path
+
+    def start_slow_callback_detection(self, threshold_ms=None):
+        """Registra no log os callbacks do event loop que passarem do limite. Retorna False se não foi possível."""
+        if self.loop is None or self._loop_thread_id is None:
+            self._log("Detecção de callbacks lentos: o bot não está em execução.", level=logging.WARNING)
+            return False
+        if threshold_ms is None:
+            threshold_ms = self.config.get("profiling", {}).get("slow_callback_ms", 100)
+        self.stop_slow_callback_detection()
+        self.slow_callback_monitor = SlowCallbackMonitor(
+            self.loop, self._loop_thread_id, threshold_ms / 1000,
+            log=lambda message: self._log(message, level=logging.WARNING)
+        )
+        self.slow_callback_monitor.start()
+        self._log(f"Detecção de callbacks lentos ativada (limite {threshold_ms:.0f} ms).")
+        return True
+
+    def stop_slow_callback_detection(self):
+        if self.slow_callback_monitor is None:
+            return
+        monitor, self.slow_callback_monitor = self.slow_callback_monitor, None
+        monitor.stop()
+        self._log(f"Detecção de callbacks lentos desativada ({monitor.stalls} bloqueio(s) detectado(s)).")
+
+    # --- Memória (chamado pela GUI/CLI, fora do loop) ---
+
+    def memory_report(self, timeout=5.0):
+        """Entradas e bytes estimados de cada estrutura em memória deste bot.
+
+        Com o bot em execução, a leitura roda no event loop (sem disputar as
+        estruturas com os handlers); bloqueia no máximo `timeout` segundos.
+        """
+        loop = self.loop
+        if loop is not None and loop.is_running():
+            return asyncio.run_coroutine_threadsafe(self._memory_rows_async(), loop).result(timeout)
+        return self._memory_rows()
+
+    async def _memory_rows_async(self):
+        return self._memory_rows()
+
+    def _memory_rows(self):
+        limits = self.config.get("memory", {})
+        rows = [
+            structure_row("pending_verification", self.pending_verification, len(self.pending_verification),
+                          limits.get("pending_verification_max", 50000)),
+            structure_row("user_message_counts", self.rule_engine.user_message_counts,
+                          len(self.rule_engine.user_message_counts), limits.get("flood_history_max_users", 100000)),
+            structure_row("follow_cache", self.follow_verifier, len(self.follow_verifier), limits.get("follow_cache_max", 100000)),
+            structure_row("member_cache", self.member_cache, len(self.member_cache), self.member_cache.max_entries),
+            structure_row("message_index", self.message_index, self.message_index.message_count()),
+            structure_row("recent_joins", self._recent_joins, sum(len(joins) for joins in self._recent_joins.values())),
+            structure_row("recent_media", self._recent_media, len(self._recent_media), self._recent_media_max_users),
+            structure_row("callback_clicks", self._last_callback_click, len(self._last_callback_click), 10000),
+            structure_row("metrics", self.metrics, len(self.metrics.series)),
+        ]
+        if self.ban_registry is not None:
+            rows.append(structure_row("ban_registry", self.ban_registry, len(self.ban_registry)))  # Compartilhado no processo
+        return rows
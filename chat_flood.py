@@ -0,0 +1,83 @@
+# chat_flood.py
+import time
+from collections import deque
+
+
+class ChatRateMonitor:
+    """Contador de janela deslizante de mensagens por chat (todos os usuários somados).
+
+    A janela é dividida em baldes de 1 segundo, então o custo por mensagem é O(1)
+    e a memória é limitada a `window_sec` baldes por chat.
+    """
+
+    def __init__(self, window_sec=10, threshold_per_sec=20.0, restore_after_sec=30):
+        self.window_sec = max(1, int(window_sec))
+        self.threshold_per_sec = threshold_per_sec
+        self.restore_after_sec = restore_after_sec
+        self._buckets = {}  # chat_id: deque([segundo, contagem])
+        self._surge_since = {}  # chat_id: time.monotonic() do início da proteção
+        self._calm_since = {}  # chat_id: início do período abaixo do limite de restauração
+
+    def hit(self, chat_id, now=None):
+        """Registra uma mensagem e retorna a taxa atual (msg/s) do chat."""
+        now = time.monotonic() if now is None else now
+        second = int(now)
+        buckets = self._buckets.get(chat_id)
+        if buckets is None:
+            buckets = self._buckets[chat_id] = deque()
+        if buckets and buckets[-1][0] == second:
+            buckets[-1][1] += 1
+        else:
+            buckets.append([second, 1])
+        self._expire(buckets, second)
+        return self.rate(chat_id, now)
+
+    def rate(self, chat_id, now=None):
+        """Taxa média (msg/s) na janela. Seguro para leitura a partir de outra thread."""
+        now = time.monotonic() if now is None else now
+        oldest = int(now) - self.window_sec
+        # list() copia o deque atomicamente (a GUI lê de outra thread)
+        buckets = list(self._buckets.get(chat_id, ()))
+        return sum(count for second, count in buckets if second > oldest) / self.window_sec
+
+    def is_surging(self, chat_id):
+        """Indica se a proteção de flood do chat está ativa."""
+        return chat_id in self._surge_since
+
+    def should_activate(self, chat_id, rate):
+        """True quando a taxa ultrapassa o limite e a proteção ainda não está ativa."""
+        return rate > self.threshold_per_sec and chat_id not in self._surge_since
+
+    def mark_surge(self, chat_id, now=None):
+        self._surge_since[chat_id] = time.monotonic() if now is None else now
+        self._calm_since.pop(chat_id, None)
+
+    def should_restore(self, chat_id, now=None):
+        """True quando a taxa ficou abaixo de metade do limite por `restore_after_sec`."""
+        if chat_id not in self._surge_since:
+            return False
+        now = time.monotonic() if now is None else now
+        if self.rate(chat_id, now) >= self.threshold_per_sec / 2:
+            self._calm_since.pop(chat_id, None)
+            return False
+        calm_since = self._calm_since.setdefault(chat_id, now)
+        return now - calm_since >= self.restore_after_sec
+
+    def clear_surge(self, chat_id):
+        self._surge_since.pop(chat_id, None)
+        self._calm_since.pop(chat_id, None)
+
+    def purge_idle(self, now=None):
+        """Remove chats sem mensagens na janela. Retorna quantos foram removidos."""
+        now = time.monotonic() if now is None else now
+        oldest = int(now) - self.window_sec
+        idle = [chat_id for chat_id, buckets in self._buckets.items()
+                if (not buckets or buckets[-1][0] <= oldest) and chat_id not in self._surge_since]
+        for chat_id in idle:
+            del self._buckets[chat_id]
+        return len(idle)
+
+    def _expire(self, buckets, second):
+        oldest = second - self.window_sec
+        while buckets and buckets[0][0] <= oldest:
+            buckets.popleft()
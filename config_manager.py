@@ -1,11 +1,13 @@
 # config_manager.py
 import json
 import os
+from word_lists import migrate_inline_lists
 
 CONFIG_FILE = "config.json"
 
 DEFAULT_CONFIG = {
     # Configurações do Bot
+    "bot_name": "principal", # Nome exibido na lista de bots e nos logs
     "bot_token": "SEU_TOKEN_AQUI", # Substitua pelo token do seu bot
     "group_id": "SEU_GROUP_ID_AQUI", # Substitua pelo ID do seu grupo (ex: -1001234567890)
     "instagram_url": "https://instagram.com/seu_perfil",
@@ -30,9 +32,168 @@ DEFAULT_CONFIG = {
         "allow_only_pdf": True,
         "block_spam_flood": True,
         "spam_message_limit": 5, # Máximo de mensagens
-        "spam_time_limit_sec": 10 # Em segundos
+        "spam_time_limit_sec": 10, # Em segundos
+        "purge_on_ban": True, # Apaga as mensagens recentes de quem for banido
+        "purge_message_count": 50, # Quantas mensagens recentes por usuário apagar
+        "block_chat_flood": True, # Proteção contra flood coordenado (todos os usuários somados)
+        "chat_flood_threshold_per_sec": 20, # Taxa média (msg/s) que ativa a proteção
+        "chat_flood_window_sec": 10, # Janela deslizante usada no cálculo da taxa
+        "chat_flood_restore_after_sec": 30, # Tempo abaixo de metade do limite para restaurar
+        "chat_flood_action": "lockdown", # lockdown (grupo somente leitura) ou restrict_new_members
+        "chat_flood_new_member_window_sec": 600, # "Membro recente" para restrict_new_members
+        # Regras regex personalizadas: {"name": ..., "pattern": ..., "action": "delete"|"ban", "enabled": true}
+        "custom_regex_rules": [],
+        "regex_time_budget_ms": 50, # Tempo máximo por mensagem (interrompe a busca se o pacote 'regex' estiver instalado)
+        "regex_max_text_chars": 4096 # Só o início de mensagens muito longas é avaliado
     },
 
+    # Verificação de seguidores ("Já segui")
+    "follow_verification": {
+        "backend": "simulated", # simulated (todos aprovados) ou http
+        "url": "", # Endpoint do backend http (ex: http://127.0.0.1:8085/verify)
+        "timeout_sec": 5,
+        "max_concurrent": 10, # Verificações simultâneas no backend
+        "cache_ttl_sec": 600, # Validade de um resultado positivo
+        "negative_cache_ttl_sec": 30 # Validade de um resultado negativo
+    },
+
+    # Desempenho / Caches
+    "performance": {
+        "member_cache_ttl_sec": 60, # Validade do cache de status de membros (get_chat_member)
+        "callback_throttle_sec": 1.0, # Intervalo mínimo entre cliques do mesmo usuário
+        "message_index_max_users_per_chat": 5000, # Usuários com mensagens indexadas por chat
+        "metrics_interval_sec": 1.0, # Intervalo entre amostras das métricas do painel
+        "metrics_history_samples": 300, # Amostras guardadas por série (memória limitada)
+        "dashboard_fps": 2 # Atualizações por segundo do painel na GUI
+    },
+
+    # Retry das chamadas à API do Telegram
+    "api_retry": {
+        "max_attempts": 4, # Tentativas por chamada (erros de rede e 429)
+        "backoff_base_sec": 0.5, # Backoff exponencial com jitter: base * 2^tentativa
+        "backoff_max_sec": 10,
+        "max_retry_after_sec": 60, # 429 com espera maior que isso não é repetido
+        "breaker_failure_threshold": 5, # Falhas seguidas que abrem o circuit breaker
+        "breaker_reset_sec": 30 # Tempo que o circuit breaker fica aberto
+    },
+
+    # Log de auditoria das ações de moderação (SQLite)
+    "audit_log": {
+        "enabled": True,
+        "path": "moderation_audit.db",
+        "batch_size": 500, # Registros gravados por transação
+        "flush_interval_sec": 1.0 # Intervalo máximo entre gravações
+    },
+
+    # Fila de ações de saída (prioridades: apagar/callbacks > banir/restringir/boas-vindas > edições)
+    "scheduler": {
+        "rate_per_sec": 30, # Orçamento de chamadas por segundo
+        "burst": 30, # Rajada máxima acima da taxa
+        "max_concurrent": 16, # Chamadas simultâneas em andamento
+        "normal_max_wait_sec": 2, # Espera máxima de banir/restringir/boas-vindas antes de passar na frente
+        "low_max_wait_sec": 5 # Espera máxima de edições antes de passar na frente
+    },
+
+    # Conexões HTTP com a API do Telegram
+    "http": {
+        "connection_pool_size": 64, # Conexões para chamadas da API (apagar, banir, enviar...)
+        "get_updates_pool_size": 2, # Conexões exclusivas do getUpdates (long polling)
+        "max_keepalive_connections": 64, # Conexões mantidas abertas entre requisições
+        "keepalive_expiry_sec": 30, # Tempo que uma conexão ociosa fica aberta
+        "http2": False, # Requer o pacote h2 (pip install httpx[http2])
+        "connect_timeout": 10,
+        "read_timeout": 30,
+        "write_timeout": 30,
+        "pool_timeout": 5, # Espera máxima por uma conexão livre no pool
+        "get_updates_read_timeout": 40, # Deve ser maior que o timeout do long polling
+        "base_url": "" # Vazio = api.telegram.org; ex: http://127.0.0.1:8081/bot (fake_telegram_server.py)
+    },
+
+    # Ciclo de vida do bot (parar / reiniciar)
+    "lifecycle": {
+        "drain_timeout_sec": 5, # Prazo para concluir as ações já na fila ao parar; o restante é descartado
+        "stop_timeout_sec": 15 # Espera máxima por uma parada completa (ex.: ao fechar a janela)
+    },
+
+    # Marca d'água dos updates processados (um arquivo por bot; evita reprocessar após uma queda)
+    "update_watermark": {
+        "enabled": True,
+        "path": "update_watermark_{bot}.json", # {bot} = nome do bot
+        "flush_interval_sec": 1.0, # Gravação em segundo plano, só quando a marca avançou
+        "dedup_window": 10000 # IDs recentes guardados em memória para descartar repetições
+    },
+
+    # Listas de palavras (palavras bloqueadas e palavras-chave do tópico) em banco próprio.
+    # Listas antigas guardadas em "rules" são movidas para o banco ao carregar a configuração.
+    "word_lists": {
+        "path": "word_lists.db",
+        "refresh_interval_sec": 5 # Intervalo para os bots aplicarem as alterações feitas na GUI
+    },
+
+    # Mídias proibidas (file_unique_id de arquivos/stickers e nomes de pacotes de stickers)
+    "media_blocklist": {
+        "enabled": True,
+        "path": "media_blocklist.db",
+        "bloom_filter": True, # Filtro em memória na frente do SQLite (consulta O(1) com milhões de entradas)
+        "expected_entries": 1000000, # Capacidade do filtro (~1,8 MB para 1M com 0,1% de falsos positivos)
+        "false_positive_rate": 0.001,
+        "refresh_interval_sec": 5, # Intervalo para perceber alterações feitas pela GUI
+        "action": "ban", # "ban" (apaga e bane) ou "delete" (só apaga)
+        "auto_add_on_admin_ban": True, # Banimento manual por um admin adiciona as mídias recentes do usuário
+        "auto_add_window_sec": 600 # Idade máxima das mídias consideradas no banimento manual
+    },
+
+    # Registro global de banidos (todos os grupos e bots deste computador; exportável com ban_registry.py)
+    "ban_registry": {
+        "enabled": True,
+        "path": "ban_registry.bin", # Array ordenado de IDs (8 bytes por usuário)
+        "flush_interval_sec": 5.0 # Gravação em segundo plano das alterações (e leitura das feitas por outro processo)
+    },
+
+    # Diagnóstico do event loop (profiler por amostragem e callbacks lentos; ligados pela aba Painel ou pelo headless.py)
+    "profiling": {
+        "sample_interval_ms": 10, # Intervalo entre amostras da pilha da thread do loop
+        "max_stack_depth": 64, # Frames guardados por amostra
+        "output_path": "profile_{bot}_{time}.collapsed", # Pilhas no formato collapsed (flamegraph.pl, speedscope)
+        "slow_callback_ms": 100, # Limite para registrar um callback lento
+        "slow_callback_on_start": False # Ativa a detecção de callbacks lentos ao iniciar o bot
+    },
+
+    # Memória do processo: limites suaves (ao passar, as entradas mais antigas são descartadas com um aviso)
+    "memory": {
+        "check_interval_sec": 60, # Intervalo entre verificações dos limites (tarefa de manutenção memory_limits)
+        "pending_verification_max": 50000, # Verificações "Já segui" pendentes
+        "flood_history_max_users": 100000, # Usuários com histórico de flood em memória
+        "follow_cache_max": 100000, # Resultados de verificação de seguidores em cache
+        "rss_warn_mb": 1024, # Aviso quando a memória do processo passar disso (0 = desativado)
+        "event_bus_max_events": 20000, # Eventos aguardando a GUI (logs); os mais antigos são descartados
+        "console_max_lines": 5000, # Linhas mantidas no console da GUI
+        "tracemalloc_frames": 1, # Frames guardados por alocação com o tracemalloc ativo
+        "tracemalloc_top": 15 # Linhas do snapshot do tracemalloc no relatório
+    },
+
+    # Manutenção periódica no event loop (JobQueue do python-telegram-bot, se instalado com [job-queue]).
+    # Intervalo 0 desativa a tarefa.
+    "maintenance": {
+        "slice_ms": 5, # Duração máxima de cada fatia de uma varredura antes de devolver o loop aos updates
+        "state_sweep_interval_sec": 60, # Verificações pendentes expiradas, históricos de flood e taxa do chat
+        "pending_verification_ttl_sec": 86400, # Verificação "Já segui" pendente há mais que isso é descartada
+        "pending_verification_expire_action": "kick", # Ao descartar (prazo ou limite de memória): "kick" (remove do grupo) ou "unrestrict" (libera)
+        "cache_sweep_interval_sec": 120, # Caches de membros e seguidores, cliques, entradas e mídias recentes
+        "storage_compact_interval_sec": 3600 # Checkpoint do WAL e PRAGMA optimize dos bancos SQLite
+    },
+
+    # Modo supervisor: regras avaliadas em processos separados (usuários distribuídos por hash do user_id)
+    "sharding": {
+        "workers": 0, # 0 = avaliação no próprio processo do bot
+        "batch_max": 256, # Mensagens por lote enviado a um worker
+        "eval_timeout_sec": 2 # Sem resposta do worker nesse prazo, avalia no processo principal
+    },
+
+    # Bots adicionais no mesmo processo (mesmo event loop). Cada item sobrescreve as chaves
+    # da configuração principal, ex: {"bot_name": "loja", "bot_token": "...", "group_id": "..."}
+    "extra_bots": [],
+
     # Estado Interno (não editável diretamente pela GUI usualmente)
     "bot_status": "Stopped" # Estado inicial do bot
 }
@@ -41,8 +202,10 @@ def load_config():
     """Carrega as configurações do arquivo JSON."""
     if not os.path.exists(CONFIG_FILE):
         print(f"Arquivo '{CONFIG_FILE}' não encontrado. Criando com valores padrão.")
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG.copy() # Retorna uma cópia para evitar modificação acidental do default
+        config = DEFAULT_CONFIG.copy() # Cópia para evitar modificação acidental do default
+        migrate_inline_lists(config) # Listas de palavras padrão vão para o banco próprio
+        save_config(config)
+        return config
 
     try:
         with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
@@ -65,6 +228,10 @@ def load_config():
                      updated = True
 
 
+            if migrate_inline_lists(config):
+                print("Listas de palavras movidas para o banco de listas.")
+                updated = True
+
             if updated:
                 print("Configuração atualizada com novas chaves padrão.")
                 save_config(config) # Salva se adicionou chaves faltantes
@@ -81,6 +248,28 @@ def load_config():
         return DEFAULT_CONFIG.copy()
 
 
+def bot_configs(config):
+    """Configuração de cada bot: a principal e a de cada item de 'extra_bots'.
+
+    Os itens herdam tudo da principal e sobrescrevem só o que definirem
+    (seções como 'rules' são mescladas um nível abaixo). Retorna [(nome, config)].
+    """
+    configs = [(config.get("bot_name", "principal"), config)]
+    for index, overrides in enumerate(config.get("extra_bots", [])):
+        if not overrides.get("enabled", True):
+            continue
+        bot_config = {key: value for key, value in config.items() if key != "extra_bots"}
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(bot_config.get(key), dict):
+                bot_config[key] = {**bot_config[key], **value}
+            else:
+                bot_config[key] = value
+        name = overrides.get("bot_name") or f"bot{index + 2}"
+        bot_config["bot_name"] = name
+        configs.append((name, bot_config))
+    return configs
+
+
 def save_config(config_data):
     """Salva as configurações no arquivo JSON."""
     try:
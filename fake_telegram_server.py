@@ -0,0 +1,319 @@
+# fake_telegram_server.py
+"""Servidor HTTP local que imita a Bot API do Telegram (testes de carga sem o Telegram real).
+
+Implementa getMe, getUpdates (long polling), sendMessage, deleteMessage(s),
+restrictChatMember, banChatMember, answerCallbackQuery e o que o bot usa
+ao redor (deleteWebhook, getChat, getChatMember, setChatPermissions,
+editMessageText). Latência, respostas 429 e erros são configuráveis.
+
+    python fake_telegram_server.py --port 8081 --latency 0.05 --rate-limit 30
+
+E na configuração do bot:
+
+    "http": {"base_url": "http://127.0.0.1:8081/bot", ...}
+
+Updates podem ser injetados por POST /_fake/updates (lista JSON de updates
+sem update_id) e as estatísticas lidas em GET /_fake/stats. O gerador de
+carga (load_generator.py) usa o servidor no mesmo processo.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl
+
+# Métodos que nunca recebem 429/erro injetado (o bot não conseguiria nem iniciar)
+CONTROL_METHODS = {"getme", "getupdates", "deletewebhook"}
+
+FULL_PERMISSIONS = {
+    "can_send_messages": True, "can_send_audios": True, "can_send_documents": True, "can_send_photos": True,
+    "can_send_videos": True, "can_send_video_notes": True, "can_send_voice_notes": True, "can_send_polls": True,
+    "can_send_other_messages": True, "can_add_web_page_previews": True, "can_change_info": False,
+    "can_invite_users": True, "can_pin_messages": False, "can_manage_topics": False,
+}
+
+
+class FakeTelegramServer:
+    """Bot API falsa em thread própria.
+
+    - `latency_sec` (+ `jitter_sec` aleatório) é aplicada a cada chamada, exceto getUpdates.
+    - `rate_limit`: chamadas/s aceitas no total (como o limite do Telegram); acima disso, 429.
+    - `rate_429` e `error_rate`: fração de chamadas que recebem 429 (retry_after) ou 400.
+    - `push_update()` registra o horário de cada mensagem/entrada para medir a latência
+      de ponta a ponta até o deleteMessage/restrictChatMember/banChatMember correspondente.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8081, latency_sec=0.0, jitter_sec=0.0, rate_limit=0,
+                 rate_429=0.0, retry_after=1, error_rate=0.0, seed=None):
+        self.latency_sec = latency_sec
+        self.jitter_sec = jitter_sec
+        self.rate_limit = rate_limit
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._updates_ready = threading.Condition(self._lock)
+        self._updates = deque()
+        self._next_update_id = 1
+        self._next_message_id = 1000000  # IDs das mensagens enviadas pelo bot
+        self._window_start = time.monotonic()
+        self._window_calls = 0
+        self._pushed_at = {}  # ("message"|"join", chat_id, id): time.perf_counter() do envio
+        self._restricted = {}  # (chat_id, user_id): permissões
+        self.calls = Counter()
+        self.rate_limited = Counter()
+        self.errors = Counter()
+        self.latencies = {"delete": [], "restrict": [], "ban": []}  # segundos, do update à ação
+        self.confirmed_update_id = 0  # Maior update confirmado pelo bot (offset - 1)
+        self._thread = None
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    # --- Updates ---
+
+    def push_update(self, update):
+        """Enfileira um update (o update_id é atribuído aqui). Retorna o update_id."""
+        now = time.perf_counter()
+        with self._lock:
+            update_id = self._next_update_id
+            self._next_update_id += 1
+            self._updates.append(dict(update, update_id=update_id))
+            message = update.get("message")
+            if message:
+                chat_id = message["chat"]["id"]
+                self._pushed_at[("message", chat_id, message["message_id"])] = now
+                self._pushed_at[("user", chat_id, message["from"]["id"])] = now
+                for member in message.get("new_chat_members", []):
+                    self._pushed_at[("join", chat_id, member["id"])] = now
+            self._updates_ready.notify_all()
+            return update_id
+
+    def pending_updates(self):
+        with self._lock:
+            return len(self._updates)
+
+    def _get_updates(self, params):
+        offset = int(params.get("offset", 0) or 0)
+        limit = int(params.get("limit", 100) or 100)
+        deadline = time.monotonic() + float(params.get("timeout", 0) or 0)
+        with self._updates_ready:
+            while self._updates and self._updates[0]["update_id"] < offset:
+                self._updates.popleft()  # Confirmados pelo offset
+            if offset:
+                self.confirmed_update_id = max(self.confirmed_update_id, offset - 1)
+            while not self._updates:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._updates_ready.wait(remaining)
+            return [self._updates[i] for i in range(min(limit, len(self._updates)))]
+
+    def _record_latency(self, kind, key):
+        pushed = self._pushed_at.pop(key, None) if kind != "ban" else self._pushed_at.get(key)
+        if pushed is not None:
+            self.latencies[kind].append(time.perf_counter() - pushed)
+
+    # --- Métodos da API ---
+
+    def bot_user(self, token):
+        bot_id = int(token.split(":")[0]) if token.split(":")[0].isdigit() else 1
+        return {"id": bot_id, "is_bot": True, "first_name": "Bot de Carga", "username": "fake_load_bot",
+                "can_join_groups": True, "can_read_all_group_messages": True, "supports_inline_queries": False}
+
+    def _message(self, token, params, text=None, message_id=None):
+        with self._lock:
+            if message_id is None:
+                message_id = self._next_message_id
+                self._next_message_id += 1
+        return {"message_id": message_id, "date": int(time.time()),
+                "chat": {"id": int(params.get("chat_id", 0)), "type": "supergroup", "title": "Grupo de Carga"},
+                "from": self.bot_user(token), "text": text if text is not None else params.get("text", "")}
+
+    def call(self, token, method, params):
+        """Executa um método. Retorna (status HTTP, corpo da resposta)."""
+        name = method.lower()
+        with self._lock:
+            self.calls[method] += 1
+            if name not in CONTROL_METHODS:
+                now = time.monotonic()
+                if now - self._window_start >= 1:
+                    self._window_start, self._window_calls = now, 0
+                self._window_calls += 1
+                limited = self.rate_limit and self._window_calls > self.rate_limit
+                if limited or (self.rate_429 and self._random.random() < self.rate_429):
+                    self.rate_limited[method] += 1
+                    return 429, {"ok": False, "error_code": 429,
+                                 "description": f"Too Many Requests: retry after {self.retry_after}",
+                                 "parameters": {"retry_after": self.retry_after}}
+                if self.error_rate and self._random.random() < self.error_rate:
+                    self.errors[method] += 1
+                    return 400, {"ok": False, "error_code": 400, "description": "Bad Request: erro injetado"}
+
+        chat_id = int(params.get("chat_id", 0) or 0)
+        user_id = int(params.get("user_id", 0) or 0)
+        if name == "getme":
+            result = self.bot_user(token)
+        elif name == "getupdates":
+            result = self._get_updates(params)
+        elif name in ("deletewebhook", "answercallbackquery", "setchatpermissions"):
+            result = True
+        elif name == "sendmessage":
+            result = self._message(token, params)
+        elif name == "editmessagetext":
+            result = self._message(token, params, message_id=int(params.get("message_id", 0) or 0))
+        elif name == "deletemessage":
+            with self._lock:
+                self._record_latency("delete", ("message", chat_id, int(params.get("message_id", 0))))
+            result = True
+        elif name == "deletemessages":
+            with self._lock:
+                for message_id in params.get("message_ids", []):
+                    self._record_latency("delete", ("message", chat_id, int(message_id)))
+            result = True
+        elif name == "restrictchatmember":
+            with self._lock:
+                self._restricted[(chat_id, user_id)] = params.get("permissions", {})
+                self._record_latency("restrict", ("join", chat_id, user_id))
+            result = True
+        elif name == "banchatmember":
+            with self._lock:
+                self._record_latency("ban", ("user", chat_id, user_id))
+            result = True
+        elif name == "getchat":
+            result = {"id": chat_id, "type": "supergroup", "title": "Grupo de Carga", "permissions": FULL_PERMISSIONS,
+                      "accent_color_id": 0, "max_reaction_count": 11}
+        elif name == "getchatmember":
+            user = {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+            with self._lock:
+                permissions = self._restricted.get((chat_id, user_id))
+            if permissions is None:
+                result = {"status": "member", "user": user}
+            else:
+                result = dict(FULL_PERMISSIONS, **permissions, status="restricted", user=user, is_member=True, until_date=0)
+        else:
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found: método não implementado"}
+
+        if self.latency_sec or self.jitter_sec:
+            if name != "getupdates":
+                time.sleep(self.latency_sec + self._random.random() * self.jitter_sec)
+        return 200, {"ok": True, "result": result}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "rate_limited": dict(self.rate_limited),
+                "errors": dict(self.errors),
+                "pending_updates": len(self._updates),
+                "confirmed_update_id": self.confirmed_update_id,
+                "pushed_updates": self._next_update_id - 1,
+            }
+
+    # --- HTTP ---
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, como no Telegram
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _params(self):
+                parsed = urlparse(self.path)
+                params = dict(parse_qsl(parsed.query))
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                body = self.rfile.read(length) if length else b""
+                content_type = self.headers.get("Content-Type", "")
+                if body and content_type.startswith("application/json"):
+                    params.update(json.loads(body))
+                elif body:
+                    # O python-telegram-bot envia form-urlencoded com valores não-texto em JSON
+                    for key, value in parse_qsl(body.decode("utf-8"), keep_blank_values=True):
+                        try:
+                            params[key] = json.loads(value)
+                        except ValueError:
+                            params[key] = value
+                return parsed.path, params
+
+            def _dispatch(self):
+                path, params = self._params()
+                if path == "/_fake/stats":
+                    self._send_json(200, server.stats())
+                    return
+                if path == "/_fake/updates":
+                    updates = params.get("updates", [])
+                    self._send_json(200, {"ok": True, "result": [server.push_update(u) for u in updates]})
+                    return
+                parts = path.strip("/").split("/")
+                if len(parts) != 2 or not parts[0].startswith("bot"):
+                    self._send_json(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+                    return
+                status, body = server.call(parts[0][3:], parts[1], params)
+                self._send_json(status, body)
+
+            do_GET = _dispatch
+            do_POST = _dispatch
+
+            def log_message(self, format, *args):
+                pass  # Silencioso
+
+        return Handler
+
+    def start(self):
+        """Inicia o servidor em uma thread daemon."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Para o servidor (acorda quem estiver em long polling)."""
+        with self._updates_ready:
+            self._updates_ready.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot API do Telegram falsa para testes de carga.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência artificial por chamada (segundos)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latência aleatória adicional (segundos)")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Chamadas/s aceitas antes de responder 429 (0 = sem limite)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fração de chamadas com 429 (0 a 1)")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de chamadas com 400 (0 a 1)")
+    args = parser.parse_args()
+
+    server = FakeTelegramServer(args.host, args.port, args.latency, args.jitter, args.rate_limit,
+                                args.rate_429, args.retry_after, args.error_rate)
+    print(f"Bot API falsa ouvindo em {server.base_url} (use como http.base_url)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# follow_stub_server.py
+"""Servidor HTTP local que imita o serviço de verificação de seguidores.
+
+Útil para testar o HttpFollowVerifier sem depender de APIs externas:
+
+    python follow_stub_server.py --port 8085 --latency 0.5 --followed 123,456
+
+E na configuração:
+
+    "follow_verification": {"backend": "http", "url": "http://127.0.0.1:8085/verify", ...}
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class FollowStubServer:
+    """Servidor stub em thread própria. Responde GET /verify?user_id=N com {"followed": bool}."""
+
+    def __init__(self, host="127.0.0.1", port=8085, followed_ids=None, follow_all=False, latency_sec=0.0, fail_rate=0.0):
+        self.followed_ids = set(followed_ids or [])
+        self.follow_all = follow_all
+        self.latency_sec = latency_sec
+        self.fail_rate = fail_rate
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/verify"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path != "/verify":
+                    self.send_error(404)
+                    return
+                with stub._lock:
+                    stub.request_count += 1
+                    count = stub.request_count
+                if stub.latency_sec:
+                    time.sleep(stub.latency_sec)
+                # Falha determinística: a cada 1/fail_rate requisições
+                if stub.fail_rate and count % max(1, round(1 / stub.fail_rate)) == 0:
+                    self.send_error(503)
+                    return
+                try:
+                    user_id = int(parse_qs(parsed.query).get("user_id", ["0"])[0])
+                except ValueError:
+                    self.send_error(400)
+                    return
+                body = json.dumps({"followed": stub.follow_all or user_id in stub.followed_ids}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Silencioso
+
+        return Handler
+
+    def start(self):
+        """Inicia o servidor em uma thread daemon."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Para o servidor."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor stub de verificação de seguidores.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--followed", default="", help="IDs que seguem os perfis, separados por vírgula")
+    parser.add_argument("--all", action="store_true", help="Considera que todos seguem")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência artificial (segundos)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fração de respostas 503 (0 a 1)")
+    args = parser.parse_args()
+
+    followed = [int(x) for x in args.followed.split(",") if x.strip()]
+    server = FollowStubServer(args.host, args.port, followed, args.all, args.latency, args.fail_rate)
+    print(f"Stub de verificação ouvindo em {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# follow_verifier.py
+import abc
+import asyncio
+import time
+from maintenance import sweep_mapping
+
+
+class FollowVerifier(abc.ABC):
+    """Interface base para verificar se um usuário segue os perfis configurados.
+
+    Subclasses implementam apenas `_verify`. Esta classe cuida do cache por
+    usuário (com TTL), do limite de verificações simultâneas e do timeout.
+    """
+
+    def __init__(self, max_concurrent=10, timeout_sec=5.0, cache_ttl_sec=600, negative_cache_ttl_sec=30):
+        self.timeout_sec = timeout_sec
+        self.cache_ttl_sec = cache_ttl_sec
+        self.negative_cache_ttl_sec = negative_cache_ttl_sec
+        self._max_concurrent = max_concurrent
+        self._semaphore = None  # Criado sob demanda dentro do event loop do bot
+        self._cache = {}  # user_id: (expira_em, resultado)
+
+    @abc.abstractmethod
+    async def _verify(self, user_id, user_name=None):
+        """Consulta o backend. Deve retornar True/False."""
+
+    def cached_result(self, user_id):
+        """Retorna o resultado em cache (True/False) ou None se não houver."""
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._cache[user_id]
+            return None
+        return entry[1]
+
+    async def check(self, user_id, user_name=None):
+        """Verifica o usuário. Retorna True/False, ou None se o backend falhar ou estourar o timeout."""
+        cached = self.cached_result(user_id)
+        if cached is not None:
+            return cached
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrent)
+
+        async with self._semaphore:
+            try:
+                followed = bool(await asyncio.wait_for(self._verify(user_id, user_name), self.timeout_sec))
+            except asyncio.TimeoutError:
+                return None
+            except Exception:
+                # Falha do backend não é cacheada: o usuário pode tentar de novo
+                return None
+
+        ttl = self.cache_ttl_sec if followed else self.negative_cache_ttl_sec
+        if ttl > 0:
+            self._cache[user_id] = (time.monotonic() + ttl, followed)
+        return followed
+
+    def forget(self, user_id):
+        """Remove o resultado em cache de um usuário."""
+        self._cache.pop(user_id, None)
+
+    def purge_expired(self):
+        """Remove resultados expirados do cache. Retorna quantos foram removidos."""
+        now = time.monotonic()
+        expired = [user_id for user_id, (expires_at, _) in self._cache.items() if expires_at <= now]
+        for user_id in expired:
+            del self._cache[user_id]
+        return len(expired)
+
+    def sweep_expired(self):
+        """Como purge_expired, mas incremental (gerador executado em fatias pelo MaintenanceScheduler)."""
+        now = time.monotonic()
+        return sweep_mapping(self._cache, lambda user_id, entry: entry[0] <= now)
+
+    def trim(self, max_entries):
+        """Limita o cache a `max_entries` (expirados primeiro, depois os mais antigos). Retorna quantos removeu."""
+        removed = self.purge_expired()
+        excess = len(self._cache) - max_entries
+        for user_id in list(self._cache)[:max(0, excess)]:
+            del self._cache[user_id]
+        return removed + max(0, excess)
+
+    def __len__(self):
+        return len(self._cache)
+
+    async def close(self):
+        """Libera recursos do backend (conexões, etc.)."""
+        pass
+
+
+class SimulatedFollowVerifier(FollowVerifier):
+    """Backend padrão: considera que todo usuário seguiu os perfis (comportamento antigo)."""
+
+    async def _verify(self, user_id, user_name=None):
+        return True
+
+
+class HttpFollowVerifier(FollowVerifier):
+    """Backend HTTP: consulta um serviço externo que responde {"followed": true/false}.
+
+    A requisição é um GET em `url` com os parâmetros user_id, instagram e tiktok.
+    """
+
+    def __init__(self, url, instagram_url=None, tiktok_url=None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.instagram_url = instagram_url
+        self.tiktok_url = tiktok_url
+        self._client = None
+
+    async def _verify(self, user_id, user_name=None):
+        # httpx já é dependência do python-telegram-bot
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout_sec)
+        params = {"user_id": user_id}
+        if self.instagram_url:
+            params["instagram"] = self.instagram_url
+        if self.tiktok_url:
+            params["tiktok"] = self.tiktok_url
+        response = await self._client.get(self.url, params=params)
+        response.raise_for_status()
+        return bool(response.json().get("followed"))
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def create_follow_verifier(config):
+    """Cria o verificador de acordo com a seção 'follow_verification' da configuração."""
+    settings = config.get("follow_verification", {})
+    kwargs = {
+        "max_concurrent": settings.get("max_concurrent", 10),
+        "timeout_sec": settings.get("timeout_sec", 5),
+        "cache_ttl_sec": settings.get("cache_ttl_sec", 600),
+        "negative_cache_ttl_sec": settings.get("negative_cache_ttl_sec", 30),
+    }
+    if settings.get("backend") == "http" and settings.get("url"):
+        return HttpFollowVerifier(
+            settings["url"],
+            instagram_url=config.get("instagram_url"),
+            tiktok_url=config.get("tiktok_url"),
+            **kwargs
+        )
+    return SimulatedFollowVerifier(**kwargs)
@@ -1,10 +1,10 @@
 # gui.py
 import customtkinter as ctk
 from tkinter import messagebox, colorchooser
-import threading
-import queue
 import logging
-from config_manager import load_config, save_config
+from config_manager import load_config, save_config, bot_configs
+from bot_host import BotHost
+from gui_events import EventBus, StatusEvent, ErrorEvent, LogEvent, MetricEvent
 
 # Definição do GuiHandler
 class GuiHandler(logging.Handler):
@@ -16,13 +16,29 @@ class GuiHandler(logging.Handler):
         log_entry = self.format(record)
         self.log_queue.put(log_entry)
 
+STATUS_NAMES = {
+    "Stopped": "Parado",
+    "Starting": "Iniciando...",
+    "Running": "Em Execução",
+    "Stopping": "Parando...",
+    "Draining": "Drenando...",
+    "Error": "Erro"
+}
+
 # Classe principal da interface gráfica
 class App(ctk.CTk):
     def __init__(self):
         super().__init__()
         self.config = load_config()
-        self.bot_instance = None
-        self.log_queue = queue.Queue()
+        self.bot_instance = None  # Bot selecionado na lista (painel e taxa de mensagens)
+        self.bots = {}  # nome: TelegramBot
+        self.bot_statuses = {}  # nome: último status publicado
+        self.bot_rows = {}  # nome: widgets da linha do bot na lista
+        # Todos os bots rodam no mesmo event loop, em uma única thread
+        self.bot_host = BotHost()
+        self.closing = False  # Fechando a janela: aguarda os bots publicarem Stopped
+        # Eventos do bot (status, erros, logs, métricas) chegam por aqui e são aplicados na thread do Tk
+        self.event_bus = EventBus(max_queued=self.config.get("memory", {}).get("event_bus_max_events", 20000))
         
         self.title("Bot Manager")
         self.geometry("750x650")
@@ -48,6 +64,20 @@ class App(ctk.CTk):
         self.stop_button = ctk.CTkButton(self.status_frame, text="Parar Bot", command=self.stop_bot_thread, state="disabled")
         self.stop_button.grid(row=0, column=3, padx=10, pady=5)
         
+        self.restart_button = ctk.CTkButton(self.status_frame, text="Reiniciar", width=90, command=self.restart_bot, state="disabled")
+        self.restart_button.grid(row=0, column=4, padx=(0, 10), pady=5)
+        
+        # Taxa de mensagens do grupo (proteção contra flood no chat)
+        self.chat_rate_label = ctk.CTkLabel(self.status_frame, text="Taxa: -")
+        self.chat_rate_label.grid(row=0, column=5, padx=10, pady=5, sticky="e")
+        self.status_frame.grid_columnconfigure(5, weight=1)
+        
+        # Lista de bots (um por linha: seleção, status e iniciar/parar individual)
+        self.bots_frame = ctk.CTkFrame(self.status_frame, fg_color="transparent")
+        self.bots_frame.grid(row=1, column=0, columnspan=6, padx=5, pady=(0, 5), sticky="ew")
+        self.bots_frame.grid_columnconfigure(2, weight=1)
+        self.sync_bot_rows()
+        
         # Label para exibir erros
         self.error_label = ctk.CTkLabel(self, text="", text_color="red", wraplength=730)
         self.error_label.grid(row=2, column=0, padx=10, pady=(0, 10), sticky="ew")
@@ -55,7 +85,13 @@ class App(ctk.CTk):
         # Importa e cria as abas dos outros arquivos
         from gui_home_settings import create_home_settings_tabs
         from gui_custom_rules import create_custom_rules_tab
+        from gui_regex_rules import create_regex_rules_tab
+        from gui_word_lists import create_word_lists_tab
         from gui_console import create_console_tab
+        from gui_history import create_history_tab
+        from gui_dashboard import create_dashboard_tab
+        from gui_media_blocklist import create_media_blocklist_tab
+        from gui_memory import create_memory_tab
         
         self.tab_view = ctk.CTkTabview(self)
         self.tab_view.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
@@ -63,47 +99,126 @@ class App(ctk.CTk):
         # Cria todas as abas
         create_home_settings_tabs(self)
         create_custom_rules_tab(self)
+        create_regex_rules_tab(self)
+        create_word_lists_tab(self)
         create_console_tab(self)
+        create_history_tab(self)
+        create_dashboard_tab(self)
+        create_media_blocklist_tab(self)
+        create_memory_tab(self)
         
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
-        self.after(100, self.process_log_queue)
+        self.event_bus.subscribe(StatusEvent, self.on_bot_status)
+        self.event_bus.subscribe(ErrorEvent, lambda event: self.show_error(event.message, event.bot))
+        self.event_bus.subscribe_batch(LogEvent, lambda events: self.update_console("\n".join(e.message for e in events)))
+        self.event_bus.subscribe(MetricEvent, self.on_metric)
+        self.event_bus.attach(self, interval_ms=50)
 
     # Métodos principais
-    def process_log_queue(self):
-        try:
-            while True:
-                log_entry = self.log_queue.get_nowait()
-                self.update_console(log_entry)
-        except queue.Empty:
-            pass
-        finally:
-            self.after(200, self.process_log_queue)
+    def sync_bot_rows(self):
+        """(Re)cria a lista de bots a partir da configuração (principal + extra_bots)."""
+        for widgets in self.bot_rows.values():
+            for widget in widgets.values():
+                widget.destroy()
+        self.bot_rows.clear()
+        names = [name for name, _ in bot_configs(self.config)]
+        # Bots ainda ativos continuam na lista mesmo se removidos da configuração
+        names += [name for name, bot in self.bots.items() if name not in names and bot.lifecycle.active]
+        for row, name in enumerate(names):
+            self.bot_statuses.setdefault(name, "Stopped")
+            name_button = ctk.CTkButton(self.bots_frame, text=name, width=120, height=24, anchor="w",
+                                        command=lambda n=name: self.select_bot(n))
+            name_button.grid(row=row, column=0, padx=5, pady=2, sticky="w")
+            indicator = ctk.CTkLabel(self.bots_frame, text="●", font=ctk.CTkFont(size=16))
+            indicator.grid(row=row, column=1, padx=5, pady=2)
+            status_text = ctk.CTkLabel(self.bots_frame, text="", anchor="w")
+            status_text.grid(row=row, column=2, padx=5, pady=2, sticky="ew")
+            toggle_button = ctk.CTkButton(self.bots_frame, text="", width=80, height=24,
+                                          command=lambda n=name: self.toggle_bot(n))
+            toggle_button.grid(row=row, column=3, padx=5, pady=2)
+            self.bot_rows[name] = {"name": name_button, "indicator": indicator,
+                                   "status": status_text, "toggle": toggle_button}
+            self._update_bot_row(name)
+        self.bot_statuses = {name: status for name, status in self.bot_statuses.items() if name in self.bot_rows}
+
+    def _update_bot_row(self, name):
+        widgets = self.bot_rows.get(name)
+        if widgets is None:
+            return
+        status = self.bot_statuses.get(name, "Stopped")
+        colors = {"Running": "green", "Starting": "orange", "Draining": "orange"}
+        widgets["indicator"].configure(text_color=colors.get(status, "red"))
+        widgets["status"].configure(text=STATUS_NAMES.get(status, status))
+        active = status in ("Starting", "Running", "Draining")
+        widgets["toggle"].configure(text="Parar" if active else "Iniciar",
+                                    state="disabled" if status in ("Starting", "Draining") else "normal")
+        selected = self.bot_instance is not None and self.bot_instance.name == name
+        widgets["name"].configure(fg_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"] if selected else "transparent",
+                                  border_width=0 if selected else 1)
+
+    def select_bot(self, name):
+        """Seleciona o bot exibido no painel e na taxa de mensagens."""
+        bot = self.bots.get(name)
+        if bot is None:
+            return
+        self.bot_instance = bot
+        if hasattr(self, "dashboard_view"):
+            self.dashboard_view.last_version = None  # Força redesenho com as métricas do novo bot
+        self.chat_rate_label.configure(text="Taxa: -", text_color=("gray14", "gray84"))
+        for row_name in self.bot_rows:
+            self._update_bot_row(row_name)
+
+    def on_bot_status(self, event):
+        """Status de um bot: atualiza a linha dele e o status geral."""
+        self.bot_statuses[event.bot] = event.status
+        if event.bot not in self.bot_rows:
+            self.sync_bot_rows()
+        self._update_bot_row(event.bot)
+        self.update_bot_status(self._overall_status())
+
+    def _overall_status(self):
+        statuses = set(self.bot_statuses.values())
+        for status in ("Draining", "Starting", "Running", "Error"):
+            if status in statuses:
+                return status
+        return "Stopped"
+
+    def on_metric(self, event):
+        """Aplica métricas instantâneas publicadas pelo bot."""
+        if self.bot_instance is None or event.bot != self.bot_instance.name:
+            return  # Só a taxa do bot selecionado aparece na barra de status
+        if event.name == "chat_rate":
+            rate, surging = event.value
+            self.chat_rate_label.configure(
+                text=f"Taxa: {rate:.1f} msg/s" + (" (flood)" if surging else ""),
+                text_color="orange" if surging else ("gray14", "gray84")
+            )
 
     def update_console(self, message: str):
         if hasattr(self, 'console_textbox'):
             self.console_textbox.configure(state="normal")
             self.console_textbox.insert("end", message + "\n")
+            # Limite de linhas: o texto do console não cresce sem limite em execuções longas
+            max_lines = self.config.get("memory", {}).get("console_max_lines", 5000)
+            lines = int(self.console_textbox.index("end-1c").split(".")[0])
+            if max_lines and lines > max_lines:
+                self.console_textbox.delete("1.0", f"{lines - max_lines + 1}.0")
             self.console_textbox.see("end")
             self.console_textbox.configure(state="disabled")
 
     def update_bot_status(self, status: str):
-        status_map = {
-            "Stopped": "Parado",
-            "Starting": "Iniciando...",
-            "Running": "Em Execução",
-            "Stopping": "Parando...",
-            "Error": "Erro"
-        }
-        display_status = status_map.get(status, status)
+        """Status geral (o mais relevante entre os bots) e estado dos botões globais."""
+        display_status = STATUS_NAMES.get(status, status)
         
         self.config["bot_status"] = status
         self.status_label.configure(text=f"Status do Bot: {display_status}")
         
+        self.restart_button.configure(state="normal" if status == "Running" else "disabled")
         if status == "Running":
             self.status_indicator.configure(text_color="green")
             self.start_button.configure(state="disabled")
             self.stop_button.configure(state="normal")
-        elif status in ["Starting", "Stopping"]:
+        elif status in ["Starting", "Stopping", "Draining"]:
             self.status_indicator.configure(text_color="orange")
             self.start_button.configure(state="disabled")
             self.stop_button.configure(state="disabled")
@@ -115,6 +230,12 @@ class App(ctk.CTk):
             self.status_indicator.configure(text_color="red")
             self.start_button.configure(state="normal")
             self.stop_button.configure(state="disabled")
+        if any(s in ("Stopped", "Error") for s in self.bot_statuses.values()) and status not in ("Starting", "Draining"):
+            self.start_button.configure(state="normal")  # Ainda há bots parados para iniciar
+        if status != "Running":
+            self.chat_rate_label.configure(text="Taxa: -", text_color=("gray14", "gray84"))
+        if self.closing and status in ("Stopped", "Error"):
+            self.after_idle(self.destroy)
 
     def save_settings(self):
         """Método que delega para a função em gui_home_settings.py"""
@@ -142,7 +263,7 @@ class App(ctk.CTk):
         corner_radius = self.config.get("ui_corner_radius", 10)
         
         # Atualiza widgets principais
-        for widget in [self.start_button, self.stop_button]:
+        for widget in [self.start_button, self.stop_button, self.restart_button]:
             widget.configure(fg_color=primary_color, corner_radius=corner_radius)
             if button_text_color:
                 widget.configure(text_color=button_text_color)
@@ -168,40 +289,82 @@ class App(ctk.CTk):
         self.update_console("Estilos da interface atualizados.")
 
     def start_bot_thread(self):
+        """Inicia todos os bots configurados que estiverem parados."""
         self.error_label.configure(text="")
         self.update_console("--- Iniciando Bot ---")
+        if not any(bot.lifecycle.active for bot in self.bots.values()):
+            self.sync_bot_rows()  # Lista pode ter mudado nas configurações
+        for name, bot_config in bot_configs(self.config):
+            self.start_single_bot(name, bot_config)
+
+    def start_single_bot(self, name, bot_config=None):
+        bot = self.bots.get(name)
+        if bot is not None and bot.lifecycle.active:
+            return
+        if bot_config is None:
+            bot_config = dict(bot_configs(self.config)).get(name)
+            if bot_config is None:
+                return
         
         # Adiar a importação para evitar importação circular
-        from telegram_bot import TelegramBot
+        from bot_logic import TelegramBot
         
-        self.bot_instance = TelegramBot(
-            self.config.copy(),
-            status_callback=self.update_bot_status,
-            error_callback=self.report_error_gui,
-            log_queue=self.log_queue
+        bot = TelegramBot(
+            bot_config.copy(),
+            event_bus=self.event_bus,
+            host=self.bot_host,
+            name=name
         )
-        thread = threading.Thread(target=self.bot_instance.start_bot, daemon=True)
-        thread.start()
+        self.bots[name] = bot
+        if self.bot_instance is None or self.bot_instance.name == name:
+            self.select_bot(name)
+        bot.start_bot()  # Não bloqueia: o bot é agendado no loop compartilhado
+
+    def toggle_bot(self, name):
+        """Inicia ou para um único bot da lista."""
+        bot = self.bots.get(name)
+        if bot is not None and bot.lifecycle.active:
+            self.update_console(f"--- Solicitando Parada do Bot {name} ---")
+            bot.controller.request_stop()
+        else:
+            self.error_label.configure(text="")
+            self.update_console(f"--- Iniciando Bot {name} ---")
+            self.start_single_bot(name)
 
     def stop_bot_thread(self):
         self.error_label.configure(text="")
         self.update_console("--- Solicitando Parada do Bot ---")
-        if self.bot_instance:
-            thread = threading.Thread(target=self.bot_instance.stop_bot, daemon=True)
-            thread.start()
-        else:
+        # Não bloqueia: o status (Draining -> Stopped) chega pelo barramento de eventos
+        stopping = [bot.controller.request_stop() for bot in self.bots.values() if bot.lifecycle.active]
+        if not any(stopping):
             self.update_bot_status("Stopped")
             self.update_console("--- Bot já estava parado ---")
 
+    def restart_bot(self):
+        self.error_label.configure(text="")
+        self.update_console("--- Reiniciando Bot ---")
+        configs = dict(bot_configs(self.config))  # Inclui o que foi salvo nas abas desde o início
+        for name, bot in self.bots.items():
+            if bot.lifecycle.state == "Running":
+                new_config = configs.get(name)
+                bot.restart_bot(new_config.copy() if new_config is not None else None)
+
     def on_closing(self):
-        if self.bot_instance and self.bot_instance.running:
-            if messagebox.askyesno("Sair", "O bot está em execução. Deseja pará-lo antes de sair?"):
+        active = [bot for bot in self.bots.values() if bot.lifecycle.active]
+        if active:
+            if messagebox.askyesno("Sair", "Há bots em execução. Deseja pará-los antes de sair?"):
+                # Fecha assim que os bots publicarem Stopped; o prazo só vale se a parada travar
+                self.closing = True
                 self.stop_bot_thread()
-                self.after(2000, self.destroy)
+                timeout = max(bot.controller.stop_timeout() for bot in active)
+                self.after(int(timeout * 1000), self.destroy)
         else:
             self.destroy()
 
     def report_error_gui(self, message: str):
-        def _update():
-            self.error_label.configure(text=f"Erro Crítico: {message}")
-        self.after(0, _update)
\ No newline at end of file
+        """Pode ser chamado de qualquer thread: o erro passa pelo barramento de eventos."""
+        self.event_bus.publish(ErrorEvent(message))
+
+    def show_error(self, message: str, bot: str = ""):
+        prefix = f"[{bot}] " if bot and len(self.bot_rows) > 1 else ""
+        self.error_label.configure(text=f"Erro Crítico: {prefix}{message}")
\ No newline at end of file
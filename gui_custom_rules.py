@@ -1,6 +1,7 @@
 # gui_custom_rules.py
 import customtkinter as ctk
 from tkinter import messagebox
+from config_manager import save_config
 
 def create_custom_rules_tab(app):
     """Cria as abas 'Personalizar' e 'Regras'"""
@@ -66,14 +67,16 @@ def create_rules_tab(app, tab):
     
     rule_configs = [
         ("block_profanity", "Bloquear Palavrões/Ofensas e Banir", None),
-        ("profanity_list", "Palavras Bloqueadas (separadas por vírgula):", ",".join(rules.get("profanity_list", []))),
         ("block_off_topic", "Apagar Mensagens Fora de Tópico", None),
-        ("allowed_topics_keywords", "Palavras-chave do Tópico (separadas por vírgula):", ",".join(rules.get("allowed_topics_keywords", []))),
         ("block_links", "Apagar Mensagens com Links", None),
         ("allow_only_pdf", "Permitir Apenas Arquivos PDF", None),
         ("block_spam_flood", "Bloquear Spam/Flood e Banir", None),
         ("spam_message_limit", "Limite de Mensagens (Spam):", str(rules.get("spam_message_limit", 5))),
-        ("spam_time_limit_sec", "Janela de Tempo (segundos, Spam):", str(rules.get("spam_time_limit_sec", 10)))
+        ("spam_time_limit_sec", "Janela de Tempo (segundos, Spam):", str(rules.get("spam_time_limit_sec", 10))),
+        ("purge_on_ban", "Apagar Mensagens Recentes de Quem For Banido", None),
+        ("purge_message_count", "Mensagens Recentes a Apagar (por usuário):", str(rules.get("purge_message_count", 50))),
+        ("block_chat_flood", "Proteger o Grupo Contra Flood Coletivo", None),
+        ("chat_flood_threshold_per_sec", "Limite do Grupo (mensagens/segundo):", str(rules.get("chat_flood_threshold_per_sec", 20)))
     ]
     
     for i, (key, label, default) in enumerate(rule_configs):
@@ -99,21 +102,23 @@ def create_rules_tab(app, tab):
 def save_rules(app):
     """Salva as configurações de regras"""
     try:
-        rules = {}
+        rules = dict(app.config.get("rules", {}))  # Preserva chaves sem widget na aba
         rules["block_profanity"] = app.rule_vars["block_profanity"].get() == "on"
-        rules["profanity_list"] = [w.strip() for w in app.rule_vars["profanity_list"].get().split(',') if w.strip()]
         rules["block_off_topic"] = app.rule_vars["block_off_topic"].get() == "on"
-        rules["allowed_topics_keywords"] = [w.strip() for w in app.rule_vars["allowed_topics_keywords"].get().split(',') if w.strip()]
         rules["block_links"] = app.rule_vars["block_links"].get() == "on"
         rules["allow_only_pdf"] = app.rule_vars["allow_only_pdf"].get() == "on"
         rules["block_spam_flood"] = app.rule_vars["block_spam_flood"].get() == "on"
         rules["spam_message_limit"] = int(app.rule_vars["spam_message_limit"].get())
         rules["spam_time_limit_sec"] = int(app.rule_vars["spam_time_limit_sec"].get())
+        rules["purge_on_ban"] = app.rule_vars["purge_on_ban"].get() == "on"
+        rules["purge_message_count"] = int(app.rule_vars["purge_message_count"].get())
+        rules["block_chat_flood"] = app.rule_vars["block_chat_flood"].get() == "on"
+        rules["chat_flood_threshold_per_sec"] = float(app.rule_vars["chat_flood_threshold_per_sec"].get())
         
         app.config["rules"] = rules
         save_config(app.config)
         messagebox.showinfo("Salvo", "Regras atualizadas com sucesso!")
-        app.update_console("Regras salvas. Reinicie o bot se necessário.")
+        app.update_console("Regras salvas. Clique em Reiniciar para aplicá-las ao bot em execução.")
     except ValueError:
-        messagebox.showerror("Erro", "Valores inválidos para limites de spam")
-        app.update_console("ERRO: Valores inválidos para limites de spam")
\ No newline at end of file
+        messagebox.showerror("Erro", "Valores inválidos para limites numéricos")
+        app.update_console("ERRO: Valores inválidos para limites numéricos")
\ No newline at end of file
@@ -0,0 +1,172 @@
+# gui_dashboard.py
+import customtkinter as ctk
+import tkinter as tk
+from tkinter import filedialog, messagebox
+import time
+
+# (título, [(série, cor)])
+LINE_CHARTS = [
+    ("Updates/s", [("updates_per_sec", "#3B8ED0")]),
+    ("Latência dos handlers (ms): p50 / p99", [("latency_p50_ms", "#2FA572"), ("latency_p99_ms", "#E07A1F")]),
+    ("Erros da API (%)", [("api_error_rate", "#D03B3B")]),
+    ("Filas de saída: alta / normal / baixa", [("queue_alta", "#D03B3B"), ("queue_normal", "#E07A1F"), ("queue_baixa", "#3B8ED0")]),
+    ("Verificações pendentes", [("pending_verification", "#8E5BD0")]),
+]
+
+CHART_WIDTH = 330
+CHART_HEIGHT = 110
+RULE_WINDOW_SAMPLES = 60  # Disparos de regra somados nas últimas N amostras
+
+
+def create_dashboard_tab(app):
+    """Cria a aba 'Painel' (gráficos de desempenho ao vivo)"""
+    app.tab_view.add("Painel")
+    tab_dashboard = app.tab_view.tab("Painel")
+    app.dashboard_view = DashboardView(app, tab_dashboard)
+
+
+class DashboardView:
+    """Gráficos ao vivo das métricas do bot.
+
+    Redesenha em uma taxa fixa (`dashboard_fps`) e apenas se houver amostra nova
+    e a aba estiver visível; os itens do canvas são reaproveitados (só as
+    coordenadas mudam), então o custo por quadro é pequeno e não toca o bot.
+    """
+
+    def __init__(self, app, tab):
+        self.app = app
+        self.tab_name = "Painel"
+        self.last_version = None
+        self.fps = max(1, app.config.get("performance", {}).get("dashboard_fps", 2))
+        self.charts = []
+
+        tab.grid_columnconfigure((0, 1), weight=1)
+        for i, (title, series) in enumerate(LINE_CHARTS):
+            frame = ctk.CTkFrame(tab)
+            frame.grid(row=i // 2, column=i % 2, padx=5, pady=5, sticky="nsew")
+            ctk.CTkLabel(frame, text=title, font=ctk.CTkFont(size=12, weight="bold")).pack(anchor="w", padx=5)
+            canvas = tk.Canvas(frame, width=CHART_WIDTH, height=CHART_HEIGHT, bg="#1E1E1E", highlightthickness=0)
+            canvas.pack(padx=5, pady=(0, 5))
+            lines = [canvas.create_line(0, 0, 0, 0, fill=color, width=2) for _, color in series]
+            value_text = canvas.create_text(CHART_WIDTH - 4, 4, anchor="ne", fill="#DDDDDD", font=("Courier", 9), text="")
+            max_text = canvas.create_text(4, 4, anchor="nw", fill="#888888", font=("Courier", 9), text="")
+            self.charts.append((canvas, series, lines, value_text, max_text))
+
+        # Disparos por regra (barras)
+        rules_frame = ctk.CTkFrame(tab)
+        index = len(LINE_CHARTS)
+        rules_frame.grid(row=index // 2, column=index % 2, padx=5, pady=5, sticky="nsew")
+        ctk.CTkLabel(rules_frame, text="Disparos por regra (último minuto)", font=ctk.CTkFont(size=12, weight="bold")).pack(anchor="w", padx=5)
+        self.rules_canvas = tk.Canvas(rules_frame, width=CHART_WIDTH, height=CHART_HEIGHT, bg="#1E1E1E", highlightthickness=0)
+        self.rules_canvas.pack(padx=5, pady=(0, 5))
+
+        # Diagnóstico do event loop do bot selecionado
+        profiling = app.config.get("profiling", {})
+        tools_frame = ctk.CTkFrame(tab)
+        tools_frame.grid(row=index // 2 + 1, column=0, columnspan=2, padx=5, pady=5, sticky="ew")
+        self.profile_button = ctk.CTkButton(tools_frame, text="Iniciar Profiler", width=170, command=self.toggle_profiler)
+        self.profile_button.grid(row=0, column=0, padx=5, pady=5)
+        self.slow_callback_var = ctk.StringVar(value="off")
+        ctk.CTkSwitch(tools_frame, text="Registrar callbacks lentos acima de", variable=self.slow_callback_var,
+                      onvalue="on", offvalue="off", command=self.toggle_slow_callbacks).grid(row=0, column=1, padx=(15, 5), pady=5)
+        self.slow_callback_entry = ctk.CTkEntry(tools_frame, width=60)
+        self.slow_callback_entry.grid(row=0, column=2, padx=0, pady=5)
+        self.slow_callback_entry.insert(0, str(profiling.get("slow_callback_ms", 100)))
+        ctk.CTkLabel(tools_frame, text="ms").grid(row=0, column=3, padx=5, pady=5)
+
+        self.app.after(int(1000 / self.fps), self.refresh)
+
+    def refresh(self):
+        """Quadro do painel: redesenha só se houver amostra nova e a aba estiver visível."""
+        try:
+            metrics = getattr(self.app.bot_instance, "metrics", None)
+            if metrics is not None and self.app.tab_view.get() == self.tab_name and metrics.version != self.last_version:
+                self.last_version = metrics.version
+                self._draw(metrics)
+        finally:
+            self.app.after(int(1000 / self.fps), self.refresh)
+
+    def _draw(self, metrics):
+        for canvas, series, lines, value_text, max_text in self.charts:
+            snapshots = [metrics.series_snapshot(name) for name, _ in series]
+            peak = max([value for points in snapshots for _, value in points] + [1])
+            for line, points in zip(lines, snapshots):
+                canvas.coords(line, *self._coords(points, peak, metrics.capacity))
+            canvas.itemconfigure(value_text, text=" / ".join(
+                f"{points[-1][1]:.1f}" if points else "-" for points in snapshots))
+            canvas.itemconfigure(max_text, text=f"máx {peak:.1f}")
+        self._draw_rules(metrics)
+
+    @staticmethod
+    def _coords(points, peak, capacity):
+        if len(points) < 2:
+            return (0, 0, 0, 0)
+        step = CHART_WIDTH / max(capacity - 1, 1)
+        offset = CHART_WIDTH - step * (len(points) - 1)  # Mais recente à direita
+        usable = CHART_HEIGHT - 18
+        coords = []
+        for i, (_, value) in enumerate(points):
+            coords.append(offset + i * step)
+            coords.append(CHART_HEIGHT - 2 - usable * value / peak)
+        return coords
+
+    def _draw_rules(self, metrics):
+        canvas = self.rules_canvas
+        canvas.delete("all")  # Poucas barras: recriar é barato
+        totals = []
+        for rule in metrics.rule_names():
+            points = metrics.series_snapshot(f"rule:{rule}")[-RULE_WINDOW_SAMPLES:]
+            totals.append((rule, sum(value for _, value in points)))
+        if not totals:
+            canvas.create_text(CHART_WIDTH / 2, CHART_HEIGHT / 2, text="Nenhuma regra disparou ainda", fill="#888888")
+            return
+        peak = max(total for _, total in totals) or 1
+        bar_height = min(18, (CHART_HEIGHT - 4) / len(totals))
+        for i, (rule, total) in enumerate(totals):
+            y = 2 + i * bar_height
+            width = (CHART_WIDTH - 150) * total / peak
+            canvas.create_text(4, y + bar_height / 2, anchor="w", text=rule, fill="#DDDDDD", font=("Courier", 9))
+            canvas.create_rectangle(120, y + 2, 120 + width, y + bar_height - 2, fill="#3B8ED0", width=0)
+            canvas.create_text(124 + width, y + bar_height / 2, anchor="w", text=str(total), fill="#DDDDDD", font=("Courier", 9))
+
+    # --- Diagnóstico ---
+
+    def _running_bot(self):
+        bot = self.app.bot_instance
+        if bot is None or bot.loop is None:
+            messagebox.showwarning("Diagnóstico", "Selecione um bot em execução.")
+            return None
+        return bot
+
+    def toggle_profiler(self):
+        """Inicia o profiler ou, se já estiver ativo, para e grava o perfil (collapsed stacks)."""
+        bot = self.app.bot_instance
+        if bot is not None and bot.profiler is not None and bot.profiler.running:
+            path = filedialog.asksaveasfilename(
+                title="Salvar perfil", defaultextension=".collapsed",
+                initialfile=f"profile_{bot.name}_{time.strftime('%Y%m%d_%H%M%S')}.collapsed",
+                filetypes=[("Collapsed stacks", "*.collapsed *.txt"), ("Todos", "*.*")])
+            path = bot.stop_profiling(path or None)
+            self.profile_button.configure(text="Iniciar Profiler")
+            if path:
+                self.app.update_console(f"Perfil gravado em {path} (gere o flame graph com flamegraph.pl ou speedscope).")
+            return
+        bot = self._running_bot()
+        if bot is not None and bot.start_profiling():
+            self.profile_button.configure(text="Parar e Salvar Perfil")
+
+    def toggle_slow_callbacks(self):
+        if self.slow_callback_var.get() == "off":
+            if self.app.bot_instance is not None:
+                self.app.bot_instance.stop_slow_callback_detection()
+            return
+        bot = self._running_bot()
+        try:
+            threshold_ms = float(self.slow_callback_entry.get().replace(",", "."))
+            if threshold_ms <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Erro", "Informe o limite em milissegundos.")
+            threshold_ms = None
+        if bot is None or threshold_ms is None or not bot.start_slow_callback_detection(threshold_ms):
+            self.slow_callback_var.set("off")
@@ -0,0 +1,150 @@
+# gui_events.py
+import logging
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any
+
+
+# --- Eventos do motor (bot) para a GUI ---
+
+@dataclass(frozen=True)
+class StatusEvent:
+    """Mudança de status de um bot (Stopped, Starting, Running, Draining, Error)."""
+    status: str
+    bot: str = ""  # Nome do bot (vários bots podem rodar no mesmo processo)
+
+    @property
+    def coalesce_key(self):
+        return ("status", self.bot)  # Só o status mais recente de cada bot importa
+
+
+@dataclass(frozen=True)
+class ErrorEvent:
+    """Erro que deve aparecer em destaque na GUI."""
+    message: str
+    bot: str = ""
+    coalesce_key = None
+
+
+@dataclass(frozen=True)
+class LogEvent:
+    """Linha de log já formatada para o console."""
+    message: str
+    coalesce_key = None
+
+
+@dataclass(frozen=True)
+class MetricEvent:
+    """Valor instantâneo de uma métrica (ex.: taxa de mensagens do grupo)."""
+    name: str
+    value: Any
+    bot: str = ""
+
+    @property
+    def coalesce_key(self):
+        return ("metric", self.bot, self.name)  # Só o valor mais recente importa
+
+
+class EventBus:
+    """Barramento de eventos thread-safe do bot para a GUI.
+
+    `publish()` pode ser chamado de qualquer thread. Os handlers inscritos
+    rodam sempre na thread do Tk, dentro do loop `after` (ver `attach`).
+    Eventos de status e métricas são agrupados: entre dois ciclos só o último
+    valor de cada chave é entregue, por mais ocupado que o bot esteja.
+    A fila dos demais eventos (logs) guarda no máximo `max_queued`; se a GUI
+    não der conta, os mais antigos são descartados (contados em `dropped`).
+    """
+
+    def __init__(self, max_events_per_tick=500, max_queued=None):
+        self.max_events_per_tick = max_events_per_tick
+        self._queue = deque(maxlen=max_queued)  # append/popleft são thread-safe
+        self._latest = {}  # coalesce_key: evento mais recente
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(list)
+        self._batch_subscribers = defaultdict(list)
+        self.published = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def publish(self, event):
+        """Publica um evento (qualquer thread)."""
+        key = event.coalesce_key
+        with self._lock:  # Contadores atualizados por várias threads de bots
+            self.published += 1
+            if key is None:
+                if len(self._queue) == self._queue.maxlen:
+                    self.dropped += 1
+                self._queue.append(event)
+                return
+            if key in self._latest:
+                self.coalesced += 1
+            self._latest[key] = event
+
+    def pending_events(self):
+        """Cópia dos eventos aguardando a GUI (relatório de memória; qualquer thread)."""
+        return list(self._queue)
+
+    def subscribe(self, event_type, handler):
+        """Inscreve `handler(event)` para eventos do tipo `event_type` (rodará na thread do Tk)."""
+        self._subscribers[event_type].append(handler)
+
+    def subscribe_batch(self, event_type, handler):
+        """Inscreve `handler(events)`: recebe de uma vez, por ciclo, a lista de eventos do tipo
+        (ex.: várias linhas de log inseridas no console com uma única operação)."""
+        self._batch_subscribers[event_type].append(handler)
+
+    def pump(self):
+        """Entrega os eventos pendentes. Deve ser chamado apenas na thread do Tk."""
+        with self._lock:
+            latest, self._latest = self._latest, {}
+        events = []
+        for _ in range(self.max_events_per_tick):
+            try:
+                events.append(self._queue.popleft())
+            except IndexError:
+                break
+        self._dispatch_batch(events)
+        for event in latest.values():
+            self._dispatch(event)
+
+    def attach(self, root, interval_ms=50):
+        """Agenda `pump()` periodicamente no loop `after` do widget raiz."""
+        def tick():
+            try:
+                self.pump()
+            finally:
+                root.after(interval_ms, tick)
+        root.after(interval_ms, tick)
+
+    def _dispatch_batch(self, events):
+        by_type = defaultdict(list)
+        for event in events:
+            by_type[type(event)].append(event)
+        for event_type, group in by_type.items():
+            for handler in self._batch_subscribers.get(event_type, []):
+                try:
+                    handler(group)
+                except Exception:
+                    logging.getLogger(__name__).exception("Erro em handler de evento da GUI")
+            for event in group:
+                self._dispatch(event)
+
+    def _dispatch(self, event):
+        for handler in self._subscribers.get(type(event), []):
+            try:
+                handler(event)
+            except Exception:
+                logging.getLogger(__name__).exception("Erro em handler de evento da GUI")
+
+
+class BusLogHandler(logging.Handler):
+    """Handler de log que publica cada registro como LogEvent no barramento."""
+
+    def __init__(self, event_bus):
+        super().__init__()
+        self.event_bus = event_bus
+
+    def emit(self, record):
+        self.event_bus.publish(LogEvent(self.format(record)))
@@ -0,0 +1,283 @@
+# gui_history.py
+import customtkinter as ctk
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from audit_log import AuditLog, AUDIT_FILE
+
+RULE_OPTIONS = ["Todas", "profanity", "off_topic", "links", "media", "flood",
+                "pending_verification", "new_member", "verification", "media_blocklist", "ban_registry"]
+
+
+def rule_options(config):
+    """Regras fixas mais uma opção `regex:<nome>` para cada regra regex personalizada."""
+    custom = config.get("rules", {}).get("custom_regex_rules", [])
+    return RULE_OPTIONS + [f"regex:{rule['name']}" for rule in custom if rule.get("name")]
+
+
+def create_history_tab(app):
+    """Cria a aba 'Histórico' (consulta ao log de auditoria)"""
+    app.tab_view.add("Histórico")
+    tab_history = app.tab_view.tab("Histórico")
+    app.history_view = HistoryView(app, tab_history)
+
+
+class HistoryView:
+    """Lista virtualizada e paginada do histórico de moderação.
+
+    Apenas `VISIBLE_ROWS` labels existem; a rolagem só troca o texto delas.
+    Os resultados são buscados em páginas numa thread separada e entregues à
+    interface por uma fila lida com `after`, então a GUI nunca bloqueia.
+    Cada página começa na chave (ts, id) do fim da anterior; só as
+    `MAX_CACHED_PAGES` páginas mais próximas da posição atual ficam em memória.
+    """
+
+    VISIBLE_ROWS = 18
+    PAGE_SIZE = 200
+    MAX_CACHED_PAGES = 6
+
+    def __init__(self, app, tab):
+        self.app = app
+        self.audit = None
+        self.filters = {}
+        self.total = 0
+        self.top = 0  # Índice do primeiro registro visível
+        self.pages = {}  # número da página: lista de registros
+        self.cursors = {0: None}  # número da página: chave (ts, id) onde ela começa
+        self.requested_pages = set()
+        self.failed_pages = set()  # Buscadas de novo na próxima rolagem
+        self.generation = 0  # Descarta respostas de buscas antigas
+        self.results = queue.Queue()
+        self.jobs_running = 0
+
+        tab.grid_columnconfigure(0, weight=1)
+        tab.grid_rowconfigure(1, weight=1)
+
+        # Filtros
+        filters_frame = ctk.CTkFrame(tab)
+        filters_frame.grid(row=0, column=0, columnspan=2, padx=10, pady=10, sticky="ew")
+
+        ctk.CTkLabel(filters_frame, text="Usuário (ID):").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.user_entry = ctk.CTkEntry(filters_frame, width=120)
+        self.user_entry.grid(row=0, column=1, padx=5, pady=5)
+
+        ctk.CTkLabel(filters_frame, text="Regra:").grid(row=0, column=2, padx=5, pady=5, sticky="w")
+        self.rule_menu = ctk.CTkOptionMenu(filters_frame, values=rule_options(app.config), width=140)
+        self.rule_menu.grid(row=0, column=3, padx=5, pady=5)
+        self.rule_menu.set("Todas")
+
+        ctk.CTkLabel(filters_frame, text="De (dd/mm/aaaa):").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        self.since_entry = ctk.CTkEntry(filters_frame, width=120)
+        self.since_entry.grid(row=1, column=1, padx=5, pady=5)
+
+        ctk.CTkLabel(filters_frame, text="Até:").grid(row=1, column=2, padx=5, pady=5, sticky="w")
+        self.until_entry = ctk.CTkEntry(filters_frame, width=140)
+        self.until_entry.grid(row=1, column=3, padx=5, pady=5)
+
+        ctk.CTkButton(filters_frame, text="Buscar", width=100, command=self.search).grid(row=0, column=4, rowspan=2, padx=10, pady=5)
+
+        # Lista virtualizada
+        self.list_frame = ctk.CTkFrame(tab)
+        self.list_frame.grid(row=1, column=0, padx=(10, 0), pady=(0, 5), sticky="nsew")
+        self.list_frame.grid_columnconfigure(0, weight=1)
+        row_font = ctk.CTkFont(family="Courier", size=12)
+        self.row_labels = []
+        for i in range(self.VISIBLE_ROWS):
+            label = ctk.CTkLabel(self.list_frame, text="", anchor="w", font=row_font, height=18)
+            label.grid(row=i, column=0, padx=5, sticky="ew")
+            label.bind("<MouseWheel>", self._on_mousewheel)
+            label.bind("<Button-4>", lambda e: self.scroll_to(self.top - 3))  # Linux
+            label.bind("<Button-5>", lambda e: self.scroll_to(self.top + 3))
+            self.row_labels.append(label)
+        self.list_frame.bind("<MouseWheel>", self._on_mousewheel)
+
+        self.scrollbar = ctk.CTkScrollbar(tab, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=1, padx=(0, 10), pady=(0, 5), sticky="ns")
+        self.scrollbar.set(0, 1)
+
+        self.status_label = ctk.CTkLabel(tab, text="Use os filtros e clique em Buscar.", anchor="w")
+        self.status_label.grid(row=2, column=0, columnspan=2, padx=10, pady=(0, 10), sticky="ew")
+
+    def refresh_rule_options(self):
+        """Atualiza o filtro de regras (chamado ao salvar as regras regex)."""
+        options = rule_options(self.app.config)
+        self.rule_menu.configure(values=options)
+        if self.rule_menu.get() not in options:
+            self.rule_menu.set("Todas")
+
+    # --- Busca ---
+
+    def _parse_filters(self):
+        filters = {}
+        user = self.user_entry.get().strip()
+        if user:
+            filters["user_id"] = int(user)
+        rule = self.rule_menu.get()
+        if rule != "Todas":
+            filters["rule"] = rule
+        since = self.since_entry.get().strip()
+        if since:
+            filters["since"] = datetime.strptime(since, "%d/%m/%Y").timestamp()
+        until = self.until_entry.get().strip()
+        if until:
+            # Inclui o dia inteiro informado
+            filters["until"] = (datetime.strptime(until, "%d/%m/%Y") + timedelta(days=1)).timestamp()
+        return filters
+
+    def search(self):
+        """Inicia uma nova busca com os filtros atuais."""
+        try:
+            self.filters = self._parse_filters()
+        except ValueError:
+            self.status_label.configure(text="Filtros inválidos: use um ID numérico e datas no formato dd/mm/aaaa.")
+            return
+        self.generation += 1
+        self.total = 0
+        self.top = 0
+        self.pages.clear()
+        self.cursors = {0: None}
+        self.requested_pages.clear()
+        self.failed_pages.clear()
+        self.status_label.configure(text="Buscando...")
+        self._render()
+        self._run_in_background(self._count_job, self.generation, dict(self.filters))
+
+    def _get_audit(self):
+        # Mesmo arquivo que o bot usa; as consultas abrem conexões próprias
+        if self.audit is None:
+            self.audit = AuditLog(self.app.config.get("audit_log", {}).get("path", AUDIT_FILE))
+        return self.audit
+
+    def _count_job(self, generation, filters):
+        started = time.perf_counter()
+        total = self._get_audit().count(**filters)
+        first_page = self._get_audit().query(limit=self.PAGE_SIZE, **filters)
+        return ("count", generation, total, first_page, time.perf_counter() - started)
+
+    def _page_job(self, generation, filters, page, known_page, known_cursor):
+        """Busca `page` a partir da página conhecida mais próxima antes dela.
+
+        Na rolagem normal a página anterior é conhecida e a busca vai direto pela chave;
+        num salto pela barra, `seek` percorre antes só as chaves no índice.
+        """
+        audit = self._get_audit()
+        cursor = known_cursor
+        if page > known_page:
+            cursor = audit.seek((page - known_page) * self.PAGE_SIZE, before=known_cursor, **filters)
+            if cursor is None:
+                return ("page", generation, page, [], None)
+        rows = audit.query(limit=self.PAGE_SIZE, before=cursor, **filters)
+        return ("page", generation, page, rows, cursor)
+
+    def _run_in_background(self, job, *args):
+        def worker():
+            try:
+                self.results.put(job(*args))
+            except Exception as e:
+                page = args[2] if job == self._page_job else None
+                self.results.put(("error", args[0], str(e), page))
+        self.jobs_running += 1
+        threading.Thread(target=worker, daemon=True).start()
+        if self.jobs_running == 1:
+            self.app.after(50, self._poll_results)
+
+    def _poll_results(self):
+        """Aplica, na thread da GUI, os resultados prontos das buscas."""
+        try:
+            while True:
+                result = self.results.get_nowait()
+                self.jobs_running -= 1
+                kind, generation = result[0], result[1]
+                if generation != self.generation:
+                    continue  # Busca antiga
+                if kind == "count":
+                    _, _, self.total, first_page, elapsed = result
+                    self._store_page(0, first_page, None)
+                    self.status_label.configure(text=f"{self.total} registro(s) encontrados em {elapsed * 1000:.0f} ms.")
+                elif kind == "page":
+                    _, _, page, rows, cursor = result
+                    self.requested_pages.discard(page)
+                    self._store_page(page, rows, cursor)
+                else:
+                    _, _, error, page = result
+                    if page is not None:
+                        self.requested_pages.discard(page)
+                        self.failed_pages.add(page)
+                    self.status_label.configure(text=f"Erro na busca: {error}")
+                self._render()
+        except queue.Empty:
+            pass
+        if self.jobs_running:
+            self.app.after(50, self._poll_results)
+
+    def _store_page(self, page, rows, cursor):
+        """Guarda a página, a chave onde ela começa e a da seguinte; descarta as páginas distantes."""
+        self.pages[page] = rows
+        if cursor is not None or page == 0:
+            self.cursors[page] = cursor
+        if len(rows) == self.PAGE_SIZE:
+            self.cursors[page + 1] = (rows[-1]["ts"], rows[-1]["id"])
+        current = self.top // self.PAGE_SIZE
+        while len(self.pages) > self.MAX_CACHED_PAGES:
+            del self.pages[max(self.pages, key=lambda p: abs(p - current))]
+
+    # --- Rolagem e renderização ---
+
+    def scroll_to(self, top):
+        max_top = max(0, self.total - self.VISIBLE_ROWS)
+        self.top = min(max(0, int(top)), max_top)
+        self.failed_pages.clear()  # Rolar tenta de novo as páginas que falharam
+        self._render()
+
+    def _on_mousewheel(self, event):
+        self.scroll_to(self.top - (3 if event.delta > 0 else -3))
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = self.VISIBLE_ROWS if len(args) > 2 and args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def _row(self, index):
+        """Registro do índice ou None se a página ainda não chegou (e pede a página)."""
+        page = index // self.PAGE_SIZE
+        rows = self.pages.get(page)
+        if rows is None:
+            if page not in self.requested_pages and page not in self.failed_pages:
+                self.requested_pages.add(page)
+                known_page = max(p for p in self.cursors if p <= page)
+                self._run_in_background(self._page_job, self.generation, dict(self.filters),
+                                        page, known_page, self.cursors[known_page])
+            return None
+        offset = index % self.PAGE_SIZE
+        return rows[offset] if offset < len(rows) else None
+
+    @staticmethod
+    def _format(record):
+        when = datetime.fromtimestamp(record["ts"]).strftime("%d/%m %H:%M:%S")
+        latency = f"{record['latency_ms']:.0f}ms" if record["latency_ms"] is not None else "-"
+        return (f"{when}  {record['action']:<10} {record['rule'] or '-':<20} "
+                f"usuário {record['user_id']}  msg {record['message_id'] or '-'}  "
+                f"{latency:>6}  {record['outcome']}  {record['detail'] or ''}")
+
+    def _render(self):
+        """Materializa apenas as linhas visíveis."""
+        for i, label in enumerate(self.row_labels):
+            index = self.top + i
+            if index >= self.total:
+                text = ""
+            else:
+                record = self._row(index)
+                if record:
+                    text = self._format(record)
+                elif index // self.PAGE_SIZE in self.failed_pages:
+                    text = "erro ao carregar (role para tentar de novo)"
+                else:
+                    text = "carregando..."
+            label.configure(text=text)
+        if self.total:
+            self.scrollbar.set(self.top / self.total, min(1.0, (self.top + self.VISIBLE_ROWS) / self.total))
+        else:
+            self.scrollbar.set(0, 1)
@@ -94,4 +94,4 @@ def save_settings(app):
     app.home_tiktok_label.bind("<Button-1>", lambda e: webbrowser.open_new(app.config["tiktok_url"]))
     
     messagebox.showinfo("Salvo", "Configurações salvas com sucesso!")
-    app.update_console("Configurações salvas. Reinicie o bot se necessário.")
\ No newline at end of file
+    app.update_console("Configurações salvas. Clique em Reiniciar para aplicá-las; um novo token exige parar e iniciar o bot.")
\ No newline at end of file
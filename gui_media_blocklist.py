@@ -0,0 +1,141 @@
+# gui_media_blocklist.py
+import customtkinter as ctk
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from media_blocklist import MediaBlocklist, BLOCKLIST_FILE, KIND_FILE, KIND_STICKER_SET, media_key
+
+KIND_OPTIONS = {"Arquivo (file_unique_id)": KIND_FILE, "Pacote de stickers": KIND_STICKER_SET}
+
+
+def create_media_blocklist_tab(app):
+    """Cria a aba 'Mídias Bloqueadas' (edição da lista de mídias proibidas)"""
+    app.tab_view.add("Mídias Bloqueadas")
+    tab = app.tab_view.tab("Mídias Bloqueadas")
+    app.media_blocklist_view = MediaBlocklistView(app, tab)
+
+
+class MediaBlocklistView:
+    """Adicionar, remover e buscar entradas da lista de mídias proibidas.
+
+    Usa uma conexão própria ao banco (sem carregar a lista em memória); o bot
+    percebe as alterações sozinho. As buscas rodam numa thread separada.
+    """
+
+    MAX_RESULTS = 100
+
+    def __init__(self, app, tab):
+        self.app = app
+        self.blocklist = None
+        self.results = queue.Queue()
+
+        tab.grid_columnconfigure(0, weight=1)
+        tab.grid_rowconfigure(2, weight=1)
+
+        # Edição
+        edit_frame = ctk.CTkFrame(tab)
+        edit_frame.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
+        edit_frame.grid_columnconfigure(1, weight=1)
+
+        self.kind_menu = ctk.CTkOptionMenu(edit_frame, values=list(KIND_OPTIONS), width=190)
+        self.kind_menu.grid(row=0, column=0, padx=5, pady=5)
+        self.value_entry = ctk.CTkEntry(edit_frame, placeholder_text="file_unique_id ou nome do pacote")
+        self.value_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        ctk.CTkButton(edit_frame, text="Adicionar", width=90, command=self.add).grid(row=0, column=2, padx=5, pady=5)
+        ctk.CTkButton(edit_frame, text="Remover", width=90, command=self.remove).grid(row=0, column=3, padx=5, pady=5)
+
+        # Busca
+        search_frame = ctk.CTkFrame(tab)
+        search_frame.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="ew")
+        search_frame.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(search_frame, text="Buscar (prefixo):").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.search_entry = ctk.CTkEntry(search_frame)
+        self.search_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.search_entry.bind("<Return>", lambda e: self.search())
+        ctk.CTkButton(search_frame, text="Buscar", width=90, command=self.search).grid(row=0, column=2, padx=5, pady=5)
+
+        self.results_text = ctk.CTkTextbox(tab, font=ctk.CTkFont(family="Courier", size=12), state="disabled")
+        self.results_text.grid(row=2, column=0, padx=10, pady=(0, 5), sticky="nsew")
+
+        self.status_label = ctk.CTkLabel(tab, text="Clique em Buscar para listar as entradas mais recentes.", anchor="w")
+        self.status_label.grid(row=3, column=0, padx=10, pady=(0, 10), sticky="ew")
+
+    def _get_blocklist(self):
+        if self.blocklist is None:
+            path = self.app.config.get("media_blocklist", {}).get("path", BLOCKLIST_FILE)
+            self.blocklist = MediaBlocklist(path, preload=False)
+        return self.blocklist
+
+    def _key(self):
+        value = self.value_entry.get().strip()
+        # Aceita a chave completa colada do histórico ("file:..." / "set:...")
+        kind, separator, _ = value.partition(":")
+        if separator and kind in (KIND_FILE, KIND_STICKER_SET):
+            return value
+        return media_key(KIND_OPTIONS[self.kind_menu.get()], value) if value else None
+
+    def add(self):
+        key = self._key()
+        if not key:
+            self.status_label.configure(text="Informe o file_unique_id ou o nome do pacote.")
+            return
+        try:
+            added = self._get_blocklist().add(key, added_by="gui")
+        except (sqlite3.Error, ValueError) as e:
+            self.status_label.configure(text=f"Erro ao adicionar: {e}")
+            return
+        self.status_label.configure(text=f"Adicionado: {key}" if added else f"Já estava na lista: {key}")
+        self.value_entry.delete(0, "end")
+        self.search()
+
+    def remove(self):
+        key = self._key()
+        if not key:
+            self.status_label.configure(text="Informe o file_unique_id ou o nome do pacote.")
+            return
+        try:
+            removed = self._get_blocklist().remove(key)
+        except sqlite3.Error as e:
+            self.status_label.configure(text=f"Erro ao remover: {e}")
+            return
+        self.status_label.configure(text=f"Removido: {key}" if removed else f"Não encontrado: {key}")
+        self.search()
+
+    def search(self):
+        """Lista as entradas mais recentes com o prefixo informado (em segundo plano)."""
+        prefix = self.search_entry.get().strip()
+        try:
+            blocklist = self._get_blocklist()
+        except sqlite3.Error as e:
+            self.status_label.configure(text=f"Erro ao abrir a lista: {e}")
+            return
+
+        def worker():
+            try:
+                self.results.put((blocklist.search(prefix, limit=self.MAX_RESULTS), blocklist.total(), None))
+            except sqlite3.Error as e:
+                self.results.put(([], 0, e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.app.after(50, self._poll_results)
+
+    def _poll_results(self):
+        try:
+            entries, total, error = self.results.get_nowait()
+        except queue.Empty:
+            self.app.after(50, self._poll_results)
+            return
+        if error is not None:
+            self.status_label.configure(text=f"Erro na busca: {error}")
+            return
+        lines = [
+            f"{datetime.fromtimestamp(entry['added_at']):%d/%m/%Y %H:%M}  {entry['key']:<45} "
+            f"{entry['added_by'] or '-':<16} {entry['note'] or ''}"
+            for entry in entries
+        ]
+        self.results_text.configure(state="normal")
+        self.results_text.delete("1.0", "end")
+        self.results_text.insert("1.0", "\n".join(lines) or "Nenhuma entrada encontrada.")
+        self.results_text.configure(state="disabled")
+        self.status_label.configure(text=f"{len(entries)} exibida(s) de {total} entrada(s) na lista.")
@@ -0,0 +1,89 @@
+# gui_memory.py
+import customtkinter as ctk
+import queue
+import threading
+import tracemalloc
+from memory_report import bots_report, structure_row, start_tracemalloc, stop_tracemalloc
+
+
+def create_memory_tab(app):
+    """Cria a aba 'Memória' (relatório de uso de memória)"""
+    app.tab_view.add("Memória")
+    tab = app.tab_view.tab("Memória")
+    app.memory_view = MemoryView(app, tab)
+
+
+class MemoryView:
+    """Relatório de memória sob demanda: estruturas de cada bot, da própria GUI e tracemalloc.
+
+    A coleta dos bots roda no event loop deles (ver TelegramBot.memory_report);
+    aqui ela é pedida numa thread separada para a interface não travar.
+    """
+
+    def __init__(self, app, tab):
+        self.app = app
+        self.results = queue.Queue()
+        self.settings = app.config.get("memory", {})
+
+        tab.grid_columnconfigure(0, weight=1)
+        tab.grid_rowconfigure(1, weight=1)
+
+        buttons_frame = ctk.CTkFrame(tab, fg_color="transparent")
+        buttons_frame.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="ew")
+        self.refresh_button = ctk.CTkButton(buttons_frame, text="Atualizar Relatório", command=self.refresh)
+        self.refresh_button.grid(row=0, column=0, padx=5)
+        self.tracemalloc_button = ctk.CTkButton(buttons_frame, text="Ativar tracemalloc", command=self.toggle_tracemalloc)
+        self.tracemalloc_button.grid(row=0, column=1, padx=5)
+        self.status_label = ctk.CTkLabel(buttons_frame, text="")
+        self.status_label.grid(row=0, column=2, padx=5)
+
+        self.report_text = ctk.CTkTextbox(tab, font=ctk.CTkFont(family="Courier", size=12), state="disabled", wrap="none")
+        self.report_text.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="nsew")
+
+    def _gui_rows(self):
+        """Estruturas da própria interface (lidas na thread do Tk)."""
+        console = getattr(self.app, "console_textbox", None)
+        events = self.app.event_bus.pending_events()
+        rows = [structure_row("event_bus", events, len(events), self.settings.get("event_bus_max_events", 20000))]
+        if console is not None:
+            text = console.get("1.0", "end-1c")
+            rows.append({"name": "console", "entries": text.count("\n") + 1 if text else 0,
+                         "bytes": len(text.encode("utf-8")), "limit": self.settings.get("console_max_lines", 5000)})
+        return rows
+
+    def refresh(self):
+        bots = list(self.app.bots.values())
+        gui_title = f"Interface ({self.app.event_bus.dropped} log(s) descartado(s) pela fila)"
+        gui_rows = self._gui_rows()
+        self.refresh_button.configure(state="disabled")
+        self.status_label.configure(text="Coletando...")
+
+        def worker():
+            text = bots_report(bots, [(gui_title, gui_rows)], self.settings.get("tracemalloc_top", 15))
+            self.results.put(text)
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.app.after(100, self._poll_result)
+
+    def _poll_result(self):
+        try:
+            text = self.results.get_nowait()
+        except queue.Empty:
+            self.app.after(100, self._poll_result)
+            return
+        self.report_text.configure(state="normal")
+        self.report_text.delete("1.0", "end")
+        self.report_text.insert("1.0", text)
+        self.report_text.configure(state="disabled")
+        self.refresh_button.configure(state="normal")
+        self.status_label.configure(text="")
+
+    def toggle_tracemalloc(self):
+        if tracemalloc.is_tracing():
+            stop_tracemalloc()
+            self.tracemalloc_button.configure(text="Ativar tracemalloc")
+            self.app.update_console("tracemalloc desativado.")
+        else:
+            start_tracemalloc(self.settings.get("tracemalloc_frames", 1))
+            self.tracemalloc_button.configure(text="Desativar tracemalloc")
+            self.app.update_console("tracemalloc ativado: o snapshot aparece no próximo relatório.")
@@ -0,0 +1,137 @@
+# gui_regex_rules.py
+import customtkinter as ctk
+import time
+from tkinter import messagebox
+from config_manager import save_config
+from regex_rules import RegexRuleSet, validate_pattern
+
+ACTION_LABELS = {"Apagar": "delete", "Apagar e Banir": "ban"}
+
+
+def create_regex_rules_tab(app):
+    """Cria a aba 'Regex' (editor de regras personalizadas)"""
+    app.tab_view.add("Regex")
+    tab = app.tab_view.tab("Regex")
+    app.regex_rules_editor = RegexRulesEditor(app, tab)
+
+
+class RegexRulesEditor:
+    """Editor das regras regex personalizadas (nome, expressão, ação e ativa).
+
+    Cada expressão é validada ao salvar (sintaxe e construções sujeitas a
+    backtracking catastrófico); a área de teste mostra quais regras casam com
+    um texto de exemplo e quanto tempo a avaliação levou.
+    """
+
+    def __init__(self, app, tab):
+        self.app = app
+        self.rows = []
+
+        tab.grid_columnconfigure(0, weight=1)
+        tab.grid_rowconfigure(0, weight=1)
+
+        self.rows_frame = ctk.CTkScrollableFrame(tab)
+        self.rows_frame.grid(row=0, column=0, padx=10, pady=(10, 5), sticky="nsew")
+        self.rows_frame.grid_columnconfigure(2, weight=1)
+        for column, title in enumerate(("Ativa", "Nome", "Expressão regular", "Ação")):
+            ctk.CTkLabel(self.rows_frame, text=title).grid(row=0, column=column, padx=5, pady=(0, 5), sticky="w")
+        for rule in app.config.get("rules", {}).get("custom_regex_rules", []):
+            self.add_row(rule)
+
+        buttons_frame = ctk.CTkFrame(tab, fg_color="transparent")
+        buttons_frame.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+        ctk.CTkButton(buttons_frame, text="Adicionar Regra", command=self.add_row).grid(row=0, column=0, padx=5)
+        ctk.CTkButton(buttons_frame, text="Salvar Regras Regex", command=self.save).grid(row=0, column=1, padx=5)
+
+        # Teste
+        test_frame = ctk.CTkFrame(tab)
+        test_frame.grid(row=2, column=0, padx=10, pady=(5, 10), sticky="ew")
+        test_frame.grid_columnconfigure(1, weight=1)
+        ctk.CTkLabel(test_frame, text="Texto de teste:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.test_entry = ctk.CTkEntry(test_frame)
+        self.test_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.test_entry.bind("<Return>", lambda e: self.test())
+        ctk.CTkButton(test_frame, text="Testar", width=90, command=self.test).grid(row=0, column=2, padx=5, pady=5)
+        self.result_label = ctk.CTkLabel(test_frame, text="", anchor="w", wraplength=700, justify="left")
+        self.result_label.grid(row=1, column=0, columnspan=3, padx=5, pady=(0, 5), sticky="ew")
+
+    def add_row(self, rule=None):
+        rule = rule or {}
+        row = len(self.rows) + 1
+        widgets = {}
+        widgets["enabled"] = ctk.StringVar(value="on" if rule.get("enabled", True) else "off")
+        enabled = ctk.CTkCheckBox(self.rows_frame, text="", width=24, variable=widgets["enabled"], onvalue="on", offvalue="off")
+        enabled.grid(row=row, column=0, padx=5, pady=2)
+        widgets["name"] = ctk.CTkEntry(self.rows_frame, width=130)
+        widgets["name"].grid(row=row, column=1, padx=5, pady=2)
+        widgets["name"].insert(0, rule.get("name", ""))
+        widgets["pattern"] = ctk.CTkEntry(self.rows_frame)
+        widgets["pattern"].grid(row=row, column=2, padx=5, pady=2, sticky="ew")
+        widgets["pattern"].insert(0, rule.get("pattern", ""))
+        widgets["action"] = ctk.CTkOptionMenu(self.rows_frame, values=list(ACTION_LABELS), width=130)
+        widgets["action"].grid(row=row, column=3, padx=5, pady=2)
+        widgets["action"].set("Apagar e Banir" if rule.get("action") == "ban" else "Apagar")
+        remove = ctk.CTkButton(self.rows_frame, text="✕", width=28, command=lambda: self.remove_row(widgets))
+        remove.grid(row=row, column=4, padx=5, pady=2)
+        widgets["widgets"] = [enabled, widgets["name"], widgets["pattern"], widgets["action"], remove]
+        self.rows.append(widgets)
+
+    def remove_row(self, widgets):
+        for widget in widgets["widgets"]:
+            widget.destroy()
+        self.rows.remove(widgets)
+
+    def _collect(self):
+        """Regras como ficam na configuração (linhas sem expressão são ignoradas)."""
+        rules = []
+        for widgets in self.rows:
+            pattern = widgets["pattern"].get().strip()
+            if not pattern:
+                continue
+            rules.append({
+                "name": widgets["name"].get().strip() or f"regra {len(rules) + 1}",
+                "pattern": pattern,
+                "action": ACTION_LABELS[widgets["action"].get()],
+                "enabled": widgets["enabled"].get() == "on"
+            })
+        return rules
+
+    def save(self):
+        rules = self._collect()
+        errors = []
+        for rule in rules:
+            try:
+                validate_pattern(rule["pattern"])
+            except ValueError as e:
+                errors.append(f"{rule['name']}: {e}")
+        names = [rule["name"] for rule in rules]
+        errors += [f"{name}: nome repetido" for name in sorted(set(names)) if names.count(name) > 1]
+        if errors:
+            messagebox.showerror("Erro", "Regras inválidas:\n" + "\n".join(errors))
+            return
+        config_rules = dict(self.app.config.get("rules", {}))
+        config_rules["custom_regex_rules"] = rules
+        self.app.config["rules"] = config_rules
+        save_config(self.app.config)
+        if getattr(self.app, "history_view", None) is not None:
+            self.app.history_view.refresh_rule_options()
+        messagebox.showinfo("Salvo", f"{len(rules)} regra(s) regex salva(s)!")
+        self.app.update_console("Regras regex salvas. Clique em Reiniciar para aplicá-las ao bot em execução.")
+
+    def test(self):
+        config_rules = self.app.config.get("rules", {})
+        rule_set = RegexRuleSet(
+            self._collect(),
+            time_budget_ms=config_rules.get("regex_time_budget_ms", 50),
+            max_text_chars=config_rules.get("regex_max_text_chars", 4096)
+        )
+        started = time.perf_counter()
+        matched = rule_set.match(self.test_entry.get())
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        lines = [f"Ignorada: {error}" for error in rule_set.errors]
+        if matched:
+            lines.append("Casou: " + ", ".join(f"{name} ({'banir' if action == 'ban' else 'apagar'})" for name, action in matched))
+        else:
+            lines.append("Nenhuma regra casou.")
+        lines.append(f"Tempo: {elapsed_ms:.2f} ms" + (" (limite excedido)" if rule_set.timeouts else ""))
+        self.result_label.configure(text="\n".join(lines))
@@ -0,0 +1,174 @@
+# gui_word_lists.py
+import customtkinter as ctk
+import queue
+import sqlite3
+import threading
+from tkinter import filedialog
+from word_lists import WordListStore, WORD_LISTS_FILE, parse_words
+
+LIST_LABELS = {"Palavras Bloqueadas": "profanity_list", "Palavras-chave do Tópico": "allowed_topics_keywords"}
+
+
+def create_word_lists_tab(app):
+    """Cria a aba 'Palavras' (editor das listas de palavras)"""
+    app.tab_view.add("Palavras")
+    tab = app.tab_view.tab("Palavras")
+    app.word_lists_view = WordListsView(app, tab)
+
+
+class WordListsView:
+    """Editor paginado das listas de palavras (banco próprio, fora do config.json).
+
+    Só uma página é lida por vez; consultas e importações rodam numa thread
+    separada e o resultado chega à interface por uma fila lida com `after`.
+    Os bots em execução aplicam as alterações sozinhos.
+    """
+
+    PAGE_SIZE = 200
+
+    def __init__(self, app, tab):
+        self.app = app
+        self.store = None
+        self.page_number = 0
+        self.total = 0
+        self.generation = 0  # Descarta respostas de consultas antigas
+        self.results = queue.Queue()
+
+        tab.grid_columnconfigure(0, weight=1)
+        tab.grid_rowconfigure(2, weight=1)
+
+        # Lista e busca
+        top_frame = ctk.CTkFrame(tab)
+        top_frame.grid(row=0, column=0, padx=10, pady=10, sticky="ew")
+        top_frame.grid_columnconfigure(2, weight=1)
+        self.list_menu = ctk.CTkOptionMenu(top_frame, values=list(LIST_LABELS), width=190,
+                                           command=lambda _: self.search())
+        self.list_menu.grid(row=0, column=0, padx=5, pady=5)
+        ctk.CTkLabel(top_frame, text="Buscar (prefixo):").grid(row=0, column=1, padx=5, pady=5, sticky="e")
+        self.search_entry = ctk.CTkEntry(top_frame)
+        self.search_entry.grid(row=0, column=2, padx=5, pady=5, sticky="ew")
+        self.search_entry.bind("<Return>", lambda e: self.search())
+        ctk.CTkButton(top_frame, text="Buscar", width=90, command=self.search).grid(row=0, column=3, padx=5, pady=5)
+
+        # Edição
+        edit_frame = ctk.CTkFrame(tab)
+        edit_frame.grid(row=1, column=0, padx=10, pady=(0, 10), sticky="ew")
+        edit_frame.grid_columnconfigure(0, weight=1)
+        self.words_entry = ctk.CTkEntry(edit_frame, placeholder_text="Palavras (separadas por vírgula)")
+        self.words_entry.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        ctk.CTkButton(edit_frame, text="Adicionar", width=90, command=self.add).grid(row=0, column=1, padx=5, pady=5)
+        ctk.CTkButton(edit_frame, text="Remover", width=90, command=self.remove).grid(row=0, column=2, padx=5, pady=5)
+        ctk.CTkButton(edit_frame, text="Importar Arquivo...", width=130, command=self.import_file).grid(row=0, column=3, padx=5, pady=5)
+
+        self.words_text = ctk.CTkTextbox(tab, font=ctk.CTkFont(family="Courier", size=12), state="disabled")
+        self.words_text.grid(row=2, column=0, padx=10, pady=(0, 5), sticky="nsew")
+
+        # Paginação
+        pages_frame = ctk.CTkFrame(tab, fg_color="transparent")
+        pages_frame.grid(row=3, column=0, padx=10, pady=(0, 10), sticky="ew")
+        pages_frame.grid_columnconfigure(1, weight=1)
+        ctk.CTkButton(pages_frame, text="◀", width=40, command=lambda: self.load_page(self.page_number - 1)).grid(row=0, column=0, padx=5)
+        self.status_label = ctk.CTkLabel(pages_frame, text="Clique em Buscar para ver a lista.")
+        self.status_label.grid(row=0, column=1, padx=5, sticky="ew")
+        ctk.CTkButton(pages_frame, text="▶", width=40, command=lambda: self.load_page(self.page_number + 1)).grid(row=0, column=2, padx=5)
+
+    def _get_store(self):
+        if self.store is None:
+            self.store = WordListStore(self.app.config.get("word_lists", {}).get("path", WORD_LISTS_FILE))
+        return self.store
+
+    def _list_name(self):
+        return LIST_LABELS[self.list_menu.get()]
+
+    def _run_in_background(self, job, *args):
+        generation = self.generation
+
+        def worker():
+            try:
+                self.results.put((generation, job(*args), None))
+            except (sqlite3.Error, OSError, UnicodeDecodeError) as e:
+                self.results.put((generation, None, e))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.app.after(50, self._poll_results)
+
+    def _poll_results(self):
+        try:
+            generation, result, error = self.results.get_nowait()
+        except queue.Empty:
+            self.app.after(50, self._poll_results)
+            return
+        if generation != self.generation:
+            return
+        if error is not None:
+            self.status_label.configure(text=f"Erro: {error}")
+            return
+        callback, value = result
+        callback(value)
+
+    # --- Consulta ---
+
+    def search(self):
+        """Recomeça a listagem da primeira página com o filtro atual."""
+        self.page_number = 0
+        self.load_page(0)
+
+    def load_page(self, page_number):
+        if page_number < 0 or (page_number > self.page_number and (page_number * self.PAGE_SIZE) >= self.total):
+            return
+        self.generation += 1
+        self.page_number = page_number
+        self.status_label.configure(text="Carregando...")
+        self._run_in_background(self._page_job, self._list_name(), self.search_entry.get().strip().lower(), page_number)
+
+    def _page_job(self, list_name, prefix, page_number):
+        store = self._get_store()
+        total = store.count(list_name, prefix)
+        words = store.page(list_name, prefix, limit=self.PAGE_SIZE, offset=page_number * self.PAGE_SIZE)
+        return self._show_page, (total, words)
+
+    def _show_page(self, page):
+        self.total, words = page
+        pages = max(1, -(-self.total // self.PAGE_SIZE))
+        self.words_text.configure(state="normal")
+        self.words_text.delete("1.0", "end")
+        self.words_text.insert("1.0", "\n".join(words) or "Nenhuma palavra encontrada.")
+        self.words_text.configure(state="disabled")
+        self.status_label.configure(text=f"Página {self.page_number + 1} de {pages} ({self.total} palavra(s))")
+
+    # --- Edição ---
+
+    def _edit(self, job, description):
+        self.generation += 1
+        self.status_label.configure(text=f"{description}...")
+        self._run_in_background(job)
+
+    def _edited(self, message):
+        self.app.update_console(message)
+        self.search()
+
+    def add(self):
+        words = parse_words(self.words_entry.get())
+        if not words:
+            return
+        list_name = self._list_name()
+        self.words_entry.delete(0, "end")
+        self._edit(lambda: (self._edited, f"{self._get_store().add(list_name, words)} palavra(s) adicionada(s)."),
+                   "Adicionando")
+
+    def remove(self):
+        words = parse_words(self.words_entry.get())
+        if not words:
+            return
+        list_name = self._list_name()
+        self.words_entry.delete(0, "end")
+        self._edit(lambda: (self._edited, f"{self._get_store().remove(list_name, words)} palavra(s) removida(s)."),
+                   "Removendo")
+
+    def import_file(self):
+        path = filedialog.askopenfilename(title="Importar palavras", filetypes=[("Texto", "*.txt *.csv"), ("Todos", "*.*")])
+        if not path:
+            return
+        list_name = self._list_name()
+        self._edit(lambda: (self._edited, f"{self._get_store().import_file(list_name, path)} palavra(s) importada(s)."),
+                   "Importando")
@@ -0,0 +1,103 @@
+# headless.py
+import argparse
+import multiprocessing
+import signal
+import time
+from config_manager import load_config, bot_configs
+from bot_host import BotHost
+from bot_lifecycle import STOPPED, RUNNING, ERROR
+from memory_report import bots_report, start_tracemalloc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa os bots sem interface gráfica.")
+    parser.add_argument("--bot", action="append", default=[], help="Nome do bot a iniciar (pode repetir; padrão: todos)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Modo supervisor: avalia as regras em N processos (sobrescreve sharding.workers)")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="ARQUIVO",
+                        help="Amostra a pilha do event loop durante toda a execução e grava as pilhas (collapsed) ao sair")
+    parser.add_argument("--slow-callback-ms", type=float, default=None,
+                        help="Registra no log os callbacks do event loop que levarem mais que N ms")
+    parser.add_argument("--memory-report-sec", type=float, default=0,
+                        help="Imprime o relatório de memória a cada N segundos (0 = só sob demanda, com SIGUSR2)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Ativa o tracemalloc desde o início (o relatório inclui as maiores alocações)")
+    args = parser.parse_args()
+
+    # Adiar a importação: o python-telegram-bot só é necessário aqui
+    from bot_logic import TelegramBot
+
+    config = load_config()
+    memory_settings = config.get("memory", {})
+    if args.tracemalloc:
+        start_tracemalloc(memory_settings.get("tracemalloc_frames", 1))
+    host = BotHost()
+    bots = []
+    for name, bot_config in bot_configs(config):
+        if args.bot and name not in args.bot:
+            continue
+        bot_config = dict(bot_config)
+        if args.workers is not None:
+            bot_config["sharding"] = dict(bot_config.get("sharding", {}), workers=args.workers)
+        bots.append(TelegramBot(bot_config, host=host, name=name))
+    if not bots:
+        print("Nenhum bot selecionado.")
+        return
+
+    for bot in bots:
+        bot.start_bot()
+    print(f"{len(bots)} bot(s) em execução. Ctrl+C para parar.")
+
+    # Diagnóstico: os bots compartilham o loop do host, então basta ligar no primeiro
+    diagnosed = bots[0]
+    if args.profile is not None or args.slow_callback_ms is not None:
+        diagnosed.lifecycle.wait_for((RUNNING, ERROR), 30)
+        if args.slow_callback_ms is not None:
+            diagnosed.start_slow_callback_detection(args.slow_callback_ms)
+        if args.profile is not None:
+            diagnosed.start_profiling()
+    if hasattr(signal, "SIGUSR1"):
+        # kill -USR1 <pid>: liga/desliga o profiler sem reiniciar (o perfil é gravado ao desligar)
+        def toggle_profiler(signum, frame):
+            if diagnosed.profiler is not None and diagnosed.profiler.running:
+                diagnosed.stop_profiling()
+            else:
+                diagnosed.start_profiling()
+        signal.signal(signal.SIGUSR1, toggle_profiler)
+
+    report_requested = []
+    if hasattr(signal, "SIGUSR2"):
+        # kill -USR2 <pid>: imprime o relatório de memória (no laço abaixo, fora do handler do sinal)
+        signal.signal(signal.SIGUSR2, lambda signum, frame: report_requested.append(True))
+
+    def print_memory_report():
+        print(bots_report(bots, tracemalloc_limit=memory_settings.get("tracemalloc_top", 15)), flush=True)
+
+    next_report = time.monotonic() + args.memory_report_sec
+    try:
+        # Espera com timeout: no Windows um wait() sem prazo não é interrompido pelo Ctrl+C
+        while any(bot.loop is not None for bot in bots):
+            time.sleep(1)
+            if report_requested or (args.memory_report_sec and time.monotonic() >= next_report):
+                report_requested.clear()
+                next_report = time.monotonic() + args.memory_report_sec
+                print_memory_report()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("Parando...")
+        if args.memory_report_sec or args.tracemalloc:
+            print_memory_report()
+        if diagnosed.profiler is not None and diagnosed.profiler.running:
+            diagnosed.stop_profiling(args.profile or None)
+        # Todos drenam em paralelo; depois aguarda cada um chegar a Stopped
+        stopping = [bot for bot in bots if bot.controller.request_stop()]
+        for bot in stopping:
+            if not bot.lifecycle.wait_for((STOPPED, ERROR), bot.controller.stop_timeout()):
+                print(f"Timeout ao parar o bot {bot.name}")
+        host.stop()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
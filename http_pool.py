@@ -0,0 +1,119 @@
+# http_pool.py
+import importlib.util
+import time
+
+from telegram.error import TimedOut
+from telegram.request import HTTPXRequest
+
+
+class InstrumentedHTTPXRequest(HTTPXRequest):
+    """HTTPXRequest que mede a ocupação do pool de conexões.
+
+    Guarda requisições em andamento, pico de uso, total de requisições e quantas
+    falharam por falta de conexão livre (pool timeout).
+    """
+
+    def __init__(self, name, connection_pool_size, **kwargs):
+        super().__init__(connection_pool_size=connection_pool_size, **kwargs)
+        self.name = name
+        self.pool_size = connection_pool_size
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.pool_timeouts = 0
+        self.saturated_since = None  # time.monotonic() de quando o pool lotou
+        self.saturated_total_sec = 0.0
+
+    async def do_request(self, *args, **kwargs):
+        self.total_requests += 1
+        self.in_flight += 1
+        if self.in_flight > self.peak_in_flight:
+            self.peak_in_flight = self.in_flight
+        if self.in_flight >= self.pool_size and self.saturated_since is None:
+            self.saturated_since = time.monotonic()
+        try:
+            return await super().do_request(*args, **kwargs)
+        except TimedOut as e:
+            if "pool" in str(e).lower():
+                self.pool_timeouts += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            if self.in_flight < self.pool_size and self.saturated_since is not None:
+                self.saturated_total_sec += time.monotonic() - self.saturated_since
+                self.saturated_since = None
+
+    def stats(self):
+        """Resumo da ocupação do pool."""
+        saturated = self.saturated_total_sec
+        if self.saturated_since is not None:
+            saturated += time.monotonic() - self.saturated_since
+        return {
+            "name": self.name,
+            "pool_size": self.pool_size,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "utilization": self.in_flight / self.pool_size if self.pool_size else 0.0,
+            "total_requests": self.total_requests,
+            "pool_timeouts": self.pool_timeouts,
+            "saturated_sec": round(saturated, 3),
+        }
+
+
+def _http_version(settings, log=None):
+    """Retorna "2" se HTTP/2 foi pedido e o pacote h2 está instalado, senão "1.1"."""
+    if not settings.get("http2"):
+        return "1.1"
+    if importlib.util.find_spec("h2") is None:
+        if log:
+            log("HTTP/2 solicitado, mas o pacote 'h2' não está instalado (pip install httpx[http2]). Usando HTTP/1.1.")
+        return "1.1"
+    return "2"
+
+
+def _build_request(name, pool_size, settings, read_timeout, http_version):
+    import httpx
+
+    keepalive = min(settings.get("max_keepalive_connections", pool_size), pool_size)
+    return InstrumentedHTTPXRequest(
+        name,
+        connection_pool_size=pool_size,
+        connect_timeout=settings.get("connect_timeout", 10),
+        read_timeout=read_timeout,
+        write_timeout=settings.get("write_timeout", 30),
+        pool_timeout=settings.get("pool_timeout", 5),
+        http_version=http_version,
+        httpx_kwargs={
+            "limits": httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=keepalive,
+                keepalive_expiry=settings.get("keepalive_expiry_sec", 30),
+            )
+        },
+    )
+
+
+def build_requests(config, log=None):
+    """Cria os objetos de requisição separados: (chamadas da API, getUpdates).
+
+    O getUpdates fica em um pool próprio para que o long polling nunca dispute
+    conexões com apagar/banir/enviar.
+    """
+    settings = config.get("http", {})
+    http_version = _http_version(settings, log)
+    api_request = _build_request(
+        "api",
+        settings.get("connection_pool_size", 64),
+        settings,
+        settings.get("read_timeout", 30),
+        http_version,
+    )
+    updates_request = _build_request(
+        "get_updates",
+        settings.get("get_updates_pool_size", 2),
+        settings,
+        # Precisa ser maior que o timeout do long polling
+        settings.get("get_updates_read_timeout", 40),
+        http_version,
+    )
+    return api_request, updates_request
@@ -0,0 +1,270 @@
+# load_generator.py
+"""Teste de carga do bot completo contra a Bot API falsa (fake_telegram_server.py).
+
+Sobe o servidor falso e um TelegramBot de verdade (BotHost, filas, retry,
+regras, auditoria) no mesmo processo, gera mensagens de N usuários e uma
+invasão (raid) de entradas, e mede o que chega ao servidor: chamadas por
+método, 429 recebidos e a latência do update até apagar/restringir/banir.
+
+    python load_generator.py --users 2000 --rate 15 --duration 30 --raid-size 300 --latency 0.05 --rate-limit 30
+
+Nada é enviado ao Telegram; arquivos do bot (auditoria, marca d'água,
+listas) ficam numa pasta temporária.
+"""
+import argparse
+import copy
+import json
+import multiprocessing
+import random
+import shutil
+import tempfile
+import threading
+import time
+from config_manager import DEFAULT_CONFIG
+from fake_telegram_server import FakeTelegramServer
+from metrics import percentile
+
+BOT_TOKEN = "123456789:LOAD-TEST"
+GROUP_ID = -1001000000001
+FIRST_USER_ID = 1000000
+
+# Tipo de mensagem: (peso, textos). "flood" manda uma rajada acima do limite de spam.
+MESSAGE_KINDS = {
+    "ok": (70, ["Alguém tem dica de caneta para planner?", "Adorei o adesivo novo da papelaria",
+                "Vocês fazem personalizados para festa?", "Qual papel usar na arte digital?"]),
+    "off_topic": (15, ["Alguém viu o jogo ontem?", "Bom dia, grupo", "Que calor hoje"]),
+    "link": (5, ["Planner grátis em https://exemplo.com/planner"]),
+    "profanity": (5, ["Que xingamento de papelaria é esse"]),
+    "flood": (5, ["Compre planner barato", "Planner barato aqui"]),
+}
+
+
+class LoadGenerator:
+    """Gera updates (mensagens, entradas e cliques em 'Já segui') e os injeta no servidor falso."""
+
+    def __init__(self, server, users, group_id=GROUP_ID, flood_burst=6, seed=None):
+        self.server = server
+        self.group_id = group_id
+        self.users = [FIRST_USER_ID + i for i in range(users)]
+        self.flood_burst = flood_burst
+        self._random = random.Random(seed)
+        self._next_message_id = 1
+        self._lock = threading.Lock()
+        self._kinds = list(MESSAGE_KINDS)
+        self._weights = [MESSAGE_KINDS[kind][0] for kind in self._kinds]
+        self.sent = {kind: 0 for kind in self._kinds}
+        self.sent.update(join=0, verify=0)
+
+    def _message_id(self):
+        with self._lock:
+            message_id = self._next_message_id
+            self._next_message_id += 1
+            return message_id
+
+    def _user(self, user_id):
+        return {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"}
+
+    def _chat(self):
+        return {"id": self.group_id, "type": "supergroup", "title": "Grupo de Carga"}
+
+    def message(self, user_id, text):
+        message = {"message_id": self._message_id(), "date": int(time.time()), "chat": self._chat(),
+                   "from": self._user(user_id), "text": text}
+        start = text.find("https://")
+        if start >= 0:
+            message["entities"] = [{"type": "url", "offset": start, "length": len(text) - start}]
+        return {"message": message}
+
+    def join(self, user_id):
+        return {"message": {"message_id": self._message_id(), "date": int(time.time()), "chat": self._chat(),
+                            "from": self._user(user_id), "new_chat_members": [self._user(user_id)]}}
+
+    def verify_click(self, user_id):
+        return {"callback_query": {
+            "id": str(user_id), "from": self._user(user_id), "chat_instance": "carga", "data": f"verify_{user_id}",
+            "message": {"message_id": self._message_id(), "date": int(time.time()), "chat": self._chat(),
+                        "from": self.server.bot_user(BOT_TOKEN), "text": "Bem-vindo(a)!"}}}
+
+    def send_messages(self, rate, duration, stop_event):
+        """Mensagens dos usuários a `rate` msg/s durante `duration` segundos (uma rajada conta como uma)."""
+        started = time.monotonic()
+        count = 0
+        while not stop_event.is_set():
+            target = started + count / rate
+            now = time.monotonic()
+            if target - started >= duration:
+                break
+            if target > now:
+                time.sleep(target - now)
+            kind = self._random.choices(self._kinds, self._weights)[0]
+            user_id = self._random.choice(self.users)
+            texts = MESSAGE_KINDS[kind][1]
+            for _ in range(self.flood_burst if kind == "flood" else 1):
+                self.server.push_update(self.message(user_id, self._random.choice(texts)))
+            self.sent[kind] += 1
+            count += 1
+
+    def raid(self, size, rate, verify_fraction, stop_event):
+        """`size` contas novas entrando a `rate` entradas/s; uma fração clica em 'Já segui' depois."""
+        first = FIRST_USER_ID + len(self.users) + 1
+        joined = []
+        started = time.monotonic()
+        for index in range(size):
+            if stop_event.is_set():
+                return
+            delay = started + index / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.server.push_update(self.join(first + index))
+            self.sent["join"] += 1
+            joined.append(first + index)
+        time.sleep(1)  # Dá tempo para a mensagem de boas-vindas
+        for user_id in joined:
+            if stop_event.is_set():
+                return
+            if self._random.random() < verify_fraction:
+                self.server.push_update(self.verify_click(user_id))
+                self.sent["verify"] += 1
+
+
+def build_config(server, work_dir, base_config=None):
+    """Configuração do bot apontando para o servidor falso, com os arquivos na pasta temporária."""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    for key, value in (base_config or {}).items():
+        config[key] = dict(config[key], **value) if isinstance(config.get(key), dict) else value
+    config.update(bot_name="carga", bot_token=BOT_TOKEN, group_id=str(GROUP_ID), extra_bots=[])
+    config["http"] = dict(config["http"], base_url=server.base_url)
+    for section, name in (("audit_log", "audit.db"), ("update_watermark", "watermark_{bot}.json"),
+                          ("word_lists", "word_lists.db"), ("media_blocklist", "media_blocklist.db"),
+                          ("ban_registry", "ban_registry.bin")):
+        config[section] = dict(config[section], path=f"{work_dir}/{name}")
+    return config
+
+
+def wait_until_idle(server, timeout, quiet_sec=1.0):
+    """Espera o bot consumir todos os updates e parar de chamar a API por `quiet_sec`."""
+    deadline = time.monotonic() + timeout
+    last_total, last_change = -1, time.monotonic()
+    while time.monotonic() < deadline:
+        stats = server.stats()
+        total = sum(stats["calls"].values()) - stats["calls"].get("getUpdates", 0)
+        if total != last_total:
+            last_total, last_change = total, time.monotonic()
+        if stats["confirmed_update_id"] >= stats["pushed_updates"] and time.monotonic() - last_change >= quiet_sec:
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def build_report(server, generator, bot, elapsed):
+    stats = server.stats()
+    report = {
+        "elapsed_sec": round(elapsed, 2),
+        "sent": generator.sent,
+        "updates_pushed": stats["pushed_updates"],
+        "updates_per_sec": round(stats["pushed_updates"] / max(elapsed, 1e-9), 1),
+        "calls": stats["calls"],
+        "rate_limited": stats["rate_limited"],
+        "errors": stats["errors"],
+        "rule_hits": dict(bot.metrics.rule_hits_total),
+        "latency_ms": {},
+    }
+    for kind, values in server.latencies.items():
+        values = sorted(values)
+        report["latency_ms"][kind] = {
+            "count": len(values),
+            "p50": round(percentile(values, 0.50) * 1000, 1),
+            "p95": round(percentile(values, 0.95) * 1000, 1),
+            "p99": round(percentile(values, 0.99) * 1000, 1),
+            "max": round(values[-1] * 1000, 1) if values else 0.0,
+        }
+    return report
+
+
+def print_report(report):
+    print(f"{report['updates_pushed']} updates em {report['elapsed_sec']}s ({report['updates_per_sec']} updates/s)")
+    print("Enviado: " + ", ".join(f"{kind}={count}" for kind, count in report["sent"].items()))
+    print(f"\n{'método':<24} {'chamadas':>9} {'429':>6} {'erros':>6}")
+    for method, count in sorted(report["calls"].items(), key=lambda item: -item[1]):
+        print(f"{method:<24} {count:>9} {report['rate_limited'].get(method, 0):>6} {report['errors'].get(method, 0):>6}")
+    print(f"\n{'latência (ms)':<24} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'máx':>8}")
+    for kind, values in report["latency_ms"].items():
+        print(f"{kind:<24} {values['count']:>6} {values['p50']:>8} {values['p95']:>8} {values['p99']:>8} {values['max']:>8}")
+    print("\nRegras: " + (", ".join(f"{rule}={count}" for rule, count in sorted(report["rule_hits"].items())) or "nenhuma"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do bot contra uma Bot API falsa local.")
+    parser.add_argument("--users", type=int, default=1000, help="Usuários que mandam mensagens")
+    parser.add_argument("--rate", type=float, default=15, help="Mensagens/s (rajadas de flood contam como uma)")
+    parser.add_argument("--duration", type=float, default=30, help="Duração do envio de mensagens (segundos)")
+    parser.add_argument("--raid-size", type=int, default=200, help="Contas na invasão (0 = sem invasão)")
+    parser.add_argument("--raid-rate", type=float, default=50, help="Entradas/s durante a invasão")
+    parser.add_argument("--raid-at", type=float, default=5, help="Início da invasão (segundos após o início)")
+    parser.add_argument("--verify-fraction", type=float, default=0.5, help="Fração da invasão que clica em 'Já segui'")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latência artificial da API falsa (segundos)")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=30, help="Chamadas/s aceitas pela API falsa (0 = sem limite)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fração de chamadas com 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de chamadas com 400")
+    parser.add_argument("--config", help="config.json cujas seções substituem os padrões (token e grupo são ignorados)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", help="Grava o relatório também em JSON")
+    args = parser.parse_args()
+
+    # Adiar a importação: o python-telegram-bot só é necessário aqui
+    from bot_logic import TelegramBot
+    from bot_host import BotHost
+    from bot_lifecycle import RUNNING, STOPPED, ERROR
+
+    base_config = None
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            base_config = json.load(f)
+    server = FakeTelegramServer(port=0, latency_sec=args.latency, jitter_sec=args.jitter, rate_limit=args.rate_limit,
+                                rate_429=args.rate_429, error_rate=args.error_rate, seed=args.seed).start()
+    work_dir = tempfile.mkdtemp(prefix="bot_carga_")
+    host = BotHost()
+    bot = TelegramBot(build_config(server, work_dir, base_config), host=host, name="carga")
+    generator = LoadGenerator(server, args.users, seed=args.seed,
+                              flood_burst=bot.config["rules"].get("spam_message_limit", 5) + 1)
+    stop_event = threading.Event()
+    try:
+        bot.start_bot()
+        if not bot.lifecycle.wait_for((RUNNING, ERROR), 30) or bot.lifecycle.state != RUNNING:
+            print("O bot não chegou a Running; veja o log acima.")
+            return
+        print(f"Bot em execução contra {server.base_url}. Gerando carga por {args.duration:.0f}s...")
+
+        started = time.monotonic()
+        raid = None
+        if args.raid_size > 0:
+            raid = threading.Timer(args.raid_at, generator.raid,
+                                   (args.raid_size, args.raid_rate, args.verify_fraction, stop_event))
+            raid.daemon = True
+            raid.start()
+        generator.send_messages(args.rate, args.duration, stop_event)
+        if raid is not None:
+            raid.join()
+        if not wait_until_idle(server, timeout=60):
+            print("Aviso: o bot ainda tinha trabalho pendente após 60s.")
+        report = build_report(server, generator, bot, time.monotonic() - started)
+    except KeyboardInterrupt:
+        stop_event.set()
+        return
+    finally:
+        if bot.controller.request_stop():
+            bot.lifecycle.wait_for((STOPPED, ERROR), bot.controller.stop_timeout())
+        host.stop()
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
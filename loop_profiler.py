@@ -0,0 +1,184 @@
+# loop_profiler.py
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_FILE = "profile_{bot}_{time}.collapsed"  # {bot} = nome do bot, {time} = data e hora
+
+
+def _label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def describe_stack(frame, limit=8):
+    """Pilha resumida (mais interna primeiro): o frame atual e as funções deste aplicativo."""
+    innermost = None
+    app_frames = []
+    while frame is not None and len(app_frames) < limit:
+        code = frame.f_code
+        entry = f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+        if innermost is None:
+            innermost = entry
+        elif os.path.dirname(os.path.abspath(code.co_filename)) == APP_DIR:
+            app_frames.append(entry)
+        frame = frame.f_back
+    return " <- ".join([innermost] + app_frames) if innermost else "(pilha indisponível)"
+
+
+class SamplingProfiler:
+    """Profiler por amostragem de uma thread (a do event loop do bot).
+
+    Uma thread separada lê a pilha da thread alvo a cada `interval_sec`
+    (sys._current_frames) e conta pilhas iguais; a thread amostrada não é
+    instrumentada. O resultado sai no formato "collapsed" (uma pilha por
+    linha, funções separadas por ';' e a contagem no fim), aceito pelo
+    flamegraph.pl, speedscope e inferno para gerar o flame graph.
+    """
+
+    def __init__(self, thread_id, interval_sec=0.01, max_depth=64):
+        self.thread_id = thread_id
+        self.interval_sec = interval_sec
+        self.max_depth = max_depth
+        self.samples = 0
+        self.elapsed_sec = 0.0
+        self._stacks = Counter()  # tupla de code objects (mais interno primeiro): amostras
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_sec):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue  # A thread terminou
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            self._stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.elapsed_sec += time.monotonic() - self._started
+
+    def collapsed(self):
+        """Linhas no formato collapsed (raiz primeiro), da pilha mais frequente para a menos."""
+        return [f"{';'.join(_label(code) for code in reversed(stack))} {count}"
+                for stack, count in self._stacks.most_common()]
+
+    def top_functions(self, n=10):
+        """Funções com mais amostras no topo da pilha (tempo próprio): [(função, fração)]."""
+        own = Counter()
+        for stack, count in self._stacks.items():
+            own[_label(stack[0])] += count
+        total = max(1, self.samples)
+        return [(label, count / total) for label, count in own.most_common(n)]
+
+    def dump(self, path):
+        """Grava as pilhas em `path`. Retorna quantas pilhas distintas foram gravadas."""
+        lines = self.collapsed()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n" if lines else "")
+        return len(lines)
+
+
+class _AsyncioLogForwarder(logging.Handler):
+    """Repassa os avisos "Executing ... took N seconds" do asyncio para o log do bot."""
+
+    def __init__(self, log):
+        super().__init__(logging.WARNING)
+        self.log = log
+
+    def emit(self, record):
+        if str(record.msg).startswith("Executing"):
+            message = record.getMessage()
+            self.log(f"Callback lento no event loop: {message[:400]}")
+
+
+class SlowCallbackMonitor:
+    """Detecção de callbacks lentos no event loop.
+
+    Liga o modo debug do asyncio com `slow_callback_duration` = limite (o
+    asyncio mede cada callback e registra os que passam do limite) e, em
+    paralelo, um watchdog envia um "ping" ao loop; se o ping não for
+    atendido dentro do limite, registra a pilha da thread do loop naquele
+    momento, apontando o handler que está bloqueando. `stop()` restaura o
+    modo debug anterior.
+    """
+
+    def __init__(self, loop, thread_id, threshold_sec, log):
+        self.loop = loop
+        self.thread_id = thread_id
+        self.threshold_sec = threshold_sec
+        self.log = log
+        self.stalls = 0  # Bloqueios detectados pelo watchdog
+        self._forwarder = _AsyncioLogForwarder(log)
+        self._previous = None
+        self._pending_since = None
+        self._reported = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._previous = (self.loop.get_debug(), self.loop.slow_callback_duration)
+        self.loop.call_soon_threadsafe(self._configure_loop, True, self.threshold_sec)
+        logging.getLogger("asyncio").addHandler(self._forwarder)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="SlowCallbackWatchdog", daemon=True)
+        self._thread.start()
+
+    def _configure_loop(self, debug, duration):
+        self.loop.set_debug(debug)
+        self.loop.slow_callback_duration = duration
+
+    def _pong(self):
+        self._pending_since = None
+        self._reported = False
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold_sec / 2):
+            pending_since = self._pending_since
+            if pending_since is None:
+                self._pending_since = time.monotonic()
+                try:
+                    self.loop.call_soon_threadsafe(self._pong)
+                except RuntimeError:
+                    return  # Loop fechado
+                continue
+            blocked = time.monotonic() - pending_since
+            if not self._reported and blocked > self.threshold_sec:
+                self._reported = True  # Um aviso por bloqueio
+                self.stalls += 1
+                frame = sys._current_frames().get(self.thread_id)
+                self.log(f"Event loop sem responder há {blocked * 1000:.0f} ms; pilha atual: {describe_stack(frame)}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logging.getLogger("asyncio").removeHandler(self._forwarder)
+        if self._previous is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._configure_loop, *self._previous)
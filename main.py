@@ -3,6 +3,7 @@ import customtkinter as ctk
 from gui import App # Importa a classe da GUI
 import sys # Para verificar se está rodando como script ou congelado (PyInstaller)
 import os
+import multiprocessing
 
 # Define o diretório base (útil para PyInstaller)
 if getattr(sys, 'frozen', False):
@@ -27,6 +28,9 @@ if __name__ == "__main__":
     # Linha removida: ctk.set_ctk_parent_class(ctk.CTk)
     # A inicialização padrão do CustomTkinter geralmente funciona bem.
 
+    # Necessário para os workers do modo supervisor (sharding.py) no executável do PyInstaller
+    multiprocessing.freeze_support()
+
     # Cria e executa a aplicação GUI
     app = App()
     app.mainloop()
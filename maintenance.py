@@ -0,0 +1,167 @@
+# maintenance.py
+import asyncio
+import inspect
+import sqlite3
+import time
+
+_MISSING = object()
+CHECK_CLOCK_EVERY = 64  # Itens processados entre consultas ao relógio dentro de uma fatia
+
+
+def sweep_mapping(mapping, is_stale, on_remove=None):
+    """Varredura incremental: remove de `mapping` as entradas para as quais is_stale(chave, valor) é True.
+
+    Gerador: devolve o controle a cada item (ver MaintenanceScheduler). Percorre
+    uma cópia das chaves, então o dicionário pode mudar entre as fatias; o
+    valor é relido no momento da verificação. `on_remove(chave, valor)` é
+    chamado para cada entrada removida. Retorna quantas entradas removeu.
+    """
+    removed = 0
+    for key in list(mapping):
+        value = mapping.get(key, _MISSING)
+        if value is not _MISSING and is_stale(key, value):
+            del mapping[key]
+            removed += 1
+            if on_remove is not None:
+                on_remove(key, value)
+        yield
+    return removed
+
+
+def compact_sqlite(path):
+    """Checkpoint do WAL (trunca o arquivo -wal) e PRAGMA optimize. Executar fora do event loop."""
+    conn = sqlite3.connect(path, timeout=10)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+
+class MaintenanceJob:
+    """Tarefa periódica e suas métricas de execução."""
+
+    def __init__(self, name, interval_sec, run):
+        self.name = name
+        self.interval_sec = interval_sec
+        self.run = run  # Função sem argumentos: retorna um gerador (fatiado), uma corrotina ou um número
+        self.running = False
+        self.runs = 0
+        self.skipped = 0  # Execuções puladas porque a anterior ainda não tinha terminado
+        self.errors = 0
+        self.processed = 0  # Itens examinados (varreduras) ou removidos
+        self.removed = 0
+        self.slices = 0
+        self.last_ms = 0.0  # Duração total da última execução (com as pausas entre fatias)
+        self.busy_ms = 0.0  # Tempo ocupando o event loop, somado
+        self.max_slice_ms = 0.0
+
+    def stats(self):
+        return {
+            "runs": self.runs, "skipped": self.skipped, "errors": self.errors,
+            "processed": self.processed, "removed": self.removed, "slices": self.slices,
+            "last_ms": round(self.last_ms, 1), "busy_ms": round(self.busy_ms, 1),
+            "max_slice_ms": round(self.max_slice_ms, 2),
+        }
+
+
+class MaintenanceScheduler:
+    """Manutenção periódica do estado do bot, no próprio event loop.
+
+    Usa o JobQueue do Application quando disponível (python-telegram-bot
+    instalado com o extra [job-queue]) e, sem ele, tarefas asyncio. Varreduras
+    são geradores executados em fatias de no máximo `slice_ms`; entre uma
+    fatia e outra o loop volta a processar updates, então nenhuma varredura
+    segura o bot por muito tempo, por maior que seja a estrutura.
+    """
+
+    def __init__(self, log, slice_ms=5.0):
+        self.log = log
+        self.slice_sec = slice_ms / 1000
+        self.jobs = {}
+        self._handles = []  # Jobs do JobQueue ou tarefas asyncio em execução
+
+    def add(self, name, interval_sec, run):
+        """Registra uma tarefa. interval_sec <= 0 desativa."""
+        if interval_sec and interval_sec > 0:
+            self.jobs[name] = MaintenanceJob(name, interval_sec, run)
+
+    def start(self, job_queue=None):
+        """Agenda as tarefas (a cada início de sessão; `stop()` na drenagem)."""
+        self.stop()
+        for job in self.jobs.values():
+            if job_queue is not None:
+                self._handles.append(job_queue.run_repeating(
+                    self._job_callback, interval=job.interval_sec, first=job.interval_sec,
+                    name=f"manutenção:{job.name}", data=job
+                ))
+            else:
+                self._handles.append(asyncio.get_running_loop().create_task(self._job_loop(job)))
+
+    def stop(self):
+        for handle in self._handles:
+            if isinstance(handle, asyncio.Task):
+                handle.cancel()
+            else:
+                handle.schedule_removal()
+        self._handles = []
+
+    async def _job_callback(self, context):
+        await self.run_job(context.job.data)
+
+    async def _job_loop(self, job):
+        while True:
+            await asyncio.sleep(job.interval_sec)
+            await self.run_job(job)
+
+    async def run_job(self, job):
+        """Executa a tarefa uma vez (pulando se a execução anterior ainda estiver em andamento)."""
+        if job.running:
+            job.skipped += 1
+            return
+        job.running = True
+        started = time.perf_counter()
+        try:
+            result = job.run()
+            if inspect.isgenerator(result):  # Antes de iscoroutine, que também aceita geradores em versões antigas
+                result = await self._run_sliced(job, result)
+            elif inspect.isawaitable(result):
+                result = await result
+            if isinstance(result, int):
+                job.removed += result
+            job.runs += 1
+        except Exception as e:
+            job.errors += 1
+            self.log(f"Manutenção '{job.name}' falhou: {e}")
+        finally:
+            job.running = False
+            job.last_ms = (time.perf_counter() - started) * 1000
+
+    async def _run_sliced(self, job, sweep):
+        """Avança o gerador em fatias de até slice_sec, cedendo o loop entre elas. Retorna o valor do gerador."""
+        while True:
+            slice_started = time.perf_counter()
+            deadline = slice_started + self.slice_sec
+            try:
+                count = 0
+                while True:
+                    next(sweep)
+                    count += 1
+                    if count % CHECK_CLOCK_EVERY == 0 and time.perf_counter() >= deadline:
+                        break
+            except StopIteration as stop:
+                self._account_slice(job, slice_started, count)
+                return stop.value
+            self._account_slice(job, slice_started, count)
+            await asyncio.sleep(0)  # Updates pendentes rodam antes da próxima fatia
+
+    @staticmethod
+    def _account_slice(job, slice_started, count):
+        elapsed_ms = (time.perf_counter() - slice_started) * 1000
+        job.slices += 1
+        job.processed += count
+        job.busy_ms += elapsed_ms
+        job.max_slice_ms = max(job.max_slice_ms, elapsed_ms)
+
+    def stats(self):
+        return {name: job.stats() for name, job in self.jobs.items()}
@@ -0,0 +1,278 @@
+# media_blocklist.py
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+
+BLOCKLIST_FILE = "media_blocklist.db"
+CHANGE_LOG_LIMIT = 100000  # Alterações guardadas para a atualização incremental dos bots
+
+KIND_FILE = "file"  # file_unique_id de documento, foto, vídeo, sticker...
+KIND_STICKER_SET = "set"  # Nome do pacote de stickers
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocklist (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    added_by TEXT,
+    note TEXT
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    added INTEGER NOT NULL
+);
+"""
+
+
+def media_key(kind, value):
+    """Chave armazenada: 'file:<file_unique_id>' ou 'set:<nome do pacote>'."""
+    return f"{kind}:{value}"
+
+
+def message_media_keys(message):
+    """Chaves de bloqueio de um telegram.Message (vazio se não houver mídia)."""
+    keys = []
+    media = (message.document or message.video or message.audio or message.voice or
+             message.animation or message.video_note or message.sticker)
+    if media is not None:
+        keys.append(media_key(KIND_FILE, media.file_unique_id))
+    if message.photo:
+        keys.append(media_key(KIND_FILE, message.photo[-1].file_unique_id))  # Maior resolução
+    if message.sticker and message.sticker.set_name:
+        keys.append(media_key(KIND_STICKER_SET, message.sticker.set_name))
+    return tuple(keys)
+
+
+class BloomFilter:
+    """Filtro de Bloom: 'com certeza não está' ou 'talvez esteja', em O(k) e memória fixa.
+
+    Ex.: 1M de itens com 0,1% de falsos positivos ocupam ~1,8 MB.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class MediaBlocklist:
+    """Lista de mídias proibidas (file_unique_id e pacotes de stickers) em SQLite.
+
+    Com `use_bloom`, um filtro de Bloom em memória descarta quase todas as
+    consultas sem tocar no disco; só os "talvez" são confirmados no SQLite
+    (o que também torna as remoções corretas, já que o filtro não remove).
+    Sem o filtro, todas as chaves ficam num set em memória.
+    Adições e remoções ficam registradas em `changes` (como em word_lists.py);
+    `refresh()` aplica só as alterações feitas por outras conexões (ex.: a GUI)
+    desde a última leitura. No bot, `might_match` roda no event loop (só
+    memória); `match` e `refresh` consultam o disco e rodam no executor.
+    Com `preload=False` (edição pela GUI) nada é carregado em memória e
+    `match` não deve ser usado.
+    """
+
+    def __init__(self, path=BLOCKLIST_FILE, use_bloom=True, expected_entries=1_000_000,
+                 error_rate=0.001, refresh_interval_sec=5.0, preload=True):
+        self.path = path
+        self.use_bloom = use_bloom
+        self.expected_entries = expected_entries
+        self.error_rate = error_rate
+        self.refresh_interval_sec = refresh_interval_sec
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._last_refresh = 0.0
+        self.checks = 0
+        self.disk_lookups = 0
+        self._bloom = None
+        self._keys = None
+        self._last_change = 0
+        self._count = self._conn.execute("SELECT COUNT(*) FROM blocklist").fetchone()[0]
+        if preload:
+            self._reload()
+
+    # --- Carga ---
+
+    def _reload(self):
+        """(Re)constrói o filtro ou o set a partir do banco e troca o atual de uma vez."""
+        bloom = BloomFilter(self.expected_entries, self.error_rate) if self.use_bloom else None
+        keys = None if self.use_bloom else set()
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            last_change = self._conn.execute("SELECT MAX(id) FROM changes").fetchone()[0] or 0
+            for (key,) in self._conn.execute("SELECT key FROM blocklist"):
+                if bloom is not None:
+                    bloom.add(key)
+                else:
+                    keys.add(key)
+            self._bloom, self._keys = bloom, keys
+            self._last_change = last_change
+            self._count = self._conn.execute("SELECT COUNT(*) FROM blocklist").fetchone()[0]
+            self._data_version = data_version
+
+    def _log_change(self, key, added):
+        self._conn.execute("INSERT INTO changes (key, added) VALUES (?, ?)", (key, int(added)))
+        last_id = self._conn.execute("SELECT MAX(id) FROM changes").fetchone()[0]
+        self._conn.execute("DELETE FROM changes WHERE id <= ?", (last_id - CHANGE_LOG_LIMIT,))
+
+    def refresh(self, force=False):
+        """Incorpora alterações feitas por outras conexões (barato quando nada mudou). Faz I/O."""
+        if self._bloom is None and self._keys is None:
+            return  # preload=False: nada em memória para atualizar
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval_sec:
+            return
+        self._last_refresh = now
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return
+            oldest = self._conn.execute("SELECT MIN(id) FROM changes").fetchone()[0]
+            needs_reload = oldest is not None and oldest > self._last_change + 1
+            if not needs_reload:
+                # As próprias alterações também voltam aqui; aplicá-las de novo não muda nada
+                for change_id, key, added in self._conn.execute(
+                        "SELECT id, key, added FROM changes WHERE id > ? ORDER BY id", (self._last_change,)):
+                    if added:
+                        if self._bloom is not None:
+                            self._bloom.add(key)
+                        else:
+                            self._keys.add(key)
+                    elif self._keys is not None:
+                        self._keys.discard(key)  # O filtro de Bloom não remove: o SQLite confirma
+                    self._last_change = change_id
+                self._count = self._conn.execute("SELECT COUNT(*) FROM blocklist").fetchone()[0]
+                self._data_version = data_version
+        if needs_reload:
+            self._reload()  # O log foi podado além do ponto em que paramos
+
+    # --- Consulta ---
+
+    def might_match(self, keys):
+        """True se alguma chave pode estar bloqueada. Só memória: seguro no event loop.
+
+        Com o set a resposta é exata; com o filtro de Bloom, "talvez" precisa de `match`.
+        """
+        if self._keys is not None:
+            return any(key in self._keys for key in keys)
+        return self._bloom is not None and any(key in self._bloom for key in keys)
+
+    def match(self, keys):
+        """Primeira chave bloqueada entre `keys` ou None. Pode consultar o disco.
+
+        Não incorpora alterações de outras conexões: isso é feito por `refresh()`.
+        """
+        if not keys:
+            return None
+        for key in keys:
+            self.checks += 1
+            if self._keys is not None:
+                if key in self._keys:
+                    return key
+                continue
+            if key not in self._bloom:
+                continue  # Certamente não está: nada de disco
+            self.disk_lookups += 1
+            with self._lock:
+                found = self._conn.execute("SELECT 1 FROM blocklist WHERE key = ?", (key,)).fetchone()
+            if found:
+                return key
+        return None
+
+    def __contains__(self, key):
+        return self.match((key,)) is not None
+
+    # --- Edição ---
+
+    def add(self, key, added_by=None, note=None):
+        """Adiciona uma chave ('file:...' ou 'set:...'). Retorna True se era nova."""
+        kind = key.split(":", 1)[0]
+        if kind not in (KIND_FILE, KIND_STICKER_SET):
+            raise ValueError(f"Chave inválida: {key}")
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO blocklist (key, kind, added_at, added_by, note) VALUES (?, ?, ?, ?, ?)",
+                    (key, kind, time.time(), added_by, note)
+                )
+                if cursor.rowcount:
+                    self._log_change(key, True)
+            if not cursor.rowcount:
+                return False
+            if self._bloom is not None:
+                self._bloom.add(key)
+            elif self._keys is not None:
+                self._keys.add(key)
+            self._count += 1
+            return True
+
+    def remove(self, key):
+        """Remove uma chave. Retorna True se existia."""
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute("DELETE FROM blocklist WHERE key = ?", (key,))
+                if cursor.rowcount:
+                    self._log_change(key, False)
+            if not cursor.rowcount:
+                return False
+            if self._keys is not None:
+                self._keys.discard(key)
+            self._count -= 1
+            return True
+
+    def search(self, prefix="", limit=100, offset=0):
+        """Entradas mais recentes primeiro, opcionalmente filtradas por prefixo da chave."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, added_at, added_by, note FROM blocklist WHERE key >= ? AND key < ? "
+                "ORDER BY id DESC LIMIT ? OFFSET ?",
+                (prefix, prefix + "\uffff", limit, offset)
+            ).fetchall()
+        return [dict(zip(("key", "added_at", "added_by", "note"), row)) for row in rows]
+
+    def total(self):
+        """Total de entradas no banco (inclui as adicionadas por outras conexões)."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM blocklist").fetchone()[0]
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_media_blocklist(config):
+    """MediaBlocklist conforme config['media_blocklist'] ou None se desativada."""
+    settings = config.get("media_blocklist", {})
+    if not settings.get("enabled", True):
+        return None
+    return MediaBlocklist(
+        settings.get("path", BLOCKLIST_FILE),
+        use_bloom=settings.get("bloom_filter", True),
+        expected_entries=settings.get("expected_entries", 1_000_000),
+        error_rate=settings.get("false_positive_rate", 0.001),
+        refresh_interval_sec=settings.get("refresh_interval_sec", 5.0)
+    )
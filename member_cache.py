@@ -0,0 +1,97 @@
+# member_cache.py
+import asyncio
+import time
+from maintenance import sweep_mapping
+
+
+class MemberStatusCache:
+    """Cache com TTL do status de membros (get_chat_member) por (chat_id, user_id).
+
+    Consultas simultâneas para o mesmo membro são agrupadas em uma única
+    requisição em andamento.
+    """
+
+    def __init__(self, ttl_sec=60, max_entries=10000):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._entries = {}  # (chat_id, user_id): (expira_em, member)
+        self._in_flight = {}  # (chat_id, user_id): asyncio.Future
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, chat_id, user_id, fetch):
+        """Retorna o membro em cache ou chama `fetch()` (corrotina) uma única vez."""
+        key = (chat_id, user_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            # Já existe uma consulta em andamento para este membro
+            self.hits += 1
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            member = await fetch()
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # Evita aviso de "exception never retrieved" quando ninguém aguarda
+                future.exception()
+            raise
+        else:
+            # Só guarda se ninguém invalidou a entrada durante a consulta
+            if self._in_flight.get(key) is future:
+                self._store(key, member)
+            if not future.done():
+                future.set_result(member)
+            return member
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def set(self, chat_id, user_id, member):
+        """Atualiza a entrada a partir de um ChatMember já conhecido (ex.: update ChatMemberHandler)."""
+        self._store((chat_id, user_id), member)
+
+    def invalidate(self, chat_id, user_id):
+        """Remove a entrada do cache (após restringir, liberar ou banir o usuário)."""
+        key = (chat_id, user_id)
+        self._entries.pop(key, None)
+        # Consultas em andamento terminam normalmente, mas o resultado não é guardado
+        self._in_flight.pop(key, None)
+
+    def clear(self):
+        """Esvazia o cache."""
+        self._entries.clear()
+        self._in_flight.clear()
+
+    def purge_expired(self):
+        """Remove entradas expiradas. Retorna quantas foram removidas."""
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+    def sweep_expired(self):
+        """Como purge_expired, mas incremental (gerador executado em fatias pelo MaintenanceScheduler)."""
+        now = time.monotonic()
+        return sweep_mapping(self._entries, lambda key, entry: entry[0] <= now)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, member):
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            if not self.purge_expired():
+                # Descarta a entrada mais antiga (dicts preservam ordem de inserção)
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + self.ttl_sec, member)
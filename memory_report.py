@@ -0,0 +1,141 @@
+# memory_report.py
+import concurrent.futures
+import importlib.util
+import itertools
+import os
+import sys
+import tracemalloc
+from collections import deque
+
+HAS_PSUTIL = importlib.util.find_spec("psutil") is not None
+EVICT_TO = 0.9  # Ao passar do limite, descarta até esta fração dele (evita despejar a cada verificação)
+
+_CONTAINERS = (dict, list, tuple, set, frozenset, deque)
+
+
+def estimate_size(obj, sample_size=64, depth=6):
+    """Bytes estimados de um objeto e do que ele contém.
+
+    Containers grandes não são percorridos por inteiro: o tamanho médio de
+    `sample_size` itens é extrapolado para todos (custo fixo por container,
+    seguro para chamar com milhões de entradas). Objetos compartilhados
+    (ints e strings internados) podem ser contados mais de uma vez.
+    """
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        count = len(obj)
+        items = list(itertools.islice(obj.items(), sample_size))
+        if items:
+            inner = max(8, sample_size // 4)  # Amostras menores nos níveis internos (custo limitado)
+            sampled = sum(estimate_size(k, inner, depth - 1) + estimate_size(v, inner, depth - 1) for k, v in items)
+            size += sampled * count // len(items)
+    elif isinstance(obj, _CONTAINERS):
+        count = len(obj)
+        items = list(itertools.islice(obj, sample_size))
+        if items:
+            inner = max(8, sample_size // 4)
+            size += sum(estimate_size(item, inner, depth - 1) for item in items) * count // len(items)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += estimate_size(vars(obj), sample_size, depth - 1)
+    return size
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.2f} GB"
+
+
+def process_memory():
+    """Memória residente (RSS) do processo em bytes, ou None se não for possível medir."""
+    if HAS_PSUTIL:
+        import psutil
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def structure_row(name, obj, entries, limit=None):
+    """Linha do relatório: {'name', 'entries', 'bytes', 'limit'}."""
+    return {"name": name, "entries": entries, "bytes": estimate_size(obj), "limit": limit}
+
+
+def pop_oldest(mapping, target):
+    """Remove as entradas mais antigas (ordem de inserção) até sobrarem `target`. Retorna os pares (chave, valor) removidos."""
+    excess = len(mapping) - max(0, target)
+    if excess <= 0:
+        return []
+    return [(key, mapping.pop(key)) for key in list(itertools.islice(mapping, excess))]
+
+
+def trim_oldest(mapping, target):
+    """Como pop_oldest, mas retorna só quantas entradas removeu."""
+    return len(pop_oldest(mapping, target))
+
+
+def format_report(sections, rss=None):
+    """Texto do relatório. `sections` = [(título, [linhas de structure_row])]."""
+    lines = []
+    if rss is not None:
+        lines.append(f"Memória do processo (RSS): {format_bytes(rss)}")
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"tracemalloc: {format_bytes(current)} em uso, pico {format_bytes(peak)}")
+    for title, rows in sections:
+        lines.append("")
+        lines.append(f"== {title}")
+        lines.append(f"{'estrutura':<24} {'entradas':>10} {'estimado':>12} {'limite':>10}")
+        for row in rows:
+            limit = row["limit"] if row["limit"] else "-"
+            lines.append(f"{row['name']:<24} {row['entries']:>10} {format_bytes(row['bytes']):>12} {limit:>10}")
+        lines.append(f"{'total':<24} {'':>10} {format_bytes(sum(row['bytes'] for row in rows)):>12}")
+    return "\n".join(lines)
+
+
+def start_tracemalloc(frames=1):
+    """Ativa o tracemalloc (aumenta o uso de memória e de CPU enquanto ativo). Retorna False se já estava ativo."""
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(frames)
+    return True
+
+
+def stop_tracemalloc():
+    tracemalloc.stop()
+
+
+def tracemalloc_top(limit=15, key_type="lineno"):
+    """As `limit` linhas de código com mais memória alocada (snapshot atual), ou None se inativo."""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    lines = []
+    for stat in snapshot.statistics(key_type)[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"{format_bytes(stat.size):>10} {stat.count:>8} blocos  {os.path.basename(frame.filename)}:{frame.lineno}")
+    return lines
+
+
+def bots_report(bots, extra_sections=(), tracemalloc_limit=15, timeout=5.0):
+    """Relatório completo (texto) de vários bots. Chamar fora do event loop (GUI/CLI)."""
+    sections = []
+    for bot in bots:
+        try:
+            sections.append((f"Bot {bot.name}", bot.memory_report(timeout)))
+        except concurrent.futures.TimeoutError:
+            sections.append((f"Bot {bot.name} (sem resposta do event loop em {timeout:.0f}s)", []))
+    text = format_report(sections + list(extra_sections), process_memory())
+    top = tracemalloc_top(tracemalloc_limit)
+    if top is not None:
+        text += "\n\n== tracemalloc (maiores alocações por linha)\n" + "\n".join(top)
+    return text
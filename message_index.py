@@ -0,0 +1,56 @@
+# message_index.py
+from collections import OrderedDict, deque
+
+
+class RecentMessageIndex:
+    """Índice em memória dos IDs das mensagens recentes de cada usuário, por chat.
+
+    Memória limitada: no máximo `per_user` IDs por usuário e `max_users_per_chat`
+    usuários por chat (os menos ativos são descartados primeiro).
+    """
+
+    def __init__(self, per_user=50, max_users_per_chat=5000):
+        self.per_user = per_user
+        self.max_users_per_chat = max_users_per_chat
+        self._chats = {}  # chat_id: OrderedDict(user_id: deque[message_id])
+
+    def add(self, chat_id, user_id, message_id):
+        """Registra uma mensagem enviada pelo usuário."""
+        users = self._chats.get(chat_id)
+        if users is None:
+            users = self._chats[chat_id] = OrderedDict()
+        ids = users.get(user_id)
+        if ids is None:
+            if len(users) >= self.max_users_per_chat:
+                users.popitem(last=False)  # Usuário inativo há mais tempo
+            ids = users[user_id] = deque(maxlen=self.per_user)
+        else:
+            users.move_to_end(user_id)
+        ids.append(message_id)
+
+    def pop_user(self, chat_id, user_id):
+        """Remove e retorna os IDs recentes do usuário no chat (mais antigos primeiro)."""
+        users = self._chats.get(chat_id)
+        if not users:
+            return []
+        ids = users.pop(user_id, None)
+        if not users:
+            del self._chats[chat_id]
+        return list(ids) if ids else []
+
+    def user_count(self):
+        """Número total de usuários indexados (todos os chats)."""
+        return sum(len(users) for users in self._chats.values())
+
+    def message_count(self):
+        """Número total de IDs de mensagens indexados (todos os chats)."""
+        return sum(len(ids) for users in self._chats.values() for ids in users.values())
+
+    def clear(self):
+        self._chats.clear()
+
+
+def chunked(items, size):
+    """Divide uma lista em blocos de até `size` itens."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
@@ -0,0 +1,108 @@
+# metrics.py
+import time
+from collections import defaultdict, deque
+
+
+class TimeSeriesRing:
+    """Série temporal de tamanho fixo (buffer circular de (timestamp, valor))."""
+
+    def __init__(self, capacity=300):
+        self._points = deque(maxlen=capacity)
+
+    def append(self, ts, value):
+        self._points.append((ts, value))
+
+    def snapshot(self):
+        """Cópia dos pontos. Seguro para leitura a partir de outra thread."""
+        return list(self._points)
+
+    def last(self, default=0):
+        try:
+            return self._points[-1][1]
+        except IndexError:
+            return default
+
+    def __len__(self):
+        return len(self._points)
+
+
+def percentile(sorted_values, q):
+    """Percentil `q` (0 a 1) de uma lista já ordenada."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * (len(sorted_values) - 1) + 0.5))]
+
+
+class BotMetrics:
+    """Métricas em memória do bot, amostradas uma vez por intervalo em séries limitadas.
+
+    Os contadores são incrementados no event loop do bot (O(1) por evento);
+    `sample()` consolida o intervalo e grava uma amostra por série.
+    A GUI só lê as séries (`series_snapshot`).
+    """
+
+    def __init__(self, capacity=300, max_latency_samples=4096):
+        self.capacity = capacity
+        self.series = defaultdict(lambda: TimeSeriesRing(self.capacity))
+        self.version = 0  # Incrementa a cada amostra (a GUI só redesenha se mudou)
+        self._updates = 0
+        self._rule_hits = defaultdict(int)
+        self.rule_hits_total = defaultdict(int)
+        self._latencies = deque(maxlen=max_latency_samples)
+        self._last_sample = time.monotonic()
+        self._last_api_calls = 0
+        self._last_api_failures = 0
+
+    # --- Eventos (event loop do bot) ---
+
+    def record_update(self):
+        self._updates += 1
+
+    def record_rule_hit(self, rule):
+        self._rule_hits[rule] += 1
+        self.rule_hits_total[rule] += 1
+
+    def record_latency(self, ms):
+        self._latencies.append(ms)
+
+    # --- Amostragem ---
+
+    def sample(self, api_calls=0, api_failures=0, gauges=None, now=None):
+        """Consolida o intervalo desde a última amostra.
+
+        `api_calls`/`api_failures` são contadores acumulados; `gauges` são valores
+        instantâneos (profundidade das filas, verificações pendentes...).
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = max(now - self._last_sample, 1e-6)
+        ts = time.time()
+
+        self.series["updates_per_sec"].append(ts, self._updates / elapsed)
+        self._updates = 0
+
+        latencies = sorted(self._latencies)
+        self._latencies.clear()
+        self.series["latency_p50_ms"].append(ts, percentile(latencies, 0.50))
+        self.series["latency_p99_ms"].append(ts, percentile(latencies, 0.99))
+
+        calls = api_calls - self._last_api_calls
+        failures = api_failures - self._last_api_failures
+        self._last_api_calls, self._last_api_failures = api_calls, api_failures
+        self.series["api_error_rate"].append(ts, 100.0 * failures / calls if calls > 0 else 0.0)
+
+        for rule in list(self.rule_hits_total):
+            self.series[f"rule:{rule}"].append(ts, self._rule_hits.get(rule, 0))
+        self._rule_hits.clear()
+
+        for name, value in (gauges or {}).items():
+            self.series[name].append(ts, value)
+
+        self._last_sample = now
+        self.version += 1
+
+    def series_snapshot(self, name):
+        ring = self.series.get(name)
+        return ring.snapshot() if ring is not None else []
+
+    def rule_names(self):
+        return sorted(self.rule_hits_total)
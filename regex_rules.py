@@ -0,0 +1,235 @@
+# regex_rules.py
+import importlib.util
+import re
+import string
+import time
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+    from re import _constants as sre_constants
+    from re import _compiler as sre_compile
+except ImportError:
+    import sre_parse
+    import sre_constants
+    import sre_compile
+
+ACTIONS = ("delete", "ban")
+STDLIB_MAX_REPEAT = 100  # Sem o pacote regex: teto de +, * e {n,} (limita a varredura a partir de cada posição)
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+_SINGLE_CHAR = {sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.IN, sre_constants.ANY}
+# Caracteres usados para saber se dois quantificadores podem consumir o mesmo trecho do texto
+_SAMPLE_CHARS = string.printable + "áàâãéêíóôõúçÁÀÂÃÉÊÍÓÔÕÚÇ\u00a0"
+
+
+def _regex_module():
+    """Módulo `regex` (opcional), que permite interromper uma busca por tempo."""
+    if importlib.util.find_spec("regex") is None:
+        return None
+    import regex
+    return regex
+
+
+def _has_repeat(items):
+    for op, av in items:
+        if op in _REPEATS and (av[1] == sre_constants.MAXREPEAT or av[1] > 1):
+            return True
+        if any(_has_repeat(sub) for sub in _children(op, av)):
+            return True
+    return False
+
+
+def _children(op, av):
+    """Subpadrões de um nó da árvore do sre_parse."""
+    if op in _REPEATS or op == getattr(sre_constants, "POSSESSIVE_REPEAT", None):
+        return [av[2]]
+    if op == sre_constants.SUBPATTERN:
+        return [av[-1]]
+    if op == sre_constants.BRANCH:
+        return av[1]
+    if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+        return [av[1]]
+    if op == getattr(sre_constants, "ATOMIC_GROUP", None):
+        return [av]
+    return []
+
+
+def _has_alternative(items):
+    """Alternativas (a|aa) ou partes opcionais (a?) em qualquer nível."""
+    for op, av in items:
+        if op == sre_constants.BRANCH or (op in _REPEATS and av[0] != av[1]):
+            return True
+        if any(_has_alternative(sub) for sub in _children(op, av)):
+            return True
+    return False
+
+
+def _chars(state, item):
+    """Caracteres de _SAMPLE_CHARS aceitos por um item de um caractere (None se o item for mais largo)."""
+    if item[0] not in _SINGLE_CHAR:
+        return None
+    compiled = sre_compile.compile(sre_parse.SubPattern(state, [item]), re.IGNORECASE | re.DOTALL)
+    return {char for char in _SAMPLE_CHARS if compiled.match(char)}
+
+
+def _check_sequence(state, items):
+    """Quantificadores ilimitados em sequência que disputam os mesmos caracteres (\\w*\\w*, \\w+\\s*\\w+)."""
+    active = []  # Caracteres dos quantificadores ilimitados que ainda podem se estender
+    for op, av in items:
+        if op in _REPEATS and len(av[2]) == 1:
+            chars = _chars(state, av[2][0])
+            if chars is not None and av[1] == sre_constants.MAXREPEAT:
+                if av[0] > 0:
+                    active = [previous for previous in active if chars <= previous]  # Ver abaixo
+                if any(chars & previous for previous in active):
+                    raise ValueError("Quantificadores seguidos sobre os mesmos caracteres, como \\w*\\w* ou "
+                                     "\\w+\\s*\\w+, podem travar a avaliação; separe-os com um trecho obrigatório.")
+                active.append(chars)
+                continue
+            if av[0] == 0:
+                continue  # Opcional: não separa os quantificadores anteriores
+            item_chars = chars
+        elif op == sre_constants.AT:
+            continue  # Âncoras (\\b, ^, $) não consomem caracteres
+        else:
+            item_chars = _chars(state, (op, av))
+        if item_chars is None:
+            active = []  # Trecho complexo: os subpadrões são conferidos à parte
+        else:
+            # Um caractere obrigatório que um quantificador não aceita encerra esse quantificador
+            active = [chars for chars in active if item_chars <= chars]
+
+
+def _check_tree(state, items):
+    """Levanta ValueError em construções sujeitas a backtracking catastrófico."""
+    _check_sequence(state, items)
+    for op, av in items:
+        if op == sre_constants.GROUPREF or op == sre_constants.GROUPREF_EXISTS:
+            raise ValueError("Referências a grupos (\\1, (?(1)...)) não são permitidas.")
+        if op in _REPEATS and (av[1] == sre_constants.MAXREPEAT or av[1] > 1):
+            if _has_repeat(av[2]):
+                raise ValueError("Quantificadores aninhados, como (a+)+ ou (\\w*)*, podem travar a avaliação.")
+            if _has_alternative(av[2]):
+                raise ValueError("Grupos repetidos com alternativas ou partes opcionais, como (a|aa)+ ou (a?b)+, "
+                                 "podem travar a avaliação.")
+        for sub in _children(op, av):
+            _check_tree(state, sub)
+
+
+def _cap_repeats(items, cap):
+    """Troca os quantificadores ilimitados da árvore por {min,cap} (no lugar)."""
+    repeats = _REPEATS | {getattr(sre_constants, "POSSESSIVE_REPEAT", None)}
+    for index, (op, av) in enumerate(items):
+        if op in repeats and av[1] == sre_constants.MAXREPEAT:
+            av = (av[0], max(av[0], cap), av[2])
+            items[index] = (op, av)
+        for sub in _children(op, av):
+            _cap_repeats(sub, cap)
+
+
+def _compile_capped(pattern, cap):
+    """Compila com o re da biblioteca padrão, limitando os quantificadores ilimitados a `cap` repetições.
+
+    O re não pode ser interrompido no meio de uma busca e, a partir de cada
+    posição do texto, um \\w+ percorreria o resto da sequência: com o teto, o
+    custo fica proporcional ao tamanho do texto. Uma ocorrência continua sendo
+    encontrada (o trecho inicial casa); só sequências de mais de `cap`
+    caracteres seguidas de outro trecho obrigatório deixam de casar.
+    """
+    parsed = sre_parse.parse(pattern)
+    _cap_repeats(parsed, cap)
+    return sre_compile.compile(parsed, parsed.state.flags)
+
+
+def validate_pattern(pattern):
+    """Valida uma expressão antes de salvar. Levanta ValueError com a explicação."""
+    if not pattern:
+        raise ValueError("Expressão vazia.")
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error as e:
+        raise ValueError(f"Expressão inválida: {e}") from e
+    if parsed.state.groupdict:
+        raise ValueError("Grupos nomeados não são permitidos; use (...) ou (?:...).")
+    try:
+        re.compile(f"(?:{pattern})")  # Como a regra entra no padrão combinado
+    except re.error as e:
+        raise ValueError("Flags globais como (?i) ou (?x) não são permitidas; use (?i:...) no trecho desejado.") from e
+    _check_tree(parsed.state, parsed)
+
+
+class RegexRuleSet:
+    """Regras regex personalizadas compiladas numa única alternância.
+
+    Cada regra vira um grupo nomeado (r0, r1, ...), então uma só varredura do
+    texto avalia todas e `lastgroup` diz qual regra casou. Regras inválidas são
+    ignoradas e listadas em `errors`.
+
+    Proteção contra backtracking: a validação rejeita quantificadores aninhados,
+    grupos repetidos com alternativas, quantificadores seguidos que disputam os
+    mesmos caracteres e referências a grupos, e o texto é limitado a
+    `max_text_chars`. Com o pacote opcional `regex` instalado, a busca também é
+    interrompida ao esgotar `time_budget_ms`. Sem ele, o re da biblioteca
+    padrão não pode ser interrompido no meio de uma busca: os quantificadores
+    ilimitados são limitados a `STDLIB_MAX_REPEAT` (ver _compile_capped) e o
+    tempo é conferido entre uma ocorrência e outra.
+    """
+
+    def __init__(self, rules, time_budget_ms=50, max_text_chars=4096):
+        self.rules = []
+        self.errors = []
+        self.time_budget = time_budget_ms / 1000
+        self.max_text_chars = max_text_chars
+        self.hits = {}  # nome da regra: ocorrências
+        self.timeouts = 0
+        parts = []
+        for rule in rules:
+            if not rule.get("enabled", True):
+                continue
+            name = rule.get("name") or f"regra {len(self.rules) + 1}"
+            try:
+                validate_pattern(rule.get("pattern", ""))
+                if rule.get("action", "delete") not in ACTIONS:
+                    raise ValueError(f"Ação inválida: {rule.get('action')}")
+            except ValueError as e:
+                self.errors.append(f"{name}: {e}")
+                continue
+            flags = "(?i:" if rule.get("ignore_case", True) else "(?:"
+            part = f"(?P<r{len(self.rules)}>{flags}{rule['pattern']}))"
+            try:
+                re.compile(part)  # Uma regra que não compila sozinha derrubaria o padrão combinado
+            except re.error as e:
+                self.errors.append(f"{name}: Expressão inválida: {e}")
+                continue
+            parts.append(part)
+            self.rules.append({"name": name, "action": rule.get("action", "delete")})
+        self._regex = _regex_module()
+        self._pattern = None
+        if parts:
+            combined = "|".join(parts)
+            self._pattern = self._regex.compile(combined) if self._regex else _compile_capped(combined, STDLIB_MAX_REPEAT)
+
+    def match(self, text):
+        """Regras que casaram com o texto: lista de (nome, ação). Uma regra de banimento encerra a busca."""
+        if self._pattern is None or not text:
+            return []
+        text = text[:self.max_text_chars]
+        deadline = time.perf_counter() + self.time_budget
+        found = {}
+        try:
+            if self._regex:
+                matches = self._pattern.finditer(text, timeout=self.time_budget)
+            else:
+                matches = self._pattern.finditer(text)
+            for match in matches:
+                rule = self.rules[int(match.lastgroup[1:])]
+                found.setdefault(rule["name"], rule["action"])
+                if rule["action"] == "ban" or time.perf_counter() > deadline:
+                    break
+        except TimeoutError:
+            pass
+        if time.perf_counter() > deadline:
+            self.timeouts += 1
+        for name in found:
+            self.hits[name] = self.hits.get(name, 0) + 1
+        return list(found.items())
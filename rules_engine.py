@@ -0,0 +1,215 @@
+# rules_engine.py
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+from regex_rules import RegexRuleSet
+
+GREETINGS = ["oi", "ola", "olá", "bom dia", "boa tarde", "boa noite", "tudo bem"]
+LINK_MARKERS = ('http://', 'https://', 'www.', '.com', '.net', '.org')
+
+
+@dataclass
+class MessageInfo:
+    """Dados de uma mensagem usados pelas regras.
+
+    Não depende do python-telegram-bot e é serializável (pickle), então pode
+    ser avaliada em outro processo (ver sharding.py).
+    """
+    chat_id: int
+    user_id: int
+    message_id: int
+    user_name: str = ""
+    text: str = ""
+    has_link_entity: bool = False
+    has_document: bool = False
+    document_mime: Optional[str] = None
+    has_media: bool = False  # Foto, vídeo, áudio, voz ou sticker
+    ts: float = 0.0
+
+    @classmethod
+    def from_message(cls, message):
+        """Extrai os campos de um telegram.Message."""
+        user = message.from_user
+        return cls(
+            chat_id=message.chat_id,
+            user_id=user.id,
+            message_id=message.message_id,
+            user_name=user.first_name,
+            text=message.text or message.caption or "", # Pega texto da msg ou legenda de midia
+            has_link_entity=any(entity.type in ['url', 'text_link'] for entity in message.entities or []),
+            has_document=message.document is not None,
+            document_mime=message.document.mime_type if message.document else None,
+            has_media=bool(message.photo or message.video or message.audio or message.voice or message.sticker),
+            ts=time.time()
+        )
+
+
+@dataclass
+class Verdict:
+    """Resultado da avaliação: o que fazer com a mensagem e o autor."""
+    delete: bool = False
+    ban: bool = False
+    ban_reason: str = ""
+    rule: Optional[str] = None  # Primeira regra que disparou (para o log de auditoria)
+    hits: list = field(default_factory=list)  # Mensagens de log das regras que dispararam
+
+
+class RuleEngine:
+    """Avalia as regras de moderação de uma mensagem.
+
+    Sem I/O e sem dependência do Telegram. O único estado é o histórico de
+    mensagens por usuário/chat usado pela regra de spam/flood; por isso um
+    chat deve ser sempre avaliado pela mesma instância. As regras regex
+    compiladas ficam em cache até a lista de regras mudar.
+
+    As listas de palavras grandes vêm de `word_lists` (ver word_lists.py; quem
+    cria o engine é responsável por chamar `word_lists.refresh()`); palavras
+    ainda guardadas em `rules` também são consideradas.
+    """
+
+    def __init__(self, word_lists=None):
+        self.user_message_counts = defaultdict(lambda: defaultdict(list)) # user_id: {chat_id: [timestamp1, timestamp2,...]}
+        self.word_lists = word_lists
+        self._regex_source = None  # Lista de regras usada para compilar _regex_rules
+        self._regex_rules = None
+
+    def regex_rules(self, rules):
+        """Regras regex personalizadas compiladas (recompila só quando a configuração muda)."""
+        source = rules.get("custom_regex_rules", [])
+        if self._regex_rules is None or source is not self._regex_source:
+            self._regex_source = source
+            self._regex_rules = RegexRuleSet(
+                source,
+                time_budget_ms=rules.get("regex_time_budget_ms", 50),
+                max_text_chars=rules.get("regex_max_text_chars", 4096)
+            )
+        return self._regex_rules
+
+    def find_word(self, list_name, rules, text):
+        """Primeira palavra da lista contida no texto (em minúsculas) ou None."""
+        matcher = self.word_lists.matcher(list_name) if self.word_lists is not None else None
+        if matcher is not None:
+            found = matcher.search(text)
+            if found:
+                return found
+        return next((word for word in rules.get(list_name, []) if word.lower() in text), None)
+
+    def evaluate(self, info: MessageInfo, rules: dict) -> Verdict:
+        verdict = Verdict()
+        text = info.text
+        who = f"{info.user_name}({info.user_id})"
+
+        # 1. Palavrões/Ofensas
+        if rules.get("block_profanity"):
+            if self.find_word("profanity_list", rules, text.lower()):
+                verdict.hits.append(f"Palavrão detectado de {who}: {text}")
+                verdict.delete = True
+                verdict.ban = True
+                verdict.ban_reason = "Conteúdo ofensivo"
+                verdict.rule = "profanity"
+
+        # 2. Fora de Tópico (se não for banido por profanidade)
+        if not verdict.ban and rules.get("block_off_topic") and text: # Verifica se há texto
+            is_greeting = any(greet in text.lower() for greet in GREETINGS)
+            # Considera fora de tópico se não for saudação E não contiver nenhuma keyword
+            if not is_greeting and not self.find_word("allowed_topics_keywords", rules, text.lower()):
+                verdict.hits.append(f"Mensagem fora de tópico detectada de {who}: {text}")
+                verdict.delete = True
+                verdict.rule = verdict.rule or "off_topic"
+
+        # 3. Links (se não for banido antes)
+        if not verdict.ban and rules.get("block_links"):
+            has_explicit_link = any(marker in text for marker in LINK_MARKERS)
+            if info.has_link_entity or has_explicit_link:
+                verdict.hits.append(f"Link detectado de {who}: {text}")
+                verdict.delete = True
+                verdict.rule = verdict.rule or "links"
+
+        # 4. Tipo de Arquivo (apenas PDF)
+        if not verdict.ban and rules.get("allow_only_pdf"):
+            if info.has_document and info.document_mime != 'application/pdf':
+                verdict.hits.append(f"Tipo de arquivo não permitido ({info.document_mime}) de {who}")
+                verdict.delete = True
+                verdict.rule = verdict.rule or "media"
+            elif info.has_media:
+                verdict.hits.append(f"Tipo de mídia não permitida (não PDF) de {who}")
+                verdict.delete = True
+                verdict.rule = verdict.rule or "media"
+
+        # 5. Regras regex personalizadas (todas numa só varredura)
+        if not verdict.ban and rules.get("custom_regex_rules") and text:
+            regex_rules = self.regex_rules(rules)
+            timeouts = regex_rules.timeouts
+            for name, action in regex_rules.match(text):
+                verdict.hits.append(f"Regra '{name}' detectada de {who}: {text}")
+                verdict.delete = True
+                if action == "ban":
+                    verdict.ban = True
+                    verdict.ban_reason = f"Regra personalizada: {name}"
+                    verdict.rule = f"regex:{name}"
+                else:
+                    verdict.rule = verdict.rule or f"regex:{name}"
+            if regex_rules.timeouts > timeouts:
+                verdict.hits.append(f"Regras regex excederam {rules.get('regex_time_budget_ms', 50)} ms na mensagem de {who}")
+
+        # 6. Spam/Flood (verificação final)
+        if not verdict.ban and rules.get("block_spam_flood"):
+            now = info.ts or time.time()
+            limit = rules.get("spam_message_limit", 5)
+            time_window = rules.get("spam_time_limit_sec", 10)
+
+            user_msgs = self.user_message_counts[info.user_id][info.chat_id]
+            # Limpa timestamps antigos
+            user_msgs = [t for t in user_msgs if now - t < time_window]
+            user_msgs.append(now)
+            self.user_message_counts[info.user_id][info.chat_id] = user_msgs
+
+            if len(user_msgs) > limit:
+                verdict.hits.append(f"Spam/Flood detectado de {who} (mensagens: {len(user_msgs)} em {time_window}s)")
+                verdict.delete = True # Apaga a mensagem atual que causou o spam
+                verdict.ban = True
+                verdict.ban_reason = "Spam/Flood"
+                verdict.rule = "flood"
+
+        if verdict.ban:
+            # Limpa o histórico de mensagens para evitar banimentos múltiplos rápidos
+            self.forget(info.user_id, info.chat_id)
+        return verdict
+
+    def forget(self, user_id, chat_id):
+        """Descarta o histórico de flood do usuário no chat."""
+        chats = self.user_message_counts.get(user_id)
+        if chats is not None:
+            chats.pop(chat_id, None)
+            if not chats:
+                del self.user_message_counts[user_id]
+
+    def purge_idle(self, max_age_sec, now=None):
+        """Remove históricos sem mensagens recentes (limita a memória). Retorna quantos removeu."""
+        now = time.time() if now is None else now
+        removed = 0
+        for user_id in list(self.user_message_counts):
+            chats = self.user_message_counts[user_id]
+            for chat_id in list(chats):
+                if not chats[chat_id] or now - chats[chat_id][-1] > max_age_sec:
+                    del chats[chat_id]
+                    removed += 1
+            if not chats:
+                del self.user_message_counts[user_id]
+        return removed
+
+    def sweep_idle(self, max_age_sec):
+        """Como purge_idle, mas incremental: gerador que cede a cada usuário (ver maintenance.py)."""
+        now = time.time()
+        removed = 0
+        for user_id in list(self.user_message_counts):
+            chats = self.user_message_counts.get(user_id)
+            if chats is not None:
+                for chat_id in [chat_id for chat_id, stamps in chats.items() if not stamps or now - stamps[-1] > max_age_sec]:
+                    del chats[chat_id]
+                    removed += 1
+                if not chats:
+                    del self.user_message_counts[user_id]
+            yield
+        return removed
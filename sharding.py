@@ -0,0 +1,210 @@
+# sharding.py
+import asyncio
+import bisect
+import hashlib
+import itertools
+import multiprocessing
+import threading
+import time
+from rules_engine import RuleEngine
+from word_lists import create_word_lists
+
+IDLE_PURGE_EVERY_SEC = 60  # Intervalo da limpeza do histórico de flood em cada worker
+
+
+class HashRing:
+    """Hash consistente: cada chave (user_id) sempre cai no mesmo nó.
+
+    Com `replicas` pontos virtuais por nó a carga fica equilibrada, e mudar o
+    número de nós só remapeia ~1/N das chaves. O cache de nós é limpo ao
+    atingir `cache_size` (há uma chave por usuário ativo).
+    """
+
+    def __init__(self, nodes, replicas=100, cache_size=65536):
+        points = sorted((self._hash(f"{node}:{i}"), node) for node in nodes for i in range(replicas))
+        self._keys = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+        self._cache = {}
+        self.cache_size = cache_size
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.blake2b(str(key).encode(), digest_size=8).digest(), "big")
+
+    def node_for(self, key):
+        node = self._cache.get(key)
+        if node is None:
+            index = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+            node = self._nodes[index]
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            self._cache[key] = node
+        return node
+
+
+def _worker_main(inbox, outbox, rules, word_list_settings=None):
+    """Processo worker: avalia lotes de mensagens dos usuários do seu shard."""
+    word_lists = create_word_lists({"word_lists": word_list_settings}) if word_list_settings is not None else None
+    engine = RuleEngine(word_lists)
+    next_purge = time.monotonic() + IDLE_PURGE_EVERY_SEC
+    while True:
+        item = inbox.get()
+        if item is None:
+            break
+        kind, payload = item
+        if kind == "rules":
+            rules = payload
+            continue
+        if word_lists is not None:
+            word_lists.refresh()  # Só consulta o banco a cada refresh_interval_sec
+        outbox.put([(request_id, engine.evaluate(info, rules)) for request_id, info in payload])
+        if time.monotonic() > next_purge:
+            engine.purge_idle(max(rules.get("spam_time_limit_sec", 10), 60))
+            next_purge = time.monotonic() + IDLE_PURGE_EVERY_SEC
+
+
+class ShardedRuleEvaluator:
+    """Avalia as regras em N processos, com os usuários distribuídos por hash consistente.
+
+    O processo principal continua sendo o único receptor de updates e o único
+    emissor de ações (pela fila com limite de taxa do bot); só a avaliação das
+    regras sai do GIL principal. O único estado das regras é o histórico de
+    flood de cada usuário, que fica no worker dono do usuário; como cada bot
+    modera um só grupo, o chat_id não serviria para dividir a carga.
+    Mensagens pedidas no mesmo ciclo do event loop seguem em um único lote por worker.
+    """
+
+    def __init__(self, workers, rules, batch_max=256, timeout_sec=2.0, word_list_settings=None):
+        self.workers = workers
+        self.rules = rules
+        self.word_list_settings = word_list_settings  # Cada worker abre o banco de listas de palavras
+        self.batch_max = batch_max
+        self.timeout_sec = timeout_sec
+        self.ring = HashRing(range(workers))
+        self._context = multiprocessing.get_context("spawn")  # Igual em Windows e Linux
+        self._processes = []
+        self._inboxes = []
+        self._outbox = None
+        self._reader = None
+        self._loop = None
+        self._futures = {}
+        self._pending = {}  # worker: [(request_id, info)] aguardando o envio do lote
+        self._flush_scheduled = False
+        self._ids = itertools.count()
+        self.evaluated = 0
+        self.timeouts = 0
+
+    @property
+    def running(self):
+        return bool(self._processes)
+
+    def start(self):
+        """Inicia os processos e a thread leitora de resultados. Chamar de dentro do event loop."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._outbox = self._context.Queue()
+        for index in range(self.workers):
+            inbox = self._context.Queue()
+            process = self._context.Process(target=_worker_main, args=(inbox, self._outbox, self.rules, self.word_list_settings),
+                                            name=f"RuleWorker-{index}", daemon=True)
+            process.start()
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+        self._reader = threading.Thread(target=self._read_results, name="RuleWorkerResults", daemon=True)
+        self._reader.start()
+
+    def update_rules(self, rules):
+        """Envia as regras novas a todos os workers."""
+        self.rules = rules
+        for inbox in self._inboxes:
+            inbox.put(("rules", rules))
+
+    async def evaluate(self, info):
+        """Avalia `info` no worker dono do usuário. Levanta asyncio.TimeoutError se o worker não responder."""
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._futures[request_id] = future
+        worker = self.ring.node_for(info.user_id)
+        batch = self._pending.setdefault(worker, [])
+        batch.append((request_id, info))
+        if len(batch) >= self.batch_max:
+            self._send(worker)
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+        try:
+            return await asyncio.wait_for(future, self.timeout_sec)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self._futures.pop(request_id, None)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        for worker in list(self._pending):
+            self._send(worker)
+
+    def _send(self, worker):
+        batch = self._pending.pop(worker, None)
+        if batch:
+            self._inboxes[worker].put(("batch", batch))
+
+    def _read_results(self):
+        while True:
+            try:
+                results = self._outbox.get()
+            except (EOFError, OSError):
+                return
+            if results is None:
+                return
+            self._loop.call_soon_threadsafe(self._resolve, results)
+
+    def _resolve(self, results):
+        for request_id, verdict in results:
+            future = self._futures.get(request_id)
+            if future is not None and not future.done():
+                future.set_result(verdict)
+        self.evaluated += len(results)
+
+    def stop(self, timeout=5.0):
+        """Encerra os workers e a thread leitora."""
+        for inbox in self._inboxes:
+            inbox.put(None)
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+        if self._outbox is not None:
+            self._outbox.put(None)
+            self._reader.join(timeout)
+        for pending in self._futures.values():
+            pending.cancel()
+        self._futures.clear()
+        self._processes, self._inboxes = [], []
+        self._outbox = self._reader = None
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "alive": sum(process.is_alive() for process in self._processes),
+            "evaluated": self.evaluated,
+            "timeouts": self.timeouts,
+        }
+
+
+def create_rule_evaluator(config):
+    """Avaliador em processos conforme config['sharding'] ou None (avaliação no próprio loop)."""
+    settings = config.get("sharding", {})
+    workers = settings.get("workers", 0)
+    if workers <= 0:
+        return None
+    return ShardedRuleEvaluator(
+        workers,
+        config.get("rules", {}),
+        batch_max=settings.get("batch_max", 256),
+        timeout_sec=settings.get("eval_timeout_sec", 2.0),
+        word_list_settings=config.get("word_lists", {})
+    )
@@ -0,0 +1,285 @@
+# simulate_rules.py
+import argparse
+import csv
+import json
+import multiprocessing
+import queue
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from rules_engine import RuleEngine, MessageInfo
+from word_lists import create_word_lists
+
+NO_RULE = "(nenhuma)"
+BATCH_SIZE = 2000  # Mensagens por lote enviado a um worker
+PURGE_EVERY = 100000  # Mensagens entre limpezas do histórico de flood de cada worker
+
+
+def _parse_ts(value):
+    """Timestamp em segundos a partir de epoch (número) ou data ISO."""
+    if value in (None, ""):
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def _parse_bool(value):
+    return str(value).strip().lower() in ("1", "true", "sim", "yes") if not isinstance(value, bool) else value
+
+
+def record_to_fields(record, index):
+    """Campos de MessageInfo (tupla) a partir de uma linha exportada (JSONL ou CSV).
+
+    Aceita os nomes usados pelo bot (chat_id, user_id, text, ...) e alguns
+    alternativos comuns em exportações (from_id, caption, date).
+    """
+    text = record.get("text") or record.get("caption") or ""
+    if isinstance(text, list):  # Exportação do Telegram Desktop: trechos com formatação
+        text = "".join(part if isinstance(part, str) else part.get("text", "") for part in text)
+    user_id = record.get("user_id", record.get("from_id", 0))
+    if isinstance(user_id, str) and user_id.startswith("user"):
+        user_id = user_id[4:]
+    return (
+        int(record.get("chat_id", 0) or 0),
+        int(user_id or 0),
+        int(record.get("message_id", record.get("id", index)) or index),
+        str(record.get("user_name", record.get("from", "")) or ""),
+        text,
+        _parse_bool(record.get("has_link_entity", False)),
+        _parse_bool(record.get("has_document", False)),
+        record.get("document_mime") or None,
+        _parse_bool(record.get("has_media", False)),
+        _parse_ts(record.get("ts", record.get("date"))),
+    )
+
+
+def read_messages(path, input_format=None):
+    """Lê o arquivo em streaming, gerando as tuplas de campos (sem carregar tudo na memória)."""
+    input_format = input_format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8-sig", newline="")
+    try:
+        if input_format == "csv":
+            for index, row in enumerate(csv.DictReader(stream)):
+                yield record_to_fields(row, index)
+        else:
+            for index, line in enumerate(stream):
+                if line.strip():
+                    yield record_to_fields(json.loads(line), index)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def load_rules(path):
+    """Regras de um config.json completo ou de um arquivo só com o dicionário de regras."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("rules", data), data.get("word_lists") if "rules" in data else None
+
+
+class SimulationStats:
+    """Contagem por regra (e por transição entre duas configurações), com exemplos."""
+
+    def __init__(self, examples=3):
+        self.examples = examples
+        self.total = 0
+        self.deleted = Counter()  # configuração ("a"/"b"): mensagens apagadas
+        self.banned = Counter()
+        self.rules = {"a": Counter(), "b": Counter()}
+        self.rule_examples = {"a": defaultdict(list), "b": defaultdict(list)}
+        self.transitions = Counter()  # (regra em a, regra em b) quando diferem
+        self.transition_examples = defaultdict(list)
+
+    def record(self, side, verdict, text):
+        rule = verdict.rule or NO_RULE
+        self.rules[side][rule] += 1
+        self.deleted[side] += verdict.delete
+        self.banned[side] += verdict.ban
+        examples = self.rule_examples[side][rule]
+        if rule != NO_RULE and len(examples) < self.examples:
+            examples.append(text)
+        return rule
+
+    def record_transition(self, rule_a, rule_b, text):
+        if rule_a != rule_b:
+            self.transitions[(rule_a, rule_b)] += 1
+            examples = self.transition_examples[(rule_a, rule_b)]
+            if len(examples) < self.examples:
+                examples.append(text)
+
+    def merge(self, other):
+        self.total += other.total
+        self.deleted.update(other.deleted)
+        self.banned.update(other.banned)
+        self.transitions.update(other.transitions)
+        for side in ("a", "b"):
+            self.rules[side].update(other.rules[side])
+            for rule, examples in other.rule_examples[side].items():
+                mine = self.rule_examples[side][rule]
+                mine.extend(examples[:self.examples - len(mine)])
+        for key, examples in other.transition_examples.items():
+            mine = self.transition_examples[key]
+            mine.extend(examples[:self.examples - len(mine)])
+
+
+class Simulator:
+    """Avalia mensagens com o mesmo RuleEngine do bot, sem nenhuma ação (dry-run)."""
+
+    def __init__(self, rules_a, rules_b=None, word_lists_a=None, word_lists_b=None, examples=3):
+        self.rules_a = rules_a
+        self.rules_b = rules_b
+        self.engine_a = RuleEngine(create_word_lists({"word_lists": word_lists_a}) if word_lists_a is not None else None)
+        self.engine_b = None
+        if rules_b is not None:
+            self.engine_b = RuleEngine(create_word_lists({"word_lists": word_lists_b}) if word_lists_b is not None else None)
+        self.stats = SimulationStats(examples)
+        self._since_purge = 0
+
+    def run(self, batch):
+        for fields in batch:
+            info = MessageInfo(*fields)
+            self.stats.total += 1
+            rule_a = self.stats.record("a", self.engine_a.evaluate(info, self.rules_a), info.text)
+            if self.engine_b is not None:
+                rule_b = self.stats.record("b", self.engine_b.evaluate(info, self.rules_b), info.text)
+                self.stats.record_transition(rule_a, rule_b, info.text)
+        self._since_purge += len(batch)
+        if batch and self._since_purge >= PURGE_EVERY:
+            # Usa o horário das mensagens (não o relógio) para descartar históricos de flood antigos
+            for engine, rules in ((self.engine_a, self.rules_a), (self.engine_b, self.rules_b)):
+                if engine is not None:
+                    engine.purge_idle(max(rules.get("spam_time_limit_sec", 10), 60), now=batch[-1][-1])
+            self._since_purge = 0
+
+
+def _worker_main(inbox, outbox, args):
+    """Processo worker: simula os lotes dos usuários do seu shard e devolve as estatísticas no fim."""
+    simulator = Simulator(*args)
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            break
+        simulator.run(batch)
+    outbox.put(simulator.stats)
+
+
+def simulate(messages, simulator_args, workers):
+    """Distribui as mensagens por user_id entre os workers (mesmo usuário, mesmo worker, em ordem).
+
+    O histórico de flood é por usuário; uma exportação costuma ter um só grupo,
+    então dividir por chat_id deixaria um único worker com todo o trabalho.
+    """
+    if workers <= 1:
+        simulator = Simulator(*simulator_args)
+        batch = []
+        for fields in messages:
+            batch.append(fields)
+            if len(batch) >= BATCH_SIZE:
+                simulator.run(batch)
+                batch = []
+        simulator.run(batch)
+        return simulator.stats
+
+    context = multiprocessing.get_context("spawn")
+    outbox = context.Queue()
+    inboxes = [context.Queue(maxsize=8) for _ in range(workers)]  # Limita a memória se o leitor for mais rápido
+    processes = [context.Process(target=_worker_main, args=(inbox, outbox, simulator_args), daemon=True)
+                 for inbox in inboxes]
+    for process in processes:
+        process.start()
+    batches = [[] for _ in range(workers)]
+    for fields in messages:
+        worker = fields[1] % workers
+        batch = batches[worker]
+        batch.append(fields)
+        if len(batch) >= BATCH_SIZE:
+            inboxes[worker].put(batch)
+            batches[worker] = []
+    for worker, inbox in enumerate(inboxes):
+        if batches[worker]:
+            inbox.put(batches[worker])
+        inbox.put(None)
+    stats = SimulationStats(simulator_args[-1])
+    received = 0
+    while received < len(processes):
+        try:
+            stats.merge(outbox.get(timeout=1))
+            received += 1
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                raise RuntimeError("Worker de simulação terminou sem devolver o resultado.")
+    for process in processes:
+        process.join()
+    return stats
+
+
+def _short(text, width=90):
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def print_report(stats, compare, elapsed):
+    total = max(1, stats.total)
+    print(f"{stats.total} mensagens em {elapsed:.1f}s ({stats.total / max(elapsed, 1e-9):.0f} msg/s)")
+    for side, title in (("a", "Configuração A"), ("b", "Configuração B")):
+        if side == "b" and not compare:
+            break
+        print(f"\n== {title}: {stats.deleted[side]} apagadas ({stats.deleted[side] / total:.1%}), "
+              f"{stats.banned[side]} banimentos")
+        print(f"{'regra':<28} {'mensagens':>10} {'%':>7}")
+        for rule, count in stats.rules[side].most_common():
+            print(f"{rule:<28} {count:>10} {count / total:>7.2%}")
+            for example in stats.rule_examples[side].get(rule, []):
+                print(f"    - {_short(example)}")
+    if compare:
+        changed = sum(stats.transitions.values())
+        print(f"\n== Diferenças A -> B: {changed} mensagens ({changed / total:.2%}) mudam de resultado")
+        for (rule_a, rule_b), count in stats.transitions.most_common():
+            print(f"{rule_a} -> {rule_b}: {count}")
+            for example in stats.transition_examples[(rule_a, rule_b)]:
+                print(f"    - {_short(example)}")
+
+
+def write_json(stats, path):
+    data = {
+        "total": stats.total,
+        "deleted": dict(stats.deleted),
+        "banned": dict(stats.banned),
+        "rules": {side: dict(counter) for side, counter in stats.rules.items()},
+        "examples": {side: dict(examples) for side, examples in stats.rule_examples.items()},
+        "transitions": [{"from": a, "to": b, "count": count, "examples": stats.transition_examples[(a, b)]}
+                        for (a, b), count in stats.transitions.most_common()],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Simula as regras de moderação sobre mensagens exportadas (JSONL ou CSV), sem nenhuma ação.")
+    parser.add_argument("messages", help="Arquivo .jsonl ou .csv ('-' para ler da entrada padrão)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="Formato (padrão: pela extensão)")
+    parser.add_argument("--config", default="config.json", help="Configuração A (config.json ou arquivo só com as regras)")
+    parser.add_argument("--compare", help="Configuração B para comparar com A")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--examples", type=int, default=3, help="Exemplos por regra")
+    parser.add_argument("--json", help="Grava o relatório também em JSON")
+    args = parser.parse_args()
+
+    rules_a, word_lists_a = load_rules(args.config)
+    rules_b, word_lists_b = load_rules(args.compare) if args.compare else (None, None)
+    simulator_args = (rules_a, rules_b, word_lists_a, word_lists_b, args.examples)
+
+    started = time.perf_counter()
+    stats = simulate(read_messages(args.messages, args.format), simulator_args, args.workers)
+    print_report(stats, bool(args.compare), time.perf_counter() - started)
+    if args.json:
+        write_json(stats, args.json)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
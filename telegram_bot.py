@@ -19,6 +19,7 @@ class TelegramBot:
         self.log_queue = log_queue
         self.running = False
         self.loop = None
+        self._stop_requested = None  # asyncio.Event do loop do bot (parada sem polling)
 
         # Configuração do logger
         self._setup_logger()
@@ -76,6 +77,7 @@ class TelegramBot:
         try:
             self.loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
+            self._stop_requested = asyncio.Event()
             self.loop.run_until_complete(self._run_bot_async())
         except Exception as e:
             self._report_error(f"Erro na thread do bot: {str(e)}")
@@ -108,9 +110,8 @@ class TelegramBot:
             self.running = True
             self._update_status("Running")
             
-            # Executa o polling enquanto o stop_event não for definido
-            while not self.stop_event.is_set():
-                await asyncio.sleep(0.1)  # Mantém o loop ativo
+            # Aguarda o pedido de parada (sinalizado por stop_bot, sem polling)
+            await self._stop_requested.wait()
         except Exception as e:
             self._report_error(f"Falha ao iniciar bot: {str(e)}")
             self._update_status("Error")
@@ -142,9 +143,9 @@ class TelegramBot:
         """Para o bot de forma segura."""
         if self.running:
             self.stop_event.set()  # Notifica o bot para parar
+            # O encerramento e a limpeza acontecem na própria thread do bot (_run_wrapper)
             if self.loop and self.loop.is_running():
-                self.loop.call_soon_threadsafe(self.loop.stop)
-            self._cleanup_resources()
+                self.loop.call_soon_threadsafe(self._stop_requested.set)
 
     def _log(self, message, level=logging.INFO):
         """Método auxiliar para logging."""
@@ -0,0 +1,58 @@
+# tests/conftest.py
+import asyncio
+import copy
+import os
+import sys
+
+import pytest
+
+# Os módulos do projeto ficam na raiz do repositório (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(coro):
+    """Executa uma corrotina num event loop novo (os testes não dependem de plugins do pytest)."""
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def bot_config(tmp_path):
+    """Configuração padrão com todos os arquivos do bot dentro de tmp_path."""
+    from config_manager import DEFAULT_CONFIG
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config["bot_token"] = "123456:TESTE"
+    config["group_id"] = "-100"
+    config["rules"]["profanity_list"] = []
+    config["rules"]["allowed_topics_keywords"] = []
+    config["word_lists"]["path"] = str(tmp_path / "word_lists.db")
+    config["audit_log"]["path"] = str(tmp_path / "audit.db")
+    config["update_watermark"]["path"] = str(tmp_path / "watermark_{bot}.json")
+    config["media_blocklist"]["path"] = str(tmp_path / "media_blocklist.db")
+    config["ban_registry"]["path"] = str(tmp_path / "ban_registry.bin")
+    config["performance"]["callback_throttle_sec"] = 0
+    return config
+
+
+@pytest.fixture
+def make_bot(bot_config):
+    """Cria TelegramBots com a configuração de teste (ajustes opcionais por seção)."""
+    pytest.importorskip("telegram")
+    from bot_logic import TelegramBot
+    created = []
+
+    def factory(**sections):
+        config = copy.deepcopy(bot_config)
+        for section, values in sections.items():
+            if isinstance(values, dict):
+                config.setdefault(section, {}).update(values)
+            else:
+                config[section] = values
+        bot = TelegramBot(config)
+        created.append(bot)
+        return bot
+
+    yield factory
+    for bot in created:
+        if bot.audit is not None:
+            bot.audit.close()
+        bot.word_lists.store.close()
@@ -0,0 +1,98 @@
+# tests/fakes.py
+"""Objetos mínimos no lugar dos do python-telegram-bot (Bot, CallbackQuery, contexto).
+
+Só implementam o que os handlers de bot_logic.py usam e registram as chamadas
+feitas à API, para os testes conferirem o que o bot teria enviado.
+"""
+import asyncio
+from types import SimpleNamespace
+
+
+class FakeBot:
+    """Bot da API: cada método registra (nome, argumentos) em `calls`."""
+
+    id = 999
+
+    def __init__(self, members=None):
+        self.members = members or {}  # (chat_id, user_id): objeto com status/can_send_messages
+        self.calls = []
+
+    def called(self, name):
+        return [kwargs for method, kwargs in self.calls if method == name]
+
+    async def get_chat_member(self, chat_id, user_id):
+        self.calls.append(("get_chat_member", {"chat_id": chat_id, "user_id": user_id}))
+        return self.members.get((chat_id, user_id), SimpleNamespace(status="member", can_send_messages=True))
+
+    async def _record(self, name, kwargs):
+        self.calls.append((name, kwargs))
+        return True
+
+    async def restrict_chat_member(self, **kwargs):
+        return await self._record("restrict_chat_member", kwargs)
+
+    async def unban_chat_member(self, **kwargs):
+        return await self._record("unban_chat_member", kwargs)
+
+    async def ban_chat_member(self, **kwargs):
+        return await self._record("ban_chat_member", kwargs)
+
+    async def delete_message(self, **kwargs):
+        return await self._record("delete_message", kwargs)
+
+    async def delete_messages(self, **kwargs):
+        return await self._record("delete_messages", kwargs)
+
+    async def send_message(self, **kwargs):
+        return await self._record("send_message", kwargs)
+
+    async def set_chat_permissions(self, **kwargs):
+        return await self._record("set_chat_permissions", kwargs)
+
+    async def get_chat(self, chat_id):
+        self.calls.append(("get_chat", {"chat_id": chat_id}))
+        return SimpleNamespace(id=chat_id, permissions="permissões originais")
+
+
+class FakeApplication:
+    """Só o create_task do Application (tarefas guardadas para o teste aguardar)."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.tasks = []
+
+    def create_task(self, coro, update=None):
+        task = asyncio.get_running_loop().create_task(coro)
+        self.tasks.append(task)
+        return task
+
+    async def wait_tasks(self):
+        tasks, self.tasks = self.tasks, []
+        await asyncio.gather(*tasks)
+
+
+def make_context(bot=None):
+    bot = bot or FakeBot()
+    return SimpleNamespace(bot=bot, application=FakeApplication(bot))
+
+
+class FakeQuery:
+    """CallbackQuery do botão "Já segui"; as respostas ficam em `answers`."""
+
+    def __init__(self, user_id, chat_id, data=None, first_name="Ana"):
+        self.id = f"q{user_id}"
+        self.from_user = SimpleNamespace(id=user_id, first_name=first_name)
+        self.message = SimpleNamespace(chat_id=chat_id, text_html="Bem-vinda!", reply_markup=None)
+        self.data = data if data is not None else f"verify_{user_id}"
+        self.answers = []
+        self.edits = []
+
+    async def answer(self, text=None, show_alert=False):
+        self.answers.append(text)
+
+    async def edit_message_text(self, text, **kwargs):
+        self.edits.append(text)
+
+
+def callback_update(query):
+    return SimpleNamespace(callback_query=query, update_id=1)
@@ -0,0 +1,148 @@
+# tests/test_action_scheduler.py
+import asyncio
+import time
+
+import pytest
+
+from action_scheduler import (
+    PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, ActionDroppedError, ActionScheduler,
+)
+from conftest import run
+
+
+def test_submit_runs_directly_when_not_started():
+    scheduler = ActionScheduler()
+
+    async def action(value):
+        return value * 2
+
+    assert run(scheduler.submit(PRIORITY_LOW, action, 21)) == 42
+    assert scheduler.dispatched[PRIORITY_LOW] == 0
+
+
+def test_highest_priority_queue_is_served_first():
+    scheduler = ActionScheduler()
+    order = []
+
+    async def action(name):
+        order.append(name)
+
+    async def scenario():
+        scheduler.start()
+        await asyncio.gather(
+            scheduler.submit(PRIORITY_LOW, action, "boas-vindas"),
+            scheduler.submit(PRIORITY_NORMAL, action, "restringir"),
+            scheduler.submit(PRIORITY_HIGH, action, "apagar"),
+        )
+        await scheduler.stop()
+
+    run(scenario())
+    assert order == ["apagar", "restringir", "boas-vindas"]
+    assert scheduler.stats()["alta"]["dispatched"] == 1
+
+
+def test_starved_item_is_promoted_ahead_of_higher_priority():
+    scheduler = ActionScheduler(max_wait_sec={PRIORITY_LOW: 5.0})
+    loop = asyncio.new_event_loop()
+    try:
+        late = loop.create_future()
+        scheduler._queues[PRIORITY_LOW].append((0.0, late, None, (), {}))
+        scheduler._queues[PRIORITY_HIGH].append((9.0, loop.create_future(), None, (), {}))
+        priority, item = scheduler._next_item(now=10.0)
+        assert (priority, item[1]) == (PRIORITY_LOW, late)
+        assert scheduler.promoted[PRIORITY_LOW] == 1
+        # Sem atraso, volta à ordem de prioridade
+        assert scheduler._next_item(now=10.0)[0] == PRIORITY_HIGH
+    finally:
+        loop.close()
+
+
+def test_token_bucket_limits_the_rate():
+    scheduler = ActionScheduler(rate_per_sec=50, burst=1)
+
+    async def action():
+        pass
+
+    async def scenario():
+        scheduler.start()
+        started = time.monotonic()
+        await asyncio.gather(*(scheduler.submit(PRIORITY_HIGH, action) for _ in range(6)))
+        elapsed = time.monotonic() - started
+        await scheduler.stop()
+        return elapsed
+
+    # 1 ficha no balde e 50 por segundo: as outras 5 chamadas esperam ~0,1 s
+    assert run(scenario()) >= 0.08
+
+
+def test_stop_drops_queued_actions_with_action_dropped_error():
+    scheduler = ActionScheduler(max_concurrent=1)
+    release = None
+
+    async def blocking():
+        await release.wait()
+
+    async def action():
+        return "executada"
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        scheduler.start()
+        first = asyncio.ensure_future(scheduler.submit(PRIORITY_HIGH, blocking))
+        queued = asyncio.ensure_future(scheduler.submit(PRIORITY_LOW, action))
+        await asyncio.sleep(0.02)
+        assert scheduler.queue_depths()["baixa"] == 1
+        dropped = await scheduler.stop()
+        release.set()
+        await first
+        with pytest.raises(ActionDroppedError):
+            await queued
+        return dropped
+
+    assert run(scenario()) == 1
+    assert not scheduler.running
+
+
+def test_submit_after_stop_is_refused_until_the_next_start():
+    scheduler = ActionScheduler()
+
+    async def action():
+        return "executada"
+
+    async def scenario():
+        scheduler.start()
+        await scheduler.stop()
+        with pytest.raises(ActionDroppedError):
+            await scheduler.submit(PRIORITY_HIGH, action)
+        scheduler.start()  # Nova sessão
+        result = await scheduler.submit(PRIORITY_HIGH, action)
+        await scheduler.stop()
+        return result
+
+    assert run(scenario()) == "executada"
+
+
+def test_cancelled_items_do_not_take_tokens():
+    scheduler = ActionScheduler(rate_per_sec=10, burst=1)
+    calls = []
+
+    async def action(name):
+        calls.append(name)
+
+    async def scenario():
+        scheduler.start()
+        await scheduler.submit(PRIORITY_HIGH, action, "primeira")  # Gasta a única ficha
+        abandoned = [asyncio.ensure_future(scheduler.submit(PRIORITY_LOW, action, f"desistiu {i}")) for i in range(5)]
+        await asyncio.sleep(0)
+        for task in abandoned:
+            task.cancel()
+        started = time.monotonic()
+        await scheduler.submit(PRIORITY_LOW, action, "última")
+        elapsed = time.monotonic() - started
+        await scheduler.stop()
+        return elapsed
+
+    # Só a última espera uma ficha nova (~0,1 s); as canceladas não consomem nenhuma
+    assert run(scenario()) < 0.2
+    assert calls == ["primeira", "última"]
@@ -0,0 +1,98 @@
+# tests/test_api_retry.py
+import pytest
+
+pytest.importorskip("telegram")
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+from action_scheduler import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+from api_retry import ApiCaller, CallShedError, CircuitBreaker
+from conftest import run
+
+FAST = {"api_retry": {"max_attempts": 3, "backoff_base_sec": 0, "backoff_max_sec": 0}}
+
+
+class Flaky:
+    """Função da API que falha com os erros de `errors` e depois responde 'ok'."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_breaker_opens_after_consecutive_failures_and_sheds_by_priority():
+    breaker = CircuitBreaker(failure_threshold=2, reset_sec=30)
+    breaker.record_failure()
+    assert not breaker.is_open()
+    breaker.record_failure()
+    assert breaker.is_open()
+    assert breaker.allow(PRIORITY_HIGH)
+    assert breaker.allow(PRIORITY_NORMAL)
+    assert not breaker.allow(PRIORITY_LOW)
+    breaker.record_failure()
+    breaker.record_failure()  # Dobro do limite: também descarta a prioridade normal
+    assert not breaker.allow(PRIORITY_NORMAL)
+    breaker.record_success()
+    assert breaker.allow(PRIORITY_LOW)
+
+
+def test_retry_after_opens_the_breaker_for_the_given_time():
+    breaker = CircuitBreaker(failure_threshold=100)
+    breaker.record_failure(open_for=60)
+    assert breaker.is_open()
+
+
+def test_idempotent_call_is_retried_after_a_timeout():
+    api = ApiCaller(FAST)
+    func = Flaky(TimedOut(), NetworkError("conexão perdida"))
+    assert run(api.call("delete_message", func, chat_id=1, message_id=2)) == "ok"
+    assert func.calls == 3
+    assert api.counters["delete_message"]["retries"] == 2
+
+
+def test_send_message_is_not_retried_after_a_timeout():
+    api = ApiCaller(FAST)
+    func = Flaky(TimedOut())
+    with pytest.raises(TimedOut):
+        run(api.call("send_message", func, chat_id=1, text="Olá"))
+    assert func.calls == 1  # A mensagem pode ter sido entregue: repetir duplicaria
+    assert api.counters["send_message"]["failures"] == 1
+
+
+def test_send_message_is_retried_after_a_429():
+    api = ApiCaller(FAST)
+    func = Flaky(RetryAfter(0))
+    assert run(api.call("send_message", func, chat_id=1, text="Olá")) == "ok"
+    assert func.calls == 2
+
+
+def test_low_priority_call_gives_up_on_429():
+    api = ApiCaller(FAST)
+    func = Flaky(RetryAfter(0))
+    with pytest.raises(RetryAfter):
+        run(api.call("edit_message_text", func, priority=PRIORITY_LOW))
+    assert func.calls == 1
+
+
+def test_bad_request_is_raised_on_the_first_attempt():
+    api = ApiCaller(FAST)
+    func = Flaky(BadRequest("Message to delete not found"))
+    with pytest.raises(BadRequest):
+        run(api.call("delete_message", func))
+    assert func.calls == 1
+
+
+def test_open_breaker_sheds_low_priority_calls():
+    api = ApiCaller({"api_retry": {"breaker_failure_threshold": 1}})
+    api.breaker("send_message").record_failure()
+    func = Flaky()
+    with pytest.raises(CallShedError):
+        run(api.call("send_message", func, priority=PRIORITY_LOW))
+    assert func.calls == 0
+    assert api.stats()["send_message"]["shed"] == 1
@@ -0,0 +1,75 @@
+# tests/test_audit_log.py
+import sqlite3
+
+import pytest
+
+from audit_log import _SCHEMA, AuditLog
+
+
+@pytest.fixture
+def audit(tmp_path):
+    messages = []
+    log = AuditLog(str(tmp_path / "audit.db"), flush_interval_sec=0.05, log=messages.append)
+    log.messages = messages
+    yield log
+    log.close()
+
+
+def test_records_are_written_in_batches_and_queried_newest_first(audit):
+    audit.record("delete", "links", user_id=1, chat_id=-100, ts=10)
+    audit.record("ban", "flood", user_id=1, chat_id=-100, ts=20)
+    audit.record("delete", "links", user_id=2, chat_id=-100, ts=30)
+    audit.flush()
+    assert audit.written == 3
+    assert [row["action"] for row in audit.query(user_id=1)] == ["ban", "delete"]
+    assert audit.count(rule="links") == 2
+    assert audit.count(since=15, until=30) == 1
+
+
+def test_write_errors_are_logged_once_per_failure_streak(audit):
+    audit.record("delete", ts=1)
+    audit.flush()
+    with sqlite3.connect(audit.path) as conn:
+        conn.execute("DROP TABLE audit")
+    for ts in range(2, 5):
+        audit.record("delete", ts=ts)
+        audit.flush()
+    assert audit.write_errors == 3
+    assert len(audit.messages) == 1
+    assert "Falha ao gravar" in audit.messages[0]
+
+    with sqlite3.connect(audit.path) as conn:
+        conn.executescript(_SCHEMA)
+    audit.record("delete", ts=5)
+    audit.flush()
+    assert audit.written == 2
+    assert len(audit.messages) == 2
+    assert "3 registro(s) perdido(s)" in audit.messages[1]
+
+
+def test_keyset_pages_cover_every_record_once_even_with_equal_timestamps(audit):
+    for i in range(25):
+        audit.record("delete", "links", user_id=i % 2, ts=100 + i // 3)  # Timestamps repetidos
+    audit.flush()
+    seen, cursor = [], None
+    while True:
+        page = audit.query(rule="links", limit=10, before=cursor)
+        if not page:
+            break
+        seen += [row["id"] for row in page]
+        cursor = (page[-1]["ts"], page[-1]["id"])
+    assert len(seen) == len(set(seen)) == 25
+    assert seen == [row["id"] for row in audit.query(limit=100)]
+
+
+def test_seek_jumps_to_the_key_of_a_later_page(audit):
+    for i in range(30):
+        audit.record("ban", "flood", user_id=7, ts=i)
+    audit.flush()
+    everything = audit.query(user_id=7, limit=100)
+    cursor = audit.seek(20, user_id=7)
+    assert cursor == (everything[19]["ts"], everything[19]["id"])
+    assert audit.query(user_id=7, limit=5, before=cursor) == everything[20:25]
+    # A partir de uma página conhecida
+    assert audit.seek(5, user_id=7, before=cursor) == (everything[24]["ts"], everything[24]["id"])
+    assert audit.seek(100, user_id=7) is None
@@ -0,0 +1,79 @@
+# tests/test_ban_registry.py
+import os
+
+from ban_registry import BanRegistry
+from conftest import run
+
+
+def touch_later(path):
+    """Garante um mtime diferente (a gravação de outro processo é percebida pelo mtime)."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def read(path):
+    return sorted(BanRegistry(path)._ids)
+
+
+def test_lookup_and_persistence(tmp_path):
+    path = str(tmp_path / "bans.bin")
+    registry = BanRegistry(path)
+    for user_id in (30, 10, 20):
+        registry.add(user_id)
+    assert not registry.add(10)
+    assert 20 in registry and 25 not in registry
+    assert registry.save() and not registry.save()
+    assert read(path) == [10, 20, 30]
+
+
+def test_local_removal_survives_a_save_after_another_process_wrote(tmp_path):
+    path = str(tmp_path / "bans.bin")
+    bot = BanRegistry(path)
+    bot.add(1)
+    bot.add(2)
+    bot.save()
+    bot.remove(2)  # Desbanido por um admin
+    cli = BanRegistry(path)
+    cli.add(3)
+    cli.save()
+    touch_later(path)
+
+    bot.save()
+    assert read(path) == [1, 3]
+
+
+def test_removal_by_another_process_is_not_undone(tmp_path):
+    path = str(tmp_path / "bans.bin")
+    bot = BanRegistry(path)
+    for user_id in (1, 2, 3):
+        bot.add(user_id)
+    bot.save()
+    cli = BanRegistry(path)
+    cli.remove(3)
+    cli.save()
+    touch_later(path)
+
+    bot.add(4)
+    assert bot.refresh()
+    assert 4 in bot and 3 not in bot
+    bot.save()
+    assert read(path) == [1, 2, 4]
+
+
+def test_import_text_file(tmp_path):
+    source = tmp_path / "exportados.txt"
+    source.write_text("# Usuários banidos\n5\n7 # spam\n\n5\n", encoding="utf-8")
+    registry = BanRegistry(str(tmp_path / "bans.bin"))
+    registry.add(7)
+    assert registry.import_file(str(source)) == 1
+    assert sorted(registry._ids) == [5, 7]
+    assert registry.dirty
+
+
+def test_bans_are_written_behind_not_per_ban(make_bot):
+    bot = make_bot()
+    registry = bot.ban_registry
+    bot._register_ban(42)
+    assert not os.path.exists(registry.path)  # Nenhuma gravação por banimento
+    run(bot._sync_ban_registry())
+    assert read(registry.path) == [42]
@@ -0,0 +1,53 @@
+# tests/test_bot_host.py
+import asyncio
+import threading
+
+from bot_host import BotHost
+
+
+def test_coroutines_from_several_bots_share_one_loop_thread():
+    host = BotHost()
+    try:
+        loop = host.start()
+        assert host.start() is loop  # Idempotente
+
+        async def where():
+            await asyncio.sleep(0)
+            return asyncio.get_running_loop(), threading.current_thread().name
+
+        results = [host.submit(where()).result(2) for _ in range(3)]
+        assert {result for result in results} == {(loop, "BotHost")}
+    finally:
+        host.stop()
+    assert not host.running
+
+
+def test_a_failing_bot_does_not_stop_the_loop():
+    host = BotHost()
+    try:
+        async def broken():
+            raise RuntimeError("falha no bot A")
+
+        async def healthy():
+            return "ok"
+
+        failed = host.submit(broken())
+        try:
+            failed.result(2)
+        except RuntimeError:
+            pass
+        assert host.submit(healthy()).result(2) == "ok"
+    finally:
+        host.stop()
+
+
+def test_host_can_be_started_again_after_stop():
+    host = BotHost()
+    first = host.start()
+    host.stop()
+    assert first.is_closed()
+    second = host.start()
+    try:
+        assert second is not first and host.running
+    finally:
+        host.stop()
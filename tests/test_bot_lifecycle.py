@@ -0,0 +1,79 @@
+# tests/test_bot_lifecycle.py
+import asyncio
+import copy
+import threading
+
+import pytest
+
+from bot_lifecycle import DRAINING, ERROR, RUNNING, STARTING, STOPPED, BotLifecycle, LifecycleError
+from conftest import run
+
+
+def test_transitions_follow_the_state_machine_and_notify():
+    changes = []
+    lifecycle = BotLifecycle(on_change=changes.append)
+    for state in (STARTING, RUNNING, DRAINING, STOPPED):
+        lifecycle.transition(state)
+    assert changes == [STARTING, RUNNING, DRAINING, STOPPED]
+    with pytest.raises(LifecycleError):
+        lifecycle.transition(DRAINING)
+    assert lifecycle.transition(STOPPED) is None  # Mesmo estado: nada muda
+    assert not lifecycle.active
+
+
+def test_request_measures_the_operation_latency():
+    lifecycle = BotLifecycle()
+    lifecycle.request("start")
+    assert lifecycle.transition(STARTING) is None
+    operation, elapsed = lifecycle.transition(RUNNING)
+    assert operation == "start" and elapsed >= 0
+    assert lifecycle.latencies["start"] == elapsed
+    lifecycle.request("stop")
+    assert lifecycle.transition(ERROR) is None  # Falhou: nada a medir
+    assert "stop" not in lifecycle.latencies
+
+
+def test_wait_for_wakes_when_another_thread_changes_state():
+    lifecycle = BotLifecycle()
+    lifecycle.transition(STARTING)
+    threading.Timer(0.05, lifecycle.transition, (RUNNING,)).start()
+    assert lifecycle.wait_for((RUNNING,), timeout=2)
+    assert not lifecycle.wait_for((STOPPED,), timeout=0.01)
+
+
+def test_restart_applies_the_saved_config(make_bot, bot_config):
+    bot = make_bot()
+    new_config = copy.deepcopy(bot_config)
+    new_config["rules"]["custom_regex_rules"] = [{"name": "spam", "pattern": "compre já", "action": "delete"}]
+
+    async def scenario():
+        bot.loop = asyncio.get_running_loop()
+        bot._stop_requested = asyncio.Event()
+        bot.restart_bot(new_config)
+        await asyncio.sleep(0)
+        return bot._stop_requested.is_set()
+
+    assert run(scenario())
+    assert bot._restart_requested
+    assert bot.config is new_config
+    assert bot.lifecycle._pending[0] == "restart"
+
+
+def test_shutdown_closes_the_audit_writer_and_the_databases(make_bot):
+    from media_blocklist import create_media_blocklist
+
+    bot = make_bot()
+    bot.audit.record("delete", "links", user_id=1, chat_id=-100)
+    writer = bot.audit._writer
+    bot.media_blocklist = create_media_blocklist(bot.config)
+    bot.word_lists.load()
+
+    bot._close_storage()
+
+    assert not writer.is_alive()
+    assert bot.word_lists.store.closed and not bot.word_lists.loaded
+    assert bot.media_blocklist is None
+    assert bot.audit.query(action="delete")  # O registro pendente foi gravado
+    # Um novo início da mesma instância reabre o que precisa
+    bot.word_lists.load()
+    assert not bot.word_lists.store.closed
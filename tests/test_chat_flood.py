@@ -0,0 +1,110 @@
+# tests/test_chat_flood.py
+import asyncio
+
+from chat_flood import ChatRateMonitor
+from conftest import run
+from fakes import make_context
+
+CHAT_ID = -100
+
+
+def test_rate_is_the_average_over_the_window():
+    monitor = ChatRateMonitor(window_sec=10)
+    for second in range(10):
+        for _ in range(3):
+            monitor.hit(1, now=1000 + second)
+    assert monitor.rate(1, now=1009) == 3.0
+    # Baldes fora da janela não contam mais
+    assert monitor.rate(1, now=1015) == 1.2
+
+
+def test_activation_and_restore_after_a_calm_period():
+    monitor = ChatRateMonitor(window_sec=1, threshold_per_sec=5, restore_after_sec=10)
+    for _ in range(6):
+        rate = monitor.hit(1, now=100)
+    assert monitor.should_activate(1, rate)
+    monitor.mark_surge(1, now=100)
+    assert not monitor.should_activate(1, monitor.hit(1, now=100))
+    assert not monitor.should_restore(1, now=100)  # Ainda acima de metade do limite
+    assert not monitor.should_restore(1, now=105)  # Calmo há 0 s
+    assert not monitor.should_restore(1, now=110)
+    assert monitor.should_restore(1, now=115)
+    monitor.clear_surge(1)
+    assert not monitor.is_surging(1)
+
+
+def test_purge_idle_keeps_surging_chats():
+    monitor = ChatRateMonitor(window_sec=5)
+    monitor.hit(1, now=0)
+    monitor.hit(2, now=0)
+    monitor.mark_surge(2)
+    assert monitor.purge_idle(now=100) == 1
+    assert list(monitor._buckets) == [2]
+
+
+def flood(bot, context, messages=30):
+    async def scenario():
+        for _ in range(messages):
+            await bot._check_chat_flood(CHAT_ID, context)
+        await asyncio.sleep(0)
+    return scenario()
+
+
+def test_lockdown_is_restored_when_the_chat_calms_down(make_bot):
+    bot = make_bot(rules={"chat_flood_threshold_per_sec": 1, "chat_flood_window_sec": 1,
+                          "chat_flood_restore_after_sec": 0})
+    context = make_context()
+
+    async def scenario():
+        await flood(bot, context)
+        task, _, _ = bot._flood_protections[CHAT_ID]
+        await asyncio.wait_for(task, 5)
+
+    run(scenario())
+
+    locked, restored = context.bot.called("set_chat_permissions")
+    assert not locked["permissions"].can_send_messages
+    assert restored["permissions"] == "permissões originais"
+    assert not bot.chat_rate_monitor.is_surging(CHAT_ID)
+    assert bot._flood_protections == {}
+
+
+def test_stopping_during_a_lockdown_restores_the_chat_without_waiting(make_bot):
+    bot = make_bot(rules={"chat_flood_threshold_per_sec": 1, "chat_flood_restore_after_sec": 3600})
+    context = make_context()
+    bot.application = bot._build_application()  # Nunca inicializado: a drenagem só cuida do estado do bot
+
+    async def scenario():
+        bot.scheduler.start()
+        await flood(bot, context)
+        while not context.bot.called("set_chat_permissions"):
+            await asyncio.sleep(0.01)  # Bloqueio aplicado
+        task, _, _ = bot._flood_protections[CHAT_ID]
+        await asyncio.wait_for(bot._drain_session(), 2)
+        return task
+
+    task = run(scenario())
+
+    assert task.cancelled()
+    assert [call["permissions"] for call in context.bot.called("set_chat_permissions")][-1] == "permissões originais"
+    assert not bot.chat_rate_monitor.is_surging(CHAT_ID)
+
+
+def test_stopping_during_restrict_new_members_releases_them(make_bot):
+    bot = make_bot(rules={"chat_flood_threshold_per_sec": 1, "chat_flood_restore_after_sec": 3600,
+                          "chat_flood_action": "restrict_new_members"})
+    context = make_context()
+    bot._remember_join(CHAT_ID, 5)
+    bot._remember_join(CHAT_ID, 6)
+    bot.pending_verification[6] = 0  # Ainda em verificação: não é liberado
+
+    async def scenario():
+        await flood(bot, context)
+        await asyncio.sleep(0.01)
+        await bot._stop_chat_flood_protections(1)
+
+    run(scenario())
+
+    restrictions = [(call["user_id"], call["permissions"].can_send_messages)
+                    for call in context.bot.called("restrict_chat_member")]
+    assert restrictions == [(5, False), (5, True)]
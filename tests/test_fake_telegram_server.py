@@ -0,0 +1,75 @@
+# tests/test_fake_telegram_server.py
+import json
+import urllib.request
+
+import pytest
+
+from conftest import run
+from fake_telegram_server import FakeTelegramServer
+from load_generator import GROUP_ID, LoadGenerator
+
+TOKEN = "123456:TESTE"
+
+
+@pytest.fixture
+def server():
+    server = FakeTelegramServer(port=0).start()
+    yield server
+    server.stop()
+
+
+def post(server, path, body):
+    url = server.base_url[:-len("/bot")] + path
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def test_injected_updates_are_served_and_confirmed_by_offset(server):
+    generator = LoadGenerator(server, users=2, seed=1)
+    ids = post(server, "/_fake/updates", {"updates": [generator.message(generator.users[0], "oi"), generator.join(generator.users[1])]})["result"]
+    assert ids == [1, 2]
+    updates = post(server, f"/bot{TOKEN}/getUpdates", {"offset": 0, "timeout": 0})["result"]
+    assert [update["update_id"] for update in updates] == [1, 2]
+    assert post(server, f"/bot{TOKEN}/getUpdates", {"offset": 3, "timeout": 0})["result"] == []
+    assert server.stats()["confirmed_update_id"] == 2
+
+
+def test_rate_limit_answers_429_except_for_control_methods(server):
+    server.rate_limit = 2
+    statuses = [server.call(TOKEN, "sendMessage", {"chat_id": GROUP_ID, "text": "x"})[0] for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    assert server.call(TOKEN, "getMe", {})[0] == 200
+    assert server.stats()["rate_limited"] == {"sendMessage": 1}
+
+
+def test_latency_from_update_to_action_is_measured(server):
+    generator = LoadGenerator(server, users=1)
+    user_id = generator.users[0]
+    update = generator.message(user_id, "https://spam.com")
+    server.push_update(update)
+    server.call(TOKEN, "deleteMessage", {"chat_id": GROUP_ID, "message_id": update["message"]["message_id"]})
+    server.call(TOKEN, "restrictChatMember", {"chat_id": GROUP_ID, "user_id": user_id, "permissions": {"can_send_messages": False}})
+    assert len(server.latencies["delete"]) == 1
+    member = server.call(TOKEN, "getChatMember", {"chat_id": GROUP_ID, "user_id": user_id})[1]["result"]
+    assert member["status"] == "restricted" and member["can_send_messages"] is False
+
+
+def test_python_telegram_bot_talks_to_the_fake_api(server):
+    telegram = pytest.importorskip("telegram")
+    from telegram.error import RetryAfter
+
+    async def scenario():
+        bot = telegram.Bot(TOKEN, base_url=server.base_url)
+        async with bot:
+            me = await bot.get_me()
+            chat = await bot.get_chat(GROUP_ID)
+            server.rate_limit, server.retry_after, server._window_calls = 1, 3, 0
+            await bot.delete_message(GROUP_ID, 1)
+            with pytest.raises(RetryAfter):
+                await bot.delete_message(GROUP_ID, 2)
+        return me, chat
+
+    me, chat = run(scenario())
+    assert me.id == 123456 and me.username == "fake_load_bot"
+    assert chat.permissions.can_send_messages
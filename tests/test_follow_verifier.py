@@ -0,0 +1,98 @@
+# tests/test_follow_verifier.py
+import asyncio
+
+import pytest
+
+from conftest import run
+from follow_verifier import FollowVerifier, HttpFollowVerifier, SimulatedFollowVerifier, create_follow_verifier
+
+
+class ScriptedVerifier(FollowVerifier):
+    """Backend de teste: responde o que estiver em `answers` (ou levanta, se for uma exceção)."""
+
+    def __init__(self, answers, delay=0, **kwargs):
+        super().__init__(**kwargs)
+        self.answers = list(answers)
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def _verify(self, user_id, user_name=None):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            answer = self.answers.pop(0)
+            if isinstance(answer, Exception):
+                raise answer
+            return answer
+        finally:
+            self.active -= 1
+
+
+def test_positive_result_is_cached():
+    verifier = ScriptedVerifier([True])
+    assert run(verifier.check(1)) is True
+    assert run(verifier.check(1)) is True
+    assert verifier.calls == 1
+    assert verifier.cached_result(1) is True
+
+
+def test_negative_result_uses_its_own_ttl():
+    verifier = ScriptedVerifier([False, True], negative_cache_ttl_sec=0)
+    assert run(verifier.check(1)) is False
+    assert verifier.cached_result(1) is None  # TTL 0: não fica em cache
+    assert run(verifier.check(1)) is True
+
+
+def test_backend_error_returns_none_and_is_not_cached():
+    verifier = ScriptedVerifier([RuntimeError("fora do ar"), True])
+    assert run(verifier.check(1)) is None
+    assert run(verifier.check(1)) is True
+
+
+def test_timeout_returns_none():
+    verifier = ScriptedVerifier([True], delay=0.2, timeout_sec=0.01)
+    assert run(verifier.check(1)) is None
+    assert verifier.cached_result(1) is None
+
+
+def test_concurrent_checks_are_limited():
+    verifier = ScriptedVerifier([True] * 6, delay=0.01, max_concurrent=2)
+
+    async def scenario():
+        return await asyncio.gather(*(verifier.check(user_id) for user_id in range(6)))
+
+    assert run(scenario()) == [True] * 6
+    assert verifier.max_active == 2
+
+
+def test_trim_drops_expired_then_oldest():
+    verifier = SimulatedFollowVerifier()
+    verifier._cache = {1: (0, True), 2: (float("inf"), True), 3: (float("inf"), False), 4: (float("inf"), True)}
+    assert verifier.trim(2) == 2
+    assert list(verifier._cache) == [3, 4]
+
+
+def test_create_follow_verifier_picks_the_backend():
+    assert isinstance(create_follow_verifier({}), SimulatedFollowVerifier)
+    http = create_follow_verifier({
+        "follow_verification": {"backend": "http", "url": "http://127.0.0.1:1/verify", "timeout_sec": 3},
+        "instagram_url": "https://instagram.com/x",
+    })
+    assert isinstance(http, HttpFollowVerifier)
+    assert http.timeout_sec == 3
+    assert http.instagram_url == "https://instagram.com/x"
+    # Sem URL, volta para o simulado
+    assert isinstance(create_follow_verifier({"follow_verification": {"backend": "http"}}), SimulatedFollowVerifier)
+
+
+def test_backend_without_verify_cannot_be_created():
+    class Incomplete(FollowVerifier):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
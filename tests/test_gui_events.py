@@ -0,0 +1,107 @@
+# tests/test_gui_events.py
+import logging
+
+from gui_events import BusLogHandler, ErrorEvent, EventBus, LogEvent, MetricEvent, StatusEvent
+
+
+def test_status_and_metrics_are_coalesced_per_key():
+    bus = EventBus()
+    received = []
+    bus.subscribe(StatusEvent, received.append)
+    bus.subscribe(MetricEvent, received.append)
+    for status in ("Starting", "Running"):
+        bus.publish(StatusEvent(status, bot="a"))
+    bus.publish(StatusEvent("Stopped", bot="b"))
+    for value in range(5):
+        bus.publish(MetricEvent("chat_rate", value, bot="a"))
+    bus.pump()
+    assert StatusEvent("Running", bot="a") in received
+    assert StatusEvent("Stopped", bot="b") in received
+    assert MetricEvent("chat_rate", 4, bot="a") in received
+    assert len(received) == 3
+    assert bus.coalesced == 5
+
+
+def test_logs_are_delivered_in_order_and_in_batches():
+    bus = EventBus(max_events_per_tick=2)
+    batches, errors = [], []
+    bus.subscribe_batch(LogEvent, batches.append)
+    bus.subscribe(ErrorEvent, errors.append)
+    for i in range(3):
+        bus.publish(LogEvent(f"linha {i}"))
+    bus.publish(ErrorEvent("falhou"))
+    bus.pump()
+    bus.pump()
+    assert [[event.message for event in batch] for batch in batches] == [["linha 0", "linha 1"], ["linha 2"]]
+    assert errors == [ErrorEvent("falhou")]
+
+
+def test_bounded_queue_drops_the_oldest_events():
+    bus = EventBus(max_queued=2)
+    for i in range(3):
+        bus.publish(LogEvent(str(i)))
+    assert [event.message for event in bus.pending_events()] == ["1", "2"]
+    assert bus.dropped == 1
+
+
+def test_failing_handler_does_not_stop_delivery():
+    bus = EventBus()
+    received = []
+
+    def broken(event):
+        raise RuntimeError("widget destruído")
+
+    bus.subscribe(ErrorEvent, broken)
+    bus.subscribe(ErrorEvent, received.append)
+    bus.publish(ErrorEvent("x"))
+    bus.pump()
+    assert received == [ErrorEvent("x")]
+
+
+def test_failing_batch_handler_does_not_stop_delivery():
+    bus = EventBus()
+    batches, single = [], []
+
+    def broken(events):
+        raise RuntimeError("console destruído")
+
+    bus.subscribe_batch(LogEvent, broken)
+    bus.subscribe_batch(LogEvent, batches.append)
+    bus.subscribe(LogEvent, single.append)
+    bus.publish(LogEvent("a"))
+    bus.publish(LogEvent("b"))
+    bus.pump()
+    assert [[event.message for event in batch] for batch in batches] == [["a", "b"]]
+    assert len(single) == 2
+
+
+def test_counters_are_exact_with_several_publishing_threads():
+    import threading
+
+    bus = EventBus(max_queued=100)
+
+    def publish():
+        for i in range(2000):
+            bus.publish(LogEvent(str(i)))
+
+    threads = [threading.Thread(target=publish) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert bus.published == 8000
+    assert bus.dropped == 8000 - 100
+
+
+def test_log_handler_publishes_formatted_records():
+    bus = EventBus()
+    logger = logging.getLogger("test_gui_events")
+    logger.propagate = False
+    handler = BusLogHandler(bus)
+    handler.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+    logger.addHandler(handler)
+    try:
+        logger.warning("atenção")
+    finally:
+        logger.removeHandler(handler)
+    assert bus.pending_events() == [LogEvent("WARNING: atenção")]
@@ -0,0 +1,65 @@
+# tests/test_http_pool.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("telegram")
+
+from telegram.error import TimedOut
+from telegram.request import HTTPXRequest
+
+from conftest import run
+from http_pool import build_requests
+
+
+def test_separate_pools_with_their_own_sizes_and_timeouts():
+    api, updates = build_requests({"http": {"connection_pool_size": 8, "get_updates_pool_size": 1,
+                                            "read_timeout": 7, "get_updates_read_timeout": 45}})
+    assert (api.name, api.pool_size) == ("api", 8)
+    assert (updates.name, updates.pool_size) == ("get_updates", 1)
+    assert api.read_timeout == 7
+    assert updates.read_timeout == 45
+
+
+def test_http2_without_h2_falls_back_to_http11(monkeypatch):
+    import importlib.util
+    real_find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *a: None if name == "h2" else real_find_spec(name, *a))
+    messages = []
+    api, _ = build_requests({"http": {"http2": True}}, log=messages.append)
+    assert api.http_version == "1.1"
+    assert messages and "h2" in messages[0]
+
+
+def test_stats_track_peak_saturation_and_pool_timeouts(monkeypatch):
+    release = None
+
+    async def fake_do_request(self, *args, **kwargs):
+        if kwargs.get("fail"):
+            raise TimedOut("Pool timeout: All connections in the connection pool are occupied.")
+        await release.wait()
+        return 200, b"{}"
+
+    monkeypatch.setattr(HTTPXRequest, "do_request", fake_do_request)
+    api, _ = build_requests({"http": {"connection_pool_size": 2}})
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        requests = [asyncio.ensure_future(api.do_request()) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        busy = api.stats()
+        release.set()
+        await asyncio.gather(*requests)
+        with pytest.raises(TimedOut):
+            await api.do_request(fail=True)
+        return busy
+
+    busy = run(scenario())
+    assert busy["in_flight"] == 2 and busy["utilization"] == 1.0
+    stats = api.stats()
+    assert stats["in_flight"] == 0
+    assert stats["peak_in_flight"] == 2
+    assert stats["total_requests"] == 3
+    assert stats["pool_timeouts"] == 1
+    assert stats["saturated_sec"] >= 0.01
@@ -0,0 +1,61 @@
+# tests/test_loop_profiler.py
+import asyncio
+import threading
+import time
+
+from loop_profiler import SamplingProfiler, SlowCallbackMonitor, describe_stack
+
+
+def busy_wait(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def test_profiler_samples_the_target_thread_into_collapsed_stacks(tmp_path):
+    profiler = SamplingProfiler(threading.get_ident(), interval_sec=0.001)
+    profiler.start()
+    busy_wait(0.2)
+    profiler.stop()
+    assert not profiler.running
+    assert profiler.samples > 0 and profiler.elapsed_sec >= 0.2
+    assert any("busy_wait" in line for line in profiler.collapsed())
+    label, share = profiler.top_functions(1)[0]
+    assert label.startswith("busy_wait (test_loop_profiler.py:") and share > 0.5
+    path = tmp_path / "perfil.collapsed"
+    assert profiler.dump(str(path)) == len(profiler.collapsed())
+    count = path.read_text(encoding="utf-8").splitlines()[0].rsplit(" ", 1)[1]
+    assert int(count) > 0
+
+
+def test_describe_stack_starts_with_the_innermost_frame():
+    import sys
+    assert describe_stack(sys._getframe()).startswith("test_describe_stack_starts_with_the_innermost_frame (")
+    assert describe_stack(None) == "(pilha indisponível)"
+
+
+def test_monitor_reports_a_blocking_callback_and_restores_debug_mode():
+    messages = []
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        monitor = SlowCallbackMonitor(loop, threading.get_ident(), 0.05, messages.append)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        assert loop.get_debug() and loop.slow_callback_duration == 0.05
+        busy_wait(0.3)  # Bloqueia o loop
+        await asyncio.sleep(0.02)
+        monitor.stop()
+        await asyncio.sleep(0)
+        return monitor, loop.get_debug()
+
+    loop = asyncio.new_event_loop()
+    try:
+        monitor, debug_after = loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+    assert monitor.stalls == 1
+    stall = next(message for message in messages if message.startswith("Event loop sem responder"))
+    assert "busy_wait" in stall
+    assert any(message.startswith("Callback lento no event loop") for message in messages)
+    assert not debug_after
@@ -0,0 +1,100 @@
+# tests/test_maintenance.py
+import asyncio
+import time
+
+from conftest import run
+from maintenance import CHECK_CLOCK_EVERY, MaintenanceJob, MaintenanceScheduler, sweep_mapping
+
+
+def drain(generator):
+    """Executa um gerador de varredura até o fim e retorna o seu valor."""
+    try:
+        while True:
+            next(generator)
+    except StopIteration as stop:
+        return stop.value
+
+
+def test_sweep_mapping_removes_stale_entries_and_reports_them():
+    mapping = {user_id: user_id for user_id in range(10)}
+    removed = []
+    assert drain(sweep_mapping(mapping, lambda key, value: value % 2, on_remove=lambda key, value: removed.append(key))) == 5
+    assert sorted(mapping) == [0, 2, 4, 6, 8]
+    assert removed == [1, 3, 5, 7, 9]
+
+
+def test_sweep_mapping_tolerates_changes_between_slices():
+    mapping = {"a": 1, "b": 1, "c": 1}
+    sweep = sweep_mapping(mapping, lambda key, value: value == 1)
+    next(sweep)
+    del mapping["b"]  # Removida por outro caminho entre as fatias
+    mapping["c"] = 2  # Relida na verificação
+    assert drain(sweep) == 1
+    assert mapping == {"c": 2}
+
+
+def test_long_sweeps_run_in_slices_and_give_the_loop_back():
+    items = 5 * CHECK_CLOCK_EVERY  # O relógio é consultado a cada CHECK_CLOCK_EVERY itens
+
+    def slow_sweep():
+        for _ in range(items):
+            time.sleep(0.0001)
+            yield
+        return items
+
+    scheduler = MaintenanceScheduler(log=print, slice_ms=2)
+    job = MaintenanceJob("lenta", 60, slow_sweep)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    async def scenario():
+        task = asyncio.ensure_future(ticker())
+        await scheduler.run_job(job)
+        task.cancel()
+
+    run(scenario())
+    assert job.runs == 1 and job.removed == items
+    assert job.slices >= 3
+    assert ticks >= job.slices - 1  # O loop atendeu outras tarefas entre as fatias
+
+
+def test_overlapping_run_is_skipped_and_errors_are_logged():
+    messages = []
+    scheduler = MaintenanceScheduler(log=messages.append)
+    release = None
+
+    async def slow():
+        await release.wait()
+        return 3
+
+    def broken():
+        raise ValueError("estado inválido")
+
+    job, failing = MaintenanceJob("lenta", 60, slow), MaintenanceJob("quebrada", 60, broken)
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        first = asyncio.ensure_future(scheduler.run_job(job))
+        await asyncio.sleep(0)
+        await scheduler.run_job(job)  # A anterior ainda está em andamento
+        release.set()
+        await first
+        await scheduler.run_job(failing)
+
+    run(scenario())
+    assert (job.runs, job.skipped, job.removed) == (1, 1, 3)
+    assert failing.errors == 1
+    assert messages == ["Manutenção 'quebrada' falhou: estado inválido"]
+
+
+def test_add_ignores_disabled_jobs():
+    scheduler = MaintenanceScheduler(log=print)
+    scheduler.add("desativada", 0, lambda: 0)
+    scheduler.add("ativa", 5, lambda: 0)
+    assert list(scheduler.jobs) == ["ativa"]
@@ -0,0 +1,74 @@
+# tests/test_media_blocklist.py
+import pytest
+
+import media_blocklist
+from media_blocklist import BloomFilter, MediaBlocklist
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"file:{i}")
+    assert all(f"file:{i}" in bloom for i in range(1000))
+    false_positives = sum(f"outro:{i}" in bloom for i in range(10000))
+    assert false_positives < 300  # ~1% esperado
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """Blocklist do bot (carregada em memória) e a conexão de edição da GUI, no mesmo arquivo."""
+    opened = []
+
+    def open_pair(use_bloom):
+        path = str(tmp_path / f"blocklist_{use_bloom}.db")
+        bot = MediaBlocklist(path, use_bloom=use_bloom, expected_entries=1000)
+        gui = MediaBlocklist(path, preload=False)
+        opened.extend((bot, gui))
+        return bot, gui
+
+    yield open_pair
+    for store in opened:
+        store.close()
+
+
+@pytest.mark.parametrize("use_bloom", [True, False])
+def test_remove_newest_then_add_is_seen_by_the_bot(stores, use_bloom):
+    bot, gui = stores(use_bloom)
+    gui.add("file:a")
+    gui.add("file:b")
+    bot.refresh(force=True)
+    assert bot.match(("file:b",)) == "file:b"
+
+    gui.remove("file:b")
+    gui.add("file:c")  # Antes reaproveitava o id de "file:b" e não era carregada
+    bot.refresh(force=True)
+    assert bot.match(("file:c",)) == "file:c"
+    assert bot.match(("file:b",)) is None
+    assert len(bot) == 2
+
+
+def test_might_match_is_exact_with_the_set(stores):
+    bot, gui = stores(use_bloom=False)
+    bot.add("set:pacote_ruim")
+    assert bot.might_match(("file:x", "set:pacote_ruim"))
+    assert not bot.might_match(("file:x",))
+    gui.remove("set:pacote_ruim")
+    bot.refresh(force=True)
+    assert not bot.might_match(("set:pacote_ruim",))
+
+
+def test_pruned_change_log_triggers_a_full_reload(stores, monkeypatch):
+    monkeypatch.setattr(media_blocklist, "CHANGE_LOG_LIMIT", 2)
+    bot, gui = stores(use_bloom=False)
+    for i in range(5):
+        gui.add(f"file:{i}")
+    gui.remove("file:0")
+    bot.refresh(force=True)
+    assert bot.might_match(("file:4",)) and not bot.might_match(("file:0",))
+    assert len(bot) == 4
+
+
+def test_invalid_key_is_rejected(stores):
+    bot, _ = stores(use_bloom=True)
+    with pytest.raises(ValueError):
+        bot.add("url:https://exemplo.com")
@@ -0,0 +1,113 @@
+# tests/test_member_cache.py
+import asyncio
+
+from conftest import run
+from member_cache import MemberStatusCache
+
+
+class Fetcher:
+    """Conta as consultas e devolve um membro diferente a cada uma."""
+
+    def __init__(self, delay=0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return f"membro{self.calls}"
+
+
+def test_hit_within_ttl_does_not_fetch_again():
+    cache = MemberStatusCache(ttl_sec=60)
+    fetch = Fetcher()
+
+    async def scenario():
+        first = await cache.get(1, 2, fetch)
+        second = await cache.get(1, 2, fetch)
+        return first, second
+
+    assert run(scenario()) == ("membro1", "membro1")
+    assert fetch.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_entry_is_fetched_again():
+    cache = MemberStatusCache(ttl_sec=0)
+    fetch = Fetcher()
+
+    async def scenario():
+        await cache.get(1, 2, fetch)
+        return await cache.get(1, 2, fetch)
+
+    assert run(scenario()) == "membro2"
+    assert fetch.calls == 2
+
+
+def test_concurrent_lookups_share_one_request():
+    cache = MemberStatusCache()
+    fetch = Fetcher(delay=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get(1, 2, fetch) for _ in range(5)))
+
+    assert run(scenario()) == ["membro1"] * 5
+    assert fetch.calls == 1
+
+
+def test_invalidate_during_fetch_discards_the_result():
+    cache = MemberStatusCache()
+    fetch = Fetcher(delay=0.01)
+
+    async def scenario():
+        pending = asyncio.ensure_future(cache.get(1, 2, fetch))
+        await asyncio.sleep(0)
+        cache.invalidate(1, 2)  # Ex.: o bot restringiu o usuário durante a consulta
+        await pending
+        return await cache.get(1, 2, fetch)
+
+    assert run(scenario()) == "membro2"
+
+
+def test_fetch_error_is_not_cached():
+    cache = MemberStatusCache()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        raise RuntimeError("falha")
+
+    async def scenario():
+        for _ in range(2):
+            try:
+                await cache.get(1, 2, failing)
+            except RuntimeError:
+                pass
+
+    run(scenario())
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+def test_max_entries_drops_the_oldest():
+    cache = MemberStatusCache(max_entries=2)
+    cache.set(1, 1, "a")
+    cache.set(1, 2, "b")
+    cache.set(1, 3, "c")
+    assert len(cache) == 2
+    assert (1, 1) not in cache._entries
+
+
+def test_sweep_expired_removes_only_expired():
+    cache = MemberStatusCache(ttl_sec=60)
+    cache.set(1, 1, "válido")
+    cache._entries[(1, 2)] = (0, "expirado")
+    sweep = cache.sweep_expired()
+    try:
+        while True:
+            next(sweep)
+    except StopIteration as stop:
+        removed = stop.value
+    assert removed == 1
+    assert list(cache._entries) == [(1, 1)]
@@ -0,0 +1,32 @@
+# tests/test_memory_report.py
+from collections import OrderedDict
+
+from memory_report import estimate_size, format_bytes, pop_oldest, structure_row, trim_oldest
+
+
+def test_pop_oldest_returns_the_removed_entries_in_insertion_order():
+    mapping = {user_id: user_id * 10 for user_id in range(5)}
+    assert pop_oldest(mapping, 2) == [(0, 0), (1, 10), (2, 20)]
+    assert list(mapping) == [3, 4]
+    assert pop_oldest(mapping, 5) == []
+
+
+def test_trim_oldest_counts_what_it_removed():
+    mapping = OrderedDict((key, None) for key in "abcdef")
+    assert trim_oldest(mapping, 4) == 2
+    assert list(mapping) == ["c", "d", "e", "f"]
+    assert trim_oldest(mapping, -1) == 4 and not mapping
+
+
+def test_estimate_size_extrapolates_from_a_sample():
+    small = {i: "x" * 100 for i in range(100)}
+    large = {i: "x" * 100 for i in range(10000)}
+    assert estimate_size(large, sample_size=16) > 50 * estimate_size(small, sample_size=16)
+    row = structure_row("pendentes", small, len(small), limit=500)
+    assert row["entries"] == 100 and row["limit"] == 500 and row["bytes"] > 100 * 100
+
+
+def test_format_bytes_picks_the_unit():
+    assert format_bytes(512) == "512 B"
+    assert format_bytes(1536) == "1.5 KB"
+    assert format_bytes(3 * 1024 ** 3) == "3.00 GB"
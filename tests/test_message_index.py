@@ -0,0 +1,55 @@
+# tests/test_message_index.py
+from conftest import run
+from fakes import make_context
+from message_index import RecentMessageIndex, chunked
+
+
+def test_pop_user_returns_recent_ids_oldest_first_and_forgets_them():
+    index = RecentMessageIndex(per_user=3)
+    for message_id in range(1, 6):
+        index.add(-100, 1, message_id)
+    index.add(-100, 2, 99)
+
+    assert index.pop_user(-100, 1) == [3, 4, 5]
+    assert index.pop_user(-100, 1) == []
+    assert index.user_count() == 1
+
+
+def test_least_active_user_is_dropped_first():
+    index = RecentMessageIndex(max_users_per_chat=2)
+    index.add(-100, 1, 10)
+    index.add(-100, 2, 20)
+    index.add(-100, 1, 11)  # Usuário 1 volta a ser o mais recente
+    index.add(-100, 3, 30)
+
+    assert index.pop_user(-100, 2) == []
+    assert index.pop_user(-100, 1) == [10, 11]
+    assert index.message_count() == 1
+
+
+def test_chats_are_independent_and_empty_chats_are_removed():
+    index = RecentMessageIndex()
+    index.add(-1, 1, 10)
+    index.add(-2, 1, 20)
+    assert index.pop_user(-1, 1) == [10]
+    assert -1 not in index._chats
+    assert index.pop_user(-2, 1) == [20]
+
+
+def test_chunked():
+    assert list(chunked(list(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 100)) == []
+
+
+def test_purge_deletes_in_batches_and_skips_the_triggering_message(make_bot):
+    bot = make_bot(rules={"purge_message_count": 150})
+    context = make_context()
+    for message_id in range(1, 151):
+        bot.message_index.add(-100, 7, message_id)
+
+    deleted = run(bot._purge_user_messages(7, -100, context, skip_message_id=150))
+
+    batches = [call["message_ids"] for call in context.bot.called("delete_messages")]
+    assert deleted == 149
+    assert [len(batch) for batch in batches] == [100, 49]
+    assert 150 not in batches[1]
@@ -0,0 +1,45 @@
+# tests/test_metrics.py
+from metrics import BotMetrics, TimeSeriesRing, percentile
+
+
+def test_ring_keeps_only_the_latest_points():
+    ring = TimeSeriesRing(capacity=3)
+    for i in range(5):
+        ring.append(i, i * 10)
+    assert ring.snapshot() == [(2, 20), (3, 30), (4, 40)]
+    assert ring.last() == 40
+    assert TimeSeriesRing().last(default=-1) == -1
+
+
+def test_percentile_of_sorted_values():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 51
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) == 0.0
+
+
+def test_sample_consolidates_the_interval():
+    metrics = BotMetrics(capacity=10)
+    metrics._last_sample = 100.0
+    for _ in range(20):
+        metrics.record_update()
+    for ms in (5, 10, 15):
+        metrics.record_latency(ms)
+    metrics.record_rule_hit("links")
+    metrics.record_rule_hit("links")
+    metrics.sample(api_calls=10, api_failures=1, gauges={"pending_verifications": 3}, now=102.0)
+
+    assert metrics.series["updates_per_sec"].last() == 10.0
+    assert metrics.series["latency_p50_ms"].last() == 10
+    assert metrics.series["api_error_rate"].last() == 10.0
+    assert metrics.series["rule:links"].last() == 2
+    assert metrics.series["pending_verifications"].last() == 3
+    assert metrics.version == 1
+
+    # Próximo intervalo: contadores acumulados viram diferenças e regras sem acerto valem 0
+    metrics.sample(api_calls=10, api_failures=1, now=103.0)
+    assert metrics.series["updates_per_sec"].last() == 0.0
+    assert metrics.series["api_error_rate"].last() == 0.0
+    assert metrics.series["rule:links"].last() == 0
+    assert metrics.rule_names() == ["links"]
+    assert metrics.rule_hits_total["links"] == 2
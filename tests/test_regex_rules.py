@@ -0,0 +1,75 @@
+# tests/test_regex_rules.py
+import time
+
+import pytest
+
+import regex_rules
+from regex_rules import RegexRuleSet, validate_pattern
+from rules_engine import MessageInfo, RuleEngine
+
+
+@pytest.mark.parametrize("pattern", [
+    r"(a+)+$", r"(\w*)*x", r"(?:ab|a)+(c+)*", r"(a)\1", r"(?P<nome>x)", "", "(abc",
+    r"(a|aa)+$", r"(a?b)+", r"\w*\w*x", r"\w+\s*\w+", r"a.*b.*c", r"(?i)chama no pv", r"(?x) chama \s no",
+])
+def test_dangerous_or_invalid_patterns_are_rejected(pattern):
+    with pytest.raises(ValueError):
+        validate_pattern(pattern)
+
+
+@pytest.mark.parametrize("pattern", [
+    r"compre\s+já", r"\bt\.me/\w+", r"(?:ganhe|grátis){1}", r"a{0,1}b+", r"\w+\s+\w+", r"\d+[.,]\d+", r"(?i:pix)\s*premiado",
+])
+def test_ordinary_patterns_are_accepted(pattern):
+    validate_pattern(pattern)
+
+
+def test_all_rules_are_evaluated_in_one_pass_and_ban_stops_the_search():
+    rules = RegexRuleSet([
+        {"name": "promo", "pattern": r"promoção", "action": "delete"},
+        {"name": "golpe", "pattern": r"pix\s+premiado", "action": "ban"},
+        {"name": "desativada", "pattern": r"olá", "enabled": False},
+        {"name": "quebrada", "pattern": r"(x+)+"},
+    ])
+    assert rules.errors and rules.errors[0].startswith("quebrada:")
+    assert rules.match("Olá, PROMOÇÃO hoje") == [("promo", "delete")]
+    assert rules.match("pix premiado e promoção") == [("golpe", "ban")]
+    assert rules.hits == {"promo": 1, "golpe": 1}
+    assert rules.match("") == []
+
+
+def test_only_the_start_of_long_texts_is_scanned():
+    rules = RegexRuleSet([{"name": "fim", "pattern": "segredo"}], max_text_chars=10)
+    assert rules.match("x" * 20 + "segredo") == []
+
+
+def test_engine_reports_the_regex_rule_name():
+    engine = RuleEngine()
+    rules = {"custom_regex_rules": [{"name": "spam", "pattern": r"compre\s+já", "action": "ban"}]}
+    verdict = engine.evaluate(MessageInfo(chat_id=-100, user_id=1, message_id=1, text="Compre  já!"), rules)
+    assert verdict.ban and verdict.delete
+    assert verdict.rule == "regex:spam"
+
+
+def test_rule_with_a_global_flag_is_skipped_instead_of_breaking_the_set():
+    rules = RegexRuleSet([
+        {"name": "global", "pattern": "(?i)chama no pv"},
+        {"name": "pv", "pattern": r"chama\s+no\s+pv"},
+    ])
+    assert [error.split(":")[0] for error in rules.errors] == ["global"]
+    assert rules.match("CHAMA no pv") == [("pv", "delete")]
+
+
+def test_stdlib_search_stays_within_the_budget_on_hostile_texts(monkeypatch):
+    monkeypatch.setattr(regex_rules, "_regex_module", lambda: None)  # Sem o pacote regex
+    patterns = [r"(a|aa)+$", r"\w*\w*x", r"compre\s+já", r"\bt\.me/\w+", r"https?://\S+", r"\d+[.,]\d+",
+                r"\w+\s+\w+!", r"gr[aá]tis.*pix", r"[a-z]+\d+[a-z]+"]
+    rules = RegexRuleSet([{"name": pattern, "pattern": pattern} for pattern in patterns], time_budget_ms=50)
+    assert len(rules.errors) == 2
+    for text in ("a" * 34 + "b", "a" * 4096, "ab" * 2048, "grátis " + "a" * 4090, "a1" * 2048):
+        started = time.perf_counter()
+        rules.match(text)
+        assert time.perf_counter() - started < 0.05
+    assert rules.timeouts == 0
+    # O teto dos quantificadores não impede encontrar ocorrências longas
+    assert ("https?://\\S+", "delete") in rules.match("veja https://x.com/" + "a" * 500)
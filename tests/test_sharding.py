@@ -0,0 +1,57 @@
+# tests/test_sharding.py
+import asyncio
+from collections import Counter
+
+from conftest import run
+from rules_engine import MessageInfo
+from sharding import HashRing, ShardedRuleEvaluator
+
+GROUP_ID = -1001234567890
+
+
+def test_ring_is_stable_and_balanced():
+    ring, same = HashRing(range(4)), HashRing(range(4))
+    owners = [ring.node_for(user_id) for user_id in range(4000)]
+    assert owners == [same.node_for(user_id) for user_id in range(4000)]
+    counts = Counter(owners)
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > 600  # ~1000 por nó
+
+
+def test_adding_a_node_remaps_only_a_fraction_of_the_keys():
+    before = HashRing(range(4))
+    after = HashRing(range(5))
+    moved = sum(before.node_for(key) != after.node_for(key) for key in range(5000))
+    assert moved < 5000 * 0.35  # ~1/5 esperado
+
+
+def test_node_cache_is_bounded():
+    ring = HashRing(range(2), cache_size=100)
+    for key in range(1000):
+        ring.node_for(key)
+    assert len(ring._cache) <= 100
+
+
+class FakeInbox:
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+
+def test_messages_of_one_group_are_spread_across_workers_by_user():
+    evaluator = ShardedRuleEvaluator(4, {}, timeout_sec=0.05)
+    inboxes = [FakeInbox() for _ in range(4)]
+
+    async def scenario():
+        evaluator._loop = asyncio.get_running_loop()
+        evaluator._inboxes = inboxes
+        messages = [MessageInfo(chat_id=GROUP_ID, user_id=user_id % 40, message_id=user_id) for user_id in range(200)]
+        await asyncio.gather(*(evaluator.evaluate(info) for info in messages), return_exceptions=True)
+
+    run(scenario())
+    users_by_worker = [{info.user_id for _, batch in inbox.items for _, info in batch} for inbox in inboxes]
+    assert all(users_by_worker)  # Todos os workers recebem trabalho de um único grupo
+    assert sum(len(users) for users in users_by_worker) == 40  # Cada usuário em um só worker
+    assert evaluator.timeouts == 200
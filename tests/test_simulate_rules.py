@@ -0,0 +1,53 @@
+# tests/test_simulate_rules.py
+import json
+
+from simulate_rules import NO_RULE, read_messages, record_to_fields, simulate
+
+RULES_A = {"block_links": True, "block_spam_flood": True, "spam_message_limit": 2, "spam_time_limit_sec": 10}
+RULES_B = dict(RULES_A, block_links=False)
+
+
+def test_telegram_desktop_export_fields():
+    record = {"id": 7, "from": "Ana", "from_id": "user42", "date": "2024-05-01T10:00:00",
+              "text": ["veja ", {"type": "link", "text": "https://x.com"}]}
+    chat_id, user_id, message_id, user_name, text, *_ = record_to_fields(record, 0)
+    assert (chat_id, user_id, message_id, user_name) == (0, 42, 7, "Ana")
+    assert text == "veja https://x.com"
+
+
+def test_csv_export_is_read_in_streaming(tmp_path):
+    path = tmp_path / "mensagens.csv"
+    path.write_text("chat_id,user_id,text,has_media,ts\n-100,1,olá,sim,10\n-100,2,oi,0,11\n", encoding="utf-8")
+    rows = list(read_messages(str(path)))
+    assert [(row[1], row[4], row[8], row[9]) for row in rows] == [(1, "olá", True, 10.0), (2, "oi", False, 11.0)]
+
+
+def write_export(path, users=6, per_user=4):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(users * per_user):
+            user_id = i % users + 1
+            text = "compre em https://loja.com" if user_id == 1 else f"mensagem {i}"
+            f.write(json.dumps({"chat_id": -100, "user_id": user_id, "message_id": i, "text": text, "ts": 1000 + i / 10}) + "\n")
+
+
+def test_comparison_counts_rules_and_transitions(tmp_path):
+    path = str(tmp_path / "export.jsonl")
+    write_export(path)
+    stats = simulate(read_messages(path), (RULES_A, RULES_B, None, None, 2), workers=1)
+    assert stats.total == 24
+    # A 3ª mensagem de cada usuário é flood (o banimento zera o histórico), com ou sem links
+    assert stats.rules["a"]["flood"] == stats.rules["b"]["flood"] == 6
+    assert stats.rules["a"]["links"] == 3
+    assert stats.transitions == {("links", NO_RULE): 3}
+    assert stats.banned == {"a": 6, "b": 6}
+
+
+def test_workers_split_a_single_group_and_give_the_same_result(tmp_path):
+    path = str(tmp_path / "export.jsonl")
+    write_export(path)
+    args = (RULES_A, RULES_B, None, None, 2)
+    single = simulate(read_messages(path), args, workers=1)
+    sharded = simulate(read_messages(path), args, workers=2)
+    assert sharded.total == single.total
+    assert sharded.rules == single.rules
+    assert sharded.transitions == single.transitions
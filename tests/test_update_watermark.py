@@ -0,0 +1,72 @@
+# tests/test_update_watermark.py
+import json
+
+from update_watermark import UpdateWatermark
+
+
+def test_recent_updates_are_detected_within_the_window(tmp_path):
+    watermark = UpdateWatermark(str(tmp_path / "wm.json"), bot_id=1, window=3)
+    assert not watermark.is_duplicate(10)
+    assert watermark.is_duplicate(10)
+    for update_id in (11, 12, 13):
+        watermark.is_duplicate(update_id)
+    assert not watermark.is_duplicate(10)  # Saiu da janela
+    assert watermark.skipped == 1
+
+
+def test_flush_writes_only_when_the_mark_advanced(tmp_path):
+    path = tmp_path / "wm.json"
+    watermark = UpdateWatermark(str(path), bot_id=1)
+    assert not watermark.flush()
+    watermark.mark_done(5)
+    watermark.mark_done(3)
+    assert watermark.dirty
+    assert watermark.flush()
+    assert not watermark.dirty and not watermark.flush()
+    assert json.loads(path.read_text(encoding="utf-8"))["update_id"] == 5
+    assert not (tmp_path / "wm.json.tmp").exists()
+
+
+def test_updates_up_to_the_saved_mark_are_skipped_after_a_restart(tmp_path):
+    path = str(tmp_path / "wm.json")
+    first = UpdateWatermark(path, bot_id=1)
+    first.mark_done(100)
+    first.flush()
+
+    restarted = UpdateWatermark(path, bot_id=1)
+    assert restarted.is_duplicate(100)
+    assert not restarted.is_duplicate(101)
+    # A marca de outro bot (outro token) não vale
+    assert not UpdateWatermark(path, bot_id=2).is_duplicate(100)
+
+
+def test_corrupted_file_starts_from_zero(tmp_path):
+    path = tmp_path / "wm.json"
+    path.write_text("{não é json", encoding="utf-8")
+    assert UpdateWatermark(str(path), bot_id=1).floor == 0
+
+
+def test_mark_saved_more_than_a_week_ago_is_ignored(tmp_path):
+    import time
+    path = tmp_path / "wm.json"
+    path.write_text(json.dumps({"bot_id": "1", "update_id": 500, "saved_at": time.time() - 8 * 86400}), encoding="utf-8")
+    assert UpdateWatermark(str(path), bot_id=1).floor == 0
+    path.write_text(json.dumps({"bot_id": "1", "update_id": 500, "saved_at": time.time() - 3600}), encoding="utf-8")
+    assert UpdateWatermark(str(path), bot_id=1).floor == 500
+
+
+def test_update_id_far_below_the_mark_starts_a_new_sequence(tmp_path):
+    path = str(tmp_path / "wm.json")
+    first = UpdateWatermark(path, bot_id=1, window=100)
+    first.mark_done(100000)
+    first.flush()
+
+    restarted = UpdateWatermark(path, bot_id=1, window=100)
+    assert restarted.is_duplicate(99950)  # Dentro da janela: reenvio
+    assert not restarted.is_duplicate(42)  # Sequência recomeçada pelo Telegram
+    assert not restarted.is_duplicate(43)
+    assert restarted.is_duplicate(43)
+    assert restarted.resets == 1
+    restarted.mark_done(43)
+    assert restarted.flush()
+    assert UpdateWatermark(path, bot_id=1).floor == 43
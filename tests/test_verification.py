@@ -0,0 +1,278 @@
+# tests/test_verification.py
+"""Fluxo do botão "Já segui" (handlers de bot_logic.py com um Bot falso)."""
+from types import SimpleNamespace
+
+from conftest import run
+from fakes import FakeBot, FakeQuery, callback_update, make_context
+
+CHAT_ID = -100
+USER_ID = 42
+
+
+def restricted():
+    return SimpleNamespace(status="restricted", can_send_messages=False)
+
+
+def click(bot, context, user_id=USER_ID):
+    query = FakeQuery(user_id, CHAT_ID)
+
+    async def scenario():
+        await bot._handle_callback_query(callback_update(query), context)
+        await context.application.wait_tasks()
+
+    run(scenario())
+    return query
+
+
+def test_pending_user_is_released(make_bot):
+    bot = make_bot()
+    context = make_context()
+    bot.pending_verification[USER_ID] = 0
+
+    query = click(bot, context)
+
+    assert USER_ID not in bot.pending_verification
+    [unrestrict] = context.bot.called("restrict_chat_member")
+    assert unrestrict["permissions"].can_send_messages
+    assert query.edits and "Acesso liberado" in query.edits[-1]
+
+
+def test_lost_pending_entry_still_restricted_resumes_verification(make_bot):
+    bot = make_bot()
+    context = make_context(FakeBot({(CHAT_ID, USER_ID): restricted()}))
+
+    query = click(bot, context)
+
+    assert context.bot.called("get_chat_member") == [{"chat_id": CHAT_ID, "user_id": USER_ID}]
+    assert context.bot.called("restrict_chat_member")[-1]["permissions"].can_send_messages
+    assert "Verificação não necessária ou já concluída." not in query.answers
+    assert USER_ID not in bot.pending_verification
+
+
+def test_unrestricted_user_is_told_verification_is_not_needed(make_bot):
+    bot = make_bot()
+    context = make_context()
+
+    first = click(bot, context)
+    second = click(bot, context)
+
+    assert first.answers == second.answers == ["Verificação não necessária ou já concluída."]
+    assert not context.bot.called("restrict_chat_member")
+    # O segundo clique usa o cache de membros
+    assert len(context.bot.called("get_chat_member")) == 1
+
+
+def test_user_muted_by_chat_flood_is_not_released_by_the_button(make_bot):
+    bot = make_bot()
+    context = make_context(FakeBot({(CHAT_ID, USER_ID): restricted()}))
+    bot._flood_restricted[CHAT_ID].add(USER_ID)
+
+    query = click(bot, context)
+
+    assert query.answers == ["Verificação não necessária ou já concluída."]
+    assert not context.bot.called("restrict_chat_member")
+
+
+def test_button_of_another_user_is_refused(make_bot):
+    bot = make_bot()
+    context = make_context()
+    bot.pending_verification[USER_ID] = 0
+    query = FakeQuery(7, CHAT_ID, data=f"verify_{USER_ID}")
+
+    run(bot._handle_callback_query(callback_update(query), context))
+
+    assert query.answers == ["Este botão não é para você."]
+    assert USER_ID in bot.pending_verification
+
+
+def test_negative_follow_check_keeps_the_user_pending_and_shows_a_notice(make_bot):
+    from follow_verifier import FollowVerifier
+
+    class NotFollowing(FollowVerifier):
+        async def _verify(self, user_id, user_name=None):
+            return False
+
+    bot = make_bot()
+    bot.follow_verifier = NotFollowing()
+    context = make_context()
+    bot.pending_verification[USER_ID] = 0
+
+    first = click(bot, context)
+    second = click(bot, context)  # Resultado negativo em cache: o aviso vai na resposta do callback
+
+    assert USER_ID in bot.pending_verification
+    assert not context.bot.called("restrict_chat_member")
+    assert "ainda não seguiu" in first.edits[-1]
+    assert "ainda não seguiu" in second.answers[-1]
+
+
+def test_repeated_clicks_are_throttled(make_bot):
+    bot = make_bot(performance={"callback_throttle_sec": 60})
+    context = make_context()
+
+    click(bot, context)
+    second = click(bot, context)
+
+    assert second.answers == ["Muitos cliques. Aguarde um instante."]
+    assert len(context.bot.called("get_chat_member")) == 1
+
+
+def test_click_while_the_check_is_running_is_not_processed_twice(make_bot):
+    import asyncio
+    from follow_verifier import FollowVerifier
+
+    class SlowBackend(FollowVerifier):
+        calls = 0
+
+        async def _verify(self, user_id, user_name=None):
+            SlowBackend.calls += 1
+            await asyncio.sleep(0.05)
+            return True
+
+    bot = make_bot()
+    bot.follow_verifier = SlowBackend()
+    context = make_context()
+    bot.pending_verification[USER_ID] = 0
+    first, second = FakeQuery(USER_ID, CHAT_ID), FakeQuery(USER_ID, CHAT_ID)
+
+    async def scenario():
+        await bot._handle_callback_query(callback_update(first), context)
+        await bot._handle_callback_query(callback_update(second), context)
+        await context.application.wait_tasks()
+
+    run(scenario())
+
+    assert second.answers == ["Sua solicitação já está sendo processada. Aguarde."]
+    assert SlowBackend.calls == 1
+    assert USER_ID not in bot._callbacks_in_flight
+    assert USER_ID not in bot.pending_verification
+
+
+def evict_pending(bot, context, user_ids, click_first=None):
+    """Estoura o limite de pendências e aguarda a expiração dos descartados (clicando antes, se pedido)."""
+    import asyncio
+    for since, user_id in enumerate(user_ids):
+        bot.pending_verification[user_id] = since
+    bot.application = context.application
+
+    async def scenario():
+        bot._enforce_memory_limits()
+        if click_first is not None:
+            await bot._handle_callback_query(callback_update(click_first), context)
+            await context.application.wait_tasks()
+        await asyncio.gather(*bot._verification_expiries)
+
+    run(scenario())
+
+
+def test_evicted_pending_users_are_kicked_and_their_old_button_does_nothing(make_bot):
+    bot = make_bot(memory={"pending_verification_max": 10})
+    context = make_context(FakeBot({(CHAT_ID, USER_ID): SimpleNamespace(status="left", can_send_messages=False)}))
+
+    evict_pending(bot, context, [USER_ID] + list(range(100, 111)))
+
+    kicked = context.bot.called("unban_chat_member")
+    assert [call["user_id"] for call in kicked] == [USER_ID, 100, 101]  # As 3 mais antigas
+    assert all("only_if_banned" not in call for call in kicked)  # Sem ele, o unban remove do grupo
+    assert len(bot.pending_verification) == 9
+    query = click(bot, context)
+    assert query.answers == ["Verificação não necessária ou já concluída."]
+    assert not context.bot.called("restrict_chat_member")
+
+
+def test_evicted_pending_users_can_be_unrestricted_instead(make_bot):
+    bot = make_bot(memory={"pending_verification_max": 10}, maintenance={"pending_verification_expire_action": "unrestrict"})
+    context = make_context()
+
+    evict_pending(bot, context, [USER_ID] + list(range(100, 111)))
+
+    released = context.bot.called("restrict_chat_member")
+    assert [call["user_id"] for call in released] == [USER_ID, 100, 101]
+    assert all(call["permissions"].can_send_messages for call in released)
+    assert not context.bot.called("unban_chat_member")
+    assert click(bot, context).answers == ["Verificação não necessária ou já concluída."]
+
+
+def test_click_right_after_eviction_resumes_verification_instead_of_kicking(make_bot):
+    bot = make_bot(memory={"pending_verification_max": 10})
+    context = make_context(FakeBot({(CHAT_ID, USER_ID): restricted()}))
+
+    evict_pending(bot, context, [USER_ID] + list(range(100, 111)), click_first=FakeQuery(USER_ID, CHAT_ID))
+
+    assert [call["user_id"] for call in context.bot.called("unban_chat_member")] == [100, 101]
+    assert context.bot.called("restrict_chat_member")[-1]["permissions"].can_send_messages
+
+
+def test_expired_pending_users_are_kicked_by_the_state_sweep(make_bot):
+    import asyncio
+    import time
+    from maintenance import MaintenanceJob, MaintenanceScheduler
+
+    bot = make_bot(maintenance={"pending_verification_ttl_sec": 3600})
+    context = make_context()
+    bot.application = context.application
+    bot.pending_verification.update({USER_ID: time.time() - 7200, 7: time.time()})
+
+    async def scenario():
+        await MaintenanceScheduler(log=print).run_job(MaintenanceJob("state", 60, bot._sweep_state))
+        await asyncio.gather(*bot._verification_expiries)
+
+    run(scenario())
+
+    assert list(bot.pending_verification) == [7]
+    assert [call["user_id"] for call in context.bot.called("unban_chat_member")] == [USER_ID]
+
+
+def join(bot, context, user_id=USER_ID):
+    member = SimpleNamespace(id=user_id, first_name="Ana", is_bot=False, username=None)
+    update = SimpleNamespace(message=SimpleNamespace(chat_id=CHAT_ID, new_chat_members=[member]))
+    run(bot._handle_new_member(update, context))
+
+
+def open_send_message_breaker(bot):
+    """Breaker de send_message aberto com o dobro de falhas: descarta até a prioridade normal."""
+    breaker = bot.api.breaker("send_message")
+    for _ in range(2 * breaker.failure_threshold):
+        breaker.record_failure(open_for=60)
+
+
+def test_new_member_is_restricted_welcomed_and_left_pending(make_bot):
+    bot = make_bot()
+    context = make_context()
+
+    join(bot, context)
+
+    assert not context.bot.called("restrict_chat_member")[0]["permissions"].can_send_messages
+    assert context.bot.called("send_message")[0]["reply_markup"] is not None
+    assert USER_ID in bot.pending_verification
+
+
+def test_shed_welcome_releases_the_new_member(make_bot):
+    bot = make_bot()
+    context = make_context()
+    open_send_message_breaker(bot)
+
+    join(bot, context)
+
+    assert not context.bot.called("send_message")
+    restrict, release = context.bot.called("restrict_chat_member")
+    assert not restrict["permissions"].can_send_messages and release["permissions"].can_send_messages
+    assert USER_ID not in bot.pending_verification
+
+
+def test_user_stays_pending_when_neither_welcome_nor_release_go_through(make_bot):
+    class FailingRelease(FakeBot):
+        async def restrict_chat_member(self, **kwargs):
+            if kwargs["permissions"].can_send_messages:
+                from telegram.error import BadRequest
+                raise BadRequest("Not enough rights")
+            return await super().restrict_chat_member(**kwargs)
+
+    bot = make_bot()
+    context = make_context(FailingRelease())
+    open_send_message_breaker(bot)
+
+    join(bot, context)
+
+    # A expiração das pendências ainda vai removê-lo ou liberá-lo
+    assert USER_ID in bot.pending_verification
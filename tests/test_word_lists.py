@@ -0,0 +1,67 @@
+# tests/test_word_lists.py
+import pytest
+
+import word_lists
+from conftest import run
+from word_lists import WordListStore, WordLists, WordMatcher, parse_words
+
+
+def test_parse_words_accepts_lines_and_commas():
+    assert parse_words(" Palavra1, palavra2\n\nPALAVRA3 ,") == ["palavra1", "palavra2", "palavra3"]
+
+
+def test_matcher_finds_substrings_in_small_and_large_buckets():
+    matcher = WordMatcher(["golpe"] + [f"x{i:04d}" for i in range(100)])
+    assert matcher.search("isso é um golpe!") == "golpe"
+    assert matcher.search("código x0042 aqui") == "x0042"
+    assert matcher.search("nada") is None
+
+
+def test_with_changes_leaves_the_current_matcher_untouched():
+    current = WordMatcher(["spam", "golpe"])
+    updated = current.with_changes([("golpe", False), ("fraude", True)])
+    assert current.search("golpe") == "golpe" and current.search("fraude") is None
+    assert updated.search("golpe") is None and updated.search("fraude") == "fraude"
+    assert (len(current), len(updated)) == (2, 2)
+    assert current._buckets[4] is updated._buckets[4]  # Tamanho sem alterações: compartilhado
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = WordListStore(str(tmp_path / "words.db"))
+    yield store
+    store.close()
+
+
+def test_refresh_swaps_in_new_matchers(store):
+    store.add("profanity_list", ["feio"])
+    lists = WordLists(store)
+    before = lists.matcher("profanity_list")
+    store.add("profanity_list", ["chato"])
+    store.remove("profanity_list", ["feio"])
+    assert lists.refresh(force=True) == 2
+    after = lists.matcher("profanity_list")
+    assert after is not before
+    assert before.search("feio") == "feio"  # Quem estava usando o antigo não vê mudança no meio da busca
+    assert after.search("chato") == "chato" and after.search("feio") is None
+    assert lists.refresh(force=True) == 0
+
+
+def test_pruned_log_reloads_everything(store, monkeypatch):
+    monkeypatch.setattr(word_lists, "CHANGE_LOG_LIMIT", 1)
+    lists = WordLists(store)
+    store.add("profanity_list", ["a1"])
+    store.add("profanity_list", ["b2"])
+    store.add("profanity_list", ["c3"])
+    assert lists.refresh(force=True) == -1
+    assert len(lists.matcher("profanity_list")) == 3
+
+
+def test_bot_loads_and_refreshes_word_lists_off_the_event_loop(make_bot):
+    bot = make_bot()
+    assert not bot.word_lists.loaded  # Nada lido do banco na thread que cria o bot (GUI)
+    bot.word_lists.store.add("profanity_list", ["palavrão"])
+    bot.word_lists.load()
+    bot.word_lists.store.add("profanity_list", ["outro"])
+    run(bot._refresh_word_lists())
+    assert bot.word_lists.matcher("profanity_list").search("mais outro") == "outro"
@@ -0,0 +1,94 @@
+# update_watermark.py
+import json
+import os
+import threading
+import time
+from collections import deque
+
+WATERMARK_FILE = "update_watermark_{bot}.json"
+MAX_AGE_SEC = 7 * 86400  # Após ~1 semana sem updates, o Telegram recomeça o update_id de um valor aleatório
+
+
+class UpdateWatermark:
+    """Marca d'água do último update processado e janela de deduplicação.
+
+    - `is_duplicate()` (O(1)): updates com id <= marca gravada no disco já foram
+      processados antes do reinício; os vistos recentemente ficam num conjunto
+      limitado a `window` ids.
+    - Uma marca gravada há mais de `max_age_sec` é ignorada, e um id mais de
+      `window` abaixo da marca indica que o Telegram recomeçou a sequência: a
+      marca volta a zero em vez de descartar todos os updates dali em diante.
+    - `mark_done()` só avança a marca em memória; `flush()` grava (write-behind)
+      quando ela avançou, em arquivo temporário + os.replace (nunca fica corrompido).
+
+    A marca é associada ao ID do bot (início do token) para não valer para outro bot.
+    """
+
+    def __init__(self, path, bot_id, window=10000, max_age_sec=MAX_AGE_SEC):
+        self.path = path
+        self.bot_id = str(bot_id)
+        self.window = window
+        self.max_age_sec = max_age_sec
+        self.floor = self._load()  # Processados antes deste início
+        self.high = self.floor  # Maior update concluído nesta execução
+        self._persisted = self.floor
+        self._recent = set()
+        self._order = deque()
+        self._lock = threading.Lock()
+        self.skipped = 0
+        self.resets = 0  # Sequências de update_id recomeçadas pelo Telegram
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if str(data.get("bot_id")) != self.bot_id:
+                return 0
+            if self.max_age_sec and time.time() - float(data.get("saved_at", 0)) > self.max_age_sec:
+                return 0  # A sequência pode ter recomeçado
+            return int(data.get("update_id", 0))
+        except (OSError, ValueError, TypeError, AttributeError):
+            return 0
+
+    def is_duplicate(self, update_id):
+        """True se o update já foi visto (e deve ser ignorado); senão o registra na janela."""
+        if update_id <= max(self.floor, self.high) - self.window:
+            self._reset()
+        if update_id <= self.floor or update_id in self._recent:
+            self.skipped += 1
+            return True
+        self._recent.add(update_id)
+        self._order.append(update_id)
+        if len(self._order) > self.window:
+            self._recent.discard(self._order.popleft())
+        return False
+
+    def _reset(self):
+        """Nova sequência de update_id: esquece a marca e a janela (a próxima gravação usa a nova sequência)."""
+        with self._lock:  # Não mistura com uma gravação em andamento no executor
+            self.floor = self.high = self._persisted = 0
+            self._recent.clear()
+            self._order.clear()
+            self.resets += 1
+
+    def mark_done(self, update_id):
+        """Registra que o update terminou de ser processado (só memória)."""
+        if update_id > self.high:
+            self.high = update_id
+
+    @property
+    def dirty(self):
+        return self.high > self._persisted
+
+    def flush(self):
+        """Grava a marca se ela avançou. Faz I/O: chamar fora do event loop. Retorna True se gravou."""
+        with self._lock:
+            high = self.high
+            if high <= self._persisted:
+                return False
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"bot_id": self.bot_id, "update_id": high, "saved_at": time.time()}, f)
+            os.replace(temp_path, self.path)
+            self._persisted = high
+            return True
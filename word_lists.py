@@ -0,0 +1,309 @@
+# word_lists.py
+import sqlite3
+import threading
+import time
+
+WORD_LISTS_FILE = "word_lists.db"
+WORD_LIST_NAMES = ("profanity_list", "allowed_topics_keywords")  # Mesmos nomes das chaves antigas em 'rules'
+CHANGE_LOG_LIMIT = 100000  # Alterações guardadas para a atualização incremental dos bots
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS words (
+    list TEXT NOT NULL,
+    word TEXT NOT NULL,
+    PRIMARY KEY (list, word)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY,
+    list TEXT NOT NULL,
+    word TEXT NOT NULL,
+    added INTEGER NOT NULL
+);
+"""
+
+
+def normalize_word(word):
+    """Forma armazenada: sem espaços nas pontas e em minúsculas (a comparação ignora maiúsculas)."""
+    return word.strip().lower()
+
+
+def parse_words(text):
+    """Palavras de um texto com uma por linha e/ou separadas por vírgula."""
+    return [word for line in text.splitlines() for word in (normalize_word(w) for w in line.split(",")) if word]
+
+
+class WordListStore:
+    """Listas de palavras em SQLite (uma tabela indexada por lista e palavra).
+
+    Adições e remoções são incrementais e ficam registradas em `changes`, de
+    onde os bots aplicam só a diferença (ver WordLists). Thread-safe.
+    """
+
+    def __init__(self, path=WORD_LISTS_FILE):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+        self.open()
+
+    @property
+    def closed(self):
+        return self._conn is None
+
+    def open(self):
+        """Abre a conexão (nada a fazer se já estiver aberta)."""
+        with self._lock:
+            if self._conn is None:
+                conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._conn = conn
+
+    def _log_changes(self, rows):
+        self._conn.executemany("INSERT INTO changes (list, word, added) VALUES (?, ?, ?)", rows)
+        last_id = self._conn.execute("SELECT MAX(id) FROM changes").fetchone()[0] or 0
+        self._conn.execute("DELETE FROM changes WHERE id <= ?", (last_id - CHANGE_LOG_LIMIT,))
+
+    def add(self, list_name, words):
+        """Adiciona palavras (em uma transação). Retorna quantas eram novas."""
+        added = []
+        with self._lock, self._conn:
+            for word in dict.fromkeys(normalize_word(w) for w in words):
+                if word and self._conn.execute("INSERT OR IGNORE INTO words (list, word) VALUES (?, ?)",
+                                               (list_name, word)).rowcount:
+                    added.append((list_name, word, 1))
+            self._log_changes(added)
+        return len(added)
+
+    def remove(self, list_name, words):
+        """Remove palavras. Retorna quantas existiam."""
+        removed = []
+        with self._lock, self._conn:
+            for word in dict.fromkeys(normalize_word(w) for w in words):
+                if self._conn.execute("DELETE FROM words WHERE list = ? AND word = ?", (list_name, word)).rowcount:
+                    removed.append((list_name, word, 0))
+            self._log_changes(removed)
+        return len(removed)
+
+    def import_file(self, list_name, path):
+        """Importa um arquivo de texto (uma palavra por linha ou separadas por vírgula). Retorna quantas eram novas."""
+        with open(path, "r", encoding="utf-8-sig") as f:
+            return self.add(list_name, parse_words(f.read()))
+
+    def words(self, list_name):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT word FROM words WHERE list = ?", (list_name,))]
+
+    def count(self, list_name, prefix=""):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM words WHERE list = ? AND word >= ? AND word < ?",
+                (list_name, prefix, prefix + "\uffff")
+            ).fetchone()[0]
+
+    def page(self, list_name, prefix="", limit=200, offset=0):
+        """Palavras em ordem alfabética, filtradas por prefixo (usa o índice da chave primária)."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT word FROM words WHERE list = ? AND word >= ? AND word < ? ORDER BY word LIMIT ? OFFSET ?",
+                (list_name, prefix, prefix + "\uffff", limit, offset)
+            )]
+
+    def last_change(self):
+        with self._lock:
+            return self._conn.execute("SELECT MAX(id) FROM changes").fetchone()[0] or 0
+
+    def changes_since(self, change_id):
+        """Alterações com id > change_id: [(id, lista, palavra, adicionada)], ou None se já foram descartadas."""
+        with self._lock:
+            oldest = self._conn.execute("SELECT MIN(id) FROM changes").fetchone()[0]
+            if oldest is not None and oldest > change_id + 1:
+                return None  # O log foi podado além do ponto em que o leitor parou: recarregar tudo
+            return self._conn.execute(
+                "SELECT id, list, word, added FROM changes WHERE id > ? ORDER BY id", (change_id,)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class WordMatcher:
+    """Busca de qualquer palavra (como substring) num texto, com as palavras agrupadas por tamanho.
+
+    Para cada tamanho presente, as janelas do texto daquele tamanho são
+    consultadas num set: custo O(tamanho do texto x tamanhos distintos), sem
+    depender do número de palavras. Grupos pequenos usam `in` direto.
+    Adicionar e remover palavras é O(1). Um matcher em uso por outra thread
+    não deve ser alterado: `with_changes` cria um novo.
+    """
+
+    SMALL_BUCKET = 16
+
+    def __init__(self, words=()):
+        self._buckets = {}  # tamanho: set de palavras
+        self._count = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        word = normalize_word(word)
+        if not word:
+            return
+        bucket = self._buckets.setdefault(len(word), set())
+        if word not in bucket:
+            bucket.add(word)
+            self._count += 1
+
+    def discard(self, word):
+        word = normalize_word(word)
+        bucket = self._buckets.get(len(word))
+        if bucket is not None and word in bucket:
+            bucket.discard(word)
+            self._count -= 1
+            if not bucket:
+                del self._buckets[len(word)]
+
+    def with_changes(self, changes):
+        """Novo matcher com as alterações [(palavra, adicionada)]; este não muda.
+
+        Só os grupos dos tamanhos alterados são copiados, então o custo não depende do tamanho da lista.
+        """
+        new = WordMatcher()
+        new._buckets = dict(self._buckets)
+        new._count = self._count
+        copied = set()
+        for word, added in changes:
+            word = normalize_word(word)
+            if not word:
+                continue
+            length = len(word)
+            if length not in copied:
+                new._buckets[length] = set(new._buckets.get(length, ()))
+                copied.add(length)
+            bucket = new._buckets[length]
+            if added and word not in bucket:
+                bucket.add(word)
+                new._count += 1
+            elif not added and word in bucket:
+                bucket.discard(word)
+                new._count -= 1
+        for length in copied:
+            if not new._buckets[length]:
+                del new._buckets[length]
+        return new
+
+    def __len__(self):
+        return self._count
+
+    def search(self, text):
+        """Primeira palavra contida em `text` (já em minúsculas) ou None."""
+        size = len(text)
+        for length, bucket in self._buckets.items():
+            if length > size:
+                continue
+            if len(bucket) <= self.SMALL_BUCKET:
+                for word in bucket:
+                    if word in text:
+                        return word
+                continue
+            for start in range(size - length + 1):
+                if text[start:start + length] in bucket:
+                    return text[start:start + length]
+        return None
+
+
+class WordLists:
+    """Matchers das listas de palavras, mantidos em dia com o banco de forma incremental.
+
+    `load()` e `refresh()` fazem I/O (no bot, rodam no executor; `refresh` aplica
+    só as alterações novas e recarrega tudo se o log foi podado). Os matchers
+    novos são montados à parte e trocados de uma vez, então `matcher()` (só
+    leitura em memória, usado pelo RuleEngine) pode rodar em outra thread
+    ao mesmo tempo. Não chamar `refresh` de duas threads ao mesmo tempo.
+    """
+
+    def __init__(self, store, names=WORD_LIST_NAMES, refresh_interval_sec=5.0, preload=True):
+        self.store = store
+        self.names = names
+        self.refresh_interval_sec = refresh_interval_sec
+        self._matchers = {}
+        self._last_change = 0
+        self._last_refresh = time.monotonic()
+        self.loaded = False
+        if preload:
+            self.load()
+
+    def load(self):
+        """Carrega as listas inteiras do banco (reabrindo a conexão, se fechada por `close()`)."""
+        self.store.open()
+        last_change = self.store.last_change()
+        matchers = {name: WordMatcher(self.store.words(name)) for name in self.names}
+        self._matchers, self._last_change = matchers, last_change
+        self.loaded = True
+
+    def refresh(self, force=False):
+        """Aplica as alterações feitas desde a última consulta. Retorna quantas foram aplicadas."""
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval_sec:
+            return 0
+        self._last_refresh = now
+        changes = self.store.changes_since(self._last_change)
+        if changes is None:
+            self.load()
+            return -1
+        if not changes:
+            return 0
+        by_list = {}
+        for _, name, word, added in changes:
+            by_list.setdefault(name, []).append((word, added))
+        matchers = dict(self._matchers)
+        for name, list_changes in by_list.items():
+            if name in matchers:
+                matchers[name] = matchers[name].with_changes(list_changes)
+        self._matchers, self._last_change = matchers, changes[-1][0]
+        return len(changes)
+
+    def matcher(self, name):
+        return self._matchers.get(name)
+
+    def close(self):
+        """Fecha o banco; os matchers continuam em memória e `load()` reabre."""
+        self.store.close()
+        self.loaded = False
+
+
+def create_word_lists(config, preload=True):
+    """WordLists conforme config['word_lists']. Com preload=False, chamar `load()` depois (fora da thread da GUI)."""
+    settings = config.get("word_lists", {})
+    return WordLists(
+        WordListStore(settings.get("path", WORD_LISTS_FILE)),
+        refresh_interval_sec=settings.get("refresh_interval_sec", 5.0),
+        preload=preload
+    )
+
+
+def migrate_inline_lists(config):
+    """Move as listas guardadas em config['rules'] para o banco. Retorna True se a configuração mudou.
+
+    Não altera o dicionário 'rules' original (pode ser o de DEFAULT_CONFIG).
+    Se o banco não puder ser aberto, as listas continuam na configuração (e
+    continuam valendo).
+    """
+    rules = config.get("rules", {})
+    inline = {name: rules[name] for name in WORD_LIST_NAMES if rules.get(name)}
+    if not inline:
+        return False
+    try:
+        store = WordListStore(config.get("word_lists", {}).get("path", WORD_LISTS_FILE))
+        try:
+            for name, words in inline.items():
+                store.add(name, words)
+        finally:
+            store.close()
+    except sqlite3.Error as e:
+        print(f"Não foi possível mover as listas de palavras para o banco: {e}")
+        return False
+    config["rules"] = {**rules, **{name: [] for name in inline}}
+    return True